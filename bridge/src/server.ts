@@ -12,7 +12,7 @@ interface SendCommand {
 }
 
 interface BridgeMessage {
-  type: 'message' | 'status' | 'qr' | 'error';
+  type: 'message' | 'typing' | 'status' | 'qr' | 'error';
   [key: string]: unknown;
 }
 
@@ -32,6 +32,7 @@ export class BridgeServer {
     this.wa = new WhatsAppClient({
       authDir: this.authDir,
       onMessage: (msg) => this.broadcast({ type: 'message', ...msg }),
+      onTyping: (event) => this.broadcast({ type: 'typing', ...event }),
       onQR: (qr) => this.broadcast({ type: 'qr', qr }),
       onStatus: (status) => this.broadcast({ type: 'status', status }),
     });
@@ -26,9 +26,15 @@ export interface InboundMessage {
   isGroup: boolean;
 }
 
+export interface TypingEvent {
+  sender: string;
+  pn: string;
+}
+
 export interface WhatsAppClientOptions {
   authDir: string;
   onMessage: (msg: InboundMessage) => void;
+  onTyping?: (event: TypingEvent) => void;
   onQR: (qr: string) => void;
   onStatus: (status: string) => void;
 }
@@ -37,6 +43,8 @@ export class WhatsAppClient {
   private sock: any = null;
   private options: WhatsAppClientOptions;
   private reconnecting = false;
+  // Chat JID -> phone-number JID, so typing events match the sender of messages
+  private phoneByJid: Map<string, string> = new Map();
 
   constructor(options: WhatsAppClientOptions) {
     this.options = options;
@@ -105,6 +113,17 @@ export class WhatsAppClient {
     // Save credentials on update
     this.sock.ev.on('creds.update', saveCreds);
 
+    // Typing indicators (only delivered for chats we subscribed to below)
+    this.sock.ev.on('presence.update', ({ id, presences }: { id: string; presences: Record<string, any> }) => {
+      if (!this.options.onTyping || id.endsWith('@g.us')) return;
+      const composing = Object.values(presences || {}).some(
+        (p: any) => p?.lastKnownPresence === 'composing',
+      );
+      if (composing) {
+        this.options.onTyping({ sender: id, pn: this.phoneByJid.get(id) || '' });
+      }
+    });
+
     // Handle incoming messages
     this.sock.ev.on('messages.upsert', async ({ messages, type }: { messages: any[]; type: string }) => {
       if (type !== 'notify') return;
@@ -121,6 +140,11 @@ export class WhatsAppClient {
 
         const isGroup = msg.key.remoteJid?.endsWith('@g.us') || false;
 
+        if (!isGroup && msg.key.remoteJid && this.options.onTyping) {
+          if (msg.key.remoteJidAlt) this.phoneByJid.set(msg.key.remoteJid, msg.key.remoteJidAlt);
+          this.sock.presenceSubscribe(msg.key.remoteJid).catch(() => undefined);
+        }
+
         this.options.onMessage({
           id: msg.key.id || '',
           sender: msg.key.remoteJid || '',
@@ -5,6 +5,7 @@ from dashboard.utils.sessions import get_sessions_list
 from dashboard.utils.memory import (
     get_token_usage_today,
     get_token_usage_period_days,
+    get_usage_rollup,
     get_facts,
     get_facts_categories,
     get_reflections,
@@ -19,6 +20,7 @@ __all__ = [
     "get_sessions_list",
     "get_token_usage_today",
     "get_token_usage_period_days",
+    "get_usage_rollup",
     "get_facts",
     "get_facts_categories",
     "get_reflections",
@@ -7,6 +7,7 @@ try:
     from nanobot.memory.db import (
         get_token_usage_today as _get_token_usage_today,
         get_token_usage_period,
+        get_llm_usage_rollup,
         get_facts_filtered,
         get_facts_by_category,
         search_facts,
@@ -41,6 +42,17 @@ def get_token_usage_period_days(days: int = 7) -> list[dict[str, Any]]:
         return []
 
 
+def get_usage_rollup(days: int = 7, group_by: str = "model") -> list[dict[str, Any]]:
+    """Get daily LLM usage/cost rollups grouped by model, call_site or session_key."""
+    if not _HAS_NANOBOT:
+        return []
+    try:
+        init_db()
+        return get_llm_usage_rollup(days=days, group_by=group_by)
+    except Exception:
+        return []
+
+
 def get_facts(
     domain: str | None = None,
     category: str | None = None,
@@ -7,6 +7,11 @@ from collections import Counter
 from pathlib import Path
 from typing import Any
 
+try:
+    from nanobot.agents.telemetry import read_tail
+except ImportError:
+    read_tail = None
+
 
 def _cfg_get(config: Any, keys: list[str], default: Any = None) -> Any:
     """Read nested values from dict-like or pydantic-like config objects."""
@@ -47,6 +52,13 @@ def load_navigator_events(limit: int = 2000, config: Any = None) -> list[dict[st
     if not log_path.exists():
         return []
 
+    if read_tail is not None:
+        # Seeks to the tail via the writer's index; spans rotated segments.
+        try:
+            return read_tail(log_path, limit)
+        except OSError:
+            return []
+
     events: list[dict[str, Any]] = []
     try:
         with log_path.open("r", encoding="utf-8") as handle:
@@ -72,19 +72,15 @@ class ContextBuilder:
         
         if self.skill_manager:
             try:
-                # 1. Always-load skills (with timing)
+                # 1. Always-load skills (pre-rendered bundle, with timing)
                 t0_always = time.perf_counter()
-                always_skills = self.skill_manager.list_always_load_skills()
+                always_names, always_bundle = self.skill_manager.get_always_load_bundle()
                 elapsed_always_load_ms = (time.perf_counter() - t0_always) * 1000
                 
                 active_content_parts = []
-                for skill in always_skills:
-                    content = skill.get("content", "")
-                    if content:
-                        name = skill.get("name", "")
-                        if name:
-                            seen.add(name)
-                        active_content_parts.append(f"### Skill: {name}\n\n{content}")
+                seen.update(always_names)
+                if always_bundle:
+                    active_content_parts.append(always_bundle)
                 
                 # 2. Semantic search (with timing)
                 search_results = []
@@ -1,8 +1,10 @@
 """Agent loop: the core processing engine."""
 
 import asyncio
+import atexit
 import copy
 import json
+import time
 from datetime import datetime
 from pathlib import Path
 from typing import Any
@@ -12,9 +14,13 @@ from loguru import logger
 
 from nanobot.bus.events import InboundMessage, OutboundMessage
 from nanobot.bus.queue import MessageBus
+from nanobot.agents.hint_cache import HintCache
 from nanobot.agents.navigator import NavigatorAgent, NavigatorResult
-from nanobot.providers.base import LLMProvider
+from nanobot.agents.telemetry import NavigatorLogWriter
+from nanobot.providers.base import LLMProvider, LLMResponse
+from nanobot.providers.call_context import llm_call_context
 from nanobot.agent.context import ContextBuilder
+from nanobot.agent.token_accounting import ContextBudget
 from nanobot.agent.reflection import Reflection
 from nanobot.agent.skill_manager import SkillManager
 from nanobot.memory.vector_manager import VectorDBManager
@@ -22,6 +28,7 @@ from nanobot.agent.skill_generator import SkillGenerator
 from nanobot.agent.tools.policy import ToolPolicy
 from nanobot.agent.tools.skill import CreateSkillTool
 from nanobot.agent.tools.registry import ToolRegistry
+from nanobot.agent.tools.results import ReadResultTool, ResultStore
 from nanobot.agent.tools.filesystem import ReadFileTool, WriteFileTool, EditFileTool, ListDirTool
 from nanobot.agent.tools.shell import ExecTool
 from nanobot.agent.tools.web import WebSearchTool, WebFetchTool
@@ -29,6 +36,7 @@ from nanobot.agent.tools.message import MessageTool
 from nanobot.agent.tools.spawn import SpawnTool
 from nanobot.agent.tools.cron import CronTool
 from nanobot.agent.tools.memory import MemorySearchTool
+from nanobot.agent.tools.tokens import TokensTool
 from nanobot.agent.tools.mcp import MCPCallTool
 from nanobot.agent.subagent import SubagentManager
 from nanobot.memory.db import add_reflection
@@ -60,14 +68,18 @@ class AgentLoop:
         restrict_to_workspace: bool = False,
         session_manager: SessionManager | None = None,
         navigator_config: "NavigatorConfig | None" = None,
+        context_budget_tokens: int | None = None,
+        tool_results_config: "ToolResultsConfig | None" = None,
     ):
-        from nanobot.config.schema import ExecToolConfig, NavigatorConfig
+        from nanobot.config.schema import ExecToolConfig, NavigatorConfig, ToolResultsConfig
         from nanobot.cron.service import CronService
         self.bus = bus
         self.provider = provider
         self.workspace = workspace
         self.model = model or provider.get_default_model()
         self.max_iterations = max_iterations
+        # None/0 derives the prompt budget from the model's context window.
+        self.context_budget = ContextBudget(self.model, max_prompt_tokens=context_budget_tokens)
         self.brave_api_key = brave_api_key
         self.exec_config = exec_config or ExecToolConfig()
         self.cron_service = cron_service
@@ -79,7 +91,12 @@ class AgentLoop:
             model=self.navigator_config.model,
             timeout_seconds=self.navigator_config.slm_timeout_seconds,
             log_path=self.navigator_config.log_path,
+            similarity=self.navigator_config.similarity,
+            hint_cache=self._make_hint_cache(self.navigator_config),
+            log_writer=self._make_navigator_log_writer(self.navigator_config),
         )
+        # Navigator runs that outlive their turn (missed hint deadline)
+        self._navigator_tasks: set[asyncio.Task] = set()
 
         # VectorDBManager + SkillManager для семантического подбора навыков
         db_path = Path.home() / ".nanobot" / "chroma"
@@ -89,7 +106,14 @@ class AgentLoop:
 
         self.context = ContextBuilder(workspace, skill_manager=self.skill_manager)
         self.sessions = session_manager or SessionManager(workspace)
-        self.tools = ToolRegistry()
+        results_config = tool_results_config or ToolResultsConfig()
+        self.result_store = ResultStore(
+            workspace / ".cache" / "tool_results",
+            threshold_chars=results_config.spill_threshold_chars,
+            preview_chars=results_config.preview_chars,
+            max_age_hours=results_config.max_age_hours,
+        )
+        self.tools = ToolRegistry(result_store=self.result_store)
         self.reflection = Reflection(provider=provider, model=self.model)
         self.skill_generator = SkillGenerator(
             skills_dir=self.workspace / "skills",
@@ -105,6 +129,7 @@ class AgentLoop:
             brave_api_key=brave_api_key,
             exec_config=self.exec_config,
             restrict_to_workspace=restrict_to_workspace,
+            result_store=self.result_store,
         )
         
         self._running = False
@@ -118,6 +143,7 @@ class AgentLoop:
         self.tools.register(WriteFileTool(allowed_dir=allowed_dir))
         self.tools.register(EditFileTool(allowed_dir=allowed_dir))
         self.tools.register(ListDirTool(allowed_dir=allowed_dir))
+        self.tools.register(ReadResultTool(self.result_store))
         
         # Shell tool
         self.tools.register(ExecTool(
@@ -133,6 +159,9 @@ class AgentLoop:
         # Memory search
         self.tools.register(MemorySearchTool())
 
+        # Token usage and cost statistics
+        self.tools.register(TokensTool())
+
         # Skill creation tool
         create_skill_tool = CreateSkillTool(
             skill_generator=self.skill_generator,
@@ -155,6 +184,27 @@ class AgentLoop:
         # MCP bridge (manus-mcp-cli)
         self.tools.register(MCPCallTool())
     
+    def _fit_prompt(
+        self,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]],
+        iteration: int,
+        previous_tokens: int,
+    ) -> tuple[list[dict[str, Any]], int]:
+        """
+        Fit the prompt into the context budget and log its growth.
+
+        The full history in ``messages`` is kept; only the copy sent to the
+        LLM has old tool results shrunk.
+        """
+        prompt, tokens = self.context_budget.fit(messages, tools)
+        growth = tokens - previous_tokens if previous_tokens else tokens
+        logger.info(
+            f"Prompt iteration {iteration}: ~{tokens} tokens ({growth:+d}), "
+            f"budget {self.context_budget.max_prompt_tokens}"
+        )
+        return prompt, tokens
+
     async def run(self) -> None:
         """Run the agent loop, processing messages from the bus."""
         self._running = True
@@ -168,25 +218,58 @@ class AgentLoop:
                     timeout=1.0
                 )
                 
-                # Process it
-                try:
-                    response = await self._process_message(msg)
-                    if response:
-                        await self.bus.publish_outbound(response)
-                except Exception as e:
-                    logger.error(f"Error processing message: {e}")
-                    # Send error response
-                    await self.bus.publish_outbound(OutboundMessage(
-                        channel=msg.channel,
-                        chat_id=msg.chat_id,
-                        content=f"Sorry, I encountered an error: {str(e)}"
-                    ))
+                await self._handle_inbound(msg)
             except asyncio.TimeoutError:
                 continue
     
+    async def _handle_inbound(self, msg: InboundMessage) -> None:
+        """Process one inbound message and publish the reply (or an error notice)."""
+        try:
+            with llm_call_context(session_key=msg.session_key):
+                response = await self._process_message(msg)
+            if response:
+                await self.bus.publish_outbound(response)
+        except Exception as e:
+            logger.error(f"Error processing message: {e}")
+            # Send error response
+            await self.bus.publish_outbound(OutboundMessage(
+                channel=msg.channel,
+                chat_id=msg.chat_id,
+                content=f"Sorry, I encountered an error: {str(e)}"
+            ))
+    
+    async def drain(self, timeout: float = 30.0) -> int:
+        """
+        Process messages still queued on the bus, e.g. bursts flushed at shutdown.
+        
+        Runs after ``run()`` has been torn down. Gives up once ``timeout``
+        seconds have passed.
+        
+        Returns:
+            Number of messages left unprocessed (logged when non-zero).
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        left = 0
+        while self.bus.inbound_size:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            msg = await self.bus.consume_inbound()
+            try:
+                await asyncio.wait_for(self._handle_inbound(msg), timeout=remaining)
+            except asyncio.TimeoutError:
+                left += 1  # The message that was cut off
+                break
+        left += self.bus.inbound_size
+        if left:
+            logger.warning(f"{left} inbound message(s) left unprocessed at shutdown")
+        return left
+    
     def stop(self) -> None:
         """Stop the agent loop."""
         self._running = False
+        self.navigator.log_writer.close()
         logger.info("Agent loop stopping")
     
     async def _process_message(self, msg: InboundMessage) -> OutboundMessage | None:
@@ -219,18 +302,16 @@ class AgentLoop:
         if session.pending_confirmation:
             return await self._handle_confirmation(session, msg)
 
-        navigator_result: NavigatorResult | None = None
+        # The navigator runs concurrently with context building below.
+        turn_started = time.monotonic()
+        navigator_task: asyncio.Task[NavigatorResult | None] | None = None
         navigator_cfg = self._navigator_config_dict()
         if self.navigator.should_run(msg.session_key, navigator_cfg):
-            try:
-                navigator_result = await self.navigator.analyze(
-                    session_history=session.messages,
-                    user_message=msg.content,
-                    config=navigator_cfg,
-                    conversation_id=msg.session_key,
-                )
-            except Exception as e:
-                logger.warning(f"Navigator analyze failed: {e}")
+            navigator_task = asyncio.create_task(
+                self._run_navigator(session.messages, msg.content, navigator_cfg, msg.session_key)
+            )
+            self._navigator_tasks.add(navigator_task)
+            navigator_task.add_done_callback(self._navigator_tasks.discard)
 
         # Update tool contexts
         message_tool = self.tools.get("message")
@@ -245,8 +326,11 @@ class AgentLoop:
         if isinstance(cron_tool, CronTool):
             cron_tool.set_context(msg.channel, msg.chat_id)
         
-        # Build initial messages (use get_history for LLM-formatted messages)
-        messages = self.context.build_messages(
+        # Build initial messages (use get_history for LLM-formatted messages).
+        # Disk reads and vector queries run in a worker thread so the
+        # navigator can make progress meanwhile.
+        messages = await asyncio.to_thread(
+            self.context.build_messages,
             history=session.get_history(),
             current_message=msg.content,
             media=msg.media if msg.media else None,
@@ -254,23 +338,35 @@ class AgentLoop:
             chat_id=msg.chat_id,
         )
 
-        if navigator_result and navigator_result.hint:
-            self._inject_navigator_hint(messages, navigator_result)
+        if navigator_task is not None:
+            if await self._wait_for_navigator(navigator_task, turn_started):
+                self._apply_navigator_task(messages, navigator_task)
+                navigator_task = None
+            else:
+                logger.info("Navigator missed its hint deadline; starting the LLM call without it")
         
         # Agent loop
         iteration = 0
+        prompt_tokens = 0
         final_content = None
         
         while iteration < self.max_iterations:
             iteration += 1
+
+            # A hint that missed the deadline joins as soon as it is ready.
+            if navigator_task is not None and navigator_task.done():
+                self._apply_navigator_task(messages, navigator_task)
+                navigator_task = None
             
             # Call LLM (with timeout to avoid hanging)
             try:
                 logger.info(f"LLM call iteration {iteration}...")
+                tools = self.tools.get_definitions()
+                prompt, prompt_tokens = self._fit_prompt(messages, tools, iteration, prompt_tokens)
                 response = await asyncio.wait_for(
                     self.provider.chat(
-                        messages=messages,
-                        tools=self.tools.get_definitions(),
+                        messages=prompt,
+                        tools=tools,
                         model=self.model
                     ),
                     timeout=120.0,
@@ -287,6 +383,8 @@ class AgentLoop:
                     content=final_content,
                     metadata=msg.metadata or {},
                 )
+            if response.finish_reason == "error":
+                return self._llm_failure_reply(response, msg.channel, msg.chat_id, msg.metadata)
             
             # Handle tool calls
             if response.has_tool_calls:
@@ -428,6 +526,53 @@ class AgentLoop:
             metadata=msg.metadata or {},  # Pass through for channel-specific needs (e.g. Slack thread_ts)
         )
 
+    @staticmethod
+    def _llm_failure_reply(
+        response: LLMResponse,
+        channel: str,
+        chat_id: str,
+        metadata: dict[str, Any] | None = None,
+    ) -> OutboundMessage:
+        """Tell the user the model call failed; the turn is not saved to the session."""
+        logger.error(f"LLM call failed: {response.content}")
+        return OutboundMessage(
+            channel=channel,
+            chat_id=chat_id,
+            content="Извини, модель сейчас недоступна. Попробуй ещё раз чуть позже.",
+            metadata=metadata or {},
+        )
+
+    @staticmethod
+    def _make_hint_cache(navigator_config: "NavigatorConfig") -> HintCache | None:
+        """Build the navigator hint cache from config (None when disabled)."""
+        cfg = getattr(navigator_config, "hint_cache", None)
+        if cfg is None or not cfg.enabled:
+            return None
+        return HintCache(
+            ttl_seconds=cfg.ttl_seconds,
+            max_entries=cfg.max_entries,
+            text_mode=cfg.text_mode,
+            per_session=cfg.per_session,
+        )
+
+    @staticmethod
+    def _make_navigator_log_writer(navigator_config: "NavigatorConfig") -> NavigatorLogWriter | None:
+        """Build the buffered pilot log writer; flushed on stop() and at exit."""
+        cfg = getattr(navigator_config, "log", None)
+        if cfg is None:
+            return None
+        writer = NavigatorLogWriter(
+            navigator_config.log_path,
+            buffer_size=cfg.buffer_size,
+            batch_size=cfg.batch_size,
+            flush_interval=cfg.flush_interval,
+            max_bytes=cfg.max_bytes,
+            rotate_seconds=cfg.rotate_hours * 3600,
+            keep_segments=cfg.keep_segments,
+        )
+        atexit.register(writer.close)
+        return writer
+
     def _navigator_config_dict(self) -> dict[str, Any]:
         """Convert navigator config model into a plain dict."""
         if hasattr(self.navigator_config, "model_dump"):
@@ -436,6 +581,48 @@ class AgentLoop:
             return self.navigator_config
         return {}
 
+    async def _run_navigator(
+        self,
+        history: list[dict[str, Any]],
+        user_message: str,
+        config: dict[str, Any],
+        session_key: str,
+    ) -> NavigatorResult | None:
+        """Run the navigator; failures are logged and yield no hint."""
+        try:
+            return await self.navigator.analyze(
+                session_history=history,
+                user_message=user_message,
+                config=config,
+                conversation_id=session_key,
+            )
+        except Exception as e:
+            logger.warning(f"Navigator analyze failed: {e}")
+            return None
+
+    async def _wait_for_navigator(self, task: asyncio.Task, turn_started: float) -> bool:
+        """
+        Wait for the navigator within its latency budget.
+
+        Returns:
+            True if the task finished; False if the deadline passed first
+            (the task keeps running)
+        """
+        deadline_ms = getattr(self.navigator_config, "hint_deadline_ms", 0)
+        if not deadline_ms:
+            await task
+            return True
+        remaining = deadline_ms / 1000 - (time.monotonic() - turn_started)
+        if remaining > 0:
+            await asyncio.wait({task}, timeout=remaining)
+        return task.done()
+
+    def _apply_navigator_task(self, messages: list[dict[str, Any]], task: asyncio.Task) -> None:
+        """Inject the hint of a finished navigator task, if it produced one."""
+        result = task.result()
+        if result and result.hint:
+            self._inject_navigator_hint(messages, result)
+
     def _inject_navigator_hint(
         self,
         messages: list[dict[str, Any]],
@@ -552,16 +739,19 @@ class AgentLoop:
     ) -> OutboundMessage | None:
         """Continue agent loop after tool execution (post-confirmation)."""
         iteration = 0
+        prompt_tokens = 0
         final_content = None
 
         while iteration < self.max_iterations:
             iteration += 1
 
             try:
+                tools = self.tools.get_definitions()
+                prompt, prompt_tokens = self._fit_prompt(messages, tools, iteration, prompt_tokens)
                 response = await asyncio.wait_for(
                     self.provider.chat(
-                        messages=messages,
-                        tools=self.tools.get_definitions(),
+                        messages=prompt,
+                        tools=tools,
                         model=self.model,
                     ),
                     timeout=120.0,
@@ -578,6 +768,8 @@ class AgentLoop:
                     content=final_content,
                     metadata=msg.metadata or {},
                 )
+            if response.finish_reason == "error":
+                return self._llm_failure_reply(response, msg.channel, msg.chat_id, msg.metadata)
 
             if response.has_tool_calls:
                 tool_call_dicts = [
@@ -732,16 +924,19 @@ class AgentLoop:
         
         # Agent loop (limited for announce handling)
         iteration = 0
+        prompt_tokens = 0
         final_content = None
         
         while iteration < self.max_iterations:
             iteration += 1
             
             try:
+                tools = self.tools.get_definitions()
+                prompt, prompt_tokens = self._fit_prompt(messages, tools, iteration, prompt_tokens)
                 response = await asyncio.wait_for(
                     self.provider.chat(
-                        messages=messages,
-                        tools=self.tools.get_definitions(),
+                        messages=prompt,
+                        tools=tools,
                         model=self.model
                     ),
                     timeout=120.0,
@@ -757,6 +952,8 @@ class AgentLoop:
                     chat_id=origin_chat_id,
                     content=final_content
                 )
+            if response.finish_reason == "error":
+                return self._llm_failure_reply(response, origin_channel, origin_chat_id)
             
             if response.has_tool_calls:
                 tool_call_dicts = [
@@ -856,5 +1053,6 @@ class AgentLoop:
             content=content
         )
         
-        response = await self._process_message(msg)
+        with llm_call_context(session_key=session_key):
+            response = await self._process_message(msg)
         return response.content if response else ""
@@ -6,6 +6,7 @@ from typing import Any
 from loguru import logger
 
 from nanobot.providers.base import LLMProvider
+from nanobot.providers.call_context import llm_call_context
 
 
 REFLECTION_SYSTEM_PROMPT = """You are a Self-Correction module for an AI agent called nanobot.
@@ -80,13 +81,14 @@ class Reflection:
                 {"role": "system", "content": REFLECTION_SYSTEM_PROMPT},
                 {"role": "user", "content": user_prompt},
             ]
-            response = await self.provider.chat(
-                messages=llm_messages,
-                tools=None,
-                model=self.model,
-                max_tokens=500,
-                temperature=0.3,
-            )
+            with llm_call_context(call_site="reflection"):
+                response = await self.provider.chat(
+                    messages=llm_messages,
+                    tools=None,
+                    model=self.model,
+                    max_tokens=500,
+                    temperature=0.3,
+                )
             return response.content
         except Exception as e:
             logger.warning(f"Reflection failed: {e}")
@@ -93,49 +93,25 @@ class SkillComposer:
         """
         Order skills based on dependencies (topological sort).
         
+        Uses the repository's cached dependency graph, so transitive
+        dependencies through skills outside the composition are respected.
+        
         Args:
             skills: List of skill dicts
         
         Returns:
             Ordered list of skills
         """
-        # Build dependency graph
         skill_map = {s["skill"]["name"]: s for s in skills}
-        graph: dict[str, list[str]] = {}
-        in_degree: dict[str, int] = {}
-        
-        for s in skills:
-            name = s["skill"]["name"]
-            deps = s["skill"].get("dependencies", [])
-            
-            graph[name] = []
-            if name not in in_degree:
-                in_degree[name] = 0
-            
-            for dep in deps:
-                if dep in skill_map:
-                    graph[dep].append(name)
-                    in_degree[name] = in_degree.get(name, 0) + 1
-        
-        # Topological sort (Kahn's algorithm)
-        queue = [name for name in graph if in_degree[name] == 0]
-        ordered = []
-        
-        while queue:
-            current = queue.pop(0)
-            ordered.append(skill_map[current])
-            
-            for neighbor in graph.get(current, []):
-                in_degree[neighbor] -= 1
-                if in_degree[neighbor] == 0:
-                    queue.append(neighbor)
+        graph = self.manager.repository.get_dependency_graph()
+        order = graph.topological_order(skill_map)
         
-        # If not all skills were ordered, there's a cycle or missing deps
-        if len(ordered) < len(skills):
+        # If not all skills could be ordered, there's a cycle
+        if order is None:
             logger.warning("Circular dependencies detected, using original order")
             return skills
         
-        return ordered
+        return [skill_map[name] for name in order]
     
     def validate_composition(self, composition: list[dict[str, Any]]) -> dict[str, Any]:
         """
@@ -151,19 +127,23 @@ class SkillComposer:
         warnings = []
         
         skill_names = {s["skill"]["name"] for s in composition}
+        graph = self.manager.repository.get_dependency_graph()
         
         # Check dependencies
         for item in composition:
             skill = item["skill"]
             for dep in skill.get("dependencies", []):
                 if dep not in skill_names:
-                    # Check if dependency exists in repository
-                    dep_skill = self.manager.get_skill(dep)
-                    if not dep_skill:
+                    if dep not in graph:
                         issues.append(f"Skill '{skill['name']}' depends on missing skill '{dep}'")
                     else:
                         warnings.append(f"Skill '{skill['name']}' depends on '{dep}' which is not in composition")
         
+        # Check for dependency cycles
+        for cycle in graph.find_cycles():
+            if skill_names.intersection(cycle):
+                issues.append(f"Circular dependency between skills: {', '.join(cycle)}")
+        
         # Check for skill type consistency
         types = [s["skill"].get("skill_type", "basic") for s in composition]
         if "meta" in types and types.index("meta") != 0:
@@ -9,6 +9,7 @@ from typing import TYPE_CHECKING, Any
 from loguru import logger
 
 from nanobot.providers.base import LLMProvider
+from nanobot.providers.call_context import llm_call_context
 
 if TYPE_CHECKING:
     from nanobot.agent.skill_manager import SkillManager
@@ -146,18 +147,19 @@ class SkillGenerator:
         prompt = SKILL_GENERATION_PROMPT.format(tool_sequence=tool_sequence)
 
         try:
-            response = await self.provider.chat(
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a technical writer. Generate clear, reusable skill documentation.",
-                    },
-                    {"role": "user", "content": prompt},
-                ],
-                model=self.model,
-                temperature=0.3,
-                max_tokens=2000,
-            )
+            with llm_call_context(call_site="skill_generator"):
+                response = await self.provider.chat(
+                    messages=[
+                        {
+                            "role": "system",
+                            "content": "You are a technical writer. Generate clear, reusable skill documentation.",
+                        },
+                        {"role": "user", "content": prompt},
+                    ],
+                    model=self.model,
+                    temperature=0.3,
+                    max_tokens=2000,
+                )
             body = response.content or "No content generated."
         except Exception as e:
             logger.error(f"Skill generation LLM call failed: {e}")
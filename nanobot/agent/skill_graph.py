@@ -0,0 +1,184 @@
+"""Materialized skill dependency graph with cached traversals."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping
+
+
+class SkillDependencyGraph:
+    """
+    In-memory dependency graph built from a repository snapshot.
+
+    Edges point from a skill to the skills it depends on. The graph is
+    immutable; SkillRepository builds a new one whenever its generation
+    changes, so every cached result below is valid for the graph's lifetime.
+
+    Features:
+    - Cached transitive dependency closures
+    - Cycle detection
+    - Cached dependency-respecting orderings for skill subsets
+    """
+
+    def __init__(self, dependencies: Mapping[str, Iterable[str]]):
+        """
+        Build the graph.
+
+        Args:
+            dependencies: Mapping of skill name to the names it depends on
+        """
+        self._deps: dict[str, tuple[str, ...]] = {
+            name: tuple(deps) for name, deps in dependencies.items()
+        }
+        self._closures: dict[str, frozenset[str]] = {}
+        self._orders: dict[tuple[str, ...], list[str] | None] = {}
+        self._cycles: list[list[str]] | None = None
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._deps
+
+    def __len__(self) -> int:
+        return len(self._deps)
+
+    def dependencies(self, name: str) -> tuple[str, ...]:
+        """Direct dependencies of a skill (empty if unknown)."""
+        return self._deps.get(name, ())
+
+    def transitive_dependencies(self, name: str) -> frozenset[str]:
+        """
+        All skills reachable from a skill through dependency edges.
+
+        Args:
+            name: Skill name
+
+        Returns:
+            Set of dependency names, excluding the skill itself unless it is on a cycle
+        """
+        cached = self._closures.get(name)
+        if cached is not None:
+            return cached
+
+        seen: set[str] = set()
+        stack = list(self._deps.get(name, ()))
+        while stack:
+            current = stack.pop()
+            if current in seen:
+                continue
+            seen.add(current)
+            known = self._closures.get(current)
+            if known is not None:
+                seen.update(known)
+                continue
+            stack.extend(self._deps.get(current, ()))
+
+        closure = frozenset(seen)
+        self._closures[name] = closure
+        return closure
+
+    def find_cycles(self) -> list[list[str]]:
+        """
+        Find dependency cycles (strongly connected components with a loop).
+
+        Returns:
+            List of cycles, each a sorted list of skill names
+        """
+        if self._cycles is not None:
+            return self._cycles
+
+        # Iterative Tarjan SCC to stay clear of the recursion limit on large graphs.
+        index_of: dict[str, int] = {}
+        lowlink: dict[str, int] = {}
+        on_stack: set[str] = set()
+        stack: list[str] = []
+        cycles: list[list[str]] = []
+        counter = 0
+
+        for root in self._deps:
+            if root in index_of:
+                continue
+            work = [(root, iter(self._deps.get(root, ())))]
+            index_of[root] = lowlink[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack.add(root)
+
+            while work:
+                node, children = work[-1]
+                advanced = False
+                for child in children:
+                    if child not in self._deps:
+                        continue
+                    if child not in index_of:
+                        index_of[child] = lowlink[child] = counter
+                        counter += 1
+                        stack.append(child)
+                        on_stack.add(child)
+                        work.append((child, iter(self._deps[child])))
+                        advanced = True
+                        break
+                    if child in on_stack:
+                        lowlink[node] = min(lowlink[node], index_of[child])
+                if advanced:
+                    continue
+
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] == index_of[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    if len(component) > 1 or node in self._deps[node]:
+                        cycles.append(sorted(component))
+
+        self._cycles = cycles
+        return cycles
+
+    def topological_order(self, names: Iterable[str]) -> list[str] | None:
+        """
+        Order a subset of skills so dependencies come first.
+
+        Dependencies are followed transitively, including through skills
+        outside the subset. Ties keep the input order.
+
+        Args:
+            names: Skill names to order
+
+        Returns:
+            Ordered names, or None if the subset contains a cycle
+        """
+        key = tuple(names)
+        if key in self._orders:
+            order = self._orders[key]
+            return list(order) if order is not None else None
+
+        members = set(key)
+        position = {name: idx for idx, name in enumerate(key)}
+        dependents: dict[str, list[str]] = {name: [] for name in key}
+        in_degree = dict.fromkeys(key, 0)
+
+        for name in key:
+            for dep in self.transitive_dependencies(name) & members:
+                if dep == name:
+                    continue
+                dependents[dep].append(name)
+                in_degree[name] += 1
+
+        ready = sorted((n for n in key if in_degree[n] == 0), key=position.__getitem__)
+        order: list[str] = []
+        while ready:
+            current = ready.pop(0)
+            order.append(current)
+            for neighbor in dependents[current]:
+                in_degree[neighbor] -= 1
+                if in_degree[neighbor] == 0:
+                    ready.append(neighbor)
+                    ready.sort(key=position.__getitem__)
+
+        result = order if len(order) == len(key) else None
+        self._orders[key] = result
+        return list(result) if result is not None else None
@@ -60,6 +60,9 @@ class SkillManager:
         
         logger.info(f"SkillManager initialized at {self.storage_dir}")
         
+        if self.repository.always_load_migration_pending:
+            self._migrate_always_load_flags()
+        
         # Sync if needed
         if auto_sync:
             self._sync_vector_index()
@@ -97,6 +100,7 @@ class SkillManager:
             description=description,
             tags=tags,
             dependencies=dependencies,
+            always_load=always_load,
         )
 
         # Add to vector index with metadata
@@ -180,21 +184,33 @@ class SkillManager:
 
     def list_always_load_skills(self) -> list[dict[str, Any]]:
         """
-        Return skills with always_load=true from vector index.
+        Return skills with always_load=true.
 
-        Enriches with full data from SkillRepository.
+        Served from the repository cache; the vector index is not queried.
 
         Returns:
             List of skill dicts with full data
         """
+        skills = self.repository.list_always_load_skills()
+        logger.debug("list_always_load_skills: {} skills", len(skills))
+        return skills
+
+    def get_always_load_bundle(self) -> tuple[list[str], str]:
+        """
+        Return the cached prompt section for always-load skills.
+
+        Returns:
+            Tuple of (skill names, rendered skill blocks)
+        """
+        return self.repository.get_always_load_bundle()
+
+    def _migrate_always_load_flags(self) -> None:
+        """Copy always_load flags from vector metadata into the repository (one-off)."""
         raw = self.vector_search.get_by_filter(where={"always_load": True})
-        enriched = []
-        for item in raw:
-            skill = self.repository.get_skill(item["skill_name"])
-            if skill:
-                enriched.append(skill)
-        logger.debug("list_always_load_skills: {} skills", len(enriched))
-        return enriched
+        names = [item["skill_name"] for item in raw]
+        updated = self.repository.set_always_load(names)
+        self.repository.complete_always_load_migration()
+        logger.info("Migrated always_load flag for {} skills from vector index", updated)
 
     def search_skills(
         self,
@@ -4,12 +4,15 @@ from __future__ import annotations
 
 import json
 import sqlite3
-from datetime import datetime
+import threading
+from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Any
 
 from loguru import logger
 
+from nanobot.agent.skill_graph import SkillDependencyGraph
+
 
 class SkillRepository:
     """
@@ -19,22 +22,48 @@ class SkillRepository:
     - SQLite for metadata (skill info, versions, dependencies)
     - Version control for skill evolution
     - Metadata tracking (usage stats, success rate, tags)
-    - JSONL execution history
+    - Indexed execution history with retention
+    - In-memory read-through cache validated by PRAGMA data_version
+    - Materialized dependency graph rebuilt on change
     """
     
-    def __init__(self, db_path: Path | str):
+    # Retention is enforced every N recorded executions rather than on each insert.
+    HISTORY_PRUNE_INTERVAL = 500
+    
+    def __init__(
+        self,
+        db_path: Path | str,
+        history_max_records: int | None = 10_000,
+        history_max_age_days: int | None = None,
+    ):
         """
         Initialize skill repository.
         
         Args:
             db_path: Path to SQLite database file
+            history_max_records: Execution records kept per skill (None = unlimited)
+            history_max_age_days: Drop execution records older than this (None = keep)
         """
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # Legacy per-skill JSONL history, imported into skill_executions on startup
         self.history_dir = self.db_path.parent / "history"
-        self.history_dir.mkdir(exist_ok=True)
+        self.history_max_records = history_max_records
+        self.history_max_age_days = history_max_age_days
+        self._history_writes = 0
         
+        # Read-through cache: name -> full skill dict (content, tags, deps, version).
+        # Invalidated as a whole on any write, ours or another process's.
+        self._cache: dict[str, dict[str, Any]] | None = None
+        self._generation = 0
+        self._lock = threading.RLock()
+        self._watch_conn: sqlite3.Connection | None = None
+        self._data_version: int | None = None
+        self._always_load_bundle: tuple[int, list[str], str] | None = None
+        self._dependency_graph: tuple[int, SkillDependencyGraph] | None = None
         self._init_db()
+        self._migrate_jsonl_history()
+        self._open_watch_connection()
     
     def _init_db(self) -> None:
         """Initialize database schema."""
@@ -51,7 +80,8 @@ class SkillRepository:
                     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                     usage_count INTEGER DEFAULT 0,
                     success_count INTEGER DEFAULT 0,
-                    version INTEGER DEFAULT 1
+                    version INTEGER DEFAULT 1,
+                    always_load INTEGER NOT NULL DEFAULT 0
                 );
                 
                 CREATE TABLE IF NOT EXISTS skill_versions (
@@ -90,20 +120,213 @@ class SkillRepository:
                     FOREIGN KEY (skill_id) REFERENCES skills(id) ON DELETE CASCADE
                 );
                 
+                CREATE TABLE IF NOT EXISTS skill_executions (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    skill_name TEXT NOT NULL,
+                    executed_at TEXT NOT NULL,
+                    success INTEGER NOT NULL,
+                    execution_time_ms REAL,
+                    context_json TEXT
+                );
+                
+                CREATE TABLE IF NOT EXISTS repository_meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL
+                );
+                
                 CREATE INDEX IF NOT EXISTS idx_skills_type ON skills(skill_type);
                 CREATE INDEX IF NOT EXISTS idx_skills_name ON skills(name);
                 CREATE INDEX IF NOT EXISTS idx_skill_tags_tag ON skill_tags(tag);
+                CREATE INDEX IF NOT EXISTS idx_skill_executions_name_time
+                    ON skill_executions(skill_name, executed_at);
             """)
+            
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(skills)")}
+            if "always_load" not in columns:
+                # Recorded in the same transaction as the column, so the flag
+                # copy from vector metadata is retried until it completes.
+                conn.execute(
+                    "INSERT OR REPLACE INTO repository_meta (key, value) "
+                    "VALUES ('always_load_migration', 'pending')"
+                )
+                conn.execute(
+                    "ALTER TABLE skills ADD COLUMN always_load INTEGER NOT NULL DEFAULT 0"
+                )
+                logger.info("Added always_load column to skills table")
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_skills_always_load ON skills(always_load)"
+            )
             conn.commit()
         finally:
             conn.close()
     
+    @property
+    def always_load_migration_pending(self) -> bool:
+        """True until always_load flags have been copied from vector-index metadata."""
+        conn = self._get_connection()
+        try:
+            row = conn.execute(
+                "SELECT value FROM repository_meta WHERE key = 'always_load_migration'"
+            ).fetchone()
+            return row is not None and row["value"] == "pending"
+        finally:
+            conn.close()
+    
+    def complete_always_load_migration(self) -> None:
+        """Record that the always_load flags have been migrated."""
+        conn = self._get_connection()
+        try:
+            conn.execute("DELETE FROM repository_meta WHERE key = 'always_load_migration'")
+            conn.commit()
+        finally:
+            conn.close()
+    
+    def _migrate_jsonl_history(self) -> None:
+        """Import legacy history/<skill>.jsonl files into skill_executions."""
+        if not self.history_dir.is_dir():
+            return
+        
+        for history_file in sorted(self.history_dir.glob("*.jsonl")):
+            rows = []
+            with history_file.open("r", encoding="utf-8") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    rows.append((
+                        history_file.stem,
+                        record.get("timestamp") or datetime.now().isoformat(),
+                        int(bool(record.get("success"))),
+                        record.get("execution_time_ms"),
+                        json.dumps(record.get("context") or {}, ensure_ascii=False),
+                    ))
+            
+            conn = self._get_connection()
+            try:
+                conn.executemany(
+                    """
+                    INSERT INTO skill_executions
+                    (skill_name, executed_at, success, execution_time_ms, context_json)
+                    VALUES (?, ?, ?, ?, ?)
+                    """,
+                    rows,
+                )
+                conn.commit()
+            finally:
+                conn.close()
+            
+            history_file.rename(history_file.with_suffix(".jsonl.migrated"))
+            logger.info(f"Migrated {len(rows)} history records for '{history_file.stem}'")
+    
     def _get_connection(self) -> sqlite3.Connection:
         """Get database connection."""
         conn = sqlite3.connect(str(self.db_path))
         conn.row_factory = sqlite3.Row
         return conn
     
+    def _open_watch_connection(self) -> None:
+        """Open the long-lived connection used only for PRAGMA data_version."""
+        self._watch_conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._data_version = self._read_data_version()
+    
+    def _read_data_version(self) -> int | None:
+        """Read PRAGMA data_version from the watch connection."""
+        if self._watch_conn is None:
+            return None
+        try:
+            return self._watch_conn.execute("PRAGMA data_version").fetchone()[0]
+        except sqlite3.Error as e:
+            logger.warning(f"PRAGMA data_version failed: {e}")
+            return None
+    
+    def close(self) -> None:
+        """Close the watch connection and drop the cache."""
+        with self._lock:
+            if self._watch_conn is not None:
+                self._watch_conn.close()
+                self._watch_conn = None
+            self._cache = None
+    
+    @property
+    def generation(self) -> int:
+        """Repository-wide generation counter, bumped whenever skills change."""
+        self._validate_cache()
+        return self._generation
+    
+    def _invalidate_cache(self) -> None:
+        """Drop cached skills and bump the generation counter."""
+        with self._lock:
+            self._data_version = self._read_data_version()
+            self._cache = None
+            self._generation += 1
+    
+    def _validate_cache(self) -> None:
+        """Invalidate the cache if another connection committed since it was filled."""
+        with self._lock:
+            version = self._read_data_version()
+            if version is None or version != self._data_version:
+                self._data_version = version
+                if self._cache is not None:
+                    logger.debug("Skill cache invalidated by external write")
+                self._cache = None
+                self._generation += 1
+    
+    def _get_cache(self) -> dict[str, dict[str, Any]]:
+        """Return the validated skill cache, loading it from SQLite on a miss."""
+        with self._lock:
+            self._validate_cache()
+            if self._cache is None:
+                self._cache = self._load_all_skills()
+            return self._cache
+    
+    def _load_all_skills(self) -> dict[str, dict[str, Any]]:
+        """Load every skill with its tags and dependencies in three queries."""
+        conn = self._get_connection()
+        try:
+            rows = conn.execute(
+                """
+                SELECT id, name, skill_type, description, content,
+                       created_at, updated_at, usage_count, success_count, version,
+                       always_load
+                FROM skills
+                """
+            ).fetchall()
+            by_id: dict[int, dict[str, Any]] = {}
+            for row in rows:
+                skill = dict(row)
+                skill["always_load"] = bool(skill["always_load"])
+                skill["tags"] = []
+                skill["dependencies"] = []
+                by_id[skill["id"]] = skill
+            
+            for skill_id, tag in conn.execute("SELECT skill_id, tag FROM skill_tags"):
+                if skill_id in by_id:
+                    by_id[skill_id]["tags"].append(tag)
+            
+            for skill_id, dep_name in conn.execute(
+                """
+                SELECT sd.skill_id, s.name FROM skill_dependencies sd
+                JOIN skills s ON sd.depends_on_skill_id = s.id
+                """
+            ):
+                if skill_id in by_id:
+                    by_id[skill_id]["dependencies"].append(dep_name)
+            
+            return {skill["name"]: skill for skill in by_id.values()}
+        finally:
+            conn.close()
+    
+    @staticmethod
+    def _copy_skill(skill: dict[str, Any]) -> dict[str, Any]:
+        """Copy a cached skill so callers cannot mutate the cache."""
+        copied = dict(skill)
+        copied["tags"] = list(skill["tags"])
+        copied["dependencies"] = list(skill["dependencies"])
+        return copied
+    
     def add_skill(
         self,
         name: str,
@@ -112,6 +335,7 @@ class SkillRepository:
         description: str | None = None,
         tags: list[str] | None = None,
         dependencies: list[str] | None = None,
+        always_load: bool = False,
     ) -> int:
         """
         Add a new skill to the repository.
@@ -123,6 +347,7 @@ class SkillRepository:
             description: Short description
             tags: List of tags for categorization
             dependencies: List of skill names this skill depends on
+            always_load: If True, skill is always loaded into context
         
         Returns:
             Skill ID
@@ -131,10 +356,10 @@ class SkillRepository:
         try:
             cursor = conn.execute(
                 """
-                INSERT INTO skills (name, skill_type, description, content, version)
-                VALUES (?, ?, ?, ?, 1)
+                INSERT INTO skills (name, skill_type, description, content, version, always_load)
+                VALUES (?, ?, ?, ?, 1, ?)
                 """,
-                (name, skill_type, description or "", content),
+                (name, skill_type, description or "", content, int(always_load)),
             )
             skill_id = cursor.lastrowid
             
@@ -171,6 +396,7 @@ class SkillRepository:
                         )
             
             conn.commit()
+            self._invalidate_cache()
             logger.info(f"Added skill '{name}' with ID {skill_id}")
             return skill_id
         except sqlite3.IntegrityError as e:
@@ -222,6 +448,7 @@ class SkillRepository:
             )
             
             conn.commit()
+            self._invalidate_cache()
             logger.info(f"Updated skill '{name}' to version {new_version}")
             return True
         finally:
@@ -229,7 +456,7 @@ class SkillRepository:
     
     def get_skill(self, name: str) -> dict[str, Any] | None:
         """
-        Get skill by name.
+        Get skill by name (served from the in-memory cache).
         
         Args:
             name: Skill name
@@ -237,42 +464,8 @@ class SkillRepository:
         Returns:
             Skill dict or None
         """
-        conn = self._get_connection()
-        try:
-            row = conn.execute(
-                """
-                SELECT id, name, skill_type, description, content, 
-                       created_at, updated_at, usage_count, success_count, version
-                FROM skills WHERE name = ?
-                """,
-                (name,),
-            ).fetchone()
-            
-            if not row:
-                return None
-            
-            skill = dict(row)
-            
-            # Get tags
-            tags_rows = conn.execute(
-                "SELECT tag FROM skill_tags WHERE skill_id = ?", (skill["id"],)
-            ).fetchall()
-            skill["tags"] = [r[0] for r in tags_rows]
-            
-            # Get dependencies
-            deps_rows = conn.execute(
-                """
-                SELECT s.name FROM skill_dependencies sd
-                JOIN skills s ON sd.depends_on_skill_id = s.id
-                WHERE sd.skill_id = ?
-                """,
-                (skill["id"],),
-            ).fetchall()
-            skill["dependencies"] = [r[0] for r in deps_rows]
-            
-            return skill
-        finally:
-            conn.close()
+        skill = self._get_cache().get(name)
+        return self._copy_skill(skill) if skill else None
     
     def list_skills(
         self, skill_type: str | None = None, tags: list[str] | None = None
@@ -287,37 +480,109 @@ class SkillRepository:
         Returns:
             List of skill dicts
         """
+        fields = (
+            "id", "name", "skill_type", "description",
+            "usage_count", "success_count", "version",
+        )
+        required_tags = set(tags or [])
+        
+        cache = self._get_cache()
+        result = []
+        for name in sorted(cache):
+            skill = cache[name]
+            if skill_type and skill["skill_type"] != skill_type:
+                continue
+            # Skills that have ALL specified tags
+            if required_tags and not required_tags.issubset(skill["tags"]):
+                continue
+            result.append({field: skill[field] for field in fields})
+        return result
+    
+    def get_dependency_graph(self) -> SkillDependencyGraph:
+        """
+        Get the dependency graph for all skills.
+        
+        The graph is built from the cached snapshot and reused until the
+        repository generation changes.
+        
+        Returns:
+            SkillDependencyGraph
+        """
+        with self._lock:
+            cache = self._get_cache()
+            if self._dependency_graph and self._dependency_graph[0] == self._generation:
+                return self._dependency_graph[1]
+            
+            graph = SkillDependencyGraph(
+                {name: skill["dependencies"] for name, skill in cache.items()}
+            )
+            self._dependency_graph = (self._generation, graph)
+            return graph
+    
+    def set_always_load(self, names: list[str], always_load: bool = True) -> int:
+        """
+        Set the always_load flag for skills.
+        
+        Args:
+            names: Skill names to update
+            always_load: New flag value
+        
+        Returns:
+            Number of skills updated
+        """
+        if not names:
+            return 0
         conn = self._get_connection()
         try:
-            query = """
-                SELECT id, name, skill_type, description, 
-                       usage_count, success_count, version
-                FROM skills
-                WHERE 1=1
-            """
-            params = []
-            
-            if skill_type:
-                query += " AND skill_type = ?"
-                params.append(skill_type)
-            
-            if tags:
-                # Skills that have ALL specified tags
-                for tag in tags:
-                    query += f"""
-                        AND id IN (
-                            SELECT skill_id FROM skill_tags WHERE tag = ?
-                        )
-                    """
-                    params.append(tag)
-            
-            query += " ORDER BY name"
-            
-            rows = conn.execute(query, params).fetchall()
-            return [dict(row) for row in rows]
+            placeholders = ",".join("?" for _ in names)
+            result = conn.execute(
+                f"UPDATE skills SET always_load = ? WHERE name IN ({placeholders})",
+                (int(always_load), *names),
+            )
+            conn.commit()
+            self._invalidate_cache()
+            return result.rowcount
         finally:
             conn.close()
     
+    def list_always_load_skills(self) -> list[dict[str, Any]]:
+        """
+        List skills flagged always_load, ordered by name.
+        
+        Returns:
+            List of full skill dicts
+        """
+        cache = self._get_cache()
+        return [
+            self._copy_skill(cache[name])
+            for name in sorted(cache)
+            if cache[name]["always_load"]
+        ]
+    
+    def get_always_load_bundle(self) -> tuple[list[str], str]:
+        """
+        Get the pre-rendered prompt section for always-load skills.
+        
+        The bundle is rebuilt only when the repository generation changes.
+        
+        Returns:
+            Tuple of (skill names, rendered "### Skill: ..." blocks)
+        """
+        with self._lock:
+            cache = self._get_cache()
+            if self._always_load_bundle and self._always_load_bundle[0] == self._generation:
+                return list(self._always_load_bundle[1]), self._always_load_bundle[2]
+            
+            names = []
+            blocks = []
+            for name in sorted(cache):
+                skill = cache[name]
+                if skill["always_load"] and skill["content"]:
+                    names.append(name)
+                    blocks.append(f"### Skill: {name}\n\n{skill['content']}")
+            self._always_load_bundle = (self._generation, names, "\n\n---\n\n".join(blocks))
+            return list(names), self._always_load_bundle[2]
+    
     def record_execution(
         self,
         name: str,
@@ -370,57 +635,141 @@ class SkillRepository:
                         (skill_id, execution_time_ms, execution_time_ms),
                     )
             
-            conn.commit()
+            conn.execute(
+                """
+                INSERT INTO skill_executions
+                (skill_name, executed_at, success, execution_time_ms, context_json)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (
+                    name,
+                    datetime.now().isoformat(),
+                    int(success),
+                    execution_time_ms,
+                    json.dumps(context or {}, ensure_ascii=False),
+                ),
+            )
             
-            # Append to JSONL history
-            self._append_history(name, success, execution_time_ms, context)
+            conn.commit()
+            self._invalidate_cache()
         finally:
             conn.close()
+        
+        self._history_writes += 1
+        if self._history_writes % self.HISTORY_PRUNE_INTERVAL == 0:
+            self.prune_history()
     
-    def _append_history(
+    def get_skill_history(
         self,
         name: str,
-        success: bool,
-        execution_time_ms: float | None,
-        context: dict[str, Any] | None,
-    ) -> None:
-        """Append execution to JSONL history file."""
-        history_file = self.history_dir / f"{name}.jsonl"
-        record = {
-            "timestamp": datetime.now().isoformat(),
-            "success": success,
-            "execution_time_ms": execution_time_ms,
-            "context": context or {},
-        }
-        
-        with history_file.open("a", encoding="utf-8") as f:
-            f.write(json.dumps(record, ensure_ascii=False) + "\n")
-    
-    def get_skill_history(self, name: str, limit: int = 100) -> list[dict[str, Any]]:
+        limit: int = 100,
+        since: datetime | str | None = None,
+        until: datetime | str | None = None,
+        success: bool | None = None,
+    ) -> list[dict[str, Any]]:
         """
-        Get execution history for a skill.
+        Get the most recent execution history for a skill.
         
         Args:
             name: Skill name
             limit: Maximum number of records
+            since: Only records at or after this time
+            until: Only records before this time
+            success: Only successful (True) or failed (False) records
         
         Returns:
-            List of execution records
+            List of execution records, oldest first
         """
-        history_file = self.history_dir / f"{name}.jsonl"
-        if not history_file.exists():
-            return []
-        
-        records = []
-        with history_file.open("r", encoding="utf-8") as f:
-            for line in f:
-                if line.strip():
-                    try:
-                        records.append(json.loads(line))
-                    except json.JSONDecodeError:
-                        continue
+        query = """
+            SELECT executed_at, success, execution_time_ms, context_json
+            FROM skill_executions
+            WHERE skill_name = ?
+        """
+        params: list[Any] = [name]
+        
+        if since is not None:
+            query += " AND executed_at >= ?"
+            params.append(since.isoformat() if isinstance(since, datetime) else since)
+        if until is not None:
+            query += " AND executed_at < ?"
+            params.append(until.isoformat() if isinstance(until, datetime) else until)
+        if success is not None:
+            query += " AND success = ?"
+            params.append(int(success))
+        
+        query += " ORDER BY executed_at DESC, id DESC LIMIT ?"
+        params.append(limit)
+        
+        conn = self._get_connection()
+        try:
+            rows = conn.execute(query, params).fetchall()
+        finally:
+            conn.close()
+        
+        return [
+            {
+                "timestamp": row["executed_at"],
+                "success": bool(row["success"]),
+                "execution_time_ms": row["execution_time_ms"],
+                "context": json.loads(row["context_json"]) if row["context_json"] else {},
+            }
+            for row in reversed(rows)
+        ]
+    
+    def prune_history(
+        self,
+        max_records: int | None = None,
+        max_age_days: int | None = None,
+    ) -> int:
+        """
+        Apply history retention.
+        
+        Args:
+            max_records: Records kept per skill (defaults to history_max_records)
+            max_age_days: Maximum record age (defaults to history_max_age_days)
         
-        return records[-limit:]
+        Returns:
+            Number of deleted records
+        """
+        max_records = max_records if max_records is not None else self.history_max_records
+        max_age_days = max_age_days if max_age_days is not None else self.history_max_age_days
+        deleted = 0
+        
+        conn = self._get_connection()
+        try:
+            if max_age_days is not None:
+                cutoff = (datetime.now() - timedelta(days=max_age_days)).isoformat()
+                deleted += conn.execute(
+                    "DELETE FROM skill_executions WHERE executed_at < ?", (cutoff,)
+                ).rowcount
+            
+            if max_records is not None:
+                over_limit = conn.execute(
+                    """
+                    SELECT skill_name FROM skill_executions
+                    GROUP BY skill_name HAVING COUNT(*) > ?
+                    """,
+                    (max_records,),
+                ).fetchall()
+                for (skill_name,) in over_limit:
+                    deleted += conn.execute(
+                        """
+                        DELETE FROM skill_executions
+                        WHERE skill_name = ? AND id NOT IN (
+                            SELECT id FROM skill_executions WHERE skill_name = ?
+                            ORDER BY executed_at DESC, id DESC LIMIT ?
+                        )
+                        """,
+                        (skill_name, skill_name, max_records),
+                    ).rowcount
+            
+            conn.commit()
+        finally:
+            conn.close()
+        
+        if deleted:
+            logger.info(f"Pruned {deleted} skill execution records")
+        return deleted
     
     def get_skill_stats(self, name: str) -> dict[str, Any] | None:
         """
@@ -471,12 +820,9 @@ class SkillRepository:
         conn = self._get_connection()
         try:
             result = conn.execute("DELETE FROM skills WHERE name = ?", (name,))
+            conn.execute("DELETE FROM skill_executions WHERE skill_name = ?", (name,))
             conn.commit()
-            
-            # Delete history file
-            history_file = self.history_dir / f"{name}.jsonl"
-            if history_file.exists():
-                history_file.unlink()
+            self._invalidate_cache()
             
             return result.rowcount > 0
         finally:
@@ -9,6 +9,8 @@ from loguru import logger
 from nanobot.memory.vector_manager import VectorDBManager
 
 COLLECTION_NAME = "nanobot_skills"
+# ChromaDB отклоняет слишком большие батчи (max_batch_size ~5k)
+REBUILD_BATCH_SIZE = 1000
 
 
 def _normalize_metadata(metadata: dict[str, Any] | None) -> dict[str, Any]:
@@ -212,8 +214,9 @@ class SkillVectorSearch:
         try:
             existing = collection.get(include=[])
             ids_to_delete = existing.get("ids") or []
+            for start in range(0, len(ids_to_delete), REBUILD_BATCH_SIZE):
+                collection.delete(ids=ids_to_delete[start:start + REBUILD_BATCH_SIZE])
             if ids_to_delete:
-                collection.delete(ids=ids_to_delete)
                 logger.debug("Удалено {} записей", len(ids_to_delete))
         except Exception as e:
             logger.warning("Ошибка при очистке коллекции: {}", e)
@@ -240,11 +243,13 @@ class SkillVectorSearch:
             documents_list.append(content)
             metadatas_list.append(safe_meta)
 
-        collection.add(
-            ids=ids_list,
-            documents=documents_list,
-            metadatas=metadatas_list,
-        )
+        for start in range(0, len(ids_list), REBUILD_BATCH_SIZE):
+            end = start + REBUILD_BATCH_SIZE
+            collection.add(
+                ids=ids_list[start:end],
+                documents=documents_list[start:end],
+                metadatas=metadatas_list[start:end],
+            )
         logger.info("Индекс пересобран: {} навыков", len(skills))
 
     def save(self) -> None:
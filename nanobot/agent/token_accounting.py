@@ -0,0 +1,274 @@
+"""Prompt token accounting and context-budget enforcement."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any
+
+from loguru import logger
+
+# Model-family → tiktoken encoding. Families not listed use cl100k_base as an
+# approximation; ``_FAMILY_SCALE`` corrects for tokenizers that run larger.
+_FAMILY_ENCODINGS: tuple[tuple[str, str], ...] = (
+    ("gpt-4o", "o200k_base"),
+    ("gpt-4.1", "o200k_base"),
+    ("gpt-5", "o200k_base"),
+    ("o1", "o200k_base"),
+    ("o3", "o200k_base"),
+    ("o4", "o200k_base"),
+)
+_DEFAULT_ENCODING = "cl100k_base"
+_FAMILY_SCALE: tuple[tuple[str, float], ...] = (
+    ("claude", 1.15),
+    ("gemini", 1.1),
+)
+
+MESSAGE_OVERHEAD_TOKENS = 4  # role/name framing per message
+IMAGE_TOKENS = 1000  # flat estimate per image part
+DEFAULT_CONTEXT_WINDOW = 128_000
+
+
+# Loaded encodings by name (None = unavailable). tiktoken is the optional
+# "tokens" extra and may download its BPE file on first use, so counts made
+# before an encoding is loaded use the byte heuristic instead of waiting.
+_ENCODINGS: dict[str, Any] = {}
+_LOADING: set[str] = set()
+_ENCODINGS_LOCK = threading.Lock()
+
+
+def _load_encoding(name: str) -> None:
+    """Load a tiktoken encoding (blocking); records None when unavailable (not installed / offline)."""
+    try:
+        import tiktoken
+        encoding = tiktoken.get_encoding(name)
+    except Exception as e:  # ImportError, or the BPE file could not be fetched
+        logger.debug(f"tiktoken encoding {name} unavailable ({type(e).__name__}); using byte heuristic")
+        encoding = None
+    with _ENCODINGS_LOCK:
+        _ENCODINGS[name] = encoding
+        _LOADING.discard(name)
+
+
+def preload_encoding(name: str) -> None:
+    """Start loading an encoding once; inside an event loop this runs on a worker thread."""
+    with _ENCODINGS_LOCK:
+        if name in _ENCODINGS or name in _LOADING:
+            return
+        _LOADING.add(name)
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        _load_encoding(name)
+        return
+    loop.run_in_executor(None, _load_encoding, name)
+
+
+def _heuristic_tokens(text: str) -> int:
+    # ~4 UTF-8 bytes per token holds reasonably for Latin, Cyrillic and CJK text.
+    return (len(text.encode("utf-8")) + 3) // 4
+
+
+# Keyed by (encoding, hash, length) rather than the text itself so large tool
+# results are not kept alive by the cache.
+_COUNT_CACHE: OrderedDict[tuple[str | None, int, int], int] = OrderedDict()
+_COUNT_CACHE_SIZE = 8192
+
+
+def _count_text(encoding_name: str | None, text: str) -> int:
+    encoding = None
+    if encoding_name is not None:
+        encoding = _ENCODINGS.get(encoding_name)
+        if encoding is None and encoding_name not in _ENCODINGS:
+            preload_encoding(encoding_name)
+            encoding = _ENCODINGS.get(encoding_name)
+        if encoding is None:
+            encoding_name = None  # Heuristic counts are cached apart from tokenizer counts
+    key = (encoding_name, hash(text), len(text))
+    cached = _COUNT_CACHE.get(key)
+    if cached is not None:
+        _COUNT_CACHE.move_to_end(key)
+        return cached
+
+    if encoding is not None:
+        count = len(encoding.encode(text, disallowed_special=()))
+    else:
+        count = _heuristic_tokens(text)
+
+    _COUNT_CACHE[key] = count
+    if len(_COUNT_CACHE) > _COUNT_CACHE_SIZE:
+        _COUNT_CACHE.popitem(last=False)
+    return count
+
+
+def _family_of(model: str) -> str:
+    return model.lower().rsplit("/", 1)[-1]
+
+
+class TokenEstimator:
+    """
+    Fast prompt-size estimator for one model family.
+
+    Text counts are memoized by content, so the tool results that are re-sent
+    on every iteration of the agent loop are only tokenized once.
+    """
+
+    def __init__(self, encoding: str | None = _DEFAULT_ENCODING, scale: float = 1.0):
+        """
+        Args:
+            encoding: tiktoken encoding name; None forces the byte heuristic
+            scale: Multiplier for tokenizers that run larger than the encoding
+        """
+        self.encoding = encoding
+        self.scale = scale
+
+    def count_text(self, text: str) -> int:
+        if not text:
+            return 0
+        return int(_count_text(self.encoding, text) * self.scale)
+
+    def count_message(self, message: dict[str, Any]) -> int:
+        """Estimated tokens of a single chat message."""
+        tokens = MESSAGE_OVERHEAD_TOKENS
+        content = message.get("content")
+        if isinstance(content, str):
+            tokens += self.count_text(content)
+        elif isinstance(content, list):
+            for part in content:
+                if not isinstance(part, dict):
+                    continue
+                if part.get("type") == "text":
+                    tokens += self.count_text(part.get("text", ""))
+                elif part.get("type") == "image_url":
+                    tokens += IMAGE_TOKENS
+        for call in message.get("tool_calls") or []:
+            function = call.get("function", {})
+            tokens += self.count_text(function.get("name", "")) + self.count_text(function.get("arguments", ""))
+        if message.get("name"):
+            tokens += self.count_text(message["name"])
+        if message.get("reasoning_content"):
+            tokens += self.count_text(message["reasoning_content"])
+        return tokens
+
+    def count_messages(self, messages: list[dict[str, Any]]) -> int:
+        return sum(self.count_message(m) for m in messages)
+
+    def count_tools(self, tools: list[dict[str, Any]] | None) -> int:
+        if not tools:
+            return 0
+        return self.count_text(json.dumps(tools, ensure_ascii=False, sort_keys=True))
+
+
+@lru_cache(maxsize=64)
+def get_estimator(model: str) -> TokenEstimator:
+    """Estimator for a model, shared per model name."""
+    family = _family_of(model)
+    encoding = next((enc for prefix, enc in _FAMILY_ENCODINGS if family.startswith(prefix)), _DEFAULT_ENCODING)
+    scale = next((s for key, s in _FAMILY_SCALE if key in model.lower()), 1.0)
+    return TokenEstimator(encoding, scale)
+
+
+@lru_cache(maxsize=64)
+def get_context_window(model: str) -> int:
+    """Max input tokens for a model from LiteLLM's model map, with a safe default."""
+    try:
+        import litellm
+        info = litellm.get_model_info(model)
+        window = info.get("max_input_tokens") or info.get("max_tokens")
+        if window:
+            return int(window)
+    except Exception:
+        pass
+    return DEFAULT_CONTEXT_WINDOW
+
+
+class ContextBudget:
+    """
+    Keeps a turn's prompt under a token budget.
+
+    When the prompt is over budget, tool results are shrunk oldest-first to a
+    head/tail excerpt; the most recent results are touched only if that is
+    not enough. System, user and assistant messages are never modified.
+    """
+
+    MIN_EXCERPT_CHARS = 600
+
+    def __init__(
+        self,
+        model: str,
+        max_prompt_tokens: int | None = None,
+        response_reserve: int = 4096,
+        protect_recent: int = 2,
+    ):
+        """
+        Args:
+            model: Model the prompt is sent to
+            max_prompt_tokens: Explicit budget; default is 90% of the model's
+                context window minus ``response_reserve``
+            response_reserve: Tokens left free for the completion
+            protect_recent: Number of latest tool results shrunk only as a last resort
+        """
+        self.estimator = get_estimator(model)
+        if max_prompt_tokens:
+            self.max_prompt_tokens = max_prompt_tokens
+        else:
+            self.max_prompt_tokens = int((get_context_window(model) - response_reserve) * 0.9)
+        self.protect_recent = protect_recent
+
+    def measure(self, messages: list[dict[str, Any]], tools: list[dict[str, Any]] | None = None) -> int:
+        """Estimated prompt tokens for messages plus tool definitions."""
+        return self.estimator.count_messages(messages) + self.estimator.count_tools(tools)
+
+    def fit(
+        self,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]] | None = None,
+    ) -> tuple[list[dict[str, Any]], int]:
+        """
+        Shrink old tool results until the prompt fits the budget.
+
+        Returns:
+            (messages, estimated tokens); the input list and its dicts are not modified
+        """
+        total = self.measure(messages, tools)
+        if total <= self.max_prompt_tokens:
+            return messages, total
+
+        fitted = list(messages)
+        tool_indices = [i for i, m in enumerate(fitted) if m.get("role") == "tool" and isinstance(m.get("content"), str)]
+        recent = set(tool_indices[-self.protect_recent:]) if self.protect_recent else set()
+        ordered = [i for i in tool_indices if i not in recent] + [i for i in tool_indices if i in recent]
+
+        shrunk = 0
+        for index in ordered:
+            if total <= self.max_prompt_tokens:
+                break
+            original = fitted[index]
+            excerpt = self._excerpt(original["content"], total - self.max_prompt_tokens)
+            if excerpt is None:
+                continue
+            replacement = {**original, "content": excerpt}
+            total += self.estimator.count_message(replacement) - self.estimator.count_message(original)
+            fitted[index] = replacement
+            shrunk += 1
+
+        if shrunk:
+            logger.info(f"Context budget: shrank {shrunk} tool result(s) to ~{total} tokens (budget {self.max_prompt_tokens})")
+        if total > self.max_prompt_tokens:
+            logger.warning(f"Context budget exceeded after truncation: ~{total} > {self.max_prompt_tokens} tokens")
+        return fitted, total
+
+    def _excerpt(self, content: str, excess_tokens: int) -> str | None:
+        """Head/tail excerpt of a tool result that drops roughly ``excess_tokens``."""
+        # Convert the token excess to characters using this content's own density.
+        chars_per_token = max(1.0, len(content) / max(1, self.estimator.count_text(content)))
+        keep = max(self.MIN_EXCERPT_CHARS, len(content) - int(excess_tokens * chars_per_token) - 200)
+        if keep >= len(content) - 200:
+            return None
+        head = content[: keep * 2 // 3]
+        tail = content[-(keep // 3):]
+        omitted = len(content) - len(head) - len(tail)
+        return f"{head}\n\n[... {omitted} chars omitted to fit the context budget ...]\n\n{tail}"
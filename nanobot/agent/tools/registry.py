@@ -1,10 +1,13 @@
 """Tool registry for dynamic tool management."""
 
-from typing import Any
+from typing import Any, TYPE_CHECKING
 
 from nanobot.agent.tools.base import Tool
 from nanobot.agent.tools.policy import ToolPolicy
 
+if TYPE_CHECKING:
+    from nanobot.agent.tools.results import ResultStore
+
 
 class ToolRegistry:
     """
@@ -13,8 +16,14 @@ class ToolRegistry:
     Allows dynamic registration and execution of tools.
     """
     
-    def __init__(self):
+    def __init__(self, result_store: "ResultStore | None" = None):
+        """
+        Args:
+            result_store: If set, oversized results are stored on disk and
+                replaced by a handle plus preview (see ``read_result``)
+        """
         self._tools: dict[str, Tool] = {}
+        self.result_store = result_store
     
     def register(self, tool: Tool) -> None:
         """Register a tool."""
@@ -65,9 +74,14 @@ class ToolRegistry:
             errors = tool.validate_params(params)
             if errors:
                 return f"Error: Invalid parameters for tool '{name}': " + "; ".join(errors)
-            return await tool.execute(**params)
+            result = await tool.execute(**params)
         except Exception as e:
             return f"Error executing {name}: {str(e)}"
+
+        # read_result pages are already bounded; spilling them would loop.
+        if self.result_store is not None and name != "read_result" and isinstance(result, str):
+            result = self.result_store.spill(name, result)
+        return result
     
     @property
     def tool_names(self) -> list[str]:
@@ -0,0 +1,187 @@
+"""Spill-to-disk storage for large tool results, and the read_result tool."""
+
+import hashlib
+import re
+import time
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+
+from nanobot.agent.tools.base import Tool
+
+_HANDLE_RE = re.compile(r"^[0-9a-f]{8,64}$")
+
+
+class ResultStore:
+    """
+    Content-addressed cache of large tool outputs.
+
+    Results above ``threshold_chars`` are written to ``root/<sha256>.txt`` and
+    replaced in the conversation by a short handle with a head/tail preview.
+    The model pages through the full output with the ``read_result`` tool, so
+    a large page or command output is sent to the LLM once, not on every
+    iteration of the tool loop.
+    """
+
+    HANDLE_LENGTH = 16
+
+    def __init__(
+        self,
+        root: Path,
+        threshold_chars: int = 12_000,
+        preview_chars: int = 2_000,
+        max_age_hours: float = 72.0,
+    ):
+        """
+        Args:
+            root: Directory holding stored results
+            threshold_chars: Results longer than this are spilled (0 disables)
+            preview_chars: Size of the inline head/tail preview
+            max_age_hours: Stored results older than this are pruned on startup
+        """
+        self.root = root
+        self.threshold_chars = threshold_chars
+        self.preview_chars = preview_chars
+        self.max_age_hours = max_age_hours
+        self.stats = {"spilled": 0, "spilled_chars": 0, "reads": 0}
+        self.prune()
+
+    def _path(self, digest: str) -> Path:
+        return self.root / f"{digest}.txt"
+
+    def should_spill(self, result: str) -> bool:
+        return self.threshold_chars > 0 and len(result) > self.threshold_chars
+
+    def put(self, result: str) -> str:
+        """Store a result and return its handle; identical content shares one file."""
+        digest = hashlib.sha256(result.encode("utf-8")).hexdigest()
+        path = self._path(digest)
+        if not path.exists():
+            self.root.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            tmp.write_text(result, encoding="utf-8")
+            tmp.replace(path)
+        else:
+            path.touch()  # keep recently used results from being pruned
+        return digest[: self.HANDLE_LENGTH]
+
+    def resolve(self, handle: str) -> Path | None:
+        """Find the stored file for a (possibly abbreviated) handle."""
+        handle = handle.strip().lower()
+        if not _HANDLE_RE.match(handle):
+            return None
+        matches = list(self.root.glob(f"{handle}*.txt")) if self.root.exists() else []
+        return matches[0] if len(matches) == 1 else None
+
+    def spill(self, tool_name: str, result: str) -> str:
+        """
+        Replace an oversized result with a handle and preview.
+
+        Returns:
+            The result unchanged if it is small, otherwise the compact stand-in
+        """
+        if not self.should_spill(result):
+            return result
+        try:
+            handle = self.put(result)
+        except OSError as e:
+            logger.warning(f"Could not spill {tool_name} result to disk: {e}")
+            return result
+
+        self.stats["spilled"] += 1
+        self.stats["spilled_chars"] += len(result)
+        logger.info(f"Spilled {len(result)} chars from {tool_name} to result {handle}")
+
+        head_len = self.preview_chars * 3 // 4
+        tail_len = self.preview_chars - head_len
+        head = result[:head_len]
+        tail = result[-tail_len:] if tail_len else ""
+        return (
+            f"[Output of {tool_name} is {len(result)} chars; stored as result '{handle}'. "
+            f"Showing the first {len(head)} and last {len(tail)} chars. "
+            f"Call read_result(handle=\"{handle}\", offset=..., length=...) to read the rest.]\n\n"
+            f"{head}\n\n[... {len(result) - len(head) - len(tail)} chars not shown ...]\n\n{tail}"
+        )
+
+    def read(self, handle: str, offset: int = 0, length: int = 8_000) -> str:
+        """Return a page of a stored result with a navigation footer."""
+        path = self.resolve(handle)
+        if path is None:
+            return f"Error: Unknown or ambiguous result handle: {handle}"
+        content = path.read_text(encoding="utf-8")
+        offset = max(0, min(offset, len(content)))
+        end = min(len(content), offset + max(1, length))
+        self.stats["reads"] += 1
+
+        footer = f"\n\n[Chars {offset}-{end} of {len(content)}"
+        if end < len(content):
+            footer += f"; next: read_result(handle=\"{handle}\", offset={end})"
+        footer += "]"
+        return content[offset:end] + footer
+
+    def prune(self) -> int:
+        """Delete results not written or read within ``max_age_hours``."""
+        if self.max_age_hours <= 0 or not self.root.exists():
+            return 0
+        cutoff = time.time() - self.max_age_hours * 3600
+        removed = 0
+        for path in self.root.glob("*.txt"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+                    removed += 1
+            except OSError:
+                continue
+        if removed:
+            logger.debug(f"Pruned {removed} stored tool result(s)")
+        return removed
+
+
+class ReadResultTool(Tool):
+    """Tool to page through a tool result that was stored on disk."""
+
+    MAX_LENGTH = 20_000
+
+    def __init__(self, store: ResultStore):
+        self._store = store
+
+    @property
+    def name(self) -> str:
+        return "read_result"
+
+    @property
+    def description(self) -> str:
+        return (
+            "Read part of a large tool output that was stored instead of shown in full. "
+            "Use the handle from the '[Output of ... stored as result ...]' notice."
+        )
+
+    @property
+    def parameters(self) -> dict[str, Any]:
+        return {
+            "type": "object",
+            "properties": {
+                "handle": {
+                    "type": "string",
+                    "description": "Result handle from the notice"
+                },
+                "offset": {
+                    "type": "integer",
+                    "description": "Character offset to start reading at (default 0)",
+                    "minimum": 0
+                },
+                "length": {
+                    "type": "integer",
+                    "description": f"Number of characters to read (default 8000, max {self.MAX_LENGTH})",
+                    "minimum": 1
+                }
+            },
+            "required": ["handle"]
+        }
+
+    async def execute(self, handle: str, offset: int = 0, length: int = 8_000, **kwargs: Any) -> str:
+        try:
+            return self._store.read(handle, offset, min(length, self.MAX_LENGTH))
+        except Exception as e:
+            return f"Error reading result: {str(e)}"
@@ -24,7 +24,7 @@ class TokensTool(Tool):
     async def execute(self, period: str = "today") -> str:
         """Execute the tokens tool."""
         try:
-            from nanobot.memory import get_token_usage_today, get_token_usage_period
+            from nanobot.memory import get_llm_usage_rollup, get_token_usage_today, get_token_usage_period
             
             if period == "today":
                 stats = get_token_usage_today()
@@ -40,12 +40,23 @@ class TokensTool(Tool):
                     f"📦 Всего: **{stats['total_tokens']:,}**",
                     f"🔄 Запросов: **{stats['requests']}**",
                 ]
+
+                by_site = get_llm_usage_rollup(days=1, group_by="call_site")
+                if by_site:
+                    cost = sum(r["cost_usd"] or 0 for r in by_site)
+                    lines.append(f"💰 Стоимость: **${cost:.4f}**")
                 
                 if stats["by_model"]:
                     lines.append("")
                     lines.append("**По моделям:**")
                     for m in stats["by_model"]:
                         lines.append(f"  • {m['model']}: {m['total_tokens']:,} ({m['requests']} req)")
+
+                if by_site:
+                    lines.append("")
+                    lines.append("**По источникам:**")
+                    for r in by_site:
+                        lines.append(f"  • {r['group']}: {r['total_tokens']:,} (${r['cost_usd'] or 0:.4f})")
                 
                 return "\n".join(lines)
             
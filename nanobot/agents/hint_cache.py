@@ -0,0 +1,181 @@
+"""Fingerprint cache for navigator SLM hints."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+
+_WORD_RE = re.compile(r"\w{4,}", re.UNICODE)
+
+
+@dataclass
+class CachedHint:
+    """A hint stored together with what it cost to produce."""
+
+    hint: str
+    focus: str
+    latency_ms: float
+    tokens_in: int
+    tokens_out: int
+    expires_at: float
+
+
+def _token_bucket(token_est: float) -> int:
+    """Log2 size bucket: 0, 1, 2-3, 4-7, ... tokens."""
+    return max(0, int(token_est)).bit_length()
+
+
+def _idle_bucket(idle_sec: float) -> str:
+    if idle_sec < 60:
+        return "recent"
+    if idle_sec <= 600:
+        return "pause"
+    return "away"
+
+
+def _repeat_bucket(repeat_score: float) -> str:
+    # 0.90 is the rule engine's repeat threshold; coarser levels below it.
+    if repeat_score > 0.90:
+        return "repeat"
+    if repeat_score >= 0.5:
+        return "similar"
+    return "new"
+
+
+def _keywords(text: str, limit: int) -> list[str]:
+    """Coarse lexical signature: sorted 5-char stems of the longest words."""
+    words = sorted(set(_WORD_RE.findall(text.lower())), key=lambda w: (-len(w), w))
+    return sorted({word[:5] for word in words[:limit]})
+
+
+def hint_fingerprint(
+    payload: dict[str, Any],
+    model: str,
+    text_mode: str = "none",
+    keywords: int = 6,
+    session: str | None = None,
+) -> str:
+    """
+    Normalize an SLM payload into a cache key.
+
+    Only the rule-engine view of the turn is kept: tags, stage, bucketed
+    metrics and the prompt constraints. The user message and recent summary
+    are free text and are dropped (``text_mode="none"``) or reduced to a
+    handful of word stems (``text_mode="keywords"``).
+
+    Args:
+        payload: Payload built by ``RuleEngine._build_llm_payload``.
+        model: SLM model name; hints are never shared across models.
+        text_mode: "none" or "keywords".
+        keywords: Number of stems kept in keyword mode.
+        session: Conversation the hint is scoped to; None shares it globally.
+
+    Returns:
+        Hex digest identifying the equivalence class of the payload.
+    """
+    facts = payload.get("facts", {})
+    metrics = facts.get("metrics", {})
+    key: dict[str, Any] = {
+        "model": model,
+        "tags": sorted(facts.get("tags", [])),
+        "stage": facts.get("stage", "active"),
+        "tokens": _token_bucket(metrics.get("token_est", 0)),
+        "idle": _idle_bucket(float(metrics.get("idle_sec", 0.0))),
+        "questions": min(int(metrics.get("question_count", 0)), 3),
+        "repeat": _repeat_bucket(float(metrics.get("repeat_score", 0.0))),
+        "constraints": payload.get("constraints", {}),
+    }
+    if session is not None:
+        key["session"] = session
+    if text_mode == "keywords":
+        key["keywords"] = _keywords(str(facts.get("user_message", "")), keywords)
+    raw = json.dumps(key, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:24]
+
+
+class HintCache:
+    """
+    In-memory TTL + LRU cache of SLM hints keyed by payload fingerprint.
+
+    Unlike the provider response cache, which only matches byte-identical
+    prompts, this collapses turns that the rule engine sees as equivalent.
+    Hints are written from one user's message, so by default they are only
+    reused within the same conversation (``per_session``); sharing them
+    across sessions would leak one conversation's content into another.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = 1800.0,
+        max_entries: int = 1024,
+        text_mode: str = "keywords",
+        keywords: int = 6,
+        per_session: bool = True,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.text_mode = text_mode
+        self.keywords = keywords
+        self.per_session = per_session
+        self._entries: OrderedDict[str, CachedHint] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.latency_saved_ms = 0.0
+
+    def key_for(self, payload: dict[str, Any], model: str, session: str | None = None) -> str:
+        """Fingerprint a payload with this cache's text mode, scoped to ``session`` when per-session."""
+        return hint_fingerprint(
+            payload,
+            model,
+            text_mode=self.text_mode,
+            keywords=self.keywords,
+            session=session if self.per_session else None,
+        )
+
+    def get(self, key: str) -> CachedHint | None:
+        """Return a live entry and refresh its LRU position, counting the lookup."""
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at <= time.monotonic():
+            del self._entries[key]
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        self.latency_saved_ms += entry.latency_ms
+        return entry
+
+    def put(self, key: str, hint: str, focus: str, latency_ms: float, tokens_in: int, tokens_out: int) -> None:
+        """Store a freshly generated hint, evicting the least recently used entry."""
+        self._entries[key] = CachedHint(
+            hint=hint,
+            focus=focus,
+            latency_ms=latency_ms,
+            tokens_in=tokens_in,
+            tokens_out=tokens_out,
+            expires_at=time.monotonic() + self.ttl_seconds,
+        )
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> dict[str, Any]:
+        """Counters for telemetry."""
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hit_rate, 4),
+            "latency_saved_ms": round(self.latency_saved_ms, 2),
+        }
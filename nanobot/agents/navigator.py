@@ -9,7 +9,6 @@ import re
 import time
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from difflib import SequenceMatcher
 from enum import Enum
 from pathlib import Path
 from typing import Any
@@ -21,7 +20,11 @@ except ImportError:  # pragma: no cover - fallback for minimal environments
 
     logger = logging.getLogger(__name__)
 
+from nanobot.agents.hint_cache import HintCache
+from nanobot.agents.similarity import SimilarityEngine, get_similarity_engine
+from nanobot.agents.telemetry import NavigatorLogWriter
 from nanobot.providers.base import LLMProvider
+from nanobot.providers.call_context import llm_call_context
 
 
 class RouteDecision(str, Enum):
@@ -75,6 +78,42 @@ class NavigatorResult:
         }
 
 
+# Repeat score above which a turn counts as a repeat of the previous one.
+REPEAT_THRESHOLD = 0.90
+
+
+def routing_thresholds(config: dict[str, Any] | None) -> tuple[float, float, float]:
+    """Return (complexity_low, complexity_high, cooldown_seconds) from navigator config."""
+    cfg = config or {}
+    thresholds = cfg.get("thresholds", {})
+    low = _as_float(thresholds.get("complexity_low"), 0.30)
+    high = _as_float(thresholds.get("complexity_high"), 0.75)
+    if high <= low:
+        high = min(low + 0.10, 1.0)
+    return low, high, _as_float(cfg.get("cooldown_seconds"), 2.0)
+
+
+def complexity_score(token_est: float, has_question: bool, repeated: bool, guidance_needed: bool) -> float:
+    """Weighted complexity of a turn in [0, 1]."""
+    complexity = 0.0
+    complexity += min(token_est / 120.0, 1.0) * 0.35
+    complexity += float(has_question) * 0.20
+    complexity += float(repeated) * 0.20
+    complexity += float(guidance_needed) * 0.25
+    return max(0.0, min(complexity, 1.0))
+
+
+def route_for(cooldown_ok: bool, risky: bool, complexity: float, low: float, high: float) -> RouteDecision:
+    """Route a scored turn: quiet during cooldown, template when simple or risky, SLM in between."""
+    if not cooldown_ok:
+        return RouteDecision.NO_ACTION
+    if risky or complexity < low:
+        return RouteDecision.TEMPLATE
+    if complexity < high:
+        return RouteDecision.SLM
+    return RouteDecision.FALLBACK
+
+
 def has_pii(text: str) -> bool:
     """PII detector stub. Extend with a real detector in production."""
     _ = text
@@ -103,6 +142,10 @@ class RuleEngine:
         re.IGNORECASE,
     )
 
+    def __init__(self, similarity: SimilarityEngine | None = None) -> None:
+        # Hybrid: exact SequenceMatcher for chat-sized turns, bounded shingles for pastes.
+        self.similarity = similarity or get_similarity_engine("hybrid")
+
     def preprocess(
         self,
         user_message: str,
@@ -110,33 +153,13 @@ class RuleEngine:
         config: dict[str, Any] | None = None,
     ) -> RuleEngineDecision:
         """Calculate metrics and route the current turn."""
-        cfg = config or {}
-        thresholds = cfg.get("thresholds", {})
-        low = _as_float(thresholds.get("complexity_low"), 0.30)
-        high = _as_float(thresholds.get("complexity_high"), 0.75)
-        if high <= low:
-            high = min(low + 0.10, 1.0)
-        cooldown_seconds = _as_float(cfg.get("cooldown_seconds"), 2.0)
+        low, high, cooldown_seconds = routing_thresholds(config)
 
         normalized = self._normalize(user_message)
         history = session_history or []
 
-        prev_user = self._last_user_message(history)
         idle_sec = self._idle_seconds(history)
-        repeat_score = self._similarity(normalized, prev_user)
-        question_count = normalized.count("?")
-
-        metrics = {
-            "char_len": float(len(normalized)),
-            "token_est": float(self._estimate_tokens(normalized)),
-            "idle_sec": float(idle_sec),
-            "question_count": float(question_count),
-            "repeat_score": float(round(repeat_score, 4)),
-        }
-
-        tags = [
-            tag for tag, pattern in self._TAG_PATTERNS.items() if pattern.search(normalized)
-        ]
+        metrics, tags, repeat_score = self._turn_features(normalized, history, idle_sec)
         flags = {
             "risk_pii": has_pii(normalized),
             "risk_toxic": is_toxic(normalized),
@@ -144,22 +167,18 @@ class RuleEngine:
             "cooldown_ok": idle_sec >= cooldown_seconds,
         }
 
-        complexity = 0.0
-        complexity += min(metrics["token_est"] / 120.0, 1.0) * 0.35
-        complexity += float(metrics["question_count"] > 0) * 0.20
-        complexity += float(metrics["repeat_score"] > 0.90) * 0.20
-        complexity += float("guidance_needed" in tags) * 0.25
-        complexity = max(0.0, min(complexity, 1.0))
+        complexity = complexity_score(
+            metrics["token_est"],
+            metrics["question_count"] > 0,
+            metrics["repeat_score"] > REPEAT_THRESHOLD,
+            "guidance_needed" in tags,
+        )
+        route = route_for(
+            flags["cooldown_ok"], flags["risk_pii"] or flags["risk_toxic"], complexity, low, high,
+        )
 
-        route = RouteDecision.FALLBACK
         llm_payload: dict[str, Any] | None = None
-
-        if not flags["cooldown_ok"]:
-            route = RouteDecision.NO_ACTION
-        elif flags["risk_pii"] or flags["risk_toxic"] or complexity < low:
-            route = RouteDecision.TEMPLATE
-        elif complexity < high:
-            route = RouteDecision.SLM
+        if route == RouteDecision.SLM:
             llm_payload = self._build_llm_payload(
                 user_message=normalized,
                 session_history=history,
@@ -167,8 +186,6 @@ class RuleEngine:
                 flags=flags,
                 metrics=metrics,
             )
-        else:
-            route = RouteDecision.FALLBACK
 
         return RuleEngineDecision(
             route=route,
@@ -179,6 +196,26 @@ class RuleEngine:
             llm_payload=llm_payload,
         )
 
+    def _turn_features(
+        self,
+        normalized: str,
+        history: list[dict[str, Any]],
+        idle_sec: float,
+    ) -> tuple[dict[str, float], list[str], float]:
+        """Metrics, tags and raw repeat score of a normalized turn."""
+        repeat_score = self._similarity(normalized, self._last_user_message(history))
+        metrics = {
+            "char_len": float(len(normalized)),
+            "token_est": float(self._estimate_tokens(normalized)),
+            "idle_sec": float(idle_sec),
+            "question_count": float(normalized.count("?")),
+            "repeat_score": float(round(repeat_score, 4)),
+        }
+        tags = [
+            tag for tag, pattern in self._TAG_PATTERNS.items() if pattern.search(normalized)
+        ]
+        return metrics, tags, repeat_score
+
     def _build_llm_payload(
         self,
         user_message: str,
@@ -220,7 +257,7 @@ class RuleEngine:
         user_turns = sum(1 for item in session_history if item.get("role") == "user")
         if user_turns < 2:
             return "start"
-        if repeat_score > 0.90 or idle_sec > 600 or self._STUCK_PATTERNS.search(message):
+        if repeat_score > REPEAT_THRESHOLD or idle_sec > 600 or self._STUCK_PATTERNS.search(message):
             return "stuck"
         return "active"
 
@@ -249,12 +286,9 @@ class RuleEngine:
         by_chars = max(1, round(len(text) / 4))
         return max(words, by_chars)
 
-    @staticmethod
-    def _similarity(left: str, right: str) -> float:
+    def _similarity(self, left: str, right: str) -> float:
         """Similarity score used for repeat/fatigue detection."""
-        if not left or not right:
-            return 0.0
-        return SequenceMatcher(None, left, right).ratio()
+        return self.similarity.score(left, right)
 
     @staticmethod
     def _last_user_message(history: list[dict[str, Any]]) -> str:
@@ -306,15 +340,16 @@ class SLMNavigator:
 
         started = time.perf_counter()
         try:
-            response = await asyncio.wait_for(
-                self.provider.chat(
-                    messages=messages,
-                    model=self.model,
-                    max_tokens=120,
-                    temperature=0.1,
-                ),
-                timeout=self.timeout_seconds,
-            )
+            with llm_call_context(call_site="navigator"):
+                response = await asyncio.wait_for(
+                    self.provider.chat(
+                        messages=messages,
+                        model=self.model,
+                        max_tokens=120,
+                        temperature=0.1,
+                    ),
+                    timeout=self.timeout_seconds,
+                )
         except asyncio.TimeoutError:
             logger.warning("Navigator SLM call timed out after {}s", self.timeout_seconds)
             return None
@@ -387,11 +422,16 @@ class NavigatorAgent:
         model: str = "qwen-2.5-1.5b-instruct",
         timeout_seconds: float = 2.0,
         log_path: str = "logs/navigator_pilot.jsonl",
+        similarity: str = "hybrid",
+        hint_cache: HintCache | None = None,
+        log_writer: NavigatorLogWriter | None = None,
     ) -> None:
-        self.rule_engine = RuleEngine()
+        self.rule_engine = RuleEngine(similarity=get_similarity_engine(similarity))
         self.slm = SLMNavigator(provider=provider, model=model, timeout_seconds=timeout_seconds)
+        self.hint_cache = hint_cache
         self.log_path = Path(log_path)
-        self._log_lock = asyncio.Lock()
+        # Without a configured writer, events are written through synchronously.
+        self.log_writer = log_writer or NavigatorLogWriter(self.log_path, flush_interval=0)
 
     def should_run(self, conversation_id: str, config: dict[str, Any] | None) -> bool:
         """Evaluate feature flag + mode + canary for this conversation."""
@@ -435,17 +475,39 @@ class NavigatorAgent:
         tokens_in = 0
         tokens_out = 0
         latency_ms = 0.0
+        cache_status = "off" if self.hint_cache is None else "skip"
+        latency_saved_ms = 0.0
 
         if route == RouteDecision.SLM:
-            slm_hint = await self.slm.generate_hint(decision.llm_payload or {})
-            if slm_hint is None:
-                route = RouteDecision.FALLBACK
+            payload = decision.llm_payload or {}
+            cache_key = self.hint_cache.key_for(payload, self.slm.model, conversation_id) if self.hint_cache else ""
+            cached = self.hint_cache.get(cache_key) if self.hint_cache else None
+            if cached is not None:
+                cache_status = "hit"
+                hint_text = cached.hint
+                focus_text = cached.focus
+                latency_saved_ms = cached.latency_ms
             else:
-                hint_text = slm_hint.hint
-                focus_text = slm_hint.focus
-                tokens_in = slm_hint.tokens_in
-                tokens_out = slm_hint.tokens_out
-                latency_ms = slm_hint.latency_ms
+                slm_hint = await self.slm.generate_hint(payload)
+                if self.hint_cache is not None:
+                    cache_status = "miss"
+                if slm_hint is None:
+                    route = RouteDecision.FALLBACK
+                else:
+                    hint_text = slm_hint.hint
+                    focus_text = slm_hint.focus
+                    tokens_in = slm_hint.tokens_in
+                    tokens_out = slm_hint.tokens_out
+                    latency_ms = slm_hint.latency_ms
+                    if self.hint_cache is not None:
+                        self.hint_cache.put(
+                            cache_key,
+                            hint=slm_hint.hint,
+                            focus=slm_hint.focus,
+                            latency_ms=slm_hint.latency_ms,
+                            tokens_in=slm_hint.tokens_in,
+                            tokens_out=slm_hint.tokens_out,
+                        )
 
         cost_usd = self._estimate_cost(tokens_in, tokens_out, cfg)
         baseline_tokens = max(80, int(decision.metrics.get("token_est", 0) + 40))
@@ -461,6 +523,8 @@ class NavigatorAgent:
             "latency_ms": latency_ms,
             "cost_usd": cost_usd,
             "tokens_saved_est": tokens_saved_est,
+            "hint_cache": cache_status,
+            "latency_saved_ms": latency_saved_ms,
         }
         result = NavigatorResult(
             route=route.value,
@@ -477,7 +541,7 @@ class NavigatorAgent:
         result: NavigatorResult,
         model: str,
     ) -> None:
-        """Persist navigator decision into pilot JSONL logs."""
+        """Queue the navigator decision for the pilot JSONL log."""
         event = {
             "ts": datetime.now(timezone.utc).isoformat(),
             "conversation_id": self._hash_conversation_id(conversation_id),
@@ -491,13 +555,13 @@ class NavigatorAgent:
             "cost_usd": float(result.metrics.get("cost_usd", 0.0)),
             "tokens_saved_est": int(result.metrics.get("tokens_saved_est", 0)),
         }
-        try:
-            async with self._log_lock:
-                self.log_path.parent.mkdir(parents=True, exist_ok=True)
-                with self.log_path.open("a", encoding="utf-8") as handle:
-                    handle.write(json.dumps(event, ensure_ascii=False) + "\n")
-        except Exception as exc:  # pragma: no cover - log path issues should not break flow
-            logger.warning("Failed to write navigator pilot log: {}", exc)
+        if self.hint_cache is not None:
+            stats = self.hint_cache.stats()
+            event["hint_cache"] = result.metrics.get("hint_cache", "skip")
+            event["latency_saved_ms"] = float(result.metrics.get("latency_saved_ms", 0.0))
+            event["hint_cache_hit_rate"] = stats["hit_rate"]
+            event["hint_cache_latency_saved_ms_total"] = stats["latency_saved_ms"]
+        self.log_writer.write(event)
 
         logger.info(json.dumps({"event": "navigator_turn", **event}, ensure_ascii=False))
 
@@ -0,0 +1,354 @@
+"""Offline evaluation of the navigator rule engine (and a mocked SLM branch)."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import random
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterable
+
+from nanobot.agents.navigator import (
+    REPEAT_THRESHOLD,
+    RouteDecision,
+    RuleEngine,
+    SLMNavigator,
+    _parse_iso_timestamp,
+    complexity_score,
+    has_pii,
+    is_toxic,
+    route_for,
+    routing_thresholds,
+)
+from nanobot.agents.similarity import get_similarity_engine
+from nanobot.providers.base import LLMProvider, LLMResponse
+
+ROUTES = [r.value for r in RouteDecision]
+
+
+@dataclass
+class EvalCase:
+    """One navigator turn to replay; ``expected_*`` fields are optional labels."""
+
+    id: str
+    user_message: str
+    history: list[dict[str, Any]] = field(default_factory=list)
+    bucket: str = ""
+    timestamp: str | None = None  # When set, idle time is measured to this instead of now
+    expected_route: str | None = None
+    expected_tags: list[str] | None = None
+    expected_stage: str | None = None
+
+
+@dataclass
+class ScoredCase:
+    """Rule-engine output for one case."""
+
+    case: EvalCase
+    route: str
+    tags: list[str]
+    stage: str
+    complexity: float
+    metrics: dict[str, float]
+
+
+# ----------------------------------------------------------------------------
+# Loading
+# ----------------------------------------------------------------------------
+
+
+def _case_from_dict(data: dict[str, Any], index: int) -> EvalCase:
+    flags = data.get("expected_flags") or {}
+    stage = flags.get("stage")
+    route = data.get("expected_route")
+    return EvalCase(
+        id=str(data.get("id") or f"case_{index:05d}"),
+        user_message=str(data.get("user_message", "")),
+        history=list(data.get("conversation_history") or data.get("history") or []),
+        bucket=str(data.get("bucket", "")),
+        timestamp=data.get("timestamp"),
+        # Template placeholders such as "NO_ACTION|TEMPLATE|..." are not labels
+        expected_route=route if route in ROUTES else None,
+        expected_tags=data.get("expected_tags"),
+        expected_stage=stage if stage in ("start", "active", "stuck") else None,
+    )
+
+
+def _cases_from_templates(data: dict[str, Any]) -> list[EvalCase]:
+    """Expand bucket seed examples of an eval template into labelled cases."""
+    cases: list[EvalCase] = []
+    for bucket in data.get("bucket_templates", []):
+        name = bucket.get("bucket", "")
+        for i, message in enumerate(bucket.get("seed_examples", []), 1):
+            cases.append(EvalCase(
+                id=f"{name}_{i:03d}",
+                user_message=message,
+                bucket=name,
+                expected_route=bucket.get("default_expected_route"),
+            ))
+    return cases
+
+
+def _cases_from_session(messages: list[dict[str, Any]], session_id: str) -> list[EvalCase]:
+    """One unlabelled case per user turn of a session export."""
+    cases: list[EvalCase] = []
+    for i, msg in enumerate(messages):
+        if msg.get("role") != "user":
+            continue
+        cases.append(EvalCase(
+            id=f"{session_id}#{i}",
+            user_message=str(msg.get("content", "")),
+            history=messages[:i],
+            bucket=session_id,
+            timestamp=msg.get("timestamp"),
+        ))
+    return cases
+
+
+def load_cases(path: Path) -> list[EvalCase]:
+    """
+    Load cases from a file or a directory of files.
+
+    Supported inputs:
+      - JSON: a list of cases, ``{"cases": [...]}``, or an eval template with
+        ``bucket_templates`` (seed examples become cases)
+      - JSONL of cases (objects with ``user_message``)
+      - JSONL session exports from SessionManager (every user turn is replayed)
+    """
+    if path.is_dir():
+        cases: list[EvalCase] = []
+        for child in sorted(path.iterdir()):
+            if child.suffix in (".json", ".jsonl"):
+                cases.extend(load_cases(child))
+        return cases
+
+    text = path.read_text(encoding="utf-8")
+    if path.suffix == ".json":
+        data = json.loads(text)
+        if isinstance(data, list):
+            return [_case_from_dict(item, i) for i, item in enumerate(data)]
+        if "cases" in data:
+            return [_case_from_dict(item, i) for i, item in enumerate(data["cases"])]
+        return _cases_from_templates(data)
+
+    rows = [json.loads(line) for line in text.splitlines() if line.strip()]
+    if any("user_message" in row for row in rows):
+        return [_case_from_dict(row, i) for i, row in enumerate(rows) if "user_message" in row]
+    messages = [row for row in rows if row.get("_type") != "metadata"]
+    return _cases_from_session(messages, path.stem)
+
+
+# ----------------------------------------------------------------------------
+# Scoring
+# ----------------------------------------------------------------------------
+
+
+def rule_engine_for(config: dict[str, Any] | None) -> RuleEngine:
+    """A rule engine using the configured repeat-detection engine (``similarity``)."""
+    return RuleEngine(similarity=get_similarity_engine((config or {}).get("similarity", "hybrid")))
+
+
+class BatchRuleScorer:
+    """
+    Scores many cases with the same rules as ``RuleEngine.preprocess``.
+
+    Thresholds, complexity and routing come from the rule engine's shared
+    helpers; only idle time differs, since replayed cases measure it to
+    their own timestamp instead of now.
+    """
+
+    def __init__(self, engine: RuleEngine | None = None, config: dict[str, Any] | None = None):
+        self.engine = engine or rule_engine_for(config)
+        self.low, self.high, self.cooldown_seconds = routing_thresholds(config)
+
+    def _idle_seconds(self, case: EvalCase) -> float:
+        if case.timestamp:
+            at = _parse_iso_timestamp(str(case.timestamp))
+            if at is not None:
+                for item in reversed(case.history):
+                    raw = item.get("timestamp")
+                    parsed = _parse_iso_timestamp(str(raw)) if raw else None
+                    if parsed:
+                        return max((at - parsed).total_seconds(), 0.0)
+                return 9_999.0
+        return self.engine._idle_seconds(case.history)
+
+    def score_one(self, case: EvalCase) -> ScoredCase:
+        engine = self.engine
+        normalized = engine._normalize(case.user_message)
+        idle = self._idle_seconds(case)
+        metrics, tags, repeat = engine._turn_features(normalized, case.history, idle)
+        stage = engine._detect_stage(case.history, normalized, repeat, idle)
+        complexity = complexity_score(
+            metrics["token_est"],
+            metrics["question_count"] > 0,
+            metrics["repeat_score"] > REPEAT_THRESHOLD,
+            "guidance_needed" in tags,
+        )
+        route = route_for(
+            idle >= self.cooldown_seconds,
+            has_pii(normalized) or is_toxic(normalized),
+            complexity,
+            self.low,
+            self.high,
+        )
+        return ScoredCase(case, route.value, tags, stage, round(complexity, 4), metrics)
+
+    def score(self, cases: list[EvalCase]) -> list[ScoredCase]:
+        return [self.score_one(case) for case in cases]
+
+
+# ----------------------------------------------------------------------------
+# Mock SLM
+# ----------------------------------------------------------------------------
+
+
+class MockSLMProvider(LLMProvider):
+    """
+    Offline stand-in for the navigator SLM.
+
+    Returns a valid hint after a simulated latency; ``failure_rate`` of the
+    calls return malformed output and ``timeout_rate`` of them sleep past
+    the navigator timeout.
+    """
+
+    def __init__(
+        self,
+        latency_ms: float = 150.0,
+        jitter_ms: float = 50.0,
+        failure_rate: float = 0.0,
+        timeout_rate: float = 0.0,
+        seed: int = 0,
+    ):
+        super().__init__(api_key=None, api_base=None)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.failure_rate = failure_rate
+        self.timeout_rate = timeout_rate
+        self._rng = random.Random(seed)
+
+    async def chat(
+        self,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]] | None = None,
+        model: str | None = None,
+        max_tokens: int = 4096,
+        temperature: float = 0.7,
+    ) -> LLMResponse:
+        roll = self._rng.random()
+        if roll < self.timeout_rate:
+            await asyncio.sleep(3600)
+        delay = max(0.0, self.latency_ms + self._rng.uniform(-self.jitter_ms, self.jitter_ms)) / 1000
+        await asyncio.sleep(delay)
+        usage = {"prompt_tokens": len(messages[-1]["content"]) // 4, "completion_tokens": 24}
+        if roll < self.timeout_rate + self.failure_rate:
+            return LLMResponse(content="not json", usage=usage)
+        hint = {"hint": "Сфокусируйся на одном следующем шаге.", "focus": "next step"}
+        return LLMResponse(content=json.dumps(hint, ensure_ascii=False), usage=usage)
+
+    def get_default_model(self) -> str:
+        return "mock/slm"
+
+
+async def run_slm_branch(
+    scored: list[ScoredCase],
+    provider: LLMProvider,
+    timeout_seconds: float = 2.0,
+    concurrency: int = 32,
+    config: dict[str, Any] | None = None,
+) -> dict[str, Any]:
+    """Send every SLM-routed case through SLMNavigator and summarize outcomes."""
+    slm = SLMNavigator(provider=provider, timeout_seconds=timeout_seconds)
+    engine = rule_engine_for(config)
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    hints = 0
+
+    async def one(item: ScoredCase) -> None:
+        nonlocal hints
+        payload = engine._build_llm_payload(
+            user_message=engine._normalize(item.case.user_message),
+            session_history=item.case.history,
+            tags=item.tags,
+            flags={"stage": item.stage},
+            metrics=item.metrics,
+        )
+        async with semaphore:
+            started = time.perf_counter()
+            hint = await slm.generate_hint(payload)
+            latencies.append((time.perf_counter() - started) * 1000)
+        if hint is not None:
+            hints += 1
+
+    targets = [s for s in scored if s.route == RouteDecision.SLM.value]
+    await asyncio.gather(*(one(s) for s in targets))
+    latencies.sort()
+
+    def pct(q: float) -> float:
+        return round(latencies[min(len(latencies) - 1, int(q * len(latencies)))], 1) if latencies else 0.0
+
+    return {
+        "calls": len(targets),
+        "hints": hints,
+        "fallbacks": len(targets) - hints,
+        "p50_ms": pct(0.50),
+        "p95_ms": pct(0.95),
+    }
+
+
+# ----------------------------------------------------------------------------
+# Report
+# ----------------------------------------------------------------------------
+
+
+def build_report(scored: list[ScoredCase], elapsed_seconds: float) -> dict[str, Any]:
+    """Route accuracy, confusion matrix, tag/stage accuracy and throughput."""
+    confusion = {expected: {predicted: 0 for predicted in ROUTES} for expected in ROUTES}
+    route_total = route_hits = 0
+    tag_total = tag_hits = 0
+    stage_total = stage_hits = 0
+    distribution = {route: 0 for route in ROUTES}
+
+    for item in scored:
+        distribution[item.route] += 1
+        case = item.case
+        if case.expected_route:
+            route_total += 1
+            route_hits += case.expected_route == item.route
+            confusion[case.expected_route][item.route] += 1
+        if case.expected_tags is not None:
+            tag_total += 1
+            tag_hits += sorted(case.expected_tags) == sorted(item.tags)
+        if case.expected_stage:
+            stage_total += 1
+            stage_hits += case.expected_stage == item.stage
+
+    def ratio(hits: int, total: int) -> float | None:
+        return round(hits / total, 4) if total else None
+
+    return {
+        "cases": len(scored),
+        "route_distribution": distribution,
+        "labelled_routes": route_total,
+        "route_accuracy": ratio(route_hits, route_total),
+        "confusion": confusion,
+        "tag_accuracy": ratio(tag_hits, tag_total),
+        "stage_accuracy": ratio(stage_hits, stage_total),
+        "elapsed_seconds": round(elapsed_seconds, 4),
+        "cases_per_second": round(len(scored) / elapsed_seconds, 1) if elapsed_seconds > 0 else None,
+    }
+
+
+def evaluate(
+    cases: Iterable[EvalCase],
+    config: dict[str, Any] | None = None,
+    engine: RuleEngine | None = None,
+) -> tuple[list[ScoredCase], dict[str, Any]]:
+    """Score cases and build the report."""
+    case_list = list(cases)
+    scorer = BatchRuleScorer(engine=engine, config=config)
+    started = time.perf_counter()
+    scored = scorer.score(case_list)
+    return scored, build_report(scored, time.perf_counter() - started)
@@ -0,0 +1,105 @@
+"""Text similarity engines for the navigator's repeat detection."""
+
+from __future__ import annotations
+
+from difflib import SequenceMatcher
+from typing import Protocol
+
+
+class SimilarityEngine(Protocol):
+    """Scores two normalized messages in [0, 1]; 1.0 means identical."""
+
+    def score(self, left: str, right: str) -> float: ...
+
+
+class SequenceSimilarity:
+    """
+    ``difflib.SequenceMatcher.ratio()`` — the reference score.
+
+    Worst case is quadratic in message length, so inputs are capped.
+    """
+
+    def __init__(self, max_chars: int = 20_000):
+        self.max_chars = max_chars
+
+    def score(self, left: str, right: str) -> float:
+        if not left or not right:
+            return 0.0
+        return SequenceMatcher(None, left[: self.max_chars], right[: self.max_chars]).ratio()
+
+
+class ShingleSimilarity:
+    """
+    Dice coefficient over hashed character k-shingles.
+
+    Linear in input size; messages longer than ``max_chars`` are compared on
+    their head and tail only, so the cost is bounded regardless of input.
+    Dice tracks ``SequenceMatcher.ratio()`` closely for near-duplicates,
+    which is the only region the repeat threshold (0.90) cares about.
+    """
+
+    def __init__(self, k: int = 4, max_chars: int = 8_000):
+        self.k = k
+        self.max_chars = max_chars
+
+    def _window(self, text: str) -> str:
+        if len(text) <= self.max_chars:
+            return text
+        half = self.max_chars // 2
+        return text[:half] + "\x00" + text[-half:]
+
+    def _shingles(self, text: str) -> set[int]:
+        k = self.k
+        if len(text) <= k:
+            return {hash(text)}
+        return {hash(text[i:i + k]) for i in range(len(text) - k + 1)}
+
+    def score(self, left: str, right: str) -> float:
+        if not left or not right:
+            return 0.0
+        if left == right:
+            return 1.0
+        a = self._shingles(self._window(left))
+        b = self._shingles(self._window(right))
+        return 2 * len(a & b) / (len(a) + len(b))
+
+
+class HybridSimilarity:
+    """
+    Exact SequenceMatcher score for chat-sized messages, shingles beyond.
+
+    Typical turns are short, so their scores (and routing) are unchanged;
+    only long pastes, where SequenceMatcher dominates pre-routing latency,
+    switch to the bounded shingle estimate.
+    """
+
+    def __init__(self, exact_max_chars: int = 1_000, shingle: ShingleSimilarity | None = None):
+        self.exact_max_chars = exact_max_chars
+        self._exact = SequenceSimilarity()
+        self._shingle = shingle or ShingleSimilarity()
+
+    def score(self, left: str, right: str) -> float:
+        if not left or not right:
+            return 0.0
+        if len(left) <= self.exact_max_chars and len(right) <= self.exact_max_chars:
+            return self._exact.score(left, right)
+        # ratio() can never exceed this bound; skip all work for very uneven lengths.
+        upper = 2 * min(len(left), len(right)) / (len(left) + len(right))
+        if upper < 0.5:
+            return upper
+        return min(upper, self._shingle.score(left, right))
+
+
+_ENGINES = {
+    "hybrid": HybridSimilarity,
+    "sequence": SequenceSimilarity,
+    "shingle": ShingleSimilarity,
+}
+
+
+def get_similarity_engine(name: str = "hybrid") -> SimilarityEngine:
+    """Create a similarity engine by name ("hybrid", "sequence" or "shingle")."""
+    try:
+        return _ENGINES[name]()
+    except KeyError:
+        raise ValueError(f"Unknown similarity engine: {name!r} (choose from {', '.join(_ENGINES)})") from None
@@ -0,0 +1,286 @@
+"""Buffered, rotating JSONL writer for navigator pilot telemetry."""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import json
+import os
+import shutil
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any
+
+try:
+    from loguru import logger
+except ImportError:  # pragma: no cover - fallback for minimal environments
+    import logging
+
+    logger = logging.getLogger(__name__)
+
+# One byte offset is remembered every INDEX_STRIDE lines of the active segment.
+INDEX_STRIDE = 256
+
+
+def index_path(log_path: Path) -> Path:
+    """Sidecar file holding the tail index of the active segment."""
+    return log_path.with_name(log_path.name + ".idx")
+
+
+def segment_path(log_path: Path, number: int) -> Path:
+    """Path of the ``number``-th rotated (gzipped) segment; 1 is the newest."""
+    return log_path.with_name(f"{log_path.name}.{number}.gz")
+
+
+class NavigatorLogWriter:
+    """
+    Appends navigator events to a JSONL file off the request path.
+
+    Events go into a bounded ring buffer (the oldest are dropped, and
+    counted, if the disk falls behind) and are written in batches on a worker
+    thread, either when ``batch_size`` accumulate or ``flush_interval``
+    seconds after the first buffered event. ``flush_interval=0`` writes
+    through synchronously.
+
+    The active segment is rotated once it exceeds ``max_bytes`` or is older
+    than ``rotate_seconds``; rotated segments are gzipped and the newest
+    ``keep_segments`` are kept. A small sidecar index (line count, size and a
+    byte offset every ``INDEX_STRIDE`` lines) lets :func:`read_tail` fetch the
+    last N events without scanning the whole file.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        buffer_size: int = 5000,
+        batch_size: int = 200,
+        flush_interval: float = 2.0,
+        max_bytes: int = 10 * 1024 * 1024,
+        rotate_seconds: float = 24 * 3600,
+        keep_segments: int = 5,
+    ):
+        self.path = Path(path)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.rotate_seconds = rotate_seconds
+        self.keep_segments = keep_segments
+        self._buffer: deque[str] = deque(maxlen=buffer_size)
+        self._buffer_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._timer: asyncio.TimerHandle | None = None
+        self._index: dict[str, Any] | None = None
+        self.stats = {"written": 0, "dropped": 0, "rotations": 0, "write_errors": 0}
+
+    def write(self, event: dict[str, Any]) -> None:
+        """Buffer one event; never raises or blocks on disk unless write-through."""
+        line = json.dumps(event, ensure_ascii=False)
+        with self._buffer_lock:
+            if len(self._buffer) == self._buffer.maxlen:
+                self.stats["dropped"] += 1
+            self._buffer.append(line)
+            pending = len(self._buffer)
+
+        if self.flush_interval <= 0:
+            self.flush()
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            if pending >= self.batch_size:
+                self.flush()
+            return
+
+        if pending >= self.batch_size:
+            self._cancel_timer()
+            loop.run_in_executor(None, self.flush)
+        elif self._timer is None:
+            self._timer = loop.call_later(self.flush_interval, self._flush_in_background, loop)
+
+    def _flush_in_background(self, loop: asyncio.AbstractEventLoop) -> None:
+        self._timer = None
+        loop.run_in_executor(None, self.flush)
+
+    def _cancel_timer(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def close(self) -> None:
+        """Cancel the pending timer and flush synchronously."""
+        self._cancel_timer()
+        self.flush()
+
+    def flush(self) -> int:
+        """Write buffered events now; returns how many were written."""
+        with self._buffer_lock:
+            lines = list(self._buffer)
+            self._buffer.clear()
+        if not lines:
+            return 0
+        with self._write_lock:
+            try:
+                self._write_lines(lines)
+            except Exception as exc:  # log path issues should not break the turn
+                self.stats["write_errors"] += 1
+                logger.warning("Failed to write navigator pilot log: {}", exc)
+                return 0
+        self.stats["written"] += len(lines)
+        return len(lines)
+
+    def _write_lines(self, lines: list[str]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        index = self._load_index()
+        if self._should_rotate(index):
+            self._rotate()
+            index = self._new_index()
+
+        offset = index["size"]
+        count = index["lines"]
+        chunks: list[bytes] = []
+        for line in lines:
+            if count % INDEX_STRIDE == 0:
+                index["offsets"].append(offset)
+            data = (line + "\n").encode("utf-8")
+            chunks.append(data)
+            offset += len(data)
+            count += 1
+
+        with self.path.open("ab") as handle:
+            handle.write(b"".join(chunks))
+        index["size"] = offset
+        index["lines"] = count
+        self._save_index(index)
+
+    def _should_rotate(self, index: dict[str, Any]) -> bool:
+        if index["lines"] == 0:
+            return False
+        if self.max_bytes > 0 and index["size"] >= self.max_bytes:
+            return True
+        return self.rotate_seconds > 0 and time.time() - index["started"] >= self.rotate_seconds
+
+    def _rotate(self) -> None:
+        """Gzip the active segment into ``.1.gz`` and shift older segments."""
+        oldest = segment_path(self.path, self.keep_segments)
+        if oldest.exists():
+            oldest.unlink()
+        for number in range(self.keep_segments - 1, 0, -1):
+            src = segment_path(self.path, number)
+            if src.exists():
+                src.replace(segment_path(self.path, number + 1))
+
+        staged = self.path.with_name(self.path.name + ".rotating")
+        self.path.replace(staged)
+        if self.keep_segments > 0:
+            with staged.open("rb") as src, gzip.open(segment_path(self.path, 1), "wb") as dst:
+                shutil.copyfileobj(src, dst)
+        staged.unlink()
+        self.stats["rotations"] += 1
+
+    def _new_index(self) -> dict[str, Any]:
+        return {"started": time.time(), "lines": 0, "size": 0, "offsets": []}
+
+    def _load_index(self) -> dict[str, Any]:
+        """Cached index, rebuilt by scanning if it does not match the file."""
+        size = self.path.stat().st_size if self.path.exists() else 0
+        index = self._index or _read_index(self.path)
+        if index is None or index["size"] != size:
+            index = _build_index(self.path)
+        self._index = index
+        return index
+
+    def _save_index(self, index: dict[str, Any]) -> None:
+        self._index = index
+        target = index_path(self.path)
+        tmp = target.with_name(target.name + ".tmp")
+        tmp.write_text(json.dumps(index), encoding="utf-8")
+        os.replace(tmp, target)
+
+
+def _read_index(log_path: Path) -> dict[str, Any] | None:
+    try:
+        data = json.loads(index_path(log_path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or not {"started", "lines", "size", "offsets"} <= data.keys():
+        return None
+    return data
+
+
+def _build_index(log_path: Path) -> dict[str, Any]:
+    """Scan a segment (e.g. written by an older version) and index it."""
+    index = {"started": time.time(), "lines": 0, "size": 0, "offsets": []}
+    if not log_path.exists():
+        return index
+    index["started"] = log_path.stat().st_mtime
+    offset = 0
+    with log_path.open("rb") as handle:
+        for raw in handle:
+            if index["lines"] % INDEX_STRIDE == 0:
+                index["offsets"].append(offset)
+            offset += len(raw)
+            index["lines"] += 1
+    index["size"] = offset
+    return index
+
+
+def _parse_lines(lines: list[bytes]) -> list[dict[str, Any]]:
+    events: list[dict[str, Any]] = []
+    for raw in lines:
+        raw = raw.strip()
+        if not raw:
+            continue
+        try:
+            data = json.loads(raw)
+        except ValueError:
+            continue
+        if isinstance(data, dict):
+            events.append(data)
+    return events
+
+
+def _tail_active(log_path: Path, limit: int) -> list[bytes]:
+    """Last ``limit`` raw lines of the active segment, seeking via the index."""
+    if not log_path.exists():
+        return []
+    size = log_path.stat().st_size
+    index = _read_index(log_path)
+    start = 0
+    if index is not None and index["size"] == size and index["offsets"]:
+        first_wanted = max(0, index["lines"] - limit)
+        start = index["offsets"][min(first_wanted // INDEX_STRIDE, len(index["offsets"]) - 1)]
+    with log_path.open("rb") as handle:
+        handle.seek(start)
+        lines = handle.readlines()
+    return lines[-limit:]
+
+
+def read_tail(log_path: str | Path, limit: int) -> list[dict[str, Any]]:
+    """
+    Return the most recent ``limit`` events, oldest first.
+
+    Reads only the indexed tail of the active segment and, if that holds
+    fewer than ``limit`` lines, continues into rotated segments newest first.
+    ``limit <= 0`` returns every retained event.
+    """
+    path = Path(log_path)
+    want = limit if limit > 0 else None
+    lines = _tail_active(path, want) if want else (path.read_bytes().splitlines() if path.exists() else [])
+    segments: list[list[bytes]] = []
+    number = 1
+    while want is None or len(lines) + sum(len(s) for s in segments) < want:
+        segment = segment_path(path, number)
+        if not segment.exists():
+            break
+        try:
+            with gzip.open(segment, "rb") as handle:
+                segments.append(handle.read().splitlines())
+        except OSError:
+            break
+        number += 1
+    for older in segments:
+        lines = older + lines
+    events = _parse_lines(lines)
+    return events[-want:] if want else events
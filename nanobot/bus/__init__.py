@@ -1,6 +1,14 @@
 """Message bus module for decoupled channel-agent communication."""
 
+from nanobot.bus.coalesce import InboundCoalescer
 from nanobot.bus.events import InboundMessage, OutboundMessage
-from nanobot.bus.queue import MessageBus
+from nanobot.bus.queue import MessageBus, Priority, classify_priority
 
-__all__ = ["MessageBus", "InboundMessage", "OutboundMessage"]
+__all__ = [
+    "MessageBus",
+    "InboundMessage",
+    "OutboundMessage",
+    "InboundCoalescer",
+    "Priority",
+    "classify_priority",
+]
@@ -0,0 +1,184 @@
+"""Per-session coalescing of bursts of short inbound messages."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable
+
+from loguru import logger
+
+from nanobot.bus.events import InboundMessage
+
+# Button presses and retries are acted on immediately.
+_IMMEDIATE_FLAGS = ("from_callback", "from_menu", "from_retry")
+
+
+@dataclass
+class _Burst:
+    messages: list[InboundMessage] = field(default_factory=list)
+    first_at: float = 0.0
+    last_at: float = 0.0
+    deadline: float = 0.0
+    timer: asyncio.TimerHandle | None = None
+
+
+@dataclass
+class _SessionPace:
+    window: float
+    gap_ewma: float | None = None
+
+
+class InboundCoalescer:
+    """
+    Merges messages a user sends in quick succession into one turn.
+
+    Each (session, sender) burst is held until no new message arrives within
+    the session's window, or until ``max_hold`` seconds after its first
+    message. The window adapts per session: it tracks 1.5x the smoothed gap
+    between messages in a burst, and shrinks after every message that turned
+    out to be alone, so users who do not split their messages pay little
+    delay. A typing notification extends the hold by ``typing_grace``.
+    Slash commands and button presses are never held; they first flush any
+    pending burst of the same sender so ordering is preserved.
+    """
+
+    def __init__(
+        self,
+        sink: Callable[[InboundMessage], Awaitable[bool]] | None = None,
+        channels: list[str] | None = None,
+        initial_window: float = 1.0,
+        min_window: float = 0.3,
+        max_window: float = 3.0,
+        max_hold: float = 8.0,
+        typing_grace: float = 4.0,
+    ):
+        """
+        Args:
+            sink: Where merged messages go (set by ``MessageBus``)
+            channels: Channels to coalesce; None means every channel but "system"
+            initial_window: Window for a session with no history
+            min_window: Lower bound the window adapts down to
+            max_window: Upper bound the window adapts up to
+            max_hold: Longest a burst is held from its first message
+            typing_grace: Hold extension after a typing notification
+        """
+        self.sink = sink
+        self.channels = set(channels) if channels is not None else None
+        self.initial_window = initial_window
+        self.min_window = min_window
+        self.max_window = max_window
+        self.max_hold = max_hold
+        self.typing_grace = typing_grace
+        self._bursts: dict[tuple[str, str], _Burst] = {}
+        self._pace: dict[str, _SessionPace] = {}
+        self._flushes: set[asyncio.Task] = set()
+        self.stats = {"received": 0, "emitted": 0, "merged": 0}
+
+    def accepts(self, msg: InboundMessage) -> bool:
+        """True if the message may be held for coalescing."""
+        if msg.channel == "system":
+            return False
+        if self.channels is not None and msg.channel not in self.channels:
+            return False
+        return True
+
+    def holds(self, msg: InboundMessage) -> bool:
+        """True if a coalescable message is a normal text turn (not a command or button)."""
+        if msg.content.lstrip().startswith("/"):
+            return False
+        meta = msg.metadata or {}
+        return not any(meta.get(flag) for flag in _IMMEDIATE_FLAGS)
+
+    async def add(self, msg: InboundMessage) -> bool:
+        """Hold ``msg`` or, for commands, flush the sender's burst and pass it through."""
+        key = (msg.session_key, msg.sender_id)
+        if not self.holds(msg):
+            await self._flush(key)
+            return await self.sink(msg)
+
+        self.stats["received"] += 1
+        now = time.monotonic()
+        pace = self._pace.setdefault(msg.session_key, _SessionPace(window=self.initial_window))
+        burst = self._bursts.get(key)
+        if burst is None:
+            burst = self._bursts[key] = _Burst(first_at=now)
+        else:
+            self._observe_gap(pace, now - burst.last_at)
+        burst.messages.append(msg)
+        burst.last_at = now
+        self._schedule(key, burst, now + pace.window)
+        return True
+
+    def notify_typing(self, session_key: str, sender_id: str) -> None:
+        """Extend a pending burst while its sender is typing."""
+        key = (session_key, sender_id)
+        burst = self._bursts.get(key)
+        if burst is not None:
+            self._schedule(key, burst, max(burst.deadline, time.monotonic() + self.typing_grace))
+
+    def _observe_gap(self, pace: _SessionPace, gap: float) -> None:
+        pace.gap_ewma = gap if pace.gap_ewma is None else 0.3 * gap + 0.7 * pace.gap_ewma
+        pace.window = min(self.max_window, max(self.min_window, 1.5 * pace.gap_ewma))
+
+    def _schedule(self, key: tuple[str, str], burst: _Burst, deadline: float) -> None:
+        burst.deadline = min(deadline, burst.first_at + self.max_hold)
+        if burst.timer is not None:
+            burst.timer.cancel()
+        loop = asyncio.get_running_loop()
+        delay = max(0.0, burst.deadline - time.monotonic())
+        burst.timer = loop.call_later(delay, self._flush_in_background, key)
+
+    def _flush_in_background(self, key: tuple[str, str]) -> None:
+        task = asyncio.create_task(self._flush(key))
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def _flush(self, key: tuple[str, str]) -> None:
+        burst = self._bursts.pop(key, None)
+        if burst is None:
+            return
+        if burst.timer is not None:
+            burst.timer.cancel()
+        if len(burst.messages) == 1:
+            pace = self._pace.get(key[0])
+            if pace is not None:
+                pace.window = max(self.min_window, pace.window * 0.8)
+        merged = merge_messages(burst.messages)
+        self.stats["emitted"] += 1
+        self.stats["merged"] += len(burst.messages) - 1
+        if len(burst.messages) > 1:
+            logger.debug(f"Coalesced {len(burst.messages)} messages from {key[0]}")
+        await self.sink(merged)
+
+    async def flush_all(self) -> None:
+        """Release every pending burst now (e.g. on shutdown)."""
+        for key in list(self._bursts):
+            await self._flush(key)
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
+
+    @property
+    def pending(self) -> int:
+        """Messages currently held."""
+        return sum(len(b.messages) for b in self._bursts.values())
+
+
+def merge_messages(messages: list[InboundMessage]) -> InboundMessage:
+    """Combine a burst into one message: texts joined by newlines, media concatenated."""
+    if len(messages) == 1:
+        return messages[0]
+    first, last = messages[0], messages[-1]
+    metadata: dict[str, Any] = dict(last.metadata)
+    metadata["coalesced"] = len(messages)
+    metadata["coalesced_message_ids"] = [m.metadata.get("message_id") for m in messages]
+    return InboundMessage(
+        channel=last.channel,
+        sender_id=last.sender_id,
+        chat_id=last.chat_id,
+        content="\n".join(m.content for m in messages if m.content),
+        timestamp=first.timestamp,
+        media=[path for m in messages for path in m.media],
+        metadata=metadata,
+    )
@@ -1,53 +1,363 @@
 """Async message queue for decoupled channel-agent communication."""
 
 import asyncio
-from typing import Callable, Awaitable
+import time
+from collections import deque
+from enum import IntEnum
+from typing import Any, Callable, Awaitable, Generic, TypeVar
 
 from loguru import logger
 
+from nanobot.bus.coalesce import InboundCoalescer
 from nanobot.bus.events import InboundMessage, OutboundMessage
 
+T = TypeVar("T", InboundMessage, OutboundMessage)
+
+
+class Priority(IntEnum):
+    """Queue lanes, served lowest value first."""
+
+    INTERACTIVE = 0  # Direct messages
+    GROUP = 1  # Group chats, channels, panels
+    SCHEDULED = 2  # Cron / heartbeat
+    SYSTEM = 3  # Subagent announces and other internal traffic
+
+
+_SCHEDULED_SOURCES = {"cron", "heartbeat"}
+
+
+def classify_priority(msg: InboundMessage | OutboundMessage) -> Priority:
+    """
+    Pick the lane for a message.
+
+    An explicit ``metadata["priority"]`` (lane name or number) wins; otherwise
+    the lane is inferred from the channel and the group markers channels
+    already put into metadata.
+    """
+    meta = msg.metadata or {}
+    explicit = meta.get("priority")
+    if explicit is not None:
+        try:
+            return Priority[str(explicit).upper()] if isinstance(explicit, str) else Priority(int(explicit))
+        except (KeyError, ValueError):
+            pass
+    if msg.channel == "system":
+        return Priority.SYSTEM
+    sender = getattr(msg, "sender_id", "")
+    if msg.channel in _SCHEDULED_SOURCES or sender in _SCHEDULED_SOURCES:
+        return Priority.SCHEDULED
+    is_group = (
+        meta.get("is_group")
+        or meta.get("chat_type") == "group"
+        or meta.get("guild_id")
+        or meta.get("channel_type") not in (None, "", "im")
+    )
+    if not is_group and isinstance(meta.get("slack"), dict):
+        is_group = meta["slack"].get("channel_type") not in (None, "", "im")
+    return Priority.GROUP if is_group else Priority.INTERACTIVE
+
+
+class LaneQueue(Generic[T]):
+    """
+    Bounded multi-lane queue with watermark-based congestion signalling.
+
+    Items are served strictly by lane priority, except that a head item that
+    has waited longer than ``starvation_seconds`` is served first so low
+    lanes still drain under sustained load. ``maxsize <= 0`` means unbounded.
+
+    Congestion starts when the depth reaches the high watermark and clears
+    once it falls to the low watermark; producers can poll ``congested`` or
+    await ``wait_for_capacity()``.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        maxsize: int = 1000,
+        high_watermark: float = 0.8,
+        low_watermark: float = 0.5,
+        starvation_seconds: float = 30.0,
+        classify: Callable[[T], Priority] = classify_priority,
+    ):
+        self.name = name
+        self.maxsize = maxsize
+        self.high_mark = max(1, int(maxsize * high_watermark)) if maxsize > 0 else 0
+        self.low_mark = min(int(maxsize * low_watermark), self.high_mark - 1) if maxsize > 0 else 0
+        self.starvation_seconds = starvation_seconds
+        self._classify = classify
+        self._lanes: dict[Priority, deque[tuple[float, T]]] = {p: deque() for p in Priority}
+        self._size = 0
+        self._getters: deque[asyncio.Future] = deque()
+        self._putters: deque[asyncio.Future] = deque()
+        self._capacity_waiters: deque[asyncio.Future] = deque()
+        self.congested = False
+        self._published = {p: 0 for p in Priority}
+        self._dropped = {p: 0 for p in Priority}
+        self._wait_total = {p: 0.0 for p in Priority}
+        self._served = {p: 0 for p in Priority}
+        self._wait_max = 0.0
+
+    def qsize(self) -> int:
+        return self._size
+
+    def empty(self) -> bool:
+        return self._size == 0
+
+    def full(self) -> bool:
+        return 0 < self.maxsize <= self._size
+
+    async def put(self, item: T, timeout: float | None = None) -> bool:
+        """
+        Enqueue, waiting for room while the queue is full.
+
+        Returns:
+            False if no room appeared within ``timeout`` seconds (the item is
+            dropped and counted); True otherwise.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        while self.full():
+            remaining = None if deadline is None else deadline - loop.time()
+            if remaining is not None and remaining <= 0:
+                self._drop(item)
+                return False
+            putter = loop.create_future()
+            self._putters.append(putter)
+            try:
+                await asyncio.wait_for(asyncio.shield(putter), remaining)
+            except asyncio.TimeoutError:
+                putter.cancel()
+                self._discard(self._putters, putter)
+                self._drop(item)
+                return False
+            except asyncio.CancelledError:
+                putter.cancel()
+                self._discard(self._putters, putter)
+                if not self.full():
+                    self._wakeup_next(self._putters)
+                raise
+        self._put(item)
+        return True
+
+    def put_nowait(self, item: T) -> bool:
+        """Enqueue without waiting; a full queue drops the item and returns False."""
+        if self.full():
+            self._drop(item)
+            return False
+        self._put(item)
+        return True
+
+    async def get(self) -> T:
+        """Remove and return the next item, waiting until one is available."""
+        loop = asyncio.get_running_loop()
+        while self.empty():
+            getter = loop.create_future()
+            self._getters.append(getter)
+            try:
+                await getter
+            except asyncio.CancelledError:
+                getter.cancel()
+                self._discard(self._getters, getter)
+                if not self.empty():
+                    self._wakeup_next(self._getters)
+                raise
+        return self._get()
+
+    async def wait_for_capacity(self) -> None:
+        """Return once the queue is not congested."""
+        while self.congested:
+            waiter = asyncio.get_running_loop().create_future()
+            self._capacity_waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                waiter.cancel()
+                self._discard(self._capacity_waiters, waiter)
+                raise
+
+    def _put(self, item: T) -> None:
+        lane = self._classify(item)
+        self._lanes[lane].append((time.monotonic(), item))
+        self._size += 1
+        self._published[lane] += 1
+        if self.high_mark and not self.congested and self._size >= self.high_mark:
+            self.congested = True
+            logger.warning(f"{self.name} queue congested: {self._size}/{self.maxsize} pending")
+        self._wakeup_next(self._getters)
+
+    def _get(self) -> T:
+        now = time.monotonic()
+        lane = self._next_lane(now)
+        enqueued, item = self._lanes[lane].popleft()
+        self._size -= 1
+        waited = now - enqueued
+        self._wait_total[lane] += waited
+        self._served[lane] += 1
+        self._wait_max = max(self._wait_max, waited)
+        if self.congested and self._size <= self.low_mark:
+            self.congested = False
+            logger.info(f"{self.name} queue drained to {self._size} pending")
+            while self._capacity_waiters:
+                self._wakeup_next(self._capacity_waiters)
+        self._wakeup_next(self._putters)
+        return item
+
+    def _next_lane(self, now: float) -> Priority:
+        heads = [(lane, q[0][0]) for lane, q in self._lanes.items() if q]
+        oldest_lane, oldest_ts = min(heads, key=lambda head: head[1])
+        if now - oldest_ts > self.starvation_seconds:
+            return oldest_lane
+        return heads[0][0]  # dict order follows Priority, highest first
+
+    def _drop(self, item: T) -> None:
+        lane = self._classify(item)
+        self._dropped[lane] += 1
+        logger.warning(f"{self.name} queue full ({self.maxsize}); dropped {lane.name.lower()} message")
+
+    @staticmethod
+    def _wakeup_next(waiters: deque[asyncio.Future]) -> None:
+        while waiters:
+            waiter = waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                break
+
+    @staticmethod
+    def _discard(waiters: deque[asyncio.Future], waiter: asyncio.Future) -> None:
+        try:
+            waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def metrics(self) -> dict[str, Any]:
+        """Depth, throughput, drop counts and queueing delay, overall and per lane."""
+        served = sum(self._served.values())
+        return {
+            "depth": self._size,
+            "maxsize": self.maxsize,
+            "congested": self.congested,
+            "published": sum(self._published.values()),
+            "dropped": sum(self._dropped.values()),
+            "wait_ms_avg": round(sum(self._wait_total.values()) / served * 1000, 2) if served else 0.0,
+            "wait_ms_max": round(self._wait_max * 1000, 2),
+            "lanes": {
+                lane.name.lower(): {
+                    "depth": len(self._lanes[lane]),
+                    "published": self._published[lane],
+                    "dropped": self._dropped[lane],
+                    "wait_ms_avg": (
+                        round(self._wait_total[lane] / self._served[lane] * 1000, 2)
+                        if self._served[lane] else 0.0
+                    ),
+                }
+                for lane in Priority
+            },
+        }
+
 
 class MessageBus:
     """
     Async message bus that decouples chat channels from the agent core.
-    
+
     Channels push messages to the inbound queue, and the agent processes
-    them and pushes responses to the outbound queue.
+    them and pushes responses to the outbound queue. Both queues are bounded
+    and prioritised (see ``Priority``): a full queue makes publishers wait,
+    which is the backpressure signal, and ``publish_timeout`` turns a long
+    wait into a counted drop.
     """
-    
-    def __init__(self):
-        self.inbound: asyncio.Queue[InboundMessage] = asyncio.Queue()
-        self.outbound: asyncio.Queue[OutboundMessage] = asyncio.Queue()
+
+    def __init__(
+        self,
+        inbound_maxsize: int = 1000,
+        outbound_maxsize: int = 1000,
+        high_watermark: float = 0.8,
+        low_watermark: float = 0.5,
+        publish_timeout: float | None = None,
+        coalescer: InboundCoalescer | None = None,
+    ):
+        """
+        Args:
+            inbound_maxsize: Max pending inbound messages (0 = unbounded)
+            outbound_maxsize: Max pending outbound messages (0 = unbounded)
+            high_watermark: Fill ratio at which a queue reports congestion
+            low_watermark: Fill ratio at which congestion clears
+            publish_timeout: Seconds a publisher waits on a full queue before
+                the message is dropped (None = wait indefinitely)
+            coalescer: Optional stage that merges bursts of messages per
+                session before they reach the inbound queue
+        """
+        self.inbound: LaneQueue[InboundMessage] = LaneQueue(
+            "inbound", inbound_maxsize, high_watermark, low_watermark
+        )
+        self.outbound: LaneQueue[OutboundMessage] = LaneQueue(
+            "outbound", outbound_maxsize, high_watermark, low_watermark
+        )
+        self.publish_timeout = publish_timeout
+        self.coalescer = coalescer
+        if coalescer is not None:
+            coalescer.sink = self._enqueue_inbound
         self._outbound_subscribers: dict[str, list[Callable[[OutboundMessage], Awaitable[None]]]] = {}
         self._running = False
-    
-    async def publish_inbound(self, msg: InboundMessage) -> None:
-        """Publish a message from a channel to the agent."""
-        await self.inbound.put(msg)
-    
+
+    async def publish_inbound(self, msg: InboundMessage) -> bool:
+        """Publish a message from a channel to the agent; False if it was dropped."""
+        if self.coalescer is not None and self.coalescer.accepts(msg):
+            return await self.coalescer.add(msg)
+        return await self._enqueue_inbound(msg)
+
+    async def _enqueue_inbound(self, msg: InboundMessage) -> bool:
+        return await self.inbound.put(msg, timeout=self.publish_timeout)
+
+    def notify_typing(self, channel: str, chat_id: str, sender_id: str) -> None:
+        """Tell the coalescer a user is typing, so their pending messages are held longer."""
+        if self.coalescer is not None:
+            self.coalescer.notify_typing(f"{channel}:{chat_id}", sender_id)
+
+    async def flush_coalesced(self) -> int:
+        """Release every burst the coalescer is holding into the inbound queue; returns how many messages."""
+        if self.coalescer is None:
+            return 0
+        held = self.coalescer.pending
+        await self.coalescer.flush_all()
+        if held:
+            logger.info(f"Flushed {held} held inbound message(s)")
+        return held
+
+    def try_publish_inbound(self, msg: InboundMessage) -> bool:
+        """Publish without waiting; drops (and counts) the message if the queue is full."""
+        return self.inbound.put_nowait(msg)
+
     async def consume_inbound(self) -> InboundMessage:
         """Consume the next inbound message (blocks until available)."""
         return await self.inbound.get()
-    
-    async def publish_outbound(self, msg: OutboundMessage) -> None:
-        """Publish a response from the agent to channels."""
-        await self.outbound.put(msg)
-    
+
+    async def publish_outbound(self, msg: OutboundMessage) -> bool:
+        """Publish a response from the agent to channels; False if it was dropped."""
+        return await self.outbound.put(msg, timeout=self.publish_timeout)
+
     async def consume_outbound(self) -> OutboundMessage:
         """Consume the next outbound message (blocks until available)."""
         return await self.outbound.get()
-    
+
+    @property
+    def inbound_congested(self) -> bool:
+        """True while inbound depth is above the high watermark (until it drains)."""
+        return self.inbound.congested
+
+    async def wait_for_inbound_capacity(self) -> None:
+        """Wait until the inbound queue is below its low watermark again."""
+        await self.inbound.wait_for_capacity()
+
     def subscribe_outbound(
-        self, 
-        channel: str, 
+        self,
+        channel: str,
         callback: Callable[[OutboundMessage], Awaitable[None]]
     ) -> None:
         """Subscribe to outbound messages for a specific channel."""
         if channel not in self._outbound_subscribers:
             self._outbound_subscribers[channel] = []
         self._outbound_subscribers[channel].append(callback)
-    
+
     async def dispatch_outbound(self) -> None:
         """
         Dispatch outbound messages to subscribed channels.
@@ -65,16 +375,20 @@ class MessageBus:
                         logger.error(f"Error dispatching to {msg.channel}: {e}")
             except asyncio.TimeoutError:
                 continue
-    
+
     def stop(self) -> None:
         """Stop the dispatcher loop."""
         self._running = False
-    
+
+    def metrics(self) -> dict[str, Any]:
+        """Queue depth, wait time and drop counts for both directions."""
+        return {"inbound": self.inbound.metrics(), "outbound": self.outbound.metrics()}
+
     @property
     def inbound_size(self) -> int:
         """Number of pending inbound messages."""
         return self.inbound.qsize()
-    
+
     @property
     def outbound_size(self) -> int:
         """Number of pending outbound messages."""
@@ -1,13 +1,17 @@
 """Base channel interface for chat platforms."""
 
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import TYPE_CHECKING, Any, Awaitable
 
 from loguru import logger
 
 from nanobot.bus.events import InboundMessage, OutboundMessage
 from nanobot.bus.queue import MessageBus
 
+if TYPE_CHECKING:
+    from nanobot.channels.media import MediaPipeline
+
 
 class BaseChannel(ABC):
     """
@@ -18,6 +22,7 @@ class BaseChannel(ABC):
     """
     
     name: str = "base"
+    groq_api_key: str = ""  # Voice transcription key for a standalone media pipeline
     
     def __init__(self, config: Any, bus: MessageBus):
         """
@@ -30,6 +35,8 @@ class BaseChannel(ABC):
         self.config = config
         self.bus = bus
         self._running = False
+        self.media: "MediaPipeline | None" = None  # Shared pipeline, set by ChannelManager
+        self._inbound_tails: dict[str, asyncio.Task] = {}  # chat_id -> last message still being prepared
     
     @abstractmethod
     async def start(self) -> None:
@@ -121,6 +128,68 @@ class BaseChannel(ABC):
         
         await self.bus.publish_inbound(msg)
     
+    async def _forward_in_order(
+        self,
+        chat_id: str,
+        message: dict[str, Any] | Awaitable[dict[str, Any] | None],
+    ) -> None:
+        """
+        Forward a message once it is ready, keeping a chat's messages in order.
+        
+        ``message`` holds the keyword arguments for ``_handle_message``, or is
+        an awaitable resolving to them (None drops the message), e.g. a job
+        still downloading media. Awaitables are prepared in the background so
+        the platform's update handler is not blocked, and a message waits for
+        the chat's earlier messages before it is forwarded.
+        """
+        previous = self._inbound_tails.get(chat_id)
+        if previous is None and isinstance(message, dict):
+            await self._handle_message(**message)
+            return
+        task = asyncio.create_task(self._forward_after(previous, message))
+        self._inbound_tails[chat_id] = task
+        
+        def _clear(t: asyncio.Task) -> None:
+            if self._inbound_tails.get(chat_id) is t:
+                del self._inbound_tails[chat_id]
+        
+        task.add_done_callback(_clear)
+    
+    async def _forward_after(
+        self,
+        previous: asyncio.Task | None,
+        message: dict[str, Any] | Awaitable[dict[str, Any] | None],
+    ) -> None:
+        try:
+            kwargs = message if isinstance(message, dict) else await message
+        except Exception as e:
+            logger.error(f"Failed to prepare inbound message on {self.name}: {e}")
+            kwargs = None
+        if previous is not None:
+            await asyncio.gather(previous, return_exceptions=True)
+        if kwargs:
+            await self._handle_message(**kwargs)
+    
+    def _media_pipeline(self) -> "MediaPipeline":
+        """The shared media pipeline, or a private default one when the channel runs standalone."""
+        if self.media is None:
+            from nanobot.channels.media import MediaPipeline
+            from nanobot.providers.transcription import GroqTranscriptionProvider
+            self.media = MediaPipeline(
+                transcriber=GroqTranscriptionProvider(api_key=self.groq_api_key or None),
+            )
+        return self.media
+    
+    def _handle_typing(self, sender_id: str, chat_id: str) -> None:
+        """
+        Forward a user's typing indicator from the chat platform to the bus.
+        
+        Lets the bus hold that user's pending messages a little longer, so
+        a follow-up is merged into the same turn.
+        """
+        if self.is_allowed(sender_id):
+            self.bus.notify_typing(self.name, str(chat_id), str(sender_id))
+    
     @property
     def is_running(self) -> bool:
         """Check if the channel is running."""
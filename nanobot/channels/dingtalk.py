@@ -12,6 +12,7 @@ from nanobot.bus.events import OutboundMessage
 from nanobot.bus.queue import MessageBus
 from nanobot.channels.base import BaseChannel
 from nanobot.config.schema import DingTalkConfig
+from nanobot.utils.http import get_http_client
 
 try:
     from dingtalk_stream import (
@@ -123,7 +124,7 @@ class DingTalkChannel(BaseChannel):
                 return
 
             self._running = True
-            self._http = httpx.AsyncClient()
+            self._http = get_http_client()
 
             logger.info(
                 f"Initializing DingTalk Stream Client with Client ID: {self.config.client_id}..."
@@ -147,9 +148,8 @@ class DingTalkChannel(BaseChannel):
         """Stop the DingTalk bot."""
         self._running = False
         # Close the shared HTTP client
-        if self._http:
-            await self._http.aclose()
-            self._http = None
+        # The pooled client is shared; it is closed by the gateway on shutdown
+        self._http = None
         # Cancel outstanding background tasks
         for task in self._background_tasks:
             task.cancel()
@@ -182,11 +182,11 @@ class DingTalkChannel(BaseChannel):
             logger.error(f"Failed to get DingTalk access token: {e}")
             return None
 
-    async def send(self, msg: OutboundMessage) -> None:
+    async def send(self, msg: OutboundMessage) -> bool | None:
         """Send a message through DingTalk."""
         token = await self._get_access_token()
         if not token:
-            return
+            return False
 
         # oToMessages/batchSend: sends to individual users (private chat)
         # https://open.dingtalk.com/document/orgapp/robot-batch-send-messages
@@ -212,10 +212,12 @@ class DingTalkChannel(BaseChannel):
             resp = await self._http.post(url, json=data, headers=headers)
             if resp.status_code != 200:
                 logger.error(f"DingTalk send failed: {resp.text}")
-            else:
-                logger.debug(f"DingTalk message sent to {msg.chat_id}")
+                resp.raise_for_status()  # 429/5xx are retried by the outbound worker
+                return False
+            logger.debug(f"DingTalk message sent to {msg.chat_id}")
         except Exception as e:
             logger.error(f"Error sending DingTalk message: {e}")
+            raise
 
     async def _on_message(self, content: str, sender_id: str, sender_name: str) -> None:
         """Handle incoming message (called by NanobotDingTalkHandler).
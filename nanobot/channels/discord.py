@@ -143,6 +143,15 @@ class DiscordChannel(BaseChannel):
                 return
             await self._handle_discord_message(message)
 
+        @self._bot.event
+        async def on_typing(channel: Any, user: Any, when: Any) -> None:
+            if getattr(user, "bot", False):
+                return
+            sender_id = str(user.id)
+            if getattr(user, "username", None):
+                sender_id = f"{sender_id}|{user.username}"
+            self._handle_typing(sender_id, str(channel.id))
+
         @self._bot.event
         async def on_interaction(interaction: discord.Interaction) -> None:
             if interaction.type != discord.InteractionType.component:
@@ -371,21 +380,26 @@ class DiscordChannel(BaseChannel):
 
         content_parts = [content] if content else []
         media_paths: list[str] = []
-        media_dir = Path.home() / ".nanobot" / "media"
-
+        fetches = []
         for attachment in message.attachments:
             if attachment.size and attachment.size > MAX_ATTACHMENT_BYTES:
                 content_parts.append(f"[attachment: {attachment.filename} - too large]")
                 continue
-            try:
-                media_dir.mkdir(parents=True, exist_ok=True)
-                file_path = media_dir / f"{attachment.id}_{attachment.filename.replace('/', '_')}"
-                await attachment.save(file_path)
-                media_paths.append(str(file_path))
-                content_parts.append(f"[attachment: {file_path}]")
-            except Exception as e:
-                logger.warning(f"Failed to download Discord attachment: {e}")
+            fetches.append((attachment, self._media_pipeline().fetch_url(
+                attachment.url,
+                Path(attachment.filename).suffix,
+                source_key=f"discord:{attachment.id}",
+            )))
+
+        # Attachments of one message download concurrently through the shared pipeline
+        results = await asyncio.gather(*(f for _, f in fetches), return_exceptions=True)
+        for (attachment, _), result in zip(fetches, results):
+            if isinstance(result, BaseException):
+                logger.warning(f"Failed to download Discord attachment: {result}")
                 content_parts.append(f"[attachment: {attachment.filename} - download failed]")
+            else:
+                media_paths.append(str(result))
+                content_parts.append(f"[attachment: {result}]")
 
         reply_to = None
         if message.reference and message.reference.message_id:
@@ -484,17 +498,11 @@ class DiscordChannel(BaseChannel):
                     sent = await channel.send(**kwargs)
                     self._last_message_id[msg.chat_id] = sent.id
                 else:
-                    logger.warning(f"Could not find Discord channel {msg.chat_id}")
-        except discord.HTTPException as e:
-            if e.status == 429:
-                retry_after = getattr(e, "retry_after", 1.0)
-                logger.warning(f"Discord rate limited, retrying in {retry_after}s")
-                await asyncio.sleep(retry_after)
-                await self.send(msg)
-            else:
-                logger.error(f"Discord send error: {e}")
+                    raise ValueError(f"Could not find Discord channel {msg.chat_id}")
         except Exception as e:
+            # Re-raised so the outbound worker retries 429/5xx and network errors
             logger.error(f"Error sending Discord message: {e}")
+            raise
 
     def _build_embed(self, msg: OutboundMessage) -> discord.Embed:
         """Build a Discord embed from OutboundMessage."""
@@ -195,7 +195,7 @@ class FeishuChannel(BaseChannel):
             elements.append({"tag": "markdown", "content": remaining})
         return elements or [{"tag": "markdown", "content": content}]
 
-    async def send(self, msg: OutboundMessage) -> None:
+    async def send(self, msg: OutboundMessage) -> bool | None:
         """Send a message through Feishu."""
         if not self._client:
             logger.warning("Feishu client not initialized")
@@ -234,11 +234,12 @@ class FeishuChannel(BaseChannel):
                     f"Failed to send Feishu message: code={response.code}, "
                     f"msg={response.msg}, log_id={response.get_log_id()}"
                 )
-            else:
-                logger.debug(f"Feishu message sent to {msg.chat_id}")
+                return False  # Rejected by the API; resending the same request won't help
+            logger.debug(f"Feishu message sent to {msg.chat_id}")
                 
         except Exception as e:
             logger.error(f"Error sending Feishu message: {e}")
+            raise
     
     def _on_message_sync(self, data: "P2ImMessageReceiveV1") -> None:
         """
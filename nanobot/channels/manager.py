@@ -10,7 +10,10 @@ from loguru import logger
 from nanobot.bus.events import OutboundMessage
 from nanobot.bus.queue import MessageBus
 from nanobot.channels.base import BaseChannel
+from nanobot.channels.media import MediaPipeline
+from nanobot.channels.outbound import ChannelOutboundWorker
 from nanobot.config.schema import Config
+from nanobot.providers.transcription import GroqTranscriptionProvider, TranscriptionCache
 
 if TYPE_CHECKING:
     from nanobot.session.manager import SessionManager
@@ -32,8 +35,12 @@ class ChannelManager:
         self.session_manager = session_manager
         self.channels: dict[str, BaseChannel] = {}
         self._dispatch_task: asyncio.Task | None = None
+        self.workers: dict[str, ChannelOutboundWorker] = {}
+        self.media: MediaPipeline | None = None
         
         self._init_channels()
+        self._init_workers()
+        self._init_media()
     
     def _init_channels(self) -> None:
         """Initialize channels based on config."""
@@ -141,6 +148,43 @@ class ChannelManager:
             except ImportError as e:
                 logger.warning(f"QQ channel not available: {e}")
     
+    def _init_workers(self) -> None:
+        """Create one outbound worker per enabled channel."""
+        cfg = self.config.channels.outbound
+        for name, channel in self.channels.items():
+            self.workers[name] = ChannelOutboundWorker(
+                name,
+                channel,
+                concurrency=cfg.channel_concurrency.get(name, cfg.concurrency),
+                queue_size=cfg.queue_size,
+                max_retries=cfg.max_retries,
+                base_delay=cfg.base_delay,
+                max_delay=cfg.max_delay,
+                send_timeout=cfg.send_timeout,
+            )
+    
+    def _init_media(self) -> None:
+        """Give every channel the same media pipeline, so downloads share one pool, cache and quota."""
+        cfg = self.config.channels.media
+        self.media = MediaPipeline(
+            media_dir=cfg.dir or None,
+            max_concurrent=cfg.max_concurrent_downloads,
+            quota_bytes=cfg.quota_mb * 1024 * 1024,
+            max_file_bytes=cfg.max_file_mb * 1024 * 1024,
+            protect_seconds=cfg.protect_seconds,
+        )
+        # One transcriber for all channels, so a transcript is reused wherever the audio shows up
+        self.media.transcriber = GroqTranscriptionProvider(
+            api_key=self.config.providers.groq.api_key or None,
+            max_concurrency=cfg.max_concurrent_transcriptions,
+            cache=TranscriptionCache(
+                max_entries=cfg.transcript_cache_entries,
+                cache_dir=self.media.media_dir / ".transcripts" if cfg.persist_transcripts else None,
+            ),
+        )
+        for channel in self.channels.values():
+            channel.media = self.media
+    
     async def _start_channel(self, name: str, channel: BaseChannel) -> None:
         """Start a channel and log any exceptions."""
         try:
@@ -178,6 +222,10 @@ class ChannelManager:
             except asyncio.CancelledError:
                 pass
         
+        # Let in-flight sends finish before the channels go away
+        for worker in self.workers.values():
+            await worker.stop()
+        
         # Stop all channels
         for name, channel in self.channels.items():
             try:
@@ -187,7 +235,7 @@ class ChannelManager:
                 logger.error(f"Error stopping {name}: {e}")
     
     async def _dispatch_outbound(self) -> None:
-        """Dispatch outbound messages to the appropriate channel."""
+        """Hand outbound messages to their channel's worker without waiting on the send."""
         logger.info("Outbound dispatcher started")
         
         while True:
@@ -197,12 +245,9 @@ class ChannelManager:
                     timeout=1.0
                 )
                 
-                channel = self.channels.get(msg.channel)
-                if channel:
-                    try:
-                        await channel.send(msg)
-                    except Exception as e:
-                        logger.error(f"Error sending to {msg.channel}: {e}")
+                worker = self.workers.get(msg.channel)
+                if worker:
+                    worker.submit(msg)
                 else:
                     logger.warning(f"Unknown channel: {msg.channel}")
                     
@@ -211,6 +256,10 @@ class ChannelManager:
             except asyncio.CancelledError:
                 break
     
+    def get_outbound_metrics(self) -> dict[str, dict[str, Any]]:
+        """Backlog, retries and send latency per channel."""
+        return {name: worker.metrics() for name, worker in self.workers.items()}
+    
     def get_channel(self, name: str) -> BaseChannel | None:
         """Get a channel by name."""
         return self.channels.get(name)
@@ -0,0 +1,260 @@
+"""Shared download pipeline for inbound media (photos, voice notes, files)."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+import re
+import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+from loguru import logger
+
+from nanobot.utils.http import get_http_client
+
+# Writes one download to the given path; may return the sha256 hex digest it computed while writing.
+MediaWriter = Callable[[Path], Awaitable[str | None]]
+
+_SUFFIX_RE = re.compile(r"^\.[A-Za-z0-9]{1,10}$")
+_HASH_CHUNK = 1 << 20
+
+
+class MediaTooLargeError(Exception):
+    """A download exceeded the pipeline's per-file size limit."""
+
+
+def _hash_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(_HASH_CHUNK):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _clean_suffix(suffix: str) -> str:
+    return suffix.lower() if _SUFFIX_RE.match(suffix or "") else ""
+
+
+class MediaPipeline:
+    """
+    Downloads channel media into one content-addressed directory.
+
+    Files are stored as ``<sha256 prefix><suffix>``, so the same photo sent
+    twice (or forwarded between chats) is kept once. A ``source_key`` (e.g.
+    Telegram's ``file_unique_id``) lets repeated and concurrent requests for
+    the same remote file share one download. At most ``max_concurrent``
+    downloads run at a time; URLs are streamed to disk in chunks, never held
+    in memory. The directory is kept under ``quota_bytes`` by evicting the
+    least recently used files, sparing anything used in the last
+    ``protect_seconds`` (it may still be attached to a message in flight).
+    Voice transcription runs as a background job per file, so channels can
+    start it right after the download and await the text just before
+    forwarding the message; the transcriber caps how many run at once.
+    """
+
+    def __init__(
+        self,
+        media_dir: str | Path | None = None,
+        max_concurrent: int = 4,
+        quota_bytes: int = 1024 * 1024 * 1024,
+        max_file_bytes: int = 50 * 1024 * 1024,
+        chunk_size: int = 64 * 1024,
+        protect_seconds: float = 300.0,
+        transcriber: Any = None,
+    ):
+        """
+        Args:
+            media_dir: Where files are kept (default ``~/.nanobot/media``)
+            max_concurrent: Downloads running at once across all channels
+            quota_bytes: Disk budget for the directory (0 = unlimited)
+            max_file_bytes: Streamed downloads larger than this are aborted (0 = unlimited)
+            chunk_size: Read size when streaming a download to disk
+            protect_seconds: Files used this recently are never evicted
+            transcriber: Object with ``async transcribe(path) -> str``; defaults
+                to Groq with the ``GROQ_API_KEY`` environment variable
+        """
+        self.media_dir = Path(media_dir).expanduser() if media_dir else Path.home() / ".nanobot" / "media"
+        self.quota_bytes = quota_bytes
+        self.max_file_bytes = max_file_bytes
+        self.chunk_size = chunk_size
+        self.protect_seconds = protect_seconds
+        self._transcriber = transcriber
+        self._downloads = asyncio.Semaphore(max_concurrent)
+        self._inflight: dict[str, asyncio.Task] = {}
+        self._by_source: OrderedDict[str, Path] = OrderedDict()
+        self._jobs: dict[Path, asyncio.Task] = {}
+        self._index: OrderedDict[Path, tuple[int, float]] | None = None  # path -> (size, last used), LRU first
+        self._total = 0
+        self.stats = {
+            "downloads": 0, "source_hits": 0, "dedup_hits": 0, "failed": 0,
+            "evicted": 0, "evicted_bytes": 0, "transcriptions": 0,
+        }
+
+    @property
+    def partial_dir(self) -> Path:
+        return self.media_dir / ".partial"
+
+    @property
+    def transcriber(self) -> Any:
+        if self._transcriber is None:
+            from nanobot.providers.transcription import GroqTranscriptionProvider
+            self._transcriber = GroqTranscriptionProvider()
+        return self._transcriber
+
+    @transcriber.setter
+    def transcriber(self, value: Any) -> None:
+        self._transcriber = value
+
+    async def fetch(self, writer: MediaWriter, suffix: str = "", source_key: str | None = None) -> Path:
+        """
+        Store one file and return its path in the media directory.
+
+        Args:
+            writer: Writes the file to a temporary path it is given
+            suffix: File extension to keep, e.g. ".jpg"
+            source_key: Stable id of the remote file, for download dedup
+        """
+        if source_key is not None:
+            known = self._by_source.get(source_key)
+            if known is not None and known.exists():
+                self.stats["source_hits"] += 1
+                self._by_source.move_to_end(source_key)
+                self._touch(known)
+                return known
+            task = self._inflight.get(source_key)
+            if task is None:
+                task = asyncio.create_task(self._download(writer, suffix))
+                self._inflight[source_key] = task
+                task.add_done_callback(lambda _t, key=source_key: self._inflight.pop(key, None))
+            else:
+                self.stats["source_hits"] += 1
+            path = await asyncio.shield(task)
+            self._by_source[source_key] = path
+            self._by_source.move_to_end(source_key)
+            while len(self._by_source) > 10_000:
+                self._by_source.popitem(last=False)
+            return path
+        return await self._download(writer, suffix)
+
+    async def fetch_url(
+        self,
+        url: str,
+        suffix: str = "",
+        source_key: str | None = None,
+        headers: dict[str, str] | None = None,
+    ) -> Path:
+        """Stream ``url`` to disk through the pipeline (see ``fetch``)."""
+        return await self.fetch(lambda path: self.stream(url, path, headers), suffix, source_key)
+
+    async def stream(self, url: str, path: Path, headers: dict[str, str] | None = None) -> str:
+        """Write ``url`` to ``path`` chunk by chunk; returns the content's sha256 hex digest."""
+        digest = hashlib.sha256()
+        size = 0
+        async with get_http_client().stream("GET", url, headers=headers, timeout=120.0) as response:
+            response.raise_for_status()
+            with open(path, "wb") as f:
+                async for chunk in response.aiter_bytes(self.chunk_size):
+                    size += len(chunk)
+                    if self.max_file_bytes and size > self.max_file_bytes:
+                        raise MediaTooLargeError(f"download exceeds {self.max_file_bytes} bytes")
+                    f.write(chunk)
+                    digest.update(chunk)
+        return digest.hexdigest()
+
+    async def _download(self, writer: MediaWriter, suffix: str) -> Path:
+        suffix = _clean_suffix(suffix)
+        async with self._downloads:
+            self.partial_dir.mkdir(parents=True, exist_ok=True)
+            tmp = self.partial_dir / f"{uuid.uuid4().hex}{suffix}"
+            try:
+                digest = await writer(tmp)
+                if not digest:
+                    digest = await asyncio.to_thread(_hash_file, tmp)
+            except BaseException:
+                self.stats["failed"] += 1
+                tmp.unlink(missing_ok=True)
+                raise
+        self.stats["downloads"] += 1
+        final = self.media_dir / f"{digest[:32]}{suffix}"
+        if final.exists():
+            self.stats["dedup_hits"] += 1
+            tmp.unlink(missing_ok=True)
+            self._touch(final)
+        else:
+            os.replace(tmp, final)
+            self._remember(final, final.stat().st_size)
+            self._enforce_quota(keep=final)
+        return final
+
+    def transcribe(self, path: str | Path) -> asyncio.Task:
+        """Start (or join) the transcription job for ``path``; the task resolves to the text."""
+        path = Path(path)
+        task = self._jobs.get(path)
+        if task is None:
+            self.stats["transcriptions"] += 1
+            task = asyncio.create_task(self.transcriber.transcribe(path))
+            self._jobs[path] = task
+            task.add_done_callback(lambda _t: self._jobs.pop(path, None))
+        return task
+
+    def _load_index(self) -> OrderedDict[Path, tuple[int, float]]:
+        if self._index is None:
+            entries: list[tuple[float, Path, int]] = []
+            if self.media_dir.is_dir():
+                with os.scandir(self.media_dir) as it:
+                    for entry in it:
+                        if entry.is_file() and not entry.name.startswith("."):
+                            st = entry.stat()
+                            entries.append((st.st_mtime, Path(entry.path), st.st_size))
+            entries.sort()
+            self._index = OrderedDict((path, (size, used)) for used, path, size in entries)
+            self._total = sum(size for _, _, size in entries)
+        return self._index
+
+    def _remember(self, path: Path, size: int) -> None:
+        index = self._load_index()
+        if path in index:
+            self._total -= index[path][0]
+        index[path] = (size, time.time())
+        index.move_to_end(path)
+        self._total += size
+
+    def _touch(self, path: Path) -> None:
+        # mtime doubles as "last used", so the LRU order survives restarts
+        try:
+            os.utime(path)
+            self._remember(path, path.stat().st_size)
+        except OSError:
+            pass
+
+    def _enforce_quota(self, keep: Path | None = None) -> None:
+        if not self.quota_bytes:
+            return
+        index = self._load_index()
+        cutoff = time.time() - self.protect_seconds
+        for path, (size, used) in list(index.items()):
+            if self._total <= self.quota_bytes:
+                break
+            if path == keep or used > cutoff:
+                continue
+            try:
+                path.unlink(missing_ok=True)
+            except OSError as e:
+                logger.warning(f"Could not evict media file {path}: {e}")
+                continue
+            del index[path]
+            self._total -= size
+            self.stats["evicted"] += 1
+            self.stats["evicted_bytes"] += size
+        if self._total > self.quota_bytes:
+            logger.warning(f"Media directory over quota ({self._total} bytes): remaining files are in use")
+
+    @property
+    def disk_usage(self) -> int:
+        """Bytes currently stored in the media directory."""
+        self._load_index()
+        return self._total
@@ -0,0 +1,179 @@
+"""Per-channel outbound delivery workers."""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from collections import deque
+from datetime import timedelta
+from typing import Any
+
+from loguru import logger
+
+from nanobot.bus.events import OutboundMessage
+from nanobot.channels.base import BaseChannel
+
+# Exception class names (from optional SDKs) that signal a transient failure.
+_TRANSIENT_NAMES = {"RetryAfter", "TimedOut", "NetworkError", "RateLimited", "ServiceUnavailable"}
+# ...and ones that never succeed on retry. python-telegram-bot's BadRequest
+# subclasses NetworkError, so these are checked first.
+_PERMANENT_NAMES = {"BadRequest", "Forbidden", "ChatMigrated", "InvalidToken"}
+
+
+def is_transient_send_error(e: BaseException) -> bool:
+    """True if another send attempt may succeed (network, timeout, 429/5xx, flood-wait)."""
+    if isinstance(e, (FileNotFoundError, PermissionError, IsADirectoryError)):
+        return False  # Missing media and the like; retrying will not help
+    if any(cls.__name__ in _PERMANENT_NAMES for cls in type(e).__mro__):
+        return False  # Bad request, blocked by the user, chat moved
+    smtp_code = getattr(e, "smtp_code", None)
+    if isinstance(smtp_code, int):
+        return 400 <= smtp_code < 500  # SMTP 4xx are temporary, 5xx permanent
+    if isinstance(e, (asyncio.TimeoutError, ConnectionError, OSError)):
+        return True
+    if any(cls.__name__ in _TRANSIENT_NAMES for cls in type(e).__mro__):
+        return True
+    try:
+        import httpx
+        if isinstance(e, httpx.TransportError):
+            return True
+    except ImportError:
+        pass
+    status = getattr(e, "status_code", None) or getattr(e, "status", None)
+    if status is None:
+        status = getattr(getattr(e, "response", None), "status_code", None)  # httpx.HTTPStatusError
+    return isinstance(status, int) and (status == 429 or status >= 500)
+
+
+def retry_after_seconds(e: BaseException) -> float | None:
+    """Server-requested delay (e.g. Telegram flood-wait), if the error carries one."""
+    value = getattr(e, "retry_after", None)
+    if isinstance(value, timedelta):
+        return value.total_seconds()
+    if isinstance(value, (int, float)):
+        return float(value)
+    return None
+
+
+class ChannelOutboundWorker:
+    """
+    Delivers outbound messages for one channel.
+
+    Messages for the same chat are sent strictly in order, one at a time;
+    different chats are sent concurrently up to ``concurrency``. Transient
+    failures are retried with exponential backoff and full jitter (or the
+    server's retry-after). A slow channel therefore only delays itself.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        channel: BaseChannel,
+        concurrency: int = 4,
+        queue_size: int = 1000,
+        max_retries: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 10.0,
+        send_timeout: float = 60.0,
+    ):
+        self.name = name
+        self.channel = channel
+        self.queue_size = queue_size
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.send_timeout = send_timeout
+        self._semaphore = asyncio.Semaphore(max(1, concurrency))
+        self._chats: dict[str, deque[OutboundMessage]] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self._pending = 0
+        self._latencies: deque[float] = deque(maxlen=200)
+        self.stats = {"sent": 0, "failed": 0, "retries": 0, "dropped": 0}
+
+    def submit(self, msg: OutboundMessage) -> bool:
+        """Queue a message without blocking; False if the channel backlog is full."""
+        if self.queue_size > 0 and self._pending >= self.queue_size:
+            self.stats["dropped"] += 1
+            logger.error(f"Outbound backlog for {self.name} is full ({self.queue_size}); dropped message")
+            return False
+        self._pending += 1
+        queue = self._chats.get(msg.chat_id)
+        if queue is not None:
+            queue.append(msg)  # A drain task for this chat is already running
+            return True
+        self._chats[msg.chat_id] = deque([msg])
+        task = asyncio.create_task(self._drain_chat(msg.chat_id))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return True
+
+    async def _drain_chat(self, chat_id: str) -> None:
+        queue = self._chats[chat_id]
+        try:
+            async with self._semaphore:
+                while queue:
+                    msg = queue.popleft()
+                    try:
+                        await self._deliver(msg)
+                    finally:
+                        self._pending -= 1
+        finally:
+            self._chats.pop(chat_id, None)
+            self._pending -= len(queue)
+
+    async def _deliver(self, msg: OutboundMessage) -> None:
+        for attempt in range(self.max_retries + 1):
+            started = time.monotonic()
+            try:
+                result = await asyncio.wait_for(self.channel.send(msg), timeout=self.send_timeout)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if attempt >= self.max_retries or not is_transient_send_error(e):
+                    self.stats["failed"] += 1
+                    logger.error(f"Error sending to {self.name}: {e}")
+                    return
+                delay = retry_after_seconds(e)
+                if delay is None:
+                    delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+                self.stats["retries"] += 1
+                logger.warning(
+                    f"Transient error sending to {self.name} ({type(e).__name__}: {e}); "
+                    f"retry {attempt + 1}/{self.max_retries} in {delay:.1f}s"
+                )
+                await asyncio.sleep(delay)
+                continue
+            if result is False:
+                # Channels that report failure by return value (already logged there)
+                self.stats["failed"] += 1
+                return
+            self._latencies.append(time.monotonic() - started)
+            self.stats["sent"] += 1
+            return
+
+    async def stop(self, timeout: float = 5.0) -> None:
+        """Give in-flight sends ``timeout`` seconds to finish, then cancel the rest."""
+        if not self._tasks:
+            return
+        _, pending = await asyncio.wait(set(self._tasks), timeout=timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    def metrics(self) -> dict[str, Any]:
+        """Backlog, outcome counts and send latency percentiles (ms)."""
+        ordered = sorted(self._latencies)
+
+        def pct(q: float) -> float:
+            if not ordered:
+                return 0.0
+            return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 1)
+
+        return {
+            "pending": self._pending,
+            "active_chats": len(self._chats),
+            **self.stats,
+            "latency_ms_p50": pct(0.5),
+            "latency_ms_p95": pct(0.95),
+        }
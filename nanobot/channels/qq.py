@@ -106,6 +106,7 @@ class QQChannel(BaseChannel):
             )
         except Exception as e:
             logger.error(f"Error sending QQ message: {e}")
+            raise
 
     async def _on_message(self, data: "C2CMessage") -> None:
         """Handle incoming message from QQ."""
@@ -89,6 +89,7 @@ class SlackChannel(BaseChannel):
             )
         except Exception as e:
             logger.error(f"Error sending Slack message: {e}")
+            raise
 
     async def _on_socket_request(
         self,
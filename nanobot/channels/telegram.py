@@ -6,15 +6,19 @@ import asyncio
 import json
 import re
 from datetime import datetime
-from typing import TYPE_CHECKING
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
 
 from loguru import logger
 from telegram import BotCommand, InlineKeyboardButton, InlineKeyboardMarkup, KeyboardButton, ReplyKeyboardMarkup, ReplyKeyboardRemove, Update
+from telegram.error import BadRequest
 from telegram.ext import Application, CallbackQueryHandler, CommandHandler, ContextTypes, MessageHandler, filters
 
 from nanobot.bus.events import OutboundMessage
 from nanobot.bus.queue import MessageBus
 from nanobot.channels.base import BaseChannel
+from nanobot.channels.media import MediaTooLargeError
+from nanobot.channels.telegram_sender import PendingSend, TelegramSender
 from nanobot.config.schema import TelegramConfig
 
 if TYPE_CHECKING:
@@ -226,7 +230,15 @@ class TelegramChannel(BaseChannel):
         self._app: Application | None = None
         self._chat_ids: dict[str, int] = {}  # Map sender_id to chat_id for replies
         self._typing_tasks: dict[str, asyncio.Task] = {}  # chat_id -> typing loop task
-        self._last_message_id: dict[str, int] = {}  # chat_id -> last sent message_id (for progress edits)
+        self._sender = TelegramSender(
+            self._send_text,
+            self._edit_text,
+            split=lambda text: self._split_message(text, self.MAX_MESSAGE_LENGTH),
+            global_rate=config.global_rate_per_second,
+            private_rate=config.chat_rate_per_second,
+            group_rate=config.group_rate_per_minute / 60,
+            max_chars=self.MAX_MESSAGE_LENGTH,
+        )
         self._pending_retry: dict[str, dict] = {}  # action_id -> {retry_content, chat_id, created_at}
 
     def _split_message(self, text: str, max_length: int = 4000) -> list[str]:
@@ -326,6 +338,9 @@ class TelegramChannel(BaseChannel):
         for chat_id in list(self._typing_tasks):
             self._stop_typing(chat_id)
         
+        # Let queued replies go out while the bot can still send them
+        await self._sender.close()
+        
         if self._app:
             logger.info("Stopping Telegram bot...")
             await self._app.updater.stop()
@@ -379,55 +394,46 @@ class TelegramChannel(BaseChannel):
             bar = "█" * filled + "░" * (10 - filled)
             cleaned_text = f"{cleaned_text}\n\n{bar} {pct}%"
 
+        # Queued, not sent: the sender paces chats under Telegram's rate limits,
+        # waits out flood control and merges messages that pile up meanwhile.
         edit_msg_id = meta.get("edit_message_id")
-        if meta.get("edit_last_message") and not edit_msg_id:
-            edit_msg_id = self._last_message_id.get(str(chat_id))
-
-        if edit_msg_id:
-            try:
-                html_content = _markdown_to_telegram_html(cleaned_text)
-                await self._app.bot.edit_message_text(
-                    chat_id=chat_id,
-                    message_id=int(edit_msg_id),
-                    text=html_content,
-                    parse_mode="HTML",
-                    reply_markup=reply_markup,
-                )
-            except Exception as e:
-                logger.warning(f"Edit message failed, sending new: {e}")
-                edit_msg_id = None
-
-        if not edit_msg_id:
-            parts = self._split_message(cleaned_text, self.MAX_MESSAGE_LENGTH)
-            for i, part in enumerate(parts):
-                is_last = i == len(parts) - 1
-                kbd = reply_markup if (is_last and reply_markup) else None
-                try:
-                    html_content = _markdown_to_telegram_html(part)
-                    sent = await self._app.bot.send_message(
-                        chat_id=chat_id,
-                        text=html_content,
-                        parse_mode="HTML",
-                        reply_markup=kbd,
-                    )
-                    self._last_message_id[str(chat_id)] = sent.message_id
-                except Exception as e:
-                    logger.warning(f"HTML parse failed, falling back to plain text: {e}")
-                    try:
-                        sent = await self._app.bot.send_message(
-                            chat_id=chat_id,
-                            text=part,
-                            reply_markup=kbd,
-                        )
-                        self._last_message_id[str(chat_id)] = sent.message_id
-                    except Exception as e2:
-                        logger.error(f"Error sending Telegram message: {e2}")
-                        return False
-                if i < len(parts) - 1:
-                    await asyncio.sleep(0.5)
-
+        self._sender.submit(chat_id, PendingSend(
+            text=cleaned_text,
+            reply_markup=reply_markup,
+            edit_message_id=int(edit_msg_id) if edit_msg_id else None,
+            edit_last=bool(meta.get("edit_last_message")),
+        ))
         return True
     
+    async def _send_text(self, chat_id: int, text: str, reply_markup: Any) -> int | None:
+        """Send one chunk as HTML, falling back to plain text if the markup is rejected."""
+        try:
+            html_content = _markdown_to_telegram_html(text)
+            sent = await self._app.bot.send_message(
+                chat_id=chat_id,
+                text=html_content,
+                parse_mode="HTML",
+                reply_markup=reply_markup,
+            )
+        except (BadRequest, ValueError) as e:
+            logger.warning(f"HTML parse failed, falling back to plain text: {e}")
+            sent = await self._app.bot.send_message(
+                chat_id=chat_id,
+                text=text,
+                reply_markup=reply_markup,
+            )
+        return sent.message_id
+    
+    async def _edit_text(self, chat_id: int, message_id: int, text: str, reply_markup: Any) -> None:
+        """Replace the text of an already sent message."""
+        await self._app.bot.edit_message_text(
+            chat_id=chat_id,
+            message_id=message_id,
+            text=_markdown_to_telegram_html(text),
+            parse_mode="HTML",
+            reply_markup=reply_markup,
+        )
+    
     async def _on_start(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Handle /start command."""
         if not update.message or not update.effective_user:
@@ -1063,39 +1069,22 @@ class TelegramChannel(BaseChannel):
             media_file = message.document
             media_type = "file"
         
-        # Download media if present
+        str_chat_id = str(chat_id)
+        metadata = {
+            "message_id": message.message_id,
+            "user_id": user.id,
+            "username": user.username,
+            "first_name": user.first_name,
+            "is_group": message.chat.type != "private"
+        }
+        
+        # Media is fetched in the background; the message follows once it is ready
         if media_file and self._app:
-            try:
-                file = await self._app.bot.get_file(media_file.file_id)
-                ext = self._get_extension(media_type, getattr(media_file, 'mime_type', None))
-                
-                # Save to workspace/media/
-                from pathlib import Path
-                media_dir = Path.home() / ".nanobot" / "media"
-                media_dir.mkdir(parents=True, exist_ok=True)
-                
-                file_path = media_dir / f"{media_file.file_id[:16]}{ext}"
-                await file.download_to_drive(str(file_path))
-                
-                media_paths.append(str(file_path))
-                
-                # Handle voice transcription
-                if media_type == "voice" or media_type == "audio":
-                    from nanobot.providers.transcription import GroqTranscriptionProvider
-                    transcriber = GroqTranscriptionProvider(api_key=self.groq_api_key)
-                    transcription = await transcriber.transcribe(file_path)
-                    if transcription:
-                        logger.info(f"Transcribed {media_type}: {transcription[:50]}...")
-                        content_parts.append(f"[transcription: {transcription}]")
-                    else:
-                        content_parts.append(f"[{media_type}: {file_path}]")
-                else:
-                    content_parts.append(f"[{media_type}: {file_path}]")
-                    
-                logger.debug(f"Downloaded {media_type} to {file_path}")
-            except Exception as e:
-                logger.error(f"Failed to download media: {e}")
-                content_parts.append(f"[{media_type}: download failed]")
+            self._start_typing(str_chat_id)
+            await self._forward_in_order(str_chat_id, self._prepare_media_message(
+                sender_id, str_chat_id, content_parts, media_file, media_type, metadata,
+            ))
+            return
         
         content = "\n".join(content_parts) if content_parts else "[empty message]"
 
@@ -1105,32 +1094,88 @@ class TelegramChannel(BaseChannel):
                 "Панель скрыта. Отправьте /start чтобы вернуть.",
                 reply_markup=ReplyKeyboardRemove(selective=False),
             )
-            self._stop_typing(str(chat_id))
+            self._stop_typing(str_chat_id)
             return
 
         content = self._resolve_quick_reply(content)
 
         logger.debug(f"Telegram message from {sender_id}: {content[:50]}...")
         
-        str_chat_id = str(chat_id)
-        
         # Start typing indicator before processing
         self._start_typing(str_chat_id)
         
         # Forward to the message bus
-        await self._handle_message(
-            sender_id=sender_id,
-            chat_id=str_chat_id,
-            content=content,
-            media=media_paths,
-            metadata={
-                "message_id": message.message_id,
-                "user_id": user.id,
-                "username": user.username,
-                "first_name": user.first_name,
-                "is_group": message.chat.type != "private"
-            }
-        )
+        await self._forward_in_order(str_chat_id, {
+            "sender_id": sender_id,
+            "chat_id": str_chat_id,
+            "content": content,
+            "media": media_paths,
+            "metadata": metadata,
+        })
+    
+    async def _prepare_media_message(
+        self,
+        sender_id: str,
+        chat_id: str,
+        content_parts: list[str],
+        media_file: Any,
+        media_type: str,
+        metadata: dict[str, Any],
+    ) -> dict[str, Any]:
+        """Download a message's media (and transcribe voice) before it is forwarded."""
+        media_paths = []
+        try:
+            file_path = await self._download_media(media_file, media_type)
+            media_paths.append(str(file_path))
+            
+            # Handle voice transcription
+            if media_type == "voice" or media_type == "audio":
+                transcription = await self._media_pipeline().transcribe(file_path)
+                if transcription:
+                    logger.info(f"Transcribed {media_type}: {transcription[:50]}...")
+                    content_parts.append(f"[transcription: {transcription}]")
+                else:
+                    content_parts.append(f"[{media_type}: {file_path}]")
+            else:
+                content_parts.append(f"[{media_type}: {file_path}]")
+                
+            logger.debug(f"Downloaded {media_type} to {file_path}")
+        except Exception as e:
+            logger.error(f"Failed to download {media_type}: {self._redact(str(e))}")
+            content_parts.append(f"[{media_type}: download failed]")
+        
+        content = "\n".join(content_parts) if content_parts else "[empty message]"
+        content = self._resolve_quick_reply(content)
+        logger.debug(f"Telegram message from {sender_id}: {content[:50]}...")
+        return {
+            "sender_id": sender_id,
+            "chat_id": chat_id,
+            "content": content,
+            "media": media_paths,
+            "metadata": metadata,
+        }
+    
+    async def _download_media(self, media_file: Any, media_type: str) -> Path:
+        """Fetch one attachment through the shared media pipeline."""
+        pipeline = self._media_pipeline()
+        ext = self._get_extension(media_type, getattr(media_file, 'mime_type', None))
+        
+        async def write(path: Path) -> str | None:
+            file = await self._app.bot.get_file(media_file.file_id)
+            size = file.file_size or 0
+            if pipeline.max_file_bytes and size > pipeline.max_file_bytes:
+                raise MediaTooLargeError(f"{media_type} is {size} bytes (limit {pipeline.max_file_bytes})")
+            # The bot's own request object honours the channel proxy; the file
+            # URL embeds the bot token, so it never goes through shared clients
+            await file.download_to_drive(str(path))
+            return None
+        
+        return await pipeline.fetch(write, ext, source_key=f"telegram:{media_file.file_unique_id}")
+    
+    def _redact(self, text: str) -> str:
+        """Mask the bot token, which Telegram file URLs (and errors quoting them) contain."""
+        token = self.config.token
+        return text.replace(token, "<token>") if token else text
     
     def _start_typing(self, chat_id: str) -> None:
         """Start sending 'typing...' indicator for a chat."""
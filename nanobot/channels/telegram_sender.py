@@ -0,0 +1,227 @@
+"""Rate-limit-aware outbound queue for the Telegram Bot API."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable
+
+from loguru import logger
+
+from nanobot.channels.outbound import is_transient_send_error, retry_after_seconds
+
+
+class RateBucket:
+    """Token bucket with a per-second rate and a burst allowance."""
+
+    def __init__(self, rate: float, burst: float = 1.0):
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.tokens = self.burst
+        self._updated = time.monotonic()
+
+    def wait_time(self) -> float:
+        """Seconds until one token is available (0 if it is now)."""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self) -> None:
+        self.tokens -= 1
+
+    async def acquire(self) -> None:
+        while (delay := self.wait_time()) > 0:
+            await asyncio.sleep(delay)
+        self.take()
+
+
+@dataclass
+class PendingSend:
+    """One outbound message waiting for its chat's turn."""
+
+    text: str
+    reply_markup: Any = None
+    edit_message_id: int | None = None
+    edit_last: bool = False  # Edit whatever was sent last to this chat, resolved at delivery
+    queued_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def is_edit(self) -> bool:
+        return self.edit_message_id is not None or self.edit_last
+
+
+class TelegramSender:
+    """
+    Per-chat outbound queues drained under Telegram's rate limits.
+
+    Every API call first takes a token from the global bucket (~30 msg/s per
+    bot) and from its chat's bucket (about 1 msg/s in private chats, 20
+    msg/min in groups). A ``RetryAfter`` pauses that chat for the requested
+    time and the message is retried, not dropped; meanwhile new messages for
+    the chat keep queueing. When a chat's worker picks up its next message,
+    later plain messages already waiting are merged into it (up to
+    ``max_chars``), so a burst of deliveries goes out as fewer sends. A
+    message carrying a keyboard ends a merge, so its buttons stay attached to
+    the right text; edits are never merged.
+    """
+
+    def __init__(
+        self,
+        send_text: Callable[[int, str, Any], Awaitable[int | None]],
+        edit_text: Callable[[int, int, str, Any], Awaitable[None]],
+        split: Callable[[str], list[str]],
+        global_rate: float = 25.0,
+        private_rate: float = 1.0,
+        group_rate: float = 20 / 60,
+        burst: float = 3.0,
+        max_chars: int = 4000,
+        max_attempts: int = 6,
+        part_delay: float = 0.0,
+    ):
+        """
+        Args:
+            send_text: Sends one chunk, returns the new message id
+            edit_text: Edits a message in place
+            split: Splits text into chunks Telegram accepts
+            global_rate: Messages per second across all chats
+            private_rate: Messages per second to one private chat
+            group_rate: Messages per second to one group (negative chat id)
+            burst: Messages a chat may receive back to back before pacing
+            max_chars: Merged messages stay within this many characters
+            max_attempts: Attempts per API call on flood control / network errors
+            part_delay: Extra pause between chunks of one message
+        """
+        self._send_text = send_text
+        self._edit_text = edit_text
+        self._split = split
+        self.private_rate = private_rate
+        self.group_rate = group_rate
+        self.burst = burst
+        self.max_chars = max_chars
+        self.max_attempts = max_attempts
+        self.part_delay = part_delay
+        self._global = RateBucket(global_rate, burst=global_rate)
+        self._chat_buckets: dict[int, RateBucket] = {}
+        self._paused_until: dict[int, float] = {}
+        self._queues: dict[int, deque[PendingSend]] = {}
+        self._workers: dict[int, asyncio.Task] = {}
+        self.last_message_id: dict[int, int] = {}
+        self.stats = {"queued": 0, "api_calls": 0, "merged": 0, "flood_waits": 0, "failed": 0}
+
+    def submit(self, chat_id: int, item: PendingSend) -> None:
+        """Queue a message for ``chat_id``; never blocks and never drops."""
+        self.stats["queued"] += 1
+        self._queues.setdefault(chat_id, deque()).append(item)
+        if chat_id not in self._workers:
+            self._workers[chat_id] = asyncio.create_task(self._drain(chat_id))
+
+    @property
+    def pending(self) -> int:
+        return sum(len(q) for q in self._queues.values())
+
+    async def _drain(self, chat_id: int) -> None:
+        queue = self._queues[chat_id]
+        try:
+            while queue:
+                item = queue.popleft()
+                try:
+                    if item.is_edit:
+                        await self._deliver_edit(chat_id, item)
+                    else:
+                        await self._deliver(chat_id, self._merge(item, queue))
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    self.stats["failed"] += 1
+                    logger.error(f"Error sending Telegram message to {chat_id}: {e}")
+        finally:
+            # Synchronous with the loop exit, so a later submit() starts a new worker.
+            self._workers.pop(chat_id, None)
+            if not queue:
+                self._queues.pop(chat_id, None)
+
+    def _merge(self, item: PendingSend, queue: deque[PendingSend]) -> PendingSend:
+        texts = [item.text]
+        size = len(item.text)
+        markup = item.reply_markup
+        while markup is None and queue and not queue[0].is_edit:
+            nxt = queue[0]
+            if size + 2 + len(nxt.text) > self.max_chars:
+                break
+            queue.popleft()
+            texts.append(nxt.text)
+            size += 2 + len(nxt.text)
+            markup = nxt.reply_markup
+        if len(texts) == 1:
+            return item
+        self.stats["merged"] += len(texts) - 1
+        return PendingSend(text="\n\n".join(texts), reply_markup=markup, queued_at=item.queued_at)
+
+    async def _deliver(self, chat_id: int, item: PendingSend) -> None:
+        parts = self._split(item.text)
+        for i, part in enumerate(parts):
+            markup = item.reply_markup if i == len(parts) - 1 else None
+            message_id = await self._call(chat_id, lambda p=part, m=markup: self._send_text(chat_id, p, m))
+            if message_id is not None:
+                self.last_message_id[chat_id] = message_id
+            if self.part_delay and i < len(parts) - 1:
+                await asyncio.sleep(self.part_delay)
+
+    async def _deliver_edit(self, chat_id: int, item: PendingSend) -> None:
+        message_id = item.edit_message_id or self.last_message_id.get(chat_id)
+        if message_id is None:
+            await self._deliver(chat_id, PendingSend(text=item.text, reply_markup=item.reply_markup))
+            return
+        try:
+            await self._call(chat_id, lambda: self._edit_text(chat_id, message_id, item.text, item.reply_markup))
+        except Exception as e:
+            if "not modified" in str(e).lower():
+                return  # Same text as before: nothing to deliver
+            logger.warning(f"Edit message failed, sending new: {e}")
+            await self._deliver(chat_id, PendingSend(text=item.text, reply_markup=item.reply_markup))
+
+    def _bucket(self, chat_id: int) -> RateBucket:
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            rate = self.group_rate if chat_id < 0 else self.private_rate
+            bucket = self._chat_buckets[chat_id] = RateBucket(rate, burst=self.burst)
+        return bucket
+
+    async def _call(self, chat_id: int, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run one API call under both buckets, waiting out flood control."""
+        for attempt in range(self.max_attempts):
+            paused = self._paused_until.get(chat_id, 0.0) - time.monotonic()
+            if paused > 0:
+                await asyncio.sleep(paused)
+            await self._bucket(chat_id).acquire()
+            await self._global.acquire()
+            self.stats["api_calls"] += 1
+            try:
+                return await fn()
+            except Exception as e:
+                wait = retry_after_seconds(e)
+                if wait is not None:
+                    self.stats["flood_waits"] += 1
+                    self._paused_until[chat_id] = time.monotonic() + wait
+                    logger.warning(f"Telegram flood control for chat {chat_id}: waiting {wait:.1f}s")
+                elif attempt + 1 < self.max_attempts and is_transient_send_error(e):
+                    await asyncio.sleep(min(30.0, 0.5 * 2 ** attempt))
+                else:
+                    raise
+        raise RuntimeError(f"Gave up after {self.max_attempts} attempts (flood control)")
+
+    async def close(self, timeout: float = 5.0) -> None:
+        """Give queued messages ``timeout`` seconds to go out, then cancel the workers."""
+        workers = list(self._workers.values())
+        if not workers:
+            return
+        _, pending = await asyncio.wait(workers, timeout=timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        dropped = self.pending
+        if dropped:
+            logger.warning(f"Telegram sender stopped with {dropped} message(s) unsent")
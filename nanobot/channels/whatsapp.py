@@ -75,8 +75,7 @@ class WhatsAppChannel(BaseChannel):
     async def send(self, msg: OutboundMessage) -> None:
         """Send a message through WhatsApp."""
         if not self._ws or not self._connected:
-            logger.warning("WhatsApp bridge not connected")
-            return
+            raise ConnectionError("WhatsApp bridge not connected")  # Retried while the bridge reconnects
         
         try:
             payload = {
@@ -87,6 +86,7 @@ class WhatsAppChannel(BaseChannel):
             await self._ws.send(json.dumps(payload))
         except Exception as e:
             logger.error(f"Error sending WhatsApp message: {e}")
+            raise
     
     async def _handle_bridge_message(self, raw: str) -> None:
         """Handle a message from the bridge."""
@@ -127,6 +127,12 @@ class WhatsAppChannel(BaseChannel):
                 }
             )
         
+        elif msg_type == "typing":
+            # Presence update: the user is composing a message
+            user_id = data.get("pn") or data.get("sender", "")
+            sender_id = user_id.split("@")[0] if "@" in user_id else user_id
+            self._handle_typing(sender_id, data.get("sender", ""))
+        
         elif msg_type == "status":
             # Connection status update
             status = data.get("status")
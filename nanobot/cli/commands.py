@@ -264,9 +264,25 @@ This file stores important information that should persist across sessions.
     skills_dir.mkdir(exist_ok=True)
 
 
+def _configure_http(config):
+    """Apply config to the process-wide pooled HTTP client registry."""
+    from nanobot.utils.http import HTTPSettings, configure_http
+    http = config.http
+    configure_http(HTTPSettings(
+        proxy=http.proxy,
+        http2=http.http2,
+        max_connections=http.max_connections,
+        max_keepalive_connections=http.max_keepalive_connections,
+        keepalive_expiry=http.keepalive_expiry,
+        connect_timeout=http.connect_timeout,
+    ))
+
+
 def _make_provider(config):
     """Create LiteLLMProvider from config. Exits if no API key found."""
     from nanobot.providers.litellm_provider import LiteLLMProvider
+    from nanobot.providers.retry import HedgePolicy, RetryPolicy
+    retry, hedge = config.llm.retry, config.llm.hedge
     p = config.get_provider()
     model = config.agents.defaults.model
     if not (p and p.api_key) and not model.startswith("bedrock/"):
@@ -279,6 +295,122 @@ def _make_provider(config):
         default_model=model,
         extra_headers=p.extra_headers if p else None,
         provider_name=config.get_provider_name(),
+        response_cache=_make_response_cache(config),
+        single_flight=config.llm.single_flight,
+        rate_limiter=_make_rate_limiter(config),
+        rate_limit_retries=config.llm.rate_limit_retries,
+        retry_policy=RetryPolicy(
+            max_attempts=retry.max_attempts,
+            base_delay=retry.base_delay,
+            max_delay=retry.max_delay,
+            attempt_timeout=retry.attempt_timeout,
+            total_timeout=retry.total_timeout,
+        ),
+        hedge_policy=HedgePolicy(
+            enabled=hedge.enabled,
+            call_sites=frozenset(hedge.call_sites),
+            quantile=hedge.quantile,
+            min_delay=hedge.min_delay,
+            min_samples=hedge.min_samples,
+        ),
+        fallbacks=_make_fallback_routes(config),
+        fallback_cooldown=retry.fallback_cooldown,
+        usage_ledger=_make_usage_ledger(config),
+    )
+
+
+def _make_fallback_routes(config):
+    """Resolve agents.defaults.fallbackModels into routes with provider credentials."""
+    from nanobot.providers.registry import find_by_name
+    from nanobot.providers.retry import ModelRoute
+    routes = []
+    for fallback in config.agents.defaults.fallback_models:
+        if fallback.provider:
+            p = getattr(config.providers, fallback.provider, None)
+            spec = find_by_name(fallback.provider)
+            name = fallback.provider
+            api_base = (p.api_base if p else None) or (spec.default_api_base if spec and spec.is_gateway else None)
+        else:
+            p = config.get_provider(fallback.model)
+            name = config.get_provider_name(fallback.model)
+            api_base = config.get_api_base(fallback.model)
+        if p is None:
+            console.print(f"[yellow]Warning: no provider config for fallback model {fallback.model}, skipping[/yellow]")
+            continue
+        routes.append(ModelRoute(
+            model=fallback.model,
+            api_key=p.api_key or None,
+            api_base=api_base or None,
+            extra_headers=p.extra_headers,
+            provider_name=name,
+        ))
+    return routes
+
+
+def _make_rate_limiter(config):
+    """Create the per-provider/model rate limiter with config overrides."""
+    from nanobot.providers.ratelimit import RateLimiter, RateLimits
+    provider_limits, model_limits = {}, {}
+    for rule in config.llm.rate_limits:
+        limits = RateLimits(rule.rpm, rule.tpm, rule.max_concurrency)
+        if rule.model:
+            model_limits[rule.model] = limits
+        elif rule.provider:
+            provider_limits[rule.provider] = limits
+    return RateLimiter(provider_limits, model_limits)
+
+
+def _make_bus(config):
+    """Create the message bus with the configured queue limits."""
+    from nanobot.bus.coalesce import InboundCoalescer
+    from nanobot.bus.queue import MessageBus
+    bus_cfg = config.bus
+    coalescer = None
+    if bus_cfg.coalesce.enabled:
+        co = bus_cfg.coalesce
+        coalescer = InboundCoalescer(
+            channels=co.channels,
+            initial_window=co.initial_window,
+            min_window=co.min_window,
+            max_window=co.max_window,
+            max_hold=co.max_hold,
+            typing_grace=co.typing_grace,
+        )
+    return MessageBus(
+        inbound_maxsize=bus_cfg.inbound_max_size,
+        outbound_maxsize=bus_cfg.outbound_max_size,
+        high_watermark=bus_cfg.high_watermark,
+        low_watermark=bus_cfg.low_watermark,
+        publish_timeout=bus_cfg.publish_timeout_seconds or None,
+        coalescer=coalescer,
+    )
+
+
+def _make_usage_ledger(config):
+    """Create the usage/cost ledger if enabled in config."""
+    usage_cfg = config.llm.usage
+    if not usage_cfg.enabled:
+        return None
+    import atexit
+    from nanobot.providers.usage import UsageLedger
+    ledger = UsageLedger(batch_size=usage_cfg.batch_size, flush_interval=usage_cfg.flush_interval)
+    atexit.register(ledger.close)
+    return ledger
+
+
+def _make_response_cache(config):
+    """Create the LLM response cache if enabled in config."""
+    cache_cfg = config.llm.cache
+    if not cache_cfg.enabled:
+        return None
+    from nanobot.providers.cache import ResponseCache
+    return ResponseCache(
+        db_path=cache_cfg.db_path or None,
+        ttl_seconds=cache_cfg.ttl_seconds,
+        max_memory_entries=cache_cfg.max_memory_entries,
+        max_db_entries=cache_cfg.max_db_entries,
+        max_temperature=cache_cfg.max_temperature,
+        call_sites=cache_cfg.call_sites,
     )
 
 
@@ -294,13 +426,14 @@ def gateway(
 ):
     """Start the nanobot gateway."""
     from nanobot.config.loader import load_config, get_data_dir
-    from nanobot.bus.queue import MessageBus
     from nanobot.agent.loop import AgentLoop
     from nanobot.channels.manager import ChannelManager
     from nanobot.session.manager import SessionManager
     from nanobot.cron.service import CronService
     from nanobot.cron.types import CronJob
     from nanobot.heartbeat.service import HeartbeatService
+    from nanobot.providers.call_context import llm_call_context
+    from nanobot.utils.http import close_http_clients
     
     if verbose:
         import logging
@@ -309,7 +442,8 @@ def gateway(
     console.print(f"{__logo__} Starting nanobot gateway on port {port}...")
     
     config = load_config()
-    bus = MessageBus()
+    _configure_http(config)
+    bus = _make_bus(config)
     provider = _make_provider(config)
     session_manager = SessionManager(config.workspace_path)
     
@@ -330,17 +464,20 @@ def gateway(
         restrict_to_workspace=config.tools.restrict_to_workspace,
         session_manager=session_manager,
         navigator_config=config.navigator,
+        context_budget_tokens=config.agents.defaults.context_budget_tokens,
+        tool_results_config=config.tools.results,
     )
     
     # Set cron callback (needs agent)
     async def on_cron_job(job: CronJob) -> str | None:
         """Execute a cron job through the agent."""
-        response = await agent.process_direct(
-            job.payload.message,
-            session_key=f"cron:{job.id}",
-            channel=job.payload.channel or "cli",
-            chat_id=job.payload.to or "direct",
-        )
+        with llm_call_context(call_site="cron"):
+            response = await agent.process_direct(
+                job.payload.message,
+                session_key=f"cron:{job.id}",
+                channel=job.payload.channel or "cli",
+                chat_id=job.payload.to or "direct",
+            )
         if job.payload.deliver and job.payload.to:
             from nanobot.bus.events import OutboundMessage
             await bus.publish_outbound(OutboundMessage(
@@ -354,7 +491,8 @@ def gateway(
     # Create heartbeat service
     async def on_heartbeat(prompt: str) -> str:
         """Execute heartbeat through the agent."""
-        return await agent.process_direct(prompt, session_key="heartbeat")
+        with llm_call_context(call_site="heartbeat"):
+            return await agent.process_direct(prompt, session_key="heartbeat")
     
     heartbeat = HeartbeatService(
         workspace=config.workspace_path,
@@ -385,12 +523,18 @@ def gateway(
                 agent.run(),
                 channels.start_all(),
             )
-        except KeyboardInterrupt:
+        except (KeyboardInterrupt, asyncio.CancelledError):
+            # asyncio.run() turns Ctrl+C into a cancellation of this task
             console.print("\nShutting down...")
             heartbeat.stop()
             cron.stop()
+            # Bursts the coalescer still holds are answered before the agent stops
+            await bus.flush_coalesced()
+            await agent.drain()
             agent.stop()
             await channels.stop_all()
+        finally:
+            await close_http_clients()
     
     asyncio.run(run())
 
@@ -411,13 +555,14 @@ def agent(
 ):
     """Interact with the agent directly."""
     from nanobot.config.loader import load_config
-    from nanobot.bus.queue import MessageBus
     from nanobot.agent.loop import AgentLoop
+    from nanobot.utils.http import close_http_clients
     from loguru import logger
     
     config = load_config()
+    _configure_http(config)
     
-    bus = MessageBus()
+    bus = _make_bus(config)
     provider = _make_provider(config)
 
     if logs:
@@ -433,6 +578,8 @@ def agent(
         exec_config=config.tools.exec,
         restrict_to_workspace=config.tools.restrict_to_workspace,
         navigator_config=config.navigator,
+        context_budget_tokens=config.agents.defaults.context_budget_tokens,
+        tool_results_config=config.tools.results,
     )
     
     # Show spinner when logs are off (no output to miss); skip when logs are on
@@ -446,9 +593,12 @@ def agent(
     if message:
         # Single message mode
         async def run_once():
-            with _thinking_ctx():
-                response = await agent_loop.process_direct(message, session_id)
-            _print_agent_response(response, render_markdown=markdown)
+            try:
+                with _thinking_ctx():
+                    response = await agent_loop.process_direct(message, session_id)
+                _print_agent_response(response, render_markdown=markdown)
+            finally:
+                await close_http_clients()
         
         asyncio.run(run_once())
     else:
@@ -464,30 +614,33 @@ def agent(
         signal.signal(signal.SIGINT, _exit_on_sigint)
         
         async def run_interactive():
-            while True:
-                try:
-                    _flush_pending_tty_input()
-                    user_input = await _read_interactive_input_async()
-                    command = user_input.strip()
-                    if not command:
-                        continue
-
-                    if _is_exit_command(command):
+            try:
+                while True:
+                    try:
+                        _flush_pending_tty_input()
+                        user_input = await _read_interactive_input_async()
+                        command = user_input.strip()
+                        if not command:
+                            continue
+
+                        if _is_exit_command(command):
+                            _restore_terminal()
+                            console.print("\nGoodbye!")
+                            break
+                    
+                        with _thinking_ctx():
+                            response = await agent_loop.process_direct(user_input, session_id)
+                        _print_agent_response(response, render_markdown=markdown)
+                    except KeyboardInterrupt:
                         _restore_terminal()
                         console.print("\nGoodbye!")
                         break
-                    
-                    with _thinking_ctx():
-                        response = await agent_loop.process_direct(user_input, session_id)
-                    _print_agent_response(response, render_markdown=markdown)
-                except KeyboardInterrupt:
-                    _restore_terminal()
-                    console.print("\nGoodbye!")
-                    break
-                except EOFError:
-                    _restore_terminal()
-                    console.print("\nGoodbye!")
-                    break
+                    except EOFError:
+                        _restore_terminal()
+                        console.print("\nGoodbye!")
+                        break
+            finally:
+                await close_http_clients()
         
         asyncio.run(run_interactive())
 
@@ -800,6 +953,77 @@ def cron_run(
         console.print(f"[red]Failed to run job {job_id}[/red]")
 
 
+# ============================================================================
+# Navigator Commands
+# ============================================================================
+
+navigator_app = typer.Typer(help="Navigator tools")
+app.add_typer(navigator_app, name="navigator")
+
+
+@navigator_app.command("eval")
+def navigator_eval(
+    path: Path = typer.Argument(..., help="Eval JSON/JSONL file, session export, or a directory of them"),
+    mock_slm: bool = typer.Option(False, "--mock-slm", help="Also run SLM-routed cases through a mock SLM"),
+    slm_latency_ms: float = typer.Option(150.0, "--slm-latency-ms", help="Mock SLM latency"),
+    slm_failure_rate: float = typer.Option(0.0, "--slm-failure-rate", help="Share of malformed mock SLM replies"),
+    repeat: int = typer.Option(1, "--repeat", "-r", help="Replay the cases N times (throughput benchmark)"),
+    as_json: bool = typer.Option(False, "--json", help="Print the report as JSON"),
+):
+    """Replay navigator cases offline and report routing accuracy."""
+    import json as _json
+    from nanobot.agents.navigator_eval import MockSLMProvider, ROUTES, evaluate, load_cases, run_slm_branch
+    from nanobot.config.loader import load_config
+
+    if not path.exists():
+        console.print(f"[red]Not found: {path}[/red]")
+        raise typer.Exit(1)
+
+    cases = load_cases(path) * max(1, repeat)
+    config = load_config().navigator.model_dump()
+    scored, report = evaluate(cases, config=config)
+
+    if mock_slm:
+        provider = MockSLMProvider(latency_ms=slm_latency_ms, failure_rate=slm_failure_rate)
+        report["slm"] = asyncio.run(
+            run_slm_branch(
+                scored, provider, timeout_seconds=config.get("slm_timeout_seconds", 2.0), config=config,
+            )
+        )
+
+    if as_json:
+        console.print_json(_json.dumps(report, ensure_ascii=False))
+        return
+
+    console.print(
+        f"{__logo__} Navigator eval: {report['cases']} cases in {report['elapsed_seconds']}s "
+        f"({report['cases_per_second']} cases/s)"
+    )
+    if report["route_accuracy"] is not None:
+        console.print(f"Route accuracy: [bold]{report['route_accuracy']:.1%}[/bold] "
+                      f"({report['labelled_routes']} labelled)")
+    for name in ("tag_accuracy", "stage_accuracy"):
+        if report[name] is not None:
+            console.print(f"{name.replace('_', ' ').capitalize()}: {report[name]:.1%}")
+
+    table = Table(title="Routes (rows = expected, columns = predicted)")
+    table.add_column("expected")
+    for route in ROUTES:
+        table.add_column(route, justify="right")
+    for expected in ROUTES:
+        row = report["confusion"][expected]
+        table.add_row(expected, *(str(row[predicted]) for predicted in ROUTES))
+    table.add_row("[dim]all (predicted)[/dim]", *(str(report["route_distribution"][r]) for r in ROUTES))
+    console.print(table)
+
+    if "slm" in report:
+        slm = report["slm"]
+        console.print(
+            f"Mock SLM: {slm['calls']} calls, {slm['hints']} hints, {slm['fallbacks']} fallbacks, "
+            f"p50 {slm['p50_ms']}ms, p95 {slm['p95_ms']}ms"
+        )
+
+
 # ============================================================================
 # Status Commands
 # ============================================================================
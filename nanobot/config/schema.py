@@ -21,6 +21,10 @@ class TelegramConfig(BaseModel):
     allow_from: list[str] = Field(default_factory=list)  # Allowed user IDs or usernames
     proxy: str | None = None  # HTTP/SOCKS5 proxy URL, e.g. "http://127.0.0.1:7890" or "socks5://127.0.0.1:1080"
     ux_level: str = "advanced"  # "minimal" | "standard" | "advanced"
+    # Outbound pacing, kept under the Bot API limits (~30 msg/s per bot, ~1/s per chat, 20/min per group)
+    global_rate_per_second: float = Field(default=25.0, gt=0.0)
+    chat_rate_per_second: float = Field(default=1.0, gt=0.0)
+    group_rate_per_minute: float = Field(default=20.0, gt=0.0)
 
 
 class FeishuConfig(BaseModel):
@@ -146,6 +150,29 @@ class QQConfig(BaseModel):
     allow_from: list[str] = Field(default_factory=list)  # Allowed user openids (empty = public access)
 
 
+class OutboundDispatchConfig(BaseModel):
+    """Per-channel outbound delivery workers."""
+    concurrency: int = Field(default=4, ge=1)  # Chats sent to concurrently per channel
+    channel_concurrency: dict[str, int] = Field(default_factory=dict)  # Per-channel override, e.g. {"email": 1}
+    queue_size: int = Field(default=1000, ge=0)  # Pending messages per channel (0 = unbounded)
+    max_retries: int = Field(default=3, ge=0)  # Retries on transient send failures
+    base_delay: float = Field(default=0.5, ge=0.0)
+    max_delay: float = Field(default=10.0, ge=0.0)
+    send_timeout: float = Field(default=60.0, gt=0.0)
+
+
+class MediaConfig(BaseModel):
+    """Shared download pipeline for inbound media."""
+    dir: str = ""  # Empty = ~/.nanobot/media
+    max_concurrent_downloads: int = Field(default=4, ge=1)
+    quota_mb: int = Field(default=1024, ge=0)  # Disk budget; least recently used files are evicted (0 = unlimited)
+    max_file_mb: int = Field(default=50, ge=0)  # Streamed downloads above this are aborted (0 = unlimited)
+    protect_seconds: float = Field(default=300.0, ge=0.0)  # Recently used files are never evicted
+    max_concurrent_transcriptions: int = Field(default=3, ge=1)
+    transcript_cache_entries: int = Field(default=2000, ge=0)  # Transcripts kept in memory, keyed by audio hash
+    persist_transcripts: bool = True  # Also keep them under <dir>/.transcripts across restarts
+
+
 class ChannelsConfig(BaseModel):
     """Configuration for chat channels."""
 
@@ -172,6 +199,14 @@ class ChannelsConfig(BaseModel):
     email: EmailConfig = Field(default_factory=EmailConfig)
     slack: SlackConfig = Field(default_factory=SlackConfig)
     qq: QQConfig = Field(default_factory=QQConfig)
+    outbound: OutboundDispatchConfig = Field(default_factory=OutboundDispatchConfig)
+    media: MediaConfig = Field(default_factory=MediaConfig)
+
+
+class FallbackModelConfig(BaseModel):
+    """A model to try when the primary one is degraded."""
+    model: str
+    provider: str = ""  # Registry name whose credentials to use (e.g. "vllm"); empty = match by model
 
 
 class AgentDefaults(BaseModel):
@@ -181,6 +216,8 @@ class AgentDefaults(BaseModel):
     max_tokens: int = 8192
     temperature: float = 0.7
     max_tool_iterations: int = 20
+    fallback_models: list[FallbackModelConfig] = Field(default_factory=list)  # Tried in order
+    context_budget_tokens: int = 0  # Max prompt tokens per LLM call (0 = derive from the model's context window)
 
 
 class AgentsConfig(BaseModel):
@@ -217,6 +254,33 @@ class GatewayConfig(BaseModel):
     port: int = 18790
 
 
+def _default_coalesce_channels() -> list[str]:
+    # Chat channels where users split one thought over several messages.
+    # Mochat buffers on its own; email is never bursty.
+    return ["telegram", "whatsapp", "discord", "slack", "feishu", "dingtalk", "qq"]
+
+
+class InboundCoalesceConfig(BaseModel):
+    """Merge bursts of messages from one sender into a single agent turn."""
+    enabled: bool = True
+    channels: list[str] = Field(default_factory=_default_coalesce_channels)
+    initial_window: float = Field(default=1.0, ge=0.0)  # Seconds to wait for a follow-up, before adapting
+    min_window: float = Field(default=0.3, ge=0.0)
+    max_window: float = Field(default=3.0, ge=0.0)
+    max_hold: float = Field(default=8.0, ge=0.0)  # Longest a burst is held from its first message
+    typing_grace: float = Field(default=4.0, ge=0.0)  # Hold extension after a typing event
+
+
+class BusConfig(BaseModel):
+    """Message bus queue limits and backpressure."""
+    inbound_max_size: int = Field(default=1000, ge=0)  # 0 = unbounded
+    outbound_max_size: int = Field(default=1000, ge=0)
+    high_watermark: float = Field(default=0.8, gt=0.0, le=1.0)  # Fill ratio that signals congestion
+    low_watermark: float = Field(default=0.5, ge=0.0, lt=1.0)  # Fill ratio that clears it
+    publish_timeout_seconds: float = Field(default=0.0, ge=0.0)  # Wait on a full queue before dropping; 0 = wait
+    coalesce: InboundCoalesceConfig = Field(default_factory=InboundCoalesceConfig)
+
+
 class WebSearchConfig(BaseModel):
     """Web search tool configuration."""
     api_key: str = ""  # Brave Search API key
@@ -233,10 +297,18 @@ class ExecToolConfig(BaseModel):
     timeout: int = 60
 
 
+class ToolResultsConfig(BaseModel):
+    """Spill-to-disk settings for large tool results (paged back with read_result)."""
+    spill_threshold_chars: int = 12000  # 0 = never spill
+    preview_chars: int = 2000  # Inline head/tail preview kept in the conversation
+    max_age_hours: float = 72.0  # Stored results older than this are pruned on startup
+
+
 class ToolsConfig(BaseModel):
     """Tools configuration."""
     web: WebToolsConfig = Field(default_factory=WebToolsConfig)
     exec: ExecToolConfig = Field(default_factory=ExecToolConfig)
+    results: ToolResultsConfig = Field(default_factory=ToolResultsConfig)
     restrict_to_workspace: bool = False  # If true, restrict all tool access to workspace directory
 
 
@@ -261,6 +333,29 @@ class NavigatorPricingConfig(BaseModel):
     output_per_1k: float = 0.0
 
 
+class NavigatorHintCacheConfig(BaseModel):
+    """Reuse SLM hints across turns the rule engine scores the same way."""
+
+    enabled: bool = True
+    ttl_seconds: float = Field(default=1800.0, gt=0.0)
+    max_entries: int = Field(default=1024, ge=1)
+    # "none" keys on tags/stage/bucketed metrics only; "keywords" adds coarse word stems
+    text_mode: Literal["none", "keywords"] = "keywords"
+    # Hints quote the user's message; sharing them across conversations leaks content
+    per_session: bool = True
+
+
+class NavigatorLogConfig(BaseModel):
+    """Buffered writer and rotation for the navigator pilot log."""
+
+    flush_interval: float = Field(default=2.0, ge=0.0)  # 0 = write through on every turn
+    batch_size: int = Field(default=200, ge=1)
+    buffer_size: int = Field(default=5000, ge=1)  # Oldest events are dropped beyond this
+    max_bytes: int = Field(default=10 * 1024 * 1024, ge=0)  # 0 = no size-based rotation
+    rotate_hours: float = Field(default=24.0, ge=0.0)  # 0 = no time-based rotation
+    keep_segments: int = Field(default=5, ge=0)  # Gzipped segments kept after rotation
+
+
 class NavigatorConfig(BaseModel):
     """Hybrid navigator feature settings."""
 
@@ -271,18 +366,108 @@ class NavigatorConfig(BaseModel):
     canary_percent: int = Field(default=0, ge=0, le=100)
     cooldown_seconds: float = Field(default=2.0, ge=0.0, le=60.0)
     slm_timeout_seconds: float = Field(default=2.0, gt=0.0, le=10.0)
+    # Latency budget for the hint, counted from the start of the turn. The
+    # navigator runs concurrently with context building; if it misses the
+    # budget the main LLM call starts without it and the hint is added to a
+    # later iteration. 0 = always wait (bounded by slm_timeout_seconds).
+    hint_deadline_ms: int = Field(default=0, ge=0)
+    similarity: Literal["hybrid", "sequence", "shingle"] = "hybrid"  # Repeat-detection engine
     log_path: str = "logs/navigator_pilot.jsonl"
+    log: NavigatorLogConfig = Field(default_factory=NavigatorLogConfig)
+    hint_cache: NavigatorHintCacheConfig = Field(default_factory=NavigatorHintCacheConfig)
     pricing: NavigatorPricingConfig = Field(default_factory=NavigatorPricingConfig)
 
 
+def _default_cache_call_sites() -> dict[str, bool]:
+    # Internal low-temperature prompts only; user-facing "main" turns stay uncached.
+    return {"reflection": True, "navigator": True, "crystallize": True, "skill_generator": True}
+
+
+class LLMCacheConfig(BaseModel):
+    """Response cache for deterministic LLM calls."""
+
+    enabled: bool = False
+    db_path: str = "~/.nanobot/llm_cache.db"  # Empty string = memory tier only
+    ttl_seconds: int = Field(default=24 * 3600, gt=0)
+    max_memory_entries: int = Field(default=512, ge=1)
+    max_db_entries: int = Field(default=10_000, ge=1)
+    max_temperature: float = Field(default=0.3, ge=0.0)  # Requests above this are never cached
+    call_sites: dict[str, bool] = Field(default_factory=_default_cache_call_sites)
+
+
+class LLMRateLimitConfig(BaseModel):
+    """Client-side pacing override for one provider or model (0 = unlimited)."""
+
+    provider: str = ""  # Registry name, e.g. "anthropic"
+    model: str = ""  # Model-name substring; wins over a provider rule
+    rpm: int = Field(default=0, ge=0)
+    tpm: int = Field(default=0, ge=0)
+    max_concurrency: int = Field(default=16, ge=1)
+
+
+class LLMRetryConfig(BaseModel):
+    """Retry policy for transient upstream failures."""
+
+    max_attempts: int = Field(default=3, ge=1)
+    base_delay: float = Field(default=0.5, ge=0.0)  # Backoff base; full jitter is applied
+    max_delay: float = Field(default=8.0, ge=0.0)
+    attempt_timeout: float = Field(default=60.0, gt=0.0)
+    total_timeout: float = Field(default=115.0, gt=0.0)  # Including retries and fallbacks
+    fallback_cooldown: float = Field(default=60.0, ge=0.0)  # How long a failed model is skipped
+
+
+class LLMHedgeConfig(BaseModel):
+    """Hedged requests: duplicate a call that runs past the latency quantile."""
+
+    enabled: bool = False
+    call_sites: list[str] = Field(default_factory=lambda: ["main"])
+    quantile: float = Field(default=0.95, gt=0.0, lt=1.0)
+    min_delay: float = Field(default=2.0, ge=0.0)
+    min_samples: int = Field(default=20, ge=1)
+
+
+class LLMUsageConfig(BaseModel):
+    """Per-call usage/cost ledger written to the memory database."""
+
+    enabled: bool = True
+    batch_size: int = Field(default=50, ge=1)  # Records per write
+    flush_interval: float = Field(default=5.0, gt=0)  # Max seconds a record stays buffered
+
+
+class LLMConfig(BaseModel):
+    """Provider-layer runtime settings shared by all LLM calls."""
+
+    cache: LLMCacheConfig = Field(default_factory=LLMCacheConfig)
+    single_flight: bool = True  # Coalesce identical concurrent requests into one upstream call
+    rate_limits: list[LLMRateLimitConfig] = Field(default_factory=list)  # Overrides ProviderSpec limits
+    rate_limit_retries: int = Field(default=3, ge=0)  # Re-queue attempts after a 429/overload
+    retry: LLMRetryConfig = Field(default_factory=LLMRetryConfig)
+    hedge: LLMHedgeConfig = Field(default_factory=LLMHedgeConfig)
+    usage: LLMUsageConfig = Field(default_factory=LLMUsageConfig)
+
+
+class HTTPConfig(BaseModel):
+    """Shared pooled HTTP client settings (tools, channels, transcription)."""
+
+    proxy: str | None = None  # e.g. "http://127.0.0.1:7890" or "socks5://..."
+    http2: bool = True
+    max_connections: int = Field(default=100, ge=1)
+    max_keepalive_connections: int = Field(default=20, ge=0)
+    keepalive_expiry: float = Field(default=30.0, ge=0.0)
+    connect_timeout: float = Field(default=10.0, gt=0.0)
+
+
 class Config(BaseSettings):
     """Root configuration for nanobot."""
     agents: AgentsConfig = Field(default_factory=AgentsConfig)
     channels: ChannelsConfig = Field(default_factory=ChannelsConfig)
     providers: ProvidersConfig = Field(default_factory=ProvidersConfig)
     gateway: GatewayConfig = Field(default_factory=GatewayConfig)
+    bus: BusConfig = Field(default_factory=BusConfig)
     tools: ToolsConfig = Field(default_factory=ToolsConfig)
     navigator: NavigatorConfig = Field(default_factory=NavigatorConfig)
+    llm: LLMConfig = Field(default_factory=LLMConfig)
+    http: HTTPConfig = Field(default_factory=HTTPConfig)
     
     @property
     def workspace_path(self) -> Path:
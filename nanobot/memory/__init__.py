@@ -3,6 +3,7 @@
 from .db import (
     add_fact,
     add_journal,
+    add_llm_usage_batch,
     add_message,
     add_token_usage,
     delete_fact,
@@ -11,6 +12,7 @@ from .db import (
     get_fact,
     get_facts_by_category,
     get_journal,
+    get_llm_usage_rollup,
     get_token_usage_today,
     get_token_usage_period,
     init_db,
@@ -36,4 +38,6 @@ __all__ = [
     "add_token_usage",
     "get_token_usage_today",
     "get_token_usage_period",
+    "add_llm_usage_batch",
+    "get_llm_usage_rollup",
 ]
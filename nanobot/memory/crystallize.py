@@ -10,6 +10,7 @@ from loguru import logger
 
 from nanobot.memory.db import add_fact
 from nanobot.providers.base import LLMProvider
+from nanobot.providers.call_context import llm_call_context
 
 
 def _get_sessions_dir() -> Path:
@@ -206,12 +207,13 @@ async def crystallize_memories(
         },
     ]
 
-    response = await provider.chat(
-        messages=messages,
-        model=model,
-        temperature=0.1,
-        max_tokens=1600,
-    )
+    with llm_call_context(call_site="crystallize"):
+        response = await provider.chat(
+            messages=messages,
+            model=model,
+            temperature=0.1,
+            max_tokens=1600,
+        )
     raw = response.content or "[]"
     parsed = _extract_json_array(raw)
     facts = _normalize_facts(parsed)
@@ -4,7 +4,7 @@ from __future__ import annotations
 
 import logging
 import sqlite3
-from datetime import datetime
+from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Any
 
@@ -96,6 +96,24 @@ def init_db() -> None:
             )
             """
         )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS llm_usage (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                date TEXT NOT NULL,
+                session_key TEXT,
+                call_site TEXT NOT NULL,
+                model TEXT NOT NULL,
+                prompt_tokens INTEGER NOT NULL DEFAULT 0,
+                completion_tokens INTEGER NOT NULL DEFAULT 0,
+                cached_tokens INTEGER NOT NULL DEFAULT 0,
+                total_tokens INTEGER NOT NULL DEFAULT 0,
+                latency_ms INTEGER NOT NULL DEFAULT 0,
+                cost_usd REAL NOT NULL DEFAULT 0,
+                created_at TEXT NOT NULL
+            )
+            """
+        )
         conn.execute(
             """
             CREATE TABLE IF NOT EXISTS reflections (
@@ -123,6 +141,9 @@ def init_db() -> None:
         conn.execute(
             "CREATE INDEX IF NOT EXISTS idx_token_usage_date ON token_usage(date)"
         )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_llm_usage_date ON llm_usage(date)"
+        )
         conn.execute(
             "CREATE INDEX IF NOT EXISTS idx_reflections_tool ON reflections(tool_name)"
         )
@@ -560,3 +581,103 @@ def get_token_usage_period(days: int = 7) -> list[dict[str, Any]]:
         ).fetchall()
     
     return [_row_to_dict(row) for row in rows]
+
+
+# ============== LLM USAGE LEDGER ==============
+
+_USAGE_GROUPS = ("model", "call_site", "session_key")
+
+
+def add_llm_usage_batch(records: list[dict[str, Any]]) -> None:
+    """
+    Записывает пачку вызовов LLM одной транзакцией.
+
+    Каждая запись попадает в llm_usage, а дневные суммы по моделям
+    добавляются в token_usage (их читают TokensTool и дашборд).
+    """
+    if not records:
+        return
+    init_db()
+    now = _now_iso()
+
+    rollup: dict[tuple[str, str], list[int]] = {}
+    for r in records:
+        bucket = rollup.setdefault((r["date"], r["model"]), [0, 0, 0, 0])
+        bucket[0] += r.get("prompt_tokens", 0)
+        bucket[1] += r.get("completion_tokens", 0)
+        bucket[2] += r.get("total_tokens", 0)
+        bucket[3] += 1
+
+    with _connect() as conn:
+        conn.executemany(
+            """
+            INSERT INTO llm_usage (
+                date, session_key, call_site, model, prompt_tokens, completion_tokens,
+                cached_tokens, total_tokens, latency_ms, cost_usd, created_at
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            [
+                (
+                    r["date"], r.get("session_key"), r.get("call_site", "main"), r["model"],
+                    r.get("prompt_tokens", 0), r.get("completion_tokens", 0), r.get("cached_tokens", 0),
+                    r.get("total_tokens", 0), r.get("latency_ms", 0), r.get("cost_usd", 0.0),
+                    r.get("created_at", now),
+                )
+                for r in records
+            ],
+        )
+        conn.executemany(
+            """
+            INSERT INTO token_usage (date, model, prompt_tokens, completion_tokens, total_tokens, requests, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(date, model)
+            DO UPDATE SET
+                prompt_tokens = prompt_tokens + excluded.prompt_tokens,
+                completion_tokens = completion_tokens + excluded.completion_tokens,
+                total_tokens = total_tokens + excluded.total_tokens,
+                requests = requests + excluded.requests,
+                updated_at = excluded.updated_at
+            """,
+            [
+                (date, model, p, c, t, n, now, now)
+                for (date, model), (p, c, t, n) in rollup.items()
+            ],
+        )
+        conn.commit()
+
+
+def get_llm_usage_rollup(days: int = 7, group_by: str = "model") -> list[dict[str, Any]]:
+    """
+    Возвращает дневные суммы токенов, стоимости и задержки за последние N дней.
+
+    Args:
+        days: Сколько последних дней учитывать (включая сегодня).
+        group_by: "model", "call_site" или "session_key".
+    """
+    if group_by not in _USAGE_GROUPS:
+        raise ValueError(f"group_by must be one of {_USAGE_GROUPS}")
+    init_db()
+    since = (datetime.now() - timedelta(days=max(0, days - 1))).strftime("%Y-%m-%d")
+
+    with _connect() as conn:
+        rows = conn.execute(
+            f"""
+            SELECT date,
+                   {group_by} AS "group",
+                   SUM(prompt_tokens) AS prompt_tokens,
+                   SUM(completion_tokens) AS completion_tokens,
+                   SUM(cached_tokens) AS cached_tokens,
+                   SUM(total_tokens) AS total_tokens,
+                   SUM(cost_usd) AS cost_usd,
+                   AVG(latency_ms) AS avg_latency_ms,
+                   COUNT(*) AS requests
+            FROM llm_usage
+            WHERE date >= ?
+            GROUP BY date, {group_by}
+            ORDER BY date DESC, total_tokens DESC
+            """,
+            (since,),
+        ).fetchall()
+
+    return [_row_to_dict(row) for row in rows]
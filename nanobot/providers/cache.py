@@ -0,0 +1,266 @@
+"""Response cache for deterministic LLM calls."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+
+from nanobot.providers.base import LLMResponse, ToolCallRequest
+
+
+def make_cache_key(
+    model: str,
+    messages: list[dict[str, Any]],
+    tools: list[dict[str, Any]] | None,
+    temperature: float,
+    max_tokens: int,
+) -> str:
+    """
+    Build a canonical hash for a chat request.
+
+    Dict key order and whitespace do not affect the key; anything that is not
+    JSON-serializable is folded in via ``str``.
+    """
+    payload = {
+        "model": model,
+        "messages": messages,
+        "tools": tools or [],
+        "temperature": round(float(temperature), 4),
+        "max_tokens": int(max_tokens),
+    }
+    blob = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def _dump_response(response: LLMResponse) -> str:
+    return json.dumps(asdict(response), ensure_ascii=False)
+
+
+def _load_response(raw: str) -> LLMResponse:
+    data = json.loads(raw)
+    data["tool_calls"] = [ToolCallRequest(**tc) for tc in data.get("tool_calls", [])]
+    return LLMResponse(**data)
+
+
+class ResponseCache:
+    """
+    Two-tier (memory + SQLite) cache of LLM responses.
+
+    Only requests from enabled call sites at or below ``max_temperature`` are
+    eligible; error responses are never stored. The memory tier is an LRU of
+    serialized responses, the SQLite tier survives restarts and is trimmed by
+    TTL and entry count. ``aget``/``aset`` run the SQLite tier on a worker
+    thread; reads never commit, last-access times of SQLite hits are written
+    with the next store.
+    """
+
+    def __init__(
+        self,
+        db_path: Path | str | None = None,
+        ttl_seconds: float = 24 * 3600,
+        max_memory_entries: int = 512,
+        max_db_entries: int = 10_000,
+        max_temperature: float = 0.3,
+        call_sites: dict[str, bool] | None = None,
+    ):
+        """
+        Initialize cache.
+
+        Args:
+            db_path: SQLite file for the persistent tier (None = memory only)
+            ttl_seconds: Lifetime of an entry in both tiers
+            max_memory_entries: LRU capacity of the memory tier
+            max_db_entries: Maximum rows kept in the SQLite tier
+            max_temperature: Requests above this temperature are never cached
+            call_sites: Per-call-site enable flags; unknown sites are disabled
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_memory_entries = max_memory_entries
+        self.max_db_entries = max_db_entries
+        self.max_temperature = max_temperature
+        self.call_sites = dict(call_sites or {})
+
+        self._memory: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+        self._conn: sqlite3.Connection | None = None
+        self._writes_since_trim = 0
+        self._accessed: dict[str, float] = {}  # key -> last SQLite hit, not yet written
+        if db_path is not None:
+            path = Path(db_path).expanduser()
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(path), check_same_thread=False)
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    key TEXT PRIMARY KEY,
+                    response_json TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    expires_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_llm_cache_last_access ON llm_cache(last_access)"
+            )
+            self._conn.commit()
+
+    def is_eligible(self, call_site: str, temperature: float, override: bool | None = None) -> bool:
+        """
+        Check whether a request may be served from / stored in the cache.
+
+        Args:
+            call_site: Call-site name from the active LLMCallContext
+            temperature: Effective sampling temperature
+            override: Per-call opt-in/opt-out; None follows ``call_sites``
+        """
+        if temperature > self.max_temperature:
+            return False
+        if override is not None:
+            return override
+        return self.call_sites.get(call_site, False)
+
+    def get(self, key: str) -> LLMResponse | None:
+        """Return a cached response, or None on miss/expiry."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                expires_at, raw = entry
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    self.stats["hits"] += 1
+                    return _load_response(raw)
+                del self._memory[key]
+
+            if self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT response_json, expires_at FROM llm_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row and row[1] > now:
+                    self._accessed[key] = now
+                    self._remember(key, row[1], row[0])
+                    self.stats["hits"] += 1
+                    return _load_response(row[0])
+
+            self.stats["misses"] += 1
+            return None
+
+    def set(self, key: str, response: LLMResponse) -> None:
+        """Store a response. Error responses are ignored."""
+        if response.finish_reason == "error":
+            return
+        now = time.time()
+        expires_at = now + self.ttl_seconds
+        raw = _dump_response(response)
+        with self._lock:
+            self._remember(key, expires_at, raw)
+            self.stats["stores"] += 1
+            if self._conn is not None:
+                self._conn.execute(
+                    """
+                    INSERT OR REPLACE INTO llm_cache (key, response_json, created_at, expires_at, last_access)
+                    VALUES (?, ?, ?, ?, ?)
+                    """,
+                    (key, raw, now, expires_at, now),
+                )
+                self._accessed.pop(key, None)
+                self._write_access_times()
+                self._conn.commit()
+                self._writes_since_trim += 1
+                if self._writes_since_trim >= 100:
+                    self._trim_db(now)
+
+    async def aget(self, key: str) -> LLMResponse | None:
+        """``get`` that keeps SQLite reads off the event loop."""
+        if self._conn is None or self._memory_hit(key):
+            return self.get(key)
+        return await asyncio.to_thread(self.get, key)
+
+    async def aset(self, key: str, response: LLMResponse) -> None:
+        """``set`` that keeps SQLite writes off the event loop."""
+        if self._conn is None or response.finish_reason == "error":
+            self.set(key, response)
+            return
+        await asyncio.to_thread(self.set, key, response)
+
+    def _memory_hit(self, key: str) -> bool:
+        with self._lock:
+            entry = self._memory.get(key)
+            return entry is not None and entry[0] > time.time()
+
+    def _write_access_times(self) -> None:
+        """Queue buffered last-access updates on the open transaction (lock held)."""
+        if self._accessed:
+            self._conn.executemany(
+                "UPDATE llm_cache SET last_access = ? WHERE key = ?",
+                [(ts, key) for key, ts in self._accessed.items()],
+            )
+            self._accessed.clear()
+
+    def _remember(self, key: str, expires_at: float, raw: str) -> None:
+        """Insert into the memory LRU (lock held)."""
+        self._memory[key] = (expires_at, raw)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def _trim_db(self, now: float) -> None:
+        """Drop expired rows and the least recently used overflow (lock held)."""
+        self._write_access_times()
+        cur = self._conn.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (now,))
+        removed = cur.rowcount
+        cur = self._conn.execute(
+            """
+            DELETE FROM llm_cache WHERE key IN (
+                SELECT key FROM llm_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?
+            )
+            """,
+            (self.max_db_entries,),
+        )
+        removed += cur.rowcount
+        self._conn.commit()
+        self._writes_since_trim = 0
+        if removed:
+            self.stats["evictions"] += removed
+            logger.debug(f"LLM cache: evicted {removed} persisted entries")
+
+    def prune(self) -> None:
+        """Apply TTL and size limits to both tiers now."""
+        now = time.time()
+        with self._lock:
+            for key in [k for k, (exp, _) in self._memory.items() if exp <= now]:
+                del self._memory[key]
+            if self._conn is not None:
+                self._trim_db(now)
+
+    def clear(self) -> None:
+        """Remove every cached response."""
+        with self._lock:
+            self._memory.clear()
+            self._accessed.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM llm_cache")
+                self._conn.commit()
+
+    def close(self) -> None:
+        """Close the SQLite tier."""
+        with self._lock:
+            if self._conn is not None:
+                self._write_access_times()
+                self._conn.commit()
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,47 @@
+"""Per-call metadata for LLM requests, carried through contextvars."""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, replace
+from typing import Iterator
+
+
+@dataclass(frozen=True)
+class LLMCallContext:
+    """
+    Describes who is calling the provider.
+
+    Call sites wrap their ``provider.chat`` calls in ``llm_call_context`` so
+    the provider layer can apply per-site policies (caching, attribution)
+    without widening the ``LLMProvider.chat`` signature.
+    """
+    call_site: str = "main"
+    session_key: str | None = None
+    cache: bool | None = None  # None = follow the configured per-site policy
+    priority: int | None = None  # None = derive from call_site (see providers/ratelimit.py)
+
+
+_current: ContextVar[LLMCallContext] = ContextVar("nanobot_llm_call_context", default=LLMCallContext())
+
+
+def current_call_context() -> LLMCallContext:
+    """Return the call context active for the current task."""
+    return _current.get()
+
+
+@contextmanager
+def llm_call_context(**overrides) -> Iterator[LLMCallContext]:
+    """
+    Temporarily override fields of the active call context.
+
+    Fields that are not overridden are inherited from the enclosing context,
+    so a session key set for a whole turn survives a nested call-site change.
+    """
+    ctx = replace(_current.get(), **overrides)
+    token = _current.set(ctx)
+    try:
+        yield ctx
+    finally:
+        _current.reset(token)
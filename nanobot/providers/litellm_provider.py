@@ -1,14 +1,53 @@
 """LiteLLM provider implementation for multi-provider support."""
 
+import asyncio
 import json
 import os
+import time
 from typing import Any
 
 import litellm
 from litellm import acompletion
+from loguru import logger
 
 from nanobot.providers.base import LLMProvider, LLMResponse, ToolCallRequest
-from nanobot.providers.registry import find_by_model, find_gateway
+from nanobot.providers.cache import ResponseCache, make_cache_key
+from nanobot.providers.call_context import current_call_context
+from nanobot.providers.ratelimit import ModelLimiter, RateLimiter, estimate_request_tokens, priority_for
+from nanobot.providers.registry import ProviderSpec, find_by_model, find_gateway, model_overrides, resolve_model
+from nanobot.providers.retry import (
+    HedgePolicy,
+    LatencyTracker,
+    ModelRoute,
+    RetryPolicy,
+    is_retryable,
+    warrants_fallback,
+)
+from nanobot.providers.singleflight import SingleFlight
+from nanobot.providers.usage import UsageLedger, estimate_cost, extract_cached_tokens
+
+
+_OVERLOAD_STATUS = {429, 503, 529}
+
+
+def _is_overload(e: Exception) -> bool:
+    """True for rate-limit / provider-overloaded failures."""
+    if isinstance(e, (litellm.RateLimitError, litellm.ServiceUnavailableError)):
+        return True
+    return getattr(e, "status_code", None) in _OVERLOAD_STATUS
+
+
+def _retry_after(e: Exception) -> float | None:
+    """Seconds from a Retry-After header on the failed response, if any."""
+    response = getattr(e, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    value = headers.get("retry-after") or headers.get("Retry-After")
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
 
 
 class LiteLLMProvider(LLMProvider):
@@ -27,10 +66,36 @@ class LiteLLMProvider(LLMProvider):
         default_model: str = "anthropic/claude-opus-4-5",
         extra_headers: dict[str, str] | None = None,
         provider_name: str | None = None,
+        response_cache: ResponseCache | None = None,
+        single_flight: bool = True,
+        rate_limiter: RateLimiter | None = None,
+        rate_limit_retries: int = 3,
+        retry_policy: RetryPolicy | None = None,
+        hedge_policy: HedgePolicy | None = None,
+        fallbacks: list[ModelRoute] | None = None,
+        fallback_cooldown: float = 60.0,
+        usage_ledger: UsageLedger | None = None,
     ):
         super().__init__(api_key, api_base)
         self.default_model = default_model
         self.extra_headers = extra_headers or {}
+        # Opt-in cache for deterministic calls (see providers/cache.py)
+        self.response_cache = response_cache
+        # Concurrent identical requests share one upstream call
+        self.single_flight: SingleFlight[LLMResponse] | None = SingleFlight() if single_flight else None
+        # Client-side pacing per provider/model, driven by ProviderSpec limits
+        self.rate_limiter = rate_limiter if rate_limiter is not None else RateLimiter()
+        self.rate_limit_retries = rate_limit_retries
+        # Retries, hedging and the ordered fallback chain (see providers/retry.py)
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.hedge_policy = hedge_policy or HedgePolicy()
+        self.fallbacks = list(fallbacks or [])
+        self.fallback_cooldown = fallback_cooldown
+        self.latency = LatencyTracker()
+        self._degraded_until: dict[str, float] = {}
+        self.stats = {"retries": 0, "hedged": 0, "fallbacks": 0}
+        # Per-call tokens, latency and cost (see providers/usage.py)
+        self.usage_ledger = usage_ledger
         
         # Detect gateway / local deployment.
         # provider_name (from config key) is the primary signal;
@@ -72,32 +137,17 @@ class LiteLLMProvider(LLMProvider):
     
     def _resolve_model(self, model: str) -> str:
         """Resolve model name by applying provider/gateway prefixes."""
-        if self._gateway:
-            # Gateway mode: apply gateway prefix, skip provider-specific prefixes
-            prefix = self._gateway.litellm_prefix
-            if self._gateway.strip_model_prefix:
-                model = model.split("/")[-1]
-            if prefix and not model.startswith(f"{prefix}/"):
-                model = f"{prefix}/{model}"
-            return model
-        
-        # Standard mode: auto-prefix for known providers
-        spec = find_by_model(model)
-        if spec and spec.litellm_prefix:
-            if not any(model.startswith(s) for s in spec.skip_prefixes):
-                model = f"{spec.litellm_prefix}/{model}"
-        
-        return model
+        return self._resolve_model_for(model, self._gateway)
+
+    def _resolve_model_for(self, model: str, gateway: ProviderSpec | None) -> str:
+        """Resolve model name for an explicit gateway (None = standard mode)."""
+        return resolve_model(model, gateway).model
     
     def _apply_model_overrides(self, model: str, kwargs: dict[str, Any]) -> None:
         """Apply model-specific parameter overrides from the registry."""
-        model_lower = model.lower()
-        spec = find_by_model(model)
-        if spec:
-            for pattern, overrides in spec.model_overrides:
-                if pattern in model_lower:
-                    kwargs.update(overrides)
-                    return
+        overrides = model_overrides(model)
+        if overrides:
+            kwargs.update(overrides)
     
     async def chat(
         self,
@@ -121,7 +171,48 @@ class LiteLLMProvider(LLMProvider):
             LLMResponse with content and/or tool calls.
         """
         model = self._resolve_model(model or self.default_model)
-        
+        kwargs = self._build_kwargs(
+            model, messages, tools, max_tokens, temperature,
+            self.api_key, self.api_base, self.extra_headers,
+        )
+
+        request_key = None
+        use_cache = False
+        if self.response_cache is not None:
+            ctx = current_call_context()
+            use_cache = self.response_cache.is_eligible(ctx.call_site, kwargs["temperature"], ctx.cache)
+        if use_cache or self.single_flight is not None:
+            request_key = make_cache_key(
+                model, messages, tools, kwargs["temperature"], kwargs["max_tokens"],
+            )
+
+        if use_cache:
+            cached = await self.response_cache.aget(request_key)
+            if cached is not None:
+                return cached
+
+        async def call() -> LLMResponse:
+            result = await self._complete(kwargs, (messages, tools, max_tokens, temperature))
+            if use_cache:
+                await self.response_cache.aset(request_key, result)
+            return result
+
+        if self.single_flight is not None:
+            return await self.single_flight.do(request_key, call)
+        return await call()
+
+    def _build_kwargs(
+        self,
+        model: str,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]] | None,
+        max_tokens: int,
+        temperature: float,
+        api_key: str | None,
+        api_base: str | None,
+        extra_headers: dict[str, str] | None,
+    ) -> dict[str, Any]:
+        """Build acompletion kwargs for a resolved model and its credentials."""
         kwargs: dict[str, Any] = {
             "model": model,
             "messages": messages,
@@ -133,33 +224,217 @@ class LiteLLMProvider(LLMProvider):
         self._apply_model_overrides(model, kwargs)
         
         # Pass api_key directly — more reliable than env vars alone
-        if self.api_key:
-            kwargs["api_key"] = self.api_key
+        if api_key:
+            kwargs["api_key"] = api_key
         
         # Pass api_base for custom endpoints
-        if self.api_base:
-            kwargs["api_base"] = self.api_base
+        if api_base:
+            kwargs["api_base"] = api_base
         
         # Pass extra headers (e.g. APP-Code for AiHubMix)
-        if self.extra_headers:
-            kwargs["extra_headers"] = self.extra_headers
+        if extra_headers:
+            kwargs["extra_headers"] = extra_headers
         
         if tools:
             kwargs["tools"] = tools
             kwargs["tool_choice"] = "auto"
 
-        # Request timeout to avoid hanging (LiteLLM passes this to httpx)
+        # Request timeout to avoid hanging (LiteLLM passes this to httpx);
+        # narrowed per attempt by the retry policy.
         kwargs["timeout"] = 120
+        return kwargs
 
-        try:
-            response = await acompletion(**kwargs)
-            return self._parse_response(response)
-        except Exception as e:
-            # Return error as content for graceful handling
-            return LLMResponse(
-                content=f"Error calling LLM: {str(e)}",
-                finish_reason="error",
+    def _spec_for(self, model: str, gateway: ProviderSpec | None) -> ProviderSpec | None:
+        """Registry entry that serves a resolved model."""
+        return gateway or find_by_model(model)
+
+    def _routes(self, kwargs: dict[str, Any], request: tuple) -> list[tuple[dict[str, Any], ProviderSpec | None]]:
+        """Primary route followed by the configured fallbacks, degraded ones last."""
+        routes = [(kwargs, self._spec_for(kwargs["model"], self._gateway))]
+        for route in self.fallbacks:
+            gateway = find_gateway(route.provider_name, route.api_key, route.api_base)
+            model = self._resolve_model_for(route.model, gateway)
+            route_kwargs = self._build_kwargs(
+                model, *request, route.api_key, route.api_base, route.extra_headers,
             )
+            routes.append((route_kwargs, self._spec_for(model, gateway)))
+
+        now = time.monotonic()
+        healthy = [r for r in routes if self._degraded_until.get(r[0]["model"], 0.0) <= now]
+        degraded = [r for r in routes if self._degraded_until.get(r[0]["model"], 0.0) > now]
+        return healthy + degraded
+
+    async def _complete(self, kwargs: dict[str, Any], request: tuple) -> LLMResponse:
+        """
+        Run the call on the primary model, then on fallbacks while it is degraded.
+
+        A model that exhausts its retries is marked degraded for
+        ``fallback_cooldown`` seconds so later calls try the next model first.
+        Errors caused by the request itself (bad request, context window) are
+        returned immediately.
+        """
+        ctx = current_call_context()
+        priority = priority_for(ctx.call_site, ctx.priority)
+        hedge = self.hedge_policy.enabled and ctx.call_site in self.hedge_policy.call_sites
+        deadline = time.monotonic() + self.retry_policy.total_timeout
+
+        routes = self._routes(kwargs, request) if self.fallbacks else [
+            (kwargs, self._spec_for(kwargs["model"], self._gateway))
+        ]
+        last_error: Exception | None = None
+        for index, (route_kwargs, spec) in enumerate(routes):
+            if index and time.monotonic() >= deadline:
+                break
+            try:
+                return await self._complete_route(route_kwargs, spec, priority, hedge, deadline)
+            except Exception as e:
+                last_error = e
+                if len(routes) == 1 or not warrants_fallback(e):
+                    break
+                self._degraded_until[route_kwargs["model"]] = time.monotonic() + self.fallback_cooldown
+                if index + 1 < len(routes):
+                    self.stats["fallbacks"] += 1
+                    logger.warning(
+                        f"LLM {route_kwargs['model']} degraded ({type(e).__name__}), "
+                        f"falling back to {routes[index + 1][0]['model']}"
+                    )
+        return self._error_response(last_error or asyncio.TimeoutError("LLM call deadline exceeded"))
+
+    async def _complete_route(
+        self,
+        kwargs: dict[str, Any],
+        spec: ProviderSpec | None,
+        priority: int,
+        hedge: bool,
+        deadline: float,
+    ) -> LLMResponse:
+        """
+        Call one model with retries; raises the last error when they run out.
+
+        Overload responses (429/503/529) shrink the limiter's window and are
+        re-queued behind its cooldown; other transient failures are retried
+        with exponential backoff and jitter.
+        """
+        limiter = self.rate_limiter.for_model(kwargs["model"], spec)
+        reserved = estimate_request_tokens(kwargs["messages"], kwargs.get("tools"))
+
+        overloads = 0
+        attempt = 0
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise asyncio.TimeoutError("LLM call deadline exceeded")
+            call_kwargs = {**kwargs, "timeout": min(self.retry_policy.attempt_timeout, remaining)}
+            started = time.monotonic()
+            try:
+                response = await asyncio.wait_for(
+                    self._call_hedged(call_kwargs, limiter, priority, reserved, hedge),
+                    timeout=remaining,
+                )
+                result = self._parse_response(response)
+                limiter.record_success(reserved, result.usage.get("total_tokens"))
+                self._record_usage(kwargs["model"], response, result, time.monotonic() - started)
+                return result
+            except Exception as e:
+                if _is_overload(e) and overloads < self.rate_limit_retries:
+                    overloads += 1
+                    continue
+                attempt += 1
+                if not is_retryable(e) or attempt >= self.retry_policy.max_attempts:
+                    raise
+                delay = self.retry_policy.backoff(attempt - 1)
+                if delay >= deadline - time.monotonic():
+                    raise
+                self.stats["retries"] += 1
+                logger.debug(f"Retrying {kwargs['model']} in {delay:.2f}s after {type(e).__name__}")
+                await asyncio.sleep(delay)
+
+    async def _call_hedged(
+        self,
+        kwargs: dict[str, Any],
+        limiter: ModelLimiter,
+        priority: int,
+        reserved: int,
+        hedge: bool,
+    ) -> Any:
+        """
+        One logical attempt, optionally hedged.
+
+        When hedging applies and enough latency samples exist, a second
+        request is sent once the first has run longer than the model's p95;
+        the first successful response wins and the other is cancelled.
+        """
+        delay = None
+        if hedge:
+            policy = self.hedge_policy
+            observed = self.latency.quantile(kwargs["model"], policy.quantile, policy.min_samples)
+            if observed is not None:
+                delay = max(policy.min_delay, observed)
+        if delay is None:
+            return await self._call_upstream(kwargs, limiter, priority, reserved)
+
+        first = asyncio.ensure_future(self._call_upstream(kwargs, limiter, priority, reserved))
+        pending: set[asyncio.Future] = {first}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=delay)
+            if done:
+                return first.result()
+
+            self.stats["hedged"] += 1
+            pending.add(asyncio.ensure_future(self._call_upstream(kwargs, limiter, priority, reserved)))
+            error: BaseException | None = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _call_upstream(
+        self,
+        kwargs: dict[str, Any],
+        limiter: ModelLimiter,
+        priority: int,
+        reserved: int,
+    ) -> Any:
+        """One acompletion call inside a limiter slot."""
+        async with limiter.slot(priority, reserved):
+            started = time.monotonic()
+            try:
+                response = await acompletion(**kwargs)
+            except Exception as e:
+                # Record before the slot is released so queued callers see the cooldown
+                if _is_overload(e):
+                    limiter.record_overload(_retry_after(e))
+                raise
+            self.latency.record(kwargs["model"], time.monotonic() - started)
+            return response
+
+    def _record_usage(self, model: str, response: Any, result: LLMResponse, latency: float) -> None:
+        """Attribute a successful call to the active session and call site."""
+        if self.usage_ledger is None or not result.usage:
+            return
+        ctx = current_call_context()
+        self.usage_ledger.record(
+            model=model,
+            usage=result.usage,
+            call_site=ctx.call_site,
+            session_key=ctx.session_key,
+            latency=latency,
+            cost_usd=estimate_cost(response, model),
+        )
+
+    def _error_response(self, e: Exception) -> LLMResponse:
+        """Turn an upstream failure into an error response."""
+        # Return error as content for graceful handling
+        return LLMResponse(
+            content=f"Error calling LLM: {str(e) or type(e).__name__}",
+            finish_reason="error",
+        )
     
     def _parse_response(self, response: Any) -> LLMResponse:
         """Parse LiteLLM response into our standard format."""
@@ -190,6 +465,9 @@ class LiteLLMProvider(LLMProvider):
                 "completion_tokens": response.usage.completion_tokens,
                 "total_tokens": response.usage.total_tokens,
             }
+            cached_tokens = extract_cached_tokens(response.usage)
+            if cached_tokens:
+                usage["cached_tokens"] = cached_tokens
         
         reasoning_content = getattr(message, "reasoning_content", None)
         
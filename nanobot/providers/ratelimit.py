@@ -0,0 +1,258 @@
+"""Client-side rate limiting and adaptive concurrency for LLM providers."""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import json
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator
+
+from loguru import logger
+
+from nanobot.providers.registry import ProviderSpec
+
+# Lower value = served first. Interactive work (user turns and everything
+# they fan out into synchronously) beats background jobs.
+CALL_SITE_PRIORITY: dict[str, int] = {
+    "main": 0,
+    "navigator": 0,
+    "subagent": 1,
+    "skill_generator": 2,
+    "cron": 3,
+    "heartbeat": 3,
+    "reflection": 4,
+    "crystallize": 4,
+}
+DEFAULT_PRIORITY = 2
+
+
+def priority_for(call_site: str, override: int | None = None) -> int:
+    """Map a call site to its queue priority."""
+    if override is not None:
+        return override
+    return CALL_SITE_PRIORITY.get(call_site, DEFAULT_PRIORITY)
+
+
+def estimate_request_tokens(messages: list[dict[str, Any]], tools: list[dict[str, Any]] | None = None) -> int:
+    """Cheap prompt-size estimate (~4 chars per token) used to reserve TPM budget."""
+    size = len(json.dumps(messages, ensure_ascii=False, default=str))
+    if tools:
+        size += len(json.dumps(tools, ensure_ascii=False, default=str))
+    return max(1, size // 4)
+
+
+@dataclass(frozen=True)
+class RateLimits:
+    """Effective limits for one provider/model pair (0 = unlimited)."""
+    rpm: int = 0
+    tpm: int = 0
+    max_concurrency: int = 16
+
+
+class TokenBucket:
+    """Per-minute token bucket; balance may go negative to carry debt."""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until ``amount`` is available (0 if it is now)."""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def consume(self, amount: float) -> None:
+        self.tokens -= min(amount, self.capacity)
+
+    def adjust(self, delta: float) -> None:
+        """Correct an earlier reservation once the real cost is known."""
+        self.tokens = min(self.capacity, self.tokens - delta)
+
+
+class _Waiter:
+    __slots__ = ("future", "tokens")
+
+    def __init__(self, future: asyncio.Future[None], tokens: int):
+        self.future = future
+        self.tokens = tokens
+
+
+class ModelLimiter:
+    """
+    Pacing for a single provider/model pair.
+
+    Combines RPM and TPM token buckets with an AIMD concurrency window:
+    each success grows the window by ``1/window`` (about +1 per round trip),
+    each overload signal halves it and pauses dispatch for a cooldown.
+    Waiters are served strictly by priority, then FIFO.
+    """
+
+    MAX_COOLDOWN = 60.0
+
+    def __init__(self, key: str, limits: RateLimits):
+        self.key = key
+        self.limits = limits
+        self._rpm = TokenBucket(limits.rpm) if limits.rpm > 0 else None
+        self._tpm = TokenBucket(limits.tpm) if limits.tpm > 0 else None
+        self.window = float(max(1, limits.max_concurrency))
+        self.in_flight = 0
+        self._queue: list[tuple[int, int, _Waiter]] = []
+        self._seq = itertools.count()
+        self._blocked_until = 0.0
+        self._overload_streak = 0
+        self._timer: asyncio.TimerHandle | None = None
+        self.stats = {"granted": 0, "overloads": 0, "max_queue": 0}
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for _, _, w in self._queue if not w.future.done())
+
+    @asynccontextmanager
+    async def slot(self, priority: int, tokens: int) -> AsyncIterator["ModelLimiter"]:
+        """Wait for a request slot; the slot is released on exit."""
+        await self._acquire(priority, tokens)
+        try:
+            yield self
+        finally:
+            self._release()
+
+    async def _acquire(self, priority: int, tokens: int) -> None:
+        loop = asyncio.get_running_loop()
+        waiter = _Waiter(loop.create_future(), tokens)
+        heapq.heappush(self._queue, (priority, next(self._seq), waiter))
+        self.stats["max_queue"] = max(self.stats["max_queue"], len(self._queue))
+        self._dispatch()
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            # Granted and cancelled in the same tick: give the slot back.
+            if waiter.future.done() and not waiter.future.cancelled():
+                self._release()
+            raise
+
+    def _release(self) -> None:
+        self.in_flight -= 1
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        now = time.monotonic()
+        while self._queue:
+            _, _, waiter = self._queue[0]
+            if waiter.future.done():  # cancelled while queued
+                heapq.heappop(self._queue)
+                continue
+            if self.in_flight >= int(self.window):
+                return
+
+            delay = self._blocked_until - now
+            if self._rpm is not None:
+                delay = max(delay, self._rpm.wait_time(1, now))
+            if self._tpm is not None:
+                delay = max(delay, self._tpm.wait_time(waiter.tokens, now))
+            if delay > 0:
+                self._timer = asyncio.get_running_loop().call_later(delay, self._dispatch)
+                return
+
+            heapq.heappop(self._queue)
+            if self._rpm is not None:
+                self._rpm.consume(1)
+            if self._tpm is not None:
+                self._tpm.consume(waiter.tokens)
+            self.in_flight += 1
+            self.stats["granted"] += 1
+            waiter.future.set_result(None)
+
+    def record_success(self, reserved_tokens: int = 0, actual_tokens: int | None = None) -> None:
+        """Grow the window additively and settle the TPM reservation."""
+        self._overload_streak = 0
+        self.window = min(float(self.limits.max_concurrency), self.window + 1.0 / self.window)
+        if self._tpm is not None and actual_tokens is not None:
+            self._tpm.adjust(actual_tokens - reserved_tokens)
+
+    def record_overload(self, retry_after: float | None = None) -> float:
+        """
+        Halve the window and pause dispatch after a 429/overload response.
+
+        Returns:
+            Cooldown in seconds before the next request is dispatched
+        """
+        self._overload_streak += 1
+        self.stats["overloads"] += 1
+        self.window = max(1.0, self.window / 2)
+        if retry_after is None:
+            retry_after = 2.0 ** (self._overload_streak - 1)
+        cooldown = min(self.MAX_COOLDOWN, max(0.0, retry_after))
+        self._blocked_until = max(self._blocked_until, time.monotonic() + cooldown)
+        logger.warning(
+            f"Rate limited on {self.key}: window={self.window:.1f}, cooling down {cooldown:.1f}s"
+        )
+        return cooldown
+
+
+class RateLimiter:
+    """Registry of ModelLimiter instances keyed by provider and model."""
+
+    def __init__(
+        self,
+        provider_limits: dict[str, RateLimits] | None = None,
+        model_limits: dict[str, RateLimits] | None = None,
+    ):
+        """
+        Args:
+            provider_limits: Limits keyed by registry provider name
+            model_limits: Limits keyed by a model-name substring; these win
+                over provider limits, and both win over the ProviderSpec
+        """
+        self.provider_limits = dict(provider_limits or {})
+        self.model_limits = dict(model_limits or {})
+        self._limiters: dict[str, ModelLimiter] = {}
+
+    def _limits_for(self, model: str, spec: ProviderSpec | None) -> RateLimits:
+        model_lower = model.lower()
+        for pattern, limits in self.model_limits.items():
+            if pattern.lower() in model_lower:
+                return limits
+        if spec is None:
+            return RateLimits()
+        if spec.name in self.provider_limits:
+            return self.provider_limits[spec.name]
+        return RateLimits(spec.rpm_limit, spec.tpm_limit, spec.max_concurrency)
+
+    def for_model(self, model: str, spec: ProviderSpec | None) -> ModelLimiter:
+        """Return (creating on first use) the limiter for a resolved model."""
+        provider = spec.name if spec else "default"
+        key = f"{provider}:{model}"
+        limiter = self._limiters.get(key)
+        if limiter is None:
+            limiter = ModelLimiter(key, self._limits_for(model, spec))
+            self._limiters[key] = limiter
+        return limiter
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        """Current window, queue depth and counters per limiter."""
+        return {
+            key: {
+                "window": round(lim.window, 2),
+                "in_flight": lim.in_flight,
+                "queued": lim.queued,
+                **lim.stats,
+            }
+            for key, lim in self._limiters.items()
+        }
@@ -12,7 +12,8 @@ Every entry writes out all fields so you can copy-paste as a template.
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+import re
+from dataclasses import dataclass, field
 from typing import Any
 
 
@@ -51,6 +52,11 @@ class ProviderSpec:
     # per-model param overrides, e.g. (("kimi-k2.5", {"temperature": 1.0}),)
     model_overrides: tuple[tuple[str, dict[str, Any]], ...] = ()
 
+    # client-side pacing (see providers/ratelimit.py); 0 = no limit
+    rpm_limit: int = 0                       # requests per minute
+    tpm_limit: int = 0                       # tokens per minute
+    max_concurrency: int = 16                # upper bound of the adaptive concurrency window
+
     @property
     def label(self) -> str:
         return self.display_name or self.name.title()
@@ -81,6 +87,9 @@ PROVIDERS: tuple[ProviderSpec, ...] = (
         default_api_base="https://openrouter.ai/api/v1",
         strip_model_prefix=False,
         model_overrides=(),
+        rpm_limit=0,
+        tpm_limit=0,
+        max_concurrency=16,
     ),
 
     # AiHubMix: global gateway, OpenAI-compatible interface.
@@ -101,6 +110,9 @@ PROVIDERS: tuple[ProviderSpec, ...] = (
         default_api_base="https://aihubmix.com/v1",
         strip_model_prefix=True,            # anthropic/claude-3 → claude-3 → openai/claude-3
         model_overrides=(),
+        rpm_limit=0,
+        tpm_limit=0,
+        max_concurrency=16,
     ),
 
     # === Standard providers (matched by model-name keywords) ===============
@@ -121,6 +133,9 @@ PROVIDERS: tuple[ProviderSpec, ...] = (
         default_api_base="",
         strip_model_prefix=False,
         model_overrides=(),
+        rpm_limit=0,
+        tpm_limit=0,
+        max_concurrency=16,
     ),
 
     # OpenAI: LiteLLM recognizes "gpt-*" natively, no prefix needed.
@@ -139,6 +154,9 @@ PROVIDERS: tuple[ProviderSpec, ...] = (
         default_api_base="",
         strip_model_prefix=False,
         model_overrides=(),
+        rpm_limit=0,
+        tpm_limit=0,
+        max_concurrency=16,
     ),
 
     # DeepSeek: needs "deepseek/" prefix for LiteLLM routing.
@@ -157,6 +175,9 @@ PROVIDERS: tuple[ProviderSpec, ...] = (
         default_api_base="",
         strip_model_prefix=False,
         model_overrides=(),
+        rpm_limit=0,
+        tpm_limit=0,
+        max_concurrency=16,
     ),
 
     # Gemini: needs "gemini/" prefix for LiteLLM.
@@ -175,6 +196,9 @@ PROVIDERS: tuple[ProviderSpec, ...] = (
         default_api_base="",
         strip_model_prefix=False,
         model_overrides=(),
+        rpm_limit=0,
+        tpm_limit=0,
+        max_concurrency=16,
     ),
 
     # Zhipu: LiteLLM uses "zai/" prefix.
@@ -197,6 +221,9 @@ PROVIDERS: tuple[ProviderSpec, ...] = (
         default_api_base="",
         strip_model_prefix=False,
         model_overrides=(),
+        rpm_limit=0,
+        tpm_limit=0,
+        max_concurrency=16,
     ),
 
     # DashScope: Qwen models, needs "dashscope/" prefix.
@@ -215,6 +242,9 @@ PROVIDERS: tuple[ProviderSpec, ...] = (
         default_api_base="",
         strip_model_prefix=False,
         model_overrides=(),
+        rpm_limit=0,
+        tpm_limit=0,
+        max_concurrency=16,
     ),
 
     # Moonshot: Kimi models, needs "moonshot/" prefix.
@@ -239,6 +269,9 @@ PROVIDERS: tuple[ProviderSpec, ...] = (
         model_overrides=(
             ("kimi-k2.5", {"temperature": 1.0}),
         ),
+        rpm_limit=0,
+        tpm_limit=0,
+        max_concurrency=16,
     ),
 
     # MiniMax: needs "minimax/" prefix for LiteLLM routing.
@@ -258,6 +291,9 @@ PROVIDERS: tuple[ProviderSpec, ...] = (
         default_api_base="https://api.minimax.io/v1",
         strip_model_prefix=False,
         model_overrides=(),
+        rpm_limit=0,
+        tpm_limit=0,
+        max_concurrency=16,
     ),
 
     # === Local deployment (matched by config key, NOT by api_base) =========
@@ -279,6 +315,9 @@ PROVIDERS: tuple[ProviderSpec, ...] = (
         default_api_base="",                # user must provide in config
         strip_model_prefix=False,
         model_overrides=(),
+        rpm_limit=0,
+        tpm_limit=0,
+        max_concurrency=4,                  # local GPU; keep the queue short
     ),
 
     # === Auxiliary (not a primary LLM provider) ============================
@@ -300,6 +339,9 @@ PROVIDERS: tuple[ProviderSpec, ...] = (
         default_api_base="",
         strip_model_prefix=False,
         model_overrides=(),
+        rpm_limit=30,                       # free-tier limits
+        tpm_limit=6000,
+        max_concurrency=4,
     ),
 )
 
@@ -308,16 +350,138 @@ PROVIDERS: tuple[ProviderSpec, ...] = (
 # Lookup helpers
 # ---------------------------------------------------------------------------
 
+@dataclass(frozen=True)
+class ResolvedModel:
+    """Everything a request needs to know about a model name, computed once."""
+    model: str                                   # LiteLLM model string (prefixed)
+    spec: ProviderSpec | None                    # gateway, or provider matched by keyword
+    overrides: dict[str, Any] = field(default_factory=dict)  # from model_overrides; do not mutate
+
+
+class ModelResolver:
+    """
+    Memoized model-name → provider resolution.
+
+    All standard-provider keywords are compiled into one regex. A lookahead
+    alternation ordered by registry priority reports, at every position, the
+    highest-priority keyword starting there, so one scan yields the same
+    answer as checking every spec's keywords in order. Results are cached
+    per (model, gateway) pair.
+    """
+
+    def __init__(self, providers: tuple[ProviderSpec, ...] = PROVIDERS, max_entries: int = 1024):
+        self.max_entries = max_entries
+        standard = [spec for spec in providers if not (spec.is_gateway or spec.is_local)]
+        self._priority: dict[str, int] = {}
+        for index, spec in enumerate(standard):
+            for kw in spec.keywords:
+                self._priority.setdefault(kw, index)
+        self._standard = standard
+        ordered = sorted(self._priority, key=self._priority.__getitem__)
+        self._pattern = re.compile("(?=(" + "|".join(re.escape(kw) for kw in ordered) + "))") if ordered else None
+        self._specs: dict[str, ProviderSpec | None] = {}
+        self._overrides: dict[str, dict[str, Any]] = {}
+        self._resolved: dict[tuple[str, str | None], ResolvedModel] = {}
+        self.stats = {"hits": 0, "misses": 0}
+
+    def _remember(self, cache: dict, key: Any, value: Any) -> None:
+        if len(cache) >= self.max_entries:
+            cache.clear()  # model names are few; a full cache means unusual churn
+        cache[key] = value
+
+    def find_by_model(self, model: str) -> ProviderSpec | None:
+        """Standard provider for a model name (cached)."""
+        try:
+            return self._specs[model]
+        except KeyError:
+            pass
+        spec = None
+        if self._pattern is not None:
+            best = min(
+                (self._priority[m.group(1)] for m in self._pattern.finditer(model.lower())),
+                default=None,
+            )
+            if best is not None:
+                spec = self._standard[best]
+        self._remember(self._specs, model, spec)
+        return spec
+
+    def resolve(self, model: str, gateway: ProviderSpec | None = None) -> ResolvedModel:
+        """Prefix a model for LiteLLM and look up its provider and overrides (cached)."""
+        key = (model, gateway.name if gateway else None)
+        cached = self._resolved.get(key)
+        if cached is not None:
+            self.stats["hits"] += 1
+            return cached
+        self.stats["misses"] += 1
+
+        resolved_name = model
+        if gateway:
+            # Gateway mode: apply gateway prefix, skip provider-specific prefixes
+            prefix = gateway.litellm_prefix
+            if gateway.strip_model_prefix:
+                resolved_name = resolved_name.split("/")[-1]
+            if prefix and not resolved_name.startswith(f"{prefix}/"):
+                resolved_name = f"{prefix}/{resolved_name}"
+        else:
+            # Standard mode: auto-prefix for known providers
+            spec = self.find_by_model(model)
+            if spec and spec.litellm_prefix:
+                if not any(model.startswith(s) for s in spec.skip_prefixes):
+                    resolved_name = f"{spec.litellm_prefix}/{model}"
+
+        result = ResolvedModel(
+            resolved_name,
+            gateway or self.find_by_model(resolved_name),
+            self.overrides_for(resolved_name),
+        )
+        self._remember(self._resolved, key, result)
+        return result
+
+    def overrides_for(self, model: str) -> dict[str, Any]:
+        """Per-model parameter overrides for a resolved model string (cached; do not mutate)."""
+        try:
+            return self._overrides[model]
+        except KeyError:
+            pass
+        overrides: dict[str, Any] = {}
+        spec = self.find_by_model(model)
+        if spec:
+            model_lower = model.lower()
+            for pattern, values in spec.model_overrides:
+                if pattern in model_lower:
+                    overrides = dict(values)
+                    break
+        self._remember(self._overrides, model, overrides)
+        return overrides
+
+    def cache_info(self) -> dict[str, int]:
+        """Hit/miss counters and current cache sizes."""
+        return {**self.stats, "resolved": len(self._resolved), "specs": len(self._specs)}
+
+
+_resolver = ModelResolver()
+
+
 def find_by_model(model: str) -> ProviderSpec | None:
     """Match a standard provider by model-name keyword (case-insensitive).
     Skips gateways/local — those are matched by api_key/api_base instead."""
-    model_lower = model.lower()
-    for spec in PROVIDERS:
-        if spec.is_gateway or spec.is_local:
-            continue
-        if any(kw in model_lower for kw in spec.keywords):
-            return spec
-    return None
+    return _resolver.find_by_model(model)
+
+
+def resolve_model(model: str, gateway: ProviderSpec | None = None) -> ResolvedModel:
+    """Resolve a model name for LiteLLM (see ModelResolver)."""
+    return _resolver.resolve(model, gateway)
+
+
+def model_overrides(model: str) -> dict[str, Any]:
+    """Parameter overrides for a resolved model string (see ModelResolver)."""
+    return _resolver.overrides_for(model)
+
+
+def resolver_cache_info() -> dict[str, int]:
+    """Cache statistics of the shared model resolver."""
+    return _resolver.cache_info()
 
 
 def find_gateway(
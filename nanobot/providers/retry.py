@@ -0,0 +1,102 @@
+"""Retry, hedging and fallback policies for LLM calls."""
+
+from __future__ import annotations
+
+import asyncio
+import random
+from collections import deque
+from dataclasses import dataclass, field
+
+import litellm
+
+# Failures that say nothing about the request itself; a retry may succeed.
+_RETRYABLE_ERRORS: tuple[type[BaseException], ...] = (
+    asyncio.TimeoutError,
+    litellm.Timeout,
+    litellm.APIConnectionError,
+    litellm.InternalServerError,
+    litellm.BadGatewayError,
+    litellm.ServiceUnavailableError,
+)
+
+# Failures caused by the request; another attempt or model will not help.
+_REQUEST_ERRORS: tuple[type[BaseException], ...] = (
+    litellm.ContextWindowExceededError,
+    litellm.ContentPolicyViolationError,
+    litellm.BadRequestError,
+)
+
+
+def is_retryable(e: BaseException) -> bool:
+    """True for transient transport/server failures."""
+    if isinstance(e, _RETRYABLE_ERRORS):
+        return True
+    status = getattr(e, "status_code", None)
+    return isinstance(status, int) and status >= 500
+
+
+def warrants_fallback(e: BaseException) -> bool:
+    """True if a different model/provider might succeed where this one failed."""
+    return not isinstance(e, _REQUEST_ERRORS)
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Exponential backoff with full jitter, bounded by a per-call deadline."""
+    max_attempts: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 8.0
+    attempt_timeout: float = 60.0  # Per upstream attempt
+    total_timeout: float = 115.0  # Whole call incl. retries and fallbacks (AgentLoop waits 120s)
+
+    def backoff(self, attempt: int) -> float:
+        """Delay before retry number ``attempt`` (0-based)."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+
+@dataclass(frozen=True)
+class HedgePolicy:
+    """
+    Fire a duplicate request when the first is slower than usual.
+
+    The hedge delay is the observed latency quantile for the model, so
+    only the slow tail pays for a second request.
+    """
+    enabled: bool = False
+    call_sites: frozenset[str] = field(default_factory=lambda: frozenset({"main"}))
+    quantile: float = 0.95
+    min_delay: float = 2.0
+    min_samples: int = 20
+
+
+class LatencyTracker:
+    """Sliding window of successful call latencies per model."""
+
+    def __init__(self, window: int = 200):
+        self.window = window
+        self._samples: dict[str, deque[float]] = {}
+
+    def record(self, model: str, seconds: float) -> None:
+        samples = self._samples.get(model)
+        if samples is None:
+            samples = self._samples[model] = deque(maxlen=self.window)
+        samples.append(seconds)
+
+    def quantile(self, model: str, q: float, min_samples: int = 1) -> float | None:
+        """Latency quantile in seconds, or None with too few samples."""
+        samples = self._samples.get(model)
+        if not samples or len(samples) < min_samples:
+            return None
+        ordered = sorted(samples)
+        index = min(len(ordered) - 1, int(q * len(ordered)))
+        return ordered[index]
+
+
+@dataclass(frozen=True)
+class ModelRoute:
+    """A fallback target: a model plus the credentials of the provider serving it."""
+    model: str
+    api_key: str | None = None
+    api_base: str | None = None
+    extra_headers: dict[str, str] | None = None
+    provider_name: str | None = None
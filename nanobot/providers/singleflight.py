@@ -0,0 +1,76 @@
+"""Single-flight coalescing of identical in-flight requests."""
+
+from __future__ import annotations
+
+import asyncio
+import copy
+from typing import Awaitable, Callable, Generic, TypeVar
+
+from loguru import logger
+
+T = TypeVar("T")
+
+
+class _Flight(Generic[T]):
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task[T]):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight(Generic[T]):
+    """
+    Share one upstream call between concurrent callers with the same key.
+
+    The first caller starts the call as a task; later callers with the same
+    key await that task instead of issuing their own. Every waiter receives
+    its own deep copy of the result, so callers may mutate it freely. The
+    upstream task is cancelled only once every waiter has gone away.
+    """
+
+    def __init__(self):
+        self._flights: dict[str, _Flight[T]] = {}
+        self.stats = {"calls": 0, "deduplicated": 0}
+
+    @property
+    def in_flight(self) -> int:
+        """Number of distinct keys currently being fetched."""
+        return len(self._flights)
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run ``fn`` unless an identical call is already running, then share its result.
+
+        Args:
+            key: Request identity (e.g. a canonical request hash)
+            fn: Zero-argument coroutine factory performing the real call
+
+        Returns:
+            The (copied) result of the shared call
+        """
+        flight = self._flights.get(key)
+        if flight is None:
+            self.stats["calls"] += 1
+            task = asyncio.ensure_future(fn())
+            flight = _Flight(task)
+            self._flights[key] = flight
+            task.add_done_callback(lambda _t, k=key, f=flight: self._forget(k, f))
+        else:
+            self.stats["deduplicated"] += 1
+            logger.debug(f"Single-flight: joined in-flight request {key[:12]}")
+
+        flight.waiters += 1
+        try:
+            result = await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if not flight.task.done() and flight.waiters == 1:
+                flight.task.cancel()
+            raise
+        finally:
+            flight.waiters -= 1
+        return copy.deepcopy(result)
+
+    def _forget(self, key: str, flight: _Flight[T]) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
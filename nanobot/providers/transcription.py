@@ -1,65 +1,164 @@
 """Voice transcription provider using Groq."""
 
+import asyncio
+import hashlib
 import os
+from collections import OrderedDict
 from pathlib import Path
 from typing import Any
 
-import httpx
 from loguru import logger
 
+from nanobot.utils.http import get_http_client
+
+
+def audio_cache_key(path: str | Path, model: str) -> str:
+    """Hash of the audio bytes and model, read in chunks."""
+    digest = hashlib.sha256(model.encode())
+    with open(path, "rb") as f:
+        while chunk := f.read(1 << 20):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class TranscriptionCache:
+    """
+    Transcripts keyed by audio content hash.
+
+    Kept in memory as an LRU of ``max_entries`` and, when ``cache_dir`` is
+    set, as one small text file per transcript so they survive restarts.
+    """
+
+    def __init__(self, max_entries: int = 2000, cache_dir: str | Path | None = None):
+        self.max_entries = max_entries
+        self.cache_dir = Path(cache_dir).expanduser() if cache_dir else None
+        self._entries: OrderedDict[str, str] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> str | None:
+        text = self._entries.get(key)
+        if text is None and self.cache_dir is not None:
+            try:
+                text = (self.cache_dir / f"{key}.txt").read_text(encoding="utf-8")
+                self._remember(key, text)
+            except OSError:
+                text = None
+        if text is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return text
+
+    def put(self, key: str, text: str) -> None:
+        self._remember(key, text)
+        if self.cache_dir is not None:
+            try:
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+                (self.cache_dir / f"{key}.txt").write_text(text, encoding="utf-8")
+            except OSError as e:
+                logger.warning(f"Could not persist transcript: {e}")
+
+    def _remember(self, key: str, text: str) -> None:
+        self._entries[key] = text
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
 
 class GroqTranscriptionProvider:
     """
     Voice transcription provider using Groq's Whisper API.
-    
+
     Groq offers extremely fast transcription with a generous free tier.
+    Results are cached by audio content, so a voice note that is forwarded
+    or re-sent (on any channel sharing this provider) is transcribed once.
+    At most ``max_concurrency`` uploads run at a time; ``transcribe_batch``
+    fans a set of queued notes out under that cap.
     """
-    
-    def __init__(self, api_key: str | None = None):
+
+    def __init__(
+        self,
+        api_key: str | None = None,
+        model: str = "whisper-large-v3",
+        max_concurrency: int = 3,
+        cache: TranscriptionCache | None = None,
+    ):
         self.api_key = api_key or os.environ.get("GROQ_API_KEY")
         self.api_url = "https://api.groq.com/openai/v1/audio/transcriptions"
-    
+        self.model = model
+        self.cache = cache if cache is not None else TranscriptionCache()
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._inflight: dict[str, asyncio.Task] = {}
+
     async def transcribe(self, file_path: str | Path) -> str:
         """
         Transcribe an audio file using Groq.
-        
+
         Args:
             file_path: Path to the audio file.
-            
+
         Returns:
             Transcribed text.
         """
         if not self.api_key:
             logger.warning("Groq API key not configured for transcription")
             return ""
-        
+
         path = Path(file_path)
         if not path.exists():
             logger.error(f"Audio file not found: {file_path}")
             return ""
-        
+
+        key = await asyncio.to_thread(audio_cache_key, path, self.model)
+        cached = self.cache.get(key)
+        if cached is not None:
+            logger.debug(f"Transcription cache hit for {path.name}")
+            return cached
+
+        # Identical notes arriving together share one upload
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._transcribe_uncached(path, key))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _t: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def transcribe_batch(self, file_paths: list[str | Path]) -> list[str]:
+        """Transcribe several files concurrently (up to ``max_concurrency``), in input order."""
+        return list(await asyncio.gather(*(self.transcribe(p) for p in file_paths)))
+
+    async def _transcribe_uncached(self, path: Path, key: str) -> str:
+        async with self._slots:
+            text = await self._upload(path)
+        if text:
+            self.cache.put(key, text)
+        return text
+
+    async def _upload(self, path: Path) -> str:
         try:
-            async with httpx.AsyncClient() as client:
-                with open(path, "rb") as f:
-                    files = {
-                        "file": (path.name, f),
-                        "model": (None, "whisper-large-v3"),
-                    }
-                    headers = {
-                        "Authorization": f"Bearer {self.api_key}",
-                    }
-                    
-                    response = await client.post(
-                        self.api_url,
-                        headers=headers,
-                        files=files,
-                        timeout=60.0
-                    )
-                    
-                    response.raise_for_status()
-                    data = response.json()
-                    return data.get("text", "")
-                    
+            # An open file is streamed into the multipart body chunk by chunk
+            with open(path, "rb") as f:
+                files: dict[str, Any] = {
+                    "file": (path.name, f),
+                    "model": (None, self.model),
+                }
+                headers = {
+                    "Authorization": f"Bearer {self.api_key}",
+                }
+
+                response = await get_http_client().post(
+                    self.api_url,
+                    headers=headers,
+                    files=files,
+                    timeout=60.0
+                )
+
+                response.raise_for_status()
+                data = response.json()
+                return data.get("text", "")
+
         except Exception as e:
             logger.error(f"Groq transcription error: {e}")
             return ""
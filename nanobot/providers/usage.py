@@ -0,0 +1,136 @@
+"""Per-call LLM usage and cost ledger with a batched SQLite writer."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable
+
+from loguru import logger
+
+
+def extract_cached_tokens(usage: Any) -> int:
+    """Prompt tokens served from the provider's prompt cache, if reported."""
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached = getattr(details, "cached_tokens", None) if details is not None else None
+    if cached is None:
+        cached = getattr(usage, "cache_read_input_tokens", None)  # Anthropic
+    return int(cached or 0)
+
+
+def estimate_cost(response: Any, model: str) -> float:
+    """USD cost of a completion from LiteLLM's price map; 0.0 for unknown models."""
+    try:
+        import litellm
+        return float(litellm.completion_cost(completion_response=response, model=model) or 0.0)
+    except Exception:
+        return 0.0
+
+
+class UsageLedger:
+    """
+    Buffers one record per upstream LLM call and writes them in batches.
+
+    Records are flushed when ``batch_size`` accumulate or ``flush_interval``
+    seconds after the first buffered record, on a worker thread so SQLite
+    never blocks the event loop. Call ``close()`` on shutdown to flush the rest.
+    """
+
+    def __init__(
+        self,
+        writer: Callable[[list[dict[str, Any]]], None] | None = None,
+        batch_size: int = 50,
+        flush_interval: float = 5.0,
+    ):
+        """
+        Args:
+            writer: Persists a batch; defaults to ``nanobot.memory.db.add_llm_usage_batch``
+            batch_size: Records that trigger an immediate flush
+            flush_interval: Max seconds a record waits in the buffer
+        """
+        if writer is None:
+            from nanobot.memory.db import add_llm_usage_batch
+            writer = add_llm_usage_batch
+        self._writer = writer
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._buffer: list[dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._timer: asyncio.TimerHandle | None = None
+        self.stats = {"recorded": 0, "flushed": 0, "write_errors": 0, "cost_usd": 0.0}
+
+    def record(
+        self,
+        model: str,
+        usage: dict[str, int],
+        call_site: str = "main",
+        session_key: str | None = None,
+        latency: float = 0.0,
+        cost_usd: float = 0.0,
+    ) -> None:
+        """Buffer one call; never raises."""
+        now = datetime.now()
+        entry = {
+            "date": now.strftime("%Y-%m-%d"),
+            "created_at": now.isoformat(timespec="seconds"),
+            "session_key": session_key,
+            "call_site": call_site,
+            "model": model,
+            "prompt_tokens": int(usage.get("prompt_tokens") or 0),
+            "completion_tokens": int(usage.get("completion_tokens") or 0),
+            "cached_tokens": int(usage.get("cached_tokens") or 0),
+            "total_tokens": int(usage.get("total_tokens") or 0),
+            "latency_ms": int(latency * 1000),
+            "cost_usd": cost_usd,
+        }
+        with self._lock:
+            self._buffer.append(entry)
+            pending = len(self._buffer)
+        self.stats["recorded"] += 1
+        self.stats["cost_usd"] += cost_usd
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            if pending >= self.batch_size:
+                self.flush()
+            return
+
+        if pending >= self.batch_size:
+            self._cancel_timer()
+            loop.run_in_executor(None, self.flush)
+        elif self._timer is None:
+            self._timer = loop.call_later(self.flush_interval, self._flush_in_background, loop)
+
+    def _flush_in_background(self, loop: asyncio.AbstractEventLoop) -> None:
+        self._timer = None
+        loop.run_in_executor(None, self.flush)
+
+    def _cancel_timer(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def flush(self) -> int:
+        """Write buffered records now; returns how many were written."""
+        with self._lock:
+            batch, self._buffer = self._buffer, []
+        if not batch:
+            return 0
+        started = time.monotonic()
+        try:
+            self._writer(batch)
+        except Exception as e:
+            self.stats["write_errors"] += 1
+            logger.warning(f"Failed to write {len(batch)} LLM usage record(s): {e}")
+            return 0
+        self.stats["flushed"] += len(batch)
+        logger.debug(f"Wrote {len(batch)} LLM usage record(s) in {(time.monotonic() - started) * 1000:.1f}ms")
+        return len(batch)
+
+    def close(self) -> None:
+        """Cancel the pending timer and flush synchronously."""
+        self._cancel_timer()
+        self.flush()
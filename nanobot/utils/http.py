@@ -0,0 +1,104 @@
+"""Process-wide pooled HTTP clients."""
+
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import weakref
+from dataclasses import dataclass
+from typing import Any
+
+import httpx
+from loguru import logger
+
+
+@dataclass(frozen=True)
+class HTTPSettings:
+    """Connection-pool settings shared by every pooled client."""
+    proxy: str | None = None
+    http2: bool = True  # Used only when the optional "h2" package is installed
+    max_connections: int = 100
+    max_keepalive_connections: int = 20  # Idle connections kept across all hosts
+    keepalive_expiry: float = 30.0
+    connect_timeout: float = 10.0
+    timeout: float = 30.0  # Default for requests that don't pass their own
+
+
+class HTTPClientRegistry:
+    """
+    Long-lived httpx.AsyncClient instances, one per profile and event loop.
+
+    Each client keeps a keep-alive pool per origin, so repeated calls to the
+    same API reuse TCP+TLS connections instead of handshaking every time.
+    Clients are bound to the event loop that first used them; asking from a
+    different loop (e.g. a fresh test loop) yields a separate client.
+    """
+
+    def __init__(self, settings: HTTPSettings | None = None):
+        self.settings = settings or HTTPSettings()
+        self._clients: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, httpx.AsyncClient]] = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def configure(self, settings: HTTPSettings) -> None:
+        """Replace settings; applies to clients created afterwards."""
+        self.settings = settings
+
+    def get(self, profile: str = "default", **options: Any) -> httpx.AsyncClient:
+        """
+        Return the pooled client for a profile on the running event loop.
+
+        Args:
+            profile: Client name; callers needing different client-level
+                behaviour (e.g. redirect handling) use their own profile
+            **options: Extra httpx.AsyncClient arguments, applied when the
+                profile's client is first created
+        """
+        loop = asyncio.get_running_loop()
+        clients = self._clients.setdefault(loop, {})
+        client = clients.get(profile)
+        if client is None or client.is_closed:
+            client = self._create(profile, options)
+            clients[profile] = client
+        return client
+
+    def _create(self, profile: str, options: dict[str, Any]) -> httpx.AsyncClient:
+        s = self.settings
+        http2 = s.http2 and importlib.util.find_spec("h2") is not None
+        logger.debug(f"Creating pooled HTTP client '{profile}' (http2={http2}, proxy={'yes' if s.proxy else 'no'})")
+        return httpx.AsyncClient(
+            http2=http2,
+            proxy=s.proxy or None,
+            limits=httpx.Limits(
+                max_connections=s.max_connections,
+                max_keepalive_connections=s.max_keepalive_connections,
+                keepalive_expiry=s.keepalive_expiry,
+            ),
+            timeout=httpx.Timeout(s.timeout, connect=s.connect_timeout),
+            **options,
+        )
+
+    async def aclose(self) -> None:
+        """Close every client owned by the running event loop."""
+        loop = asyncio.get_running_loop()
+        clients = self._clients.pop(loop, {})
+        for client in clients.values():
+            await client.aclose()
+
+
+_registry = HTTPClientRegistry()
+
+
+def configure_http(settings: HTTPSettings) -> None:
+    """Configure the process-wide registry (call before first use)."""
+    _registry.configure(settings)
+
+
+def get_http_client(profile: str = "default", **options: Any) -> httpx.AsyncClient:
+    """Shared pooled client; callers must not close it."""
+    return _registry.get(profile, **options)
+
+
+async def close_http_clients() -> None:
+    """Graceful shutdown hook: close pooled clients of the running loop."""
+    await _registry.aclose()
@@ -1,17 +1,34 @@
 #!/usr/bin/env python3
 """
-Benchmark semantic skill search with predefined test queries.
+Benchmark skill search and prompt assembly.
 
-Measures search latency and relevance scores for each query.
+Default mode generates synthetic skill corpora (100 / 1k / 10k skills) in a
+temp directory, indexes them with a deterministic hashing embedding so the
+run is offline and reproducible, and measures cold and warm latency
+percentiles for search_skills, hierarchical_search, compose_for_task and
+build_system_prompt. Results are written as JSON; pass --compare with a
+previous results file to flag regressions between commits.
+
+--live keeps the old behaviour: fixed queries against ~/.nanobot/skills.
 """
 
 from __future__ import annotations
 
+import argparse
+import hashlib
 import json
+import math
+import platform
+import random
+import subprocess
 import sys
+import tempfile
 import time
+from datetime import datetime
 from pathlib import Path
+from typing import Any, Callable
 
+from chromadb.api.types import Documents, EmbeddingFunction, Embeddings
 from loguru import logger
 
 # Add project root to path
@@ -19,6 +36,7 @@ PROJECT_ROOT = Path(__file__).resolve().parent.parent
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
+from nanobot.agent.context import ContextBuilder
 from nanobot.agent.skill_manager import SkillManager
 from nanobot.memory.vector_manager import VectorDBManager
 
@@ -36,9 +54,279 @@ TEST_QUERIES = [
     "explain this code",
 ]
 
+DEFAULT_SCALES = [100, 1000, 10000]
+DEFAULT_SEED = 42
+EMBEDDING_DIM = 128
+# Histogram bucket upper bounds in milliseconds (last bucket is open-ended)
+HISTOGRAM_BOUNDS_MS = [0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000]
 
-def main() -> int:
-    """Run benchmark and print results."""
+DOMAINS = [
+    "git", "github", "weather", "calendar", "email", "pdf", "image", "web",
+    "database", "docker", "python", "shell", "notes", "reminder", "translate",
+    "summarize", "code", "tests", "deploy", "screenshot", "tmux", "cron",
+]
+ACTIONS = [
+    "create", "find", "list", "update", "delete", "analyze", "schedule",
+    "fetch", "convert", "review", "explain", "monitor", "export", "merge",
+]
+OBJECTS = [
+    "pull request", "issue", "bug", "forecast", "event", "message", "report",
+    "page", "table", "container", "script", "command", "note", "task",
+    "document", "article", "function", "release", "session", "job",
+]
+FILLER = [
+    "first", "then", "carefully", "check", "output", "result", "user", "input",
+    "validate", "step", "retry", "error", "format", "summary", "context",
+    "options", "default", "config", "workspace", "file", "tool", "response",
+]
+
+
+class HashingEmbeddingFunction(EmbeddingFunction[Documents]):
+    """Deterministic feature-hashing embedding (offline stand-in for SentenceTransformer)."""
+
+    def __init__(self, dim: int = EMBEDDING_DIM):
+        self.dim = dim
+
+    def __call__(self, input: Documents) -> Embeddings:
+        vectors = []
+        for text in input:
+            vec = [0.0] * self.dim
+            for token in text.lower().split():
+                digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+                h = int.from_bytes(digest, "little")
+                vec[h % self.dim] += 1.0 if (h >> 32) & 1 else -1.0
+            norm = math.sqrt(sum(v * v for v in vec)) or 1.0
+            vectors.append([v / norm for v in vec])
+        return vectors
+
+    @staticmethod
+    def name() -> str:
+        return "nanobot-benchmark-hashing"
+
+
+class BenchmarkVectorDBManager(VectorDBManager):
+    """VectorDBManager with a private client and the hashing embedding."""
+
+    def __init__(self, db_path: Path):
+        super().__init__(db_path)
+        self._own_client = None
+
+    def get_client(self) -> Any:
+        if self._own_client is None:
+            import chromadb
+
+            self.db_path.mkdir(parents=True, exist_ok=True)
+            self._own_client = chromadb.PersistentClient(path=str(self.db_path))
+        return self._own_client
+
+    def _get_embedding_function(self) -> Any:
+        return HashingEmbeddingFunction()
+
+
+def generate_corpus(size: int, seed: int) -> list[dict[str, Any]]:
+    """Generate a deterministic synthetic skill corpus."""
+    rng = random.Random(seed + size)
+    skills: list[dict[str, Any]] = []
+    basic_names: list[str] = []
+
+    for idx in range(size):
+        domain = rng.choice(DOMAINS)
+        action = rng.choice(ACTIONS)
+        obj = rng.choice(OBJECTS)
+        roll = rng.random()
+        skill_type = "meta" if roll < 0.1 else "composite" if roll < 0.3 else "basic"
+        name = f"{domain}-{action}-{idx:05d}"
+        description = f"{action.capitalize()} {obj} with {domain}"
+        body = " ".join(rng.choice(FILLER + DOMAINS + OBJECTS) for _ in range(rng.randint(40, 160)))
+        dependencies = []
+        if skill_type != "basic" and basic_names:
+            dependencies = rng.sample(basic_names, k=min(len(basic_names), rng.randint(1, 3)))
+        skills.append({
+            "name": name,
+            "content": f"# {name}\n\n{description}.\n\n## Steps\n\n{body}",
+            "skill_type": skill_type,
+            "description": description,
+            "tags": [domain, action],
+            "dependencies": dependencies,
+            "always_load": idx < 3,
+        })
+        if skill_type == "basic":
+            basic_names.append(name)
+
+    return skills
+
+
+def generate_queries(count: int, seed: int) -> list[str]:
+    """Generate deterministic natural-language queries over the corpus vocabulary."""
+    rng = random.Random(seed)
+    return [
+        f"{rng.choice(ACTIONS)} {rng.choice(OBJECTS)} in {rng.choice(DOMAINS)}"
+        for _ in range(count)
+    ]
+
+
+def summarize_latencies(samples_ms: list[float]) -> dict[str, Any]:
+    """Compute percentiles and a fixed-bucket histogram."""
+    if not samples_ms:
+        return {"count": 0}
+    ordered = sorted(samples_ms)
+
+    def pct(p: float) -> float:
+        rank = max(0, math.ceil(p / 100 * len(ordered)) - 1)
+        return round(ordered[rank], 3)
+
+    histogram = [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)
+    for value in ordered:
+        for idx, bound in enumerate(HISTOGRAM_BOUNDS_MS):
+            if value <= bound:
+                histogram[idx] += 1
+                break
+        else:
+            histogram[-1] += 1
+
+    return {
+        "count": len(ordered),
+        "min_ms": round(ordered[0], 3),
+        "p50_ms": pct(50),
+        "p90_ms": pct(90),
+        "p95_ms": pct(95),
+        "p99_ms": pct(99),
+        "max_ms": round(ordered[-1], 3),
+        "mean_ms": round(sum(ordered) / len(ordered), 3),
+        "histogram": {
+            "bounds_ms": HISTOGRAM_BOUNDS_MS,
+            "counts": histogram,
+        },
+    }
+
+
+def _time_calls(fn: Callable[[str], Any], queries: list[str], repeat: int) -> list[float]:
+    samples = []
+    for _ in range(repeat):
+        for query in queries:
+            t0 = time.perf_counter()
+            fn(query)
+            samples.append((time.perf_counter() - t0) * 1000)
+    return samples
+
+
+OPERATIONS = ("search_skills", "hierarchical_search", "compose_for_task", "build_system_prompt")
+
+
+def _operations(manager: SkillManager, context: ContextBuilder) -> dict[str, Callable[[str], Any]]:
+    return {
+        "search_skills": lambda q: manager.search_skills(q, limit=5),
+        "hierarchical_search": lambda q: manager.hierarchical_search(q),
+        "compose_for_task": lambda q: manager.compose_for_task(q),
+        "build_system_prompt": lambda q: context.build_system_prompt(user_query=q),
+    }
+
+
+def run_scale(size: int, seed: int, queries: list[str], repeat: int) -> dict[str, Any]:
+    """Build one synthetic corpus and benchmark every operation on it."""
+    with tempfile.TemporaryDirectory(prefix=f"nanobot-bench-{size}-") as tmp:
+        root = Path(tmp)
+        workspace = root / "workspace"
+        workspace.mkdir()
+
+        t0 = time.perf_counter()
+        db_manager = BenchmarkVectorDBManager(root / "chroma")
+        loader = SkillManager(root / "skills", auto_sync=False, db_manager=db_manager)
+        corpus = generate_corpus(size, seed)
+        for skill in corpus:
+            loader.repository.add_skill(**skill)
+        loader.rebuild_index()
+        setup_s = time.perf_counter() - t0
+
+        results: dict[str, Any] = {"skills": size, "setup_s": round(setup_s, 2), "operations": {}}
+
+        # Cold: a fresh manager per operation, first pass over the queries.
+        # Warm: the same manager, repeated passes.
+        for op_name in OPERATIONS:
+            manager = SkillManager(root / "skills", auto_sync=False, db_manager=db_manager)
+            op = _operations(manager, ContextBuilder(workspace, skill_manager=manager))[op_name]
+            cold = _time_calls(op, queries, repeat=1)
+            warm = _time_calls(op, queries, repeat=repeat)
+            results["operations"][op_name] = {
+                "cold": summarize_latencies(cold),
+                "warm": summarize_latencies(warm),
+            }
+            print(
+                f"  {op_name:<22} cold p50={results['operations'][op_name]['cold']['p50_ms']:>9.3f} ms"
+                f"  warm p50={results['operations'][op_name]['warm']['p50_ms']:>9.3f} ms"
+                f"  p95={results['operations'][op_name]['warm']['p95_ms']:>9.3f} ms"
+            )
+        return results
+
+
+def _git_revision() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=PROJECT_ROOT, capture_output=True, text=True, timeout=5,
+        )
+        return out.stdout.strip() or None
+    except Exception:
+        return None
+
+
+def compare(current: dict[str, Any], baseline: dict[str, Any], threshold: float) -> list[str]:
+    """Return regressions where warm p95 grew by more than threshold (ratio)."""
+    regressions = []
+    for scale, data in current["results"].items():
+        base_ops = baseline.get("results", {}).get(scale, {}).get("operations", {})
+        for op_name, stats in data["operations"].items():
+            base = base_ops.get(op_name, {}).get("warm", {}).get("p95_ms")
+            now = stats["warm"].get("p95_ms")
+            if base and now and now / base > threshold:
+                regressions.append(
+                    f"{op_name} @ {scale}: warm p95 {base:.3f} -> {now:.3f} ms ({now / base:.2f}x)"
+                )
+    return regressions
+
+
+def run_synthetic(args: argparse.Namespace) -> int:
+    """Run the synthetic benchmark suite and write JSON results."""
+    scales = [int(s) for s in args.scales.split(",") if s.strip()]
+    queries = generate_queries(args.queries, args.seed)
+    report: dict[str, Any] = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "queries": len(queries),
+            "repeat": args.repeat,
+            "embedding": HashingEmbeddingFunction.name(),
+        },
+        "results": {},
+    }
+
+    print("\n--- Synthetic Skill Benchmark ---\n")
+    for size in scales:
+        print(f"Scale: {size} skills")
+        report["results"][str(size)] = run_scale(size, args.seed, queries, args.repeat)
+        print()
+
+    output = Path(args.output)
+    output.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(f"Results written to {output}")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print("\n--- Regressions ---")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print("No regressions against baseline")
+    return 0
+
+
+def run_live() -> int:
+    """Run fixed queries against the user's skill index and print results."""
     storage_dir = Path.home() / ".nanobot" / "skills"
     db_path = Path.home() / ".nanobot" / "chroma"
     db_manager = VectorDBManager(db_path)
@@ -112,5 +400,31 @@ def main() -> int:
     return 0
 
 
+def main() -> int:
+    """Parse arguments and run the selected benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--live", action="store_true", help="Benchmark ~/.nanobot/skills instead")
+    parser.add_argument("--scales", default=",".join(map(str, DEFAULT_SCALES)))
+    parser.add_argument("--queries", type=int, default=20, help="Synthetic queries per pass")
+    parser.add_argument("--repeat", type=int, default=5, help="Warm passes over the queries")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--output", default="skill_benchmark.json")
+    parser.add_argument("--compare", help="Baseline results JSON to compare against")
+    parser.add_argument(
+        "--threshold", type=float, default=1.25,
+        help="Warm p95 ratio above which --compare reports a regression",
+    )
+    parser.add_argument("--verbose", action="store_true", help="Keep INFO logging")
+    args = parser.parse_args()
+
+    if args.live:
+        return run_live()
+
+    if not args.verbose:
+        logger.remove()
+        logger.add(sys.stderr, level="WARNING")
+    return run_synthetic(args)
+
+
 if __name__ == "__main__":
     sys.exit(main())
@@ -116,6 +116,7 @@ def main() -> int:
                 description=description,
                 tags=tags,
                 skill_type="basic",
+                always_load=frontmatter.get("always", "").lower() == "true",
             )
             logger.info(f"Migrated '{name}' from {name_for_log}")
             migrated += 1
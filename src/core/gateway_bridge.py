@@ -58,6 +58,8 @@ def _get_agent(workspace: Optional[Path] = None) -> object:
             restrict_to_workspace=config.tools.restrict_to_workspace,
             session_manager=session_manager,
             navigator_config=config.navigator,
+            context_budget_tokens=config.agents.defaults.context_budget_tokens,
+            tool_results_config=config.tools.results,
         )
 
         _agent = agent
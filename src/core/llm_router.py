@@ -10,6 +10,15 @@ from openai import AsyncOpenAI
 logger = logging.getLogger(__name__)
 
 
+def _shared_http_client():
+    """Pooled client from nanobot when available (running loop required)."""
+    try:
+        from nanobot.utils.http import get_http_client
+        return get_http_client("openrouter")
+    except (ImportError, RuntimeError):
+        return None
+
+
 class LLMRouter:
     """Route commands to OpenRouter models."""
     ALLOWED_CONTEXT_ROLES = {"system", "user", "assistant"}
@@ -28,6 +37,7 @@ class LLMRouter:
         self.client = AsyncOpenAI(
             api_key=self.api_key,
             base_url="https://openrouter.ai/api/v1",
+            http_client=_shared_http_client(),
         )
 
     async def process_command(self, command: str, context: list[dict]) -> str:
@@ -0,0 +1,46 @@
+"""Tests for how the agent loop surfaces provider errors."""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+from nanobot.agent.loop import AgentLoop
+from nanobot.bus import InboundMessage
+from nanobot.providers.base import LLMResponse
+
+
+class _Sessions:
+    def __init__(self):
+        self.saved = 0
+
+    def save(self, session):
+        self.saved += 1
+
+
+def _loop(response: LLMResponse) -> AgentLoop:
+    # Only the model-call path is exercised; skip the heavy constructor.
+    loop = AgentLoop.__new__(AgentLoop)
+    loop.model = "test-model"
+    loop.max_iterations = 3
+    loop.sessions = _Sessions()
+    loop.tools = SimpleNamespace(get_definitions=lambda: [])
+    loop._fit_prompt = lambda messages, tools, iteration, prompt_tokens: (messages, 0)
+
+    async def chat(messages, tools=None, model=None):
+        return response
+
+    loop.provider = SimpleNamespace(chat=chat)
+    return loop
+
+
+async def test_provider_error_is_not_sent_or_saved_as_the_answer():
+    error = LLMResponse(content="Error calling LLM: 429 rate limited", finish_reason="error")
+    agent = _loop(error)
+    session = SimpleNamespace(messages=[], add_message=lambda role, content: session.messages.append(content))
+    msg = InboundMessage(channel="telegram", sender_id="u1", chat_id="c1", content="hi", metadata={"message_id": 7})
+
+    reply = await agent._continue_after_tool(session, msg, [{"role": "user", "content": "hi"}], "hi")
+
+    assert "429" not in reply.content and "Error calling LLM" not in reply.content
+    assert reply.metadata == {"message_id": 7}
+    assert session.messages == [] and agent.sessions.saved == 0
@@ -0,0 +1,49 @@
+"""Tests for the process-wide pooled HTTP client registry."""
+
+from __future__ import annotations
+
+import httpx
+
+from nanobot.utils.http import HTTPClientRegistry, HTTPSettings
+
+
+async def test_clients_are_reused_per_profile() -> None:
+    registry = HTTPClientRegistry()
+
+    default = registry.get()
+    assert registry.get() is default
+    fetch = registry.get("fetch", follow_redirects=True, max_redirects=5)
+    assert fetch is not default
+    assert fetch.follow_redirects
+    assert registry.get("fetch") is fetch
+
+    await registry.aclose()
+    assert default.is_closed and fetch.is_closed
+    assert registry.get() is not default
+    await registry.aclose()
+
+
+async def test_settings_apply_to_new_clients() -> None:
+    registry = HTTPClientRegistry(HTTPSettings(connect_timeout=1.5, timeout=7.0))
+    client = registry.get()
+    assert client.timeout.connect == 1.5
+    assert client.timeout.read == 7.0
+    await registry.aclose()
+
+
+async def test_pooled_client_serves_requests() -> None:
+    seen: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request.url.host)
+        return httpx.Response(200, json={"ok": True})
+
+    registry = HTTPClientRegistry()
+    client = registry.get("mock", transport=httpx.MockTransport(handler))
+    for _ in range(3):
+        r = await registry.get("mock").get("https://api.example.com/ping")
+        assert r.json() == {"ok": True}
+
+    assert seen == ["api.example.com"] * 3
+    assert registry.get("mock") is client
+    await registry.aclose()
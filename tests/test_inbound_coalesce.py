@@ -0,0 +1,151 @@
+"""Tests for per-session inbound message coalescing."""
+
+from __future__ import annotations
+
+import asyncio
+
+from nanobot.agent.loop import AgentLoop
+from nanobot.bus import InboundCoalescer, InboundMessage, MessageBus, OutboundMessage
+
+
+def _msg(content: str, sender: str = "u1", chat: str = "c1", channel: str = "telegram", **meta) -> InboundMessage:
+    return InboundMessage(
+        channel=channel, sender_id=sender, chat_id=chat, content=content,
+        media=meta.pop("media", []), metadata=meta,
+    )
+
+
+def _bus(**kwargs) -> MessageBus:
+    defaults = dict(initial_window=0.05, min_window=0.02, max_window=0.2, max_hold=0.5, typing_grace=0.15)
+    defaults.update(kwargs)
+    return MessageBus(coalescer=InboundCoalescer(**defaults))
+
+
+async def _next(bus: MessageBus, timeout: float = 1.0) -> InboundMessage:
+    return await asyncio.wait_for(bus.consume_inbound(), timeout)
+
+
+async def test_burst_is_merged_with_media():
+    bus = _bus()
+    await bus.publish_inbound(_msg("hi", message_id=1))
+    await bus.publish_inbound(_msg("one more thing", media=["/tmp/a.jpg"], message_id=2))
+    await bus.publish_inbound(_msg("and this", media=["/tmp/b.ogg"], message_id=3))
+    assert bus.inbound_size == 0
+
+    merged = await _next(bus)
+    assert merged.content == "hi\none more thing\nand this"
+    assert merged.media == ["/tmp/a.jpg", "/tmp/b.ogg"]
+    assert merged.metadata["coalesced"] == 3
+    assert merged.metadata["coalesced_message_ids"] == [1, 2, 3]
+    assert merged.metadata["message_id"] == 3
+    assert bus.coalescer.stats == {"received": 3, "emitted": 1, "merged": 2}
+
+
+async def test_senders_and_sessions_are_kept_apart():
+    bus = _bus()
+    await bus.publish_inbound(_msg("from u1", sender="u1", chat="g"))
+    await bus.publish_inbound(_msg("from u2", sender="u2", chat="g"))
+    await bus.publish_inbound(_msg("other chat", sender="u1", chat="h"))
+    contents = sorted([(await _next(bus)).content for _ in range(3)])
+    assert contents == ["from u1", "from u2", "other chat"]
+
+
+async def test_commands_and_system_messages_bypass_and_keep_order():
+    bus = _bus(initial_window=5.0, max_hold=5.0)
+    await bus.publish_inbound(_msg("draft"))
+    await bus.publish_inbound(_msg("/reset"))
+    assert (await _next(bus, 0.1)).content == "draft"  # flushed ahead of the command
+    assert (await _next(bus, 0.1)).content == "/reset"
+
+    await bus.publish_inbound(_msg("done", channel="system", sender="subagent"))
+    await bus.publish_inbound(_msg("clicked", from_callback=True))
+    assert (await _next(bus, 0.1)).content == "clicked"  # interactive lane first
+    assert (await _next(bus, 0.1)).content == "done"
+
+
+async def test_unlisted_channel_is_not_held():
+    bus = _bus(channels=["telegram"], initial_window=5.0)
+    await bus.publish_inbound(_msg("mail", channel="email"))
+    assert (await _next(bus, 0.1)).content == "mail"
+
+
+async def test_typing_extends_hold_up_to_max():
+    bus = _bus(initial_window=0.05, typing_grace=0.15, max_hold=0.3)
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    await bus.publish_inbound(_msg("first"))
+    bus.notify_typing("telegram", "c1", "u1")
+    await asyncio.sleep(0.1)
+    assert bus.inbound_size == 0  # still held thanks to the typing event
+    await bus.publish_inbound(_msg("second"))
+    for _ in range(5):
+        bus.notify_typing("telegram", "c1", "u1")
+        await asyncio.sleep(0.05)
+
+    merged = await _next(bus)
+    assert merged.content == "first\nsecond"
+    assert loop.time() - started < 0.45  # max_hold caps endless typing
+
+
+async def test_window_adapts_to_session_pace():
+    coalescer = InboundCoalescer(initial_window=0.05, min_window=0.02, max_window=0.5)
+    bus = MessageBus(coalescer=coalescer)
+    # Single messages shrink the window for this session...
+    for _ in range(3):
+        await bus.publish_inbound(_msg("solo"))
+        await _next(bus)
+    assert coalescer._pace["telegram:c1"].window < 0.05
+
+    # ...while a slower burst widens it to cover the observed gap.
+    await bus.publish_inbound(_msg("a", chat="c2"))
+    await asyncio.sleep(0.04)
+    await bus.publish_inbound(_msg("b", chat="c2"))
+    assert coalescer._pace["telegram:c2"].window > 0.05
+    assert (await _next(bus)).content == "a\nb"
+
+
+async def test_flush_on_shutdown_releases_held_bursts():
+    bus = _bus(initial_window=5.0, max_hold=5.0)
+    await bus.publish_inbound(_msg("one"))
+    await bus.publish_inbound(_msg("two"))
+    await bus.publish_inbound(_msg("other", chat="c2"))
+    assert bus.inbound_size == 0
+
+    assert await bus.flush_coalesced() == 3
+    contents = sorted([(await _next(bus, 0.1)).content for _ in range(2)])
+    assert contents == ["one\ntwo", "other"]
+    assert bus.coalescer.pending == 0
+    assert await MessageBus().flush_coalesced() == 0
+
+
+def _drain_agent(bus: MessageBus, delay: float = 0.0) -> AgentLoop:
+    agent = AgentLoop.__new__(AgentLoop)
+    agent.bus = bus
+
+    async def process(msg: InboundMessage) -> OutboundMessage:
+        await asyncio.sleep(delay)
+        return OutboundMessage(channel=msg.channel, chat_id=msg.chat_id, content=f"re: {msg.content}")
+
+    agent._process_message = process
+    return agent
+
+
+async def test_flushed_bursts_are_answered_before_the_agent_stops():
+    bus = _bus(initial_window=5.0, max_hold=5.0)
+    await bus.publish_inbound(_msg("one"))
+    await bus.publish_inbound(_msg("two"))
+    await bus.publish_inbound(_msg("other", chat="c2"))
+
+    await bus.flush_coalesced()
+    assert await _drain_agent(bus).drain(timeout=1.0) == 0
+    assert bus.inbound_size == 0
+    replies = sorted([(await bus.consume_outbound()).content for _ in range(2)])
+    assert replies == ["re: one\ntwo", "re: other"]
+
+
+async def test_drain_gives_up_at_the_deadline():
+    bus = MessageBus()
+    for i in range(3):
+        await bus.publish_inbound(_msg(f"m{i}", chat=f"c{i}"))
+
+    assert await _drain_agent(bus, delay=1.0).drain(timeout=0.05) == 3
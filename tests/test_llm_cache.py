@@ -0,0 +1,164 @@
+"""Tests for the LLM response cache and its LiteLLMProvider integration."""
+
+from __future__ import annotations
+
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from nanobot.providers import litellm_provider
+from nanobot.providers.base import LLMResponse, ToolCallRequest
+from nanobot.providers.cache import ResponseCache, make_cache_key
+from nanobot.providers.call_context import current_call_context, llm_call_context
+from nanobot.providers.litellm_provider import LiteLLMProvider
+
+
+def _fake_completion(content: str = "ok"):
+    message = SimpleNamespace(content=content, tool_calls=None, reasoning_content=None)
+    usage = SimpleNamespace(prompt_tokens=10, completion_tokens=2, total_tokens=12)
+    return SimpleNamespace(choices=[SimpleNamespace(message=message, finish_reason="stop")], usage=usage)
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """Replace litellm.acompletion with a counting fake."""
+    calls: list[dict] = []
+
+    async def fake_acompletion(**kwargs):
+        calls.append(kwargs)
+        return _fake_completion(f"answer {len(calls)}")
+
+    monkeypatch.setattr(litellm_provider, "acompletion", fake_acompletion)
+    return calls
+
+
+MESSAGES = [{"role": "user", "content": "hello"}]
+
+
+def test_cache_key_ignores_dict_order() -> None:
+    a = make_cache_key("m", [{"role": "user", "content": "x"}], None, 0.1, 100)
+    b = make_cache_key("m", [{"content": "x", "role": "user"}], None, 0.1, 100)
+    c = make_cache_key("m", [{"role": "user", "content": "x"}], None, 0.1, 101)
+    assert a == b
+    assert a != c
+
+
+def test_call_context_nesting_inherits_fields() -> None:
+    assert current_call_context().call_site == "main"
+    with llm_call_context(session_key="telegram:1"):
+        with llm_call_context(call_site="reflection") as ctx:
+            assert ctx.session_key == "telegram:1"
+            assert ctx.call_site == "reflection"
+        assert current_call_context().call_site == "main"
+    assert current_call_context().session_key is None
+
+
+def test_eligibility_rules() -> None:
+    cache = ResponseCache(call_sites={"reflection": True}, max_temperature=0.3)
+    assert cache.is_eligible("reflection", 0.3)
+    assert not cache.is_eligible("reflection", 0.7)
+    assert not cache.is_eligible("main", 0.1)
+    assert cache.is_eligible("main", 0.1, override=True)
+    assert not cache.is_eligible("reflection", 0.1, override=False)
+
+
+async def test_provider_serves_enabled_call_site_from_cache(upstream) -> None:
+    cache = ResponseCache(call_sites={"reflection": True})
+    provider = LiteLLMProvider(default_model="gpt-4o", response_cache=cache)
+
+    with llm_call_context(call_site="reflection"):
+        first = await provider.chat(MESSAGES, temperature=0.1, max_tokens=50)
+        second = await provider.chat(MESSAGES, temperature=0.1, max_tokens=50)
+
+    assert len(upstream) == 1
+    assert first.content == second.content == "answer 1"
+    assert second.usage["total_tokens"] == 12
+    assert cache.stats["hits"] == 1
+
+
+async def test_provider_skips_main_and_high_temperature_turns(upstream) -> None:
+    cache = ResponseCache(call_sites={"reflection": True})
+    provider = LiteLLMProvider(default_model="gpt-4o", response_cache=cache)
+
+    await provider.chat(MESSAGES, temperature=0.1)
+    await provider.chat(MESSAGES, temperature=0.1)
+    with llm_call_context(call_site="reflection"):
+        await provider.chat(MESSAGES, temperature=0.7)
+        await provider.chat(MESSAGES, temperature=0.7)
+
+    assert len(upstream) == 4
+    assert cache.stats["stores"] == 0
+
+
+async def test_error_responses_are_not_cached(monkeypatch) -> None:
+    calls = 0
+
+    async def failing(**kwargs):
+        nonlocal calls
+        calls += 1
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(litellm_provider, "acompletion", failing)
+    cache = ResponseCache(call_sites={"navigator": True})
+    provider = LiteLLMProvider(default_model="gpt-4o", response_cache=cache)
+
+    with llm_call_context(call_site="navigator"):
+        r1 = await provider.chat(MESSAGES, temperature=0.1)
+        await provider.chat(MESSAGES, temperature=0.1)
+
+    assert r1.finish_reason == "error"
+    assert calls == 2
+
+
+def test_sqlite_tier_survives_restart(tmp_path) -> None:
+    db = tmp_path / "cache.db"
+    response = LLMResponse(
+        content=None,
+        tool_calls=[ToolCallRequest(id="t1", name="read_file", arguments={"path": "a"})],
+        usage={"total_tokens": 3},
+    )
+    cache = ResponseCache(db_path=db)
+    cache.set("k", response)
+    cache.close()
+
+    reopened = ResponseCache(db_path=db)
+    cached = reopened.get("k")
+    assert cached is not None
+    assert cached.tool_calls[0].name == "read_file"
+    assert cached.tool_calls[0].arguments == {"path": "a"}
+    reopened.close()
+
+
+def test_ttl_and_size_eviction(tmp_path, monkeypatch) -> None:
+    cache = ResponseCache(db_path=tmp_path / "cache.db", ttl_seconds=10, max_memory_entries=2, max_db_entries=2)
+    for i in range(3):
+        cache.set(f"k{i}", LLMResponse(content=str(i)))
+    assert len(cache._memory) == 2
+
+    cache.prune()
+    assert cache.get("k0") is None
+    assert cache.get("k2").content == "2"
+
+    now = time.time()
+    monkeypatch.setattr("nanobot.providers.cache.time.time", lambda: now + 11)
+    assert cache.get("k2") is None
+    cache.close()
+
+
+async def test_sqlite_reads_do_not_commit(tmp_path) -> None:
+    db = tmp_path / "cache.db"
+    writer = ResponseCache(db_path=db)
+    await writer.aset("k", LLMResponse(content="cached"))
+    writer.close()
+
+    cache = ResponseCache(db_path=db)
+    changes = cache._conn.total_changes
+    assert (await cache.aget("k")).content == "cached"
+    assert (await cache.aget("missing")) is None
+    assert cache._conn.total_changes == changes and not cache._conn.in_transaction
+
+    # The hit's access time rides along with the next store
+    await cache.aset("other", LLMResponse(content="x"))
+    assert cache._conn.total_changes == changes + 2 and not cache._accessed
+    cache.close()
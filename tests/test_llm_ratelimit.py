@@ -0,0 +1,122 @@
+"""Tests for client-side LLM rate limiting and the AIMD concurrency window."""
+
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+
+import litellm
+
+from nanobot.providers import litellm_provider
+from nanobot.providers.call_context import llm_call_context
+from nanobot.providers.litellm_provider import LiteLLMProvider
+from nanobot.providers.ratelimit import (
+    ModelLimiter,
+    RateLimiter,
+    RateLimits,
+    TokenBucket,
+    priority_for,
+)
+from nanobot.providers.registry import find_by_name
+
+
+def _completion(content: str = "ok"):
+    message = SimpleNamespace(content=content, tool_calls=None, reasoning_content=None)
+    usage = SimpleNamespace(prompt_tokens=5, completion_tokens=5, total_tokens=10)
+    return SimpleNamespace(choices=[SimpleNamespace(message=message, finish_reason="stop")], usage=usage)
+
+
+def test_token_bucket_wait_time() -> None:
+    bucket = TokenBucket(60)  # one per second
+    now = bucket._updated
+    assert bucket.wait_time(60, now) == 0
+    bucket.consume(60)
+    assert abs(bucket.wait_time(1, now) - 1.0) < 1e-6
+    bucket.adjust(30)  # request turned out 30 tokens more expensive
+    assert abs(bucket.wait_time(1, now) - 31.0) < 1e-6
+
+
+def test_limits_resolution_order() -> None:
+    limiter = RateLimiter(
+        provider_limits={"anthropic": RateLimits(rpm=50)},
+        model_limits={"haiku": RateLimits(rpm=500)},
+    )
+    anthropic = find_by_name("anthropic")
+    assert limiter.for_model("claude-3-haiku", anthropic).limits.rpm == 500
+    assert limiter.for_model("claude-opus-4-5", anthropic).limits.rpm == 50
+    assert limiter.for_model("groq/llama3-8b", find_by_name("groq")).limits.rpm == 30
+
+
+def test_aimd_window() -> None:
+    limiter = ModelLimiter("test", RateLimits(max_concurrency=8))
+    limiter.record_overload(retry_after=0)
+    assert limiter.window == 4
+    limiter.record_overload(retry_after=0)
+    assert limiter.window == 2
+    for _ in range(10):
+        limiter.record_success()
+    assert 2 < limiter.window <= 8
+    for _ in range(200):
+        limiter.record_success()
+    assert limiter.window == 8
+
+
+async def test_queued_callers_are_served_by_priority() -> None:
+    limiter = ModelLimiter("test", RateLimits(max_concurrency=1))
+    order: list[str] = []
+
+    async def call(name: str, priority: int) -> None:
+        async with limiter.slot(priority, 1):
+            order.append(name)
+            await asyncio.sleep(0.01)
+
+    holder = asyncio.create_task(call("first", 0))
+    await asyncio.sleep(0)
+    tasks = [
+        asyncio.create_task(call("reflection", priority_for("reflection"))),
+        asyncio.create_task(call("cron", priority_for("cron"))),
+        asyncio.create_task(call("main", priority_for("main"))),
+    ]
+    await asyncio.gather(holder, *tasks)
+
+    assert order == ["first", "main", "cron", "reflection"]
+
+
+async def test_rate_limit_error_is_retried_not_returned(monkeypatch) -> None:
+    attempts = 0
+
+    async def flaky(**kwargs):
+        nonlocal attempts
+        attempts += 1
+        if attempts == 1:
+            raise litellm.RateLimitError("slow down", llm_provider="openai", model="gpt-4o")
+        return _completion("recovered")
+
+    monkeypatch.setattr(litellm_provider, "acompletion", flaky)
+    monkeypatch.setattr(ModelLimiter, "MAX_COOLDOWN", 0.01)
+    provider = LiteLLMProvider(default_model="gpt-4o")
+
+    response = await provider.chat([{"role": "user", "content": "hi"}])
+
+    assert response.content == "recovered"
+    assert attempts == 2
+    snapshot = provider.rate_limiter.snapshot()
+    (stats,) = snapshot.values()
+    assert stats["overloads"] == 1
+    assert stats["in_flight"] == 0
+
+
+async def test_persistent_rate_limit_gives_error_after_retries(monkeypatch) -> None:
+    async def always_429(**kwargs):
+        raise litellm.RateLimitError("slow down", llm_provider="openai", model="gpt-4o")
+
+    monkeypatch.setattr(litellm_provider, "acompletion", always_429)
+    monkeypatch.setattr(ModelLimiter, "MAX_COOLDOWN", 0.01)
+    provider = LiteLLMProvider(default_model="gpt-4o", rate_limit_retries=2)
+
+    with llm_call_context(call_site="reflection"):
+        response = await provider.chat([{"role": "user", "content": "hi"}])
+
+    assert response.finish_reason == "error"
+    (stats,) = provider.rate_limiter.snapshot().values()
+    assert stats["overloads"] == 3
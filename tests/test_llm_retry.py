@@ -0,0 +1,141 @@
+"""Tests for retries, hedged requests and model fallback in LiteLLMProvider."""
+
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+
+import litellm
+
+from nanobot.providers import litellm_provider
+from nanobot.providers.litellm_provider import LiteLLMProvider
+from nanobot.providers.retry import (
+    HedgePolicy,
+    LatencyTracker,
+    ModelRoute,
+    RetryPolicy,
+    is_retryable,
+)
+
+MESSAGES = [{"role": "user", "content": "hi"}]
+FAST_RETRY = RetryPolicy(max_attempts=3, base_delay=0.0, max_delay=0.0)
+
+
+def _completion(content: str):
+    message = SimpleNamespace(content=content, tool_calls=None, reasoning_content=None)
+    return SimpleNamespace(choices=[SimpleNamespace(message=message, finish_reason="stop")], usage=None)
+
+
+def _server_error(model: str) -> Exception:
+    return litellm.InternalServerError("upstream exploded", llm_provider="openai", model=model)
+
+
+def test_retryable_classification() -> None:
+    assert is_retryable(asyncio.TimeoutError())
+    assert is_retryable(_server_error("gpt-4o"))
+    assert not is_retryable(litellm.BadRequestError("bad", model="gpt-4o", llm_provider="openai"))
+    assert not is_retryable(ValueError("nope"))
+
+
+def test_latency_quantile() -> None:
+    tracker = LatencyTracker()
+    assert tracker.quantile("m", 0.95) is None
+    for i in range(100):
+        tracker.record("m", i / 100)
+    assert tracker.quantile("m", 0.95) == 0.95
+    assert tracker.quantile("m", 0.95, min_samples=500) is None
+
+
+async def test_transient_errors_are_retried(monkeypatch) -> None:
+    attempts = 0
+
+    async def flaky(**kwargs):
+        nonlocal attempts
+        attempts += 1
+        if attempts < 3:
+            raise _server_error(kwargs["model"])
+        return _completion("third time")
+
+    monkeypatch.setattr(litellm_provider, "acompletion", flaky)
+    provider = LiteLLMProvider(default_model="gpt-4o", retry_policy=FAST_RETRY)
+
+    response = await provider.chat(MESSAGES)
+
+    assert response.content == "third time"
+    assert provider.stats["retries"] == 2
+
+
+async def test_request_errors_are_not_retried_or_rerouted(monkeypatch) -> None:
+    models: list[str] = []
+
+    async def bad_request(**kwargs):
+        models.append(kwargs["model"])
+        raise litellm.BadRequestError("bad", model=kwargs["model"], llm_provider="openai")
+
+    monkeypatch.setattr(litellm_provider, "acompletion", bad_request)
+    provider = LiteLLMProvider(
+        default_model="gpt-4o",
+        retry_policy=FAST_RETRY,
+        fallbacks=[ModelRoute(model="deepseek-chat", api_key="k")],
+    )
+
+    response = await provider.chat(MESSAGES)
+
+    assert response.finish_reason == "error"
+    assert models == ["gpt-4o"]
+
+
+async def test_fallback_chain_and_degraded_primary(monkeypatch) -> None:
+    models: list[str] = []
+
+    async def primary_down(**kwargs):
+        models.append(kwargs["model"])
+        if kwargs["model"] == "gpt-4o":
+            raise _server_error(kwargs["model"])
+        assert kwargs["api_base"] == "http://localhost:8000/v1"
+        return _completion(f"from {kwargs['model']}")
+
+    monkeypatch.setattr(litellm_provider, "acompletion", primary_down)
+    provider = LiteLLMProvider(
+        default_model="gpt-4o",
+        retry_policy=FAST_RETRY,
+        fallbacks=[ModelRoute(model="llama-3-8b", api_key="dummy", api_base="http://localhost:8000/v1", provider_name="vllm")],
+    )
+
+    first = await provider.chat(MESSAGES)
+    assert first.content == "from hosted_vllm/llama-3-8b"
+    assert models == ["gpt-4o"] * 3 + ["hosted_vllm/llama-3-8b"]
+    assert provider.stats["fallbacks"] == 1
+
+    # While degraded, the primary is tried only after the fallback.
+    models.clear()
+    second = await provider.chat([{"role": "user", "content": "again"}])
+    assert second.content == "from hosted_vllm/llama-3-8b"
+    assert models == ["hosted_vllm/llama-3-8b"]
+
+
+async def test_slow_request_is_hedged(monkeypatch) -> None:
+    calls = 0
+
+    async def first_slow(**kwargs):
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            await asyncio.sleep(5)
+            return _completion("slow")
+        return _completion("hedge")
+
+    monkeypatch.setattr(litellm_provider, "acompletion", first_slow)
+    provider = LiteLLMProvider(
+        default_model="gpt-4o",
+        hedge_policy=HedgePolicy(enabled=True, min_delay=0.0, min_samples=5),
+    )
+    for _ in range(5):
+        provider.latency.record("gpt-4o", 0.02)
+
+    response = await asyncio.wait_for(provider.chat(MESSAGES), timeout=2)
+
+    assert response.content == "hedge"
+    assert provider.stats["hedged"] == 1
+    await asyncio.sleep(0)
+    assert provider.rate_limiter.snapshot()["openai:gpt-4o"]["in_flight"] == 0
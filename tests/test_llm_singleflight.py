@@ -0,0 +1,102 @@
+"""Tests for single-flight coalescing of identical LLM requests."""
+
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from nanobot.providers import litellm_provider
+from nanobot.providers.litellm_provider import LiteLLMProvider
+from nanobot.providers.singleflight import SingleFlight
+
+
+@pytest.fixture
+def slow_upstream(monkeypatch):
+    """Replace litellm.acompletion with a slow counting fake."""
+    calls: list[dict] = []
+
+    async def fake_acompletion(**kwargs):
+        calls.append(kwargs)
+        await asyncio.sleep(0.05)
+        message = SimpleNamespace(content=f"reply {len(calls)}", tool_calls=None, reasoning_content=None)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message, finish_reason="stop")], usage=None)
+
+    monkeypatch.setattr(litellm_provider, "acompletion", fake_acompletion)
+    return calls
+
+
+async def test_concurrent_identical_requests_share_one_call(slow_upstream) -> None:
+    provider = LiteLLMProvider(default_model="gpt-4o")
+    messages = [{"role": "user", "content": "HEARTBEAT"}]
+
+    results = await asyncio.gather(*(provider.chat(messages) for _ in range(5)))
+
+    assert len(slow_upstream) == 1
+    assert {r.content for r in results} == {"reply 1"}
+    assert len({id(r) for r in results}) == 5  # each waiter gets its own copy
+    assert provider.single_flight.stats == {"calls": 1, "deduplicated": 4}
+    assert provider.single_flight.in_flight == 0
+
+
+async def test_different_requests_are_not_coalesced(slow_upstream) -> None:
+    provider = LiteLLMProvider(default_model="gpt-4o")
+
+    await asyncio.gather(
+        provider.chat([{"role": "user", "content": "a"}]),
+        provider.chat([{"role": "user", "content": "b"}]),
+    )
+
+    assert len(slow_upstream) == 2
+    assert provider.single_flight.stats["deduplicated"] == 0
+
+
+async def test_sequential_requests_are_not_coalesced(slow_upstream) -> None:
+    provider = LiteLLMProvider(default_model="gpt-4o")
+    messages = [{"role": "user", "content": "a"}]
+
+    await provider.chat(messages)
+    await provider.chat(messages)
+
+    assert len(slow_upstream) == 2
+
+
+async def test_cancelled_waiter_does_not_cancel_shared_call() -> None:
+    flight: SingleFlight[str] = SingleFlight()
+    started = asyncio.Event()
+
+    async def work() -> str:
+        started.set()
+        await asyncio.sleep(0.05)
+        return "done"
+
+    first = asyncio.create_task(flight.do("k", work))
+    await started.wait()
+    second = asyncio.create_task(flight.do("k", work))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert await second == "done"
+    with pytest.raises(asyncio.CancelledError):
+        await first
+
+
+async def test_last_waiter_cancellation_cancels_upstream() -> None:
+    flight: SingleFlight[str] = SingleFlight()
+    cancelled = asyncio.Event()
+
+    async def work() -> str:
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+        return "never"
+
+    waiter = asyncio.create_task(flight.do("k", work))
+    await asyncio.sleep(0.01)
+    waiter.cancel()
+    await asyncio.wait_for(cancelled.wait(), timeout=1)
+    await asyncio.sleep(0)
+    assert flight.in_flight == 0
@@ -0,0 +1,122 @@
+"""Tests for the LLM usage/cost ledger and its provider integration."""
+
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from nanobot.memory.db import add_llm_usage_batch, get_llm_usage_rollup, get_token_usage_today
+from nanobot.providers import litellm_provider
+from nanobot.providers.call_context import llm_call_context
+from nanobot.providers.litellm_provider import LiteLLMProvider
+from nanobot.providers.usage import UsageLedger, extract_cached_tokens
+
+
+def _fake_completion(cached: int = 0):
+    message = SimpleNamespace(content="ok", tool_calls=None, reasoning_content=None)
+    usage = SimpleNamespace(
+        prompt_tokens=100,
+        completion_tokens=20,
+        total_tokens=120,
+        prompt_tokens_details=SimpleNamespace(cached_tokens=cached),
+    )
+    return SimpleNamespace(choices=[SimpleNamespace(message=message, finish_reason="stop")], usage=usage)
+
+
+@pytest.fixture
+def memory_db(tmp_path, monkeypatch):
+    db_file = tmp_path / "memory.db"
+    monkeypatch.setattr("nanobot.memory.db.DB_PATH", db_file)
+    return db_file
+
+
+def test_extract_cached_tokens_handles_provider_shapes():
+    openai_usage = SimpleNamespace(prompt_tokens_details=SimpleNamespace(cached_tokens=64))
+    anthropic_usage = SimpleNamespace(prompt_tokens_details=None, cache_read_input_tokens=32)
+    assert extract_cached_tokens(openai_usage) == 64
+    assert extract_cached_tokens(anthropic_usage) == 32
+    assert extract_cached_tokens(SimpleNamespace()) == 0
+
+
+def test_ledger_batches_writes():
+    batches: list[list[dict]] = []
+    ledger = UsageLedger(writer=batches.append, batch_size=3)
+    usage = {"prompt_tokens": 10, "completion_tokens": 2, "total_tokens": 12}
+
+    ledger.record("m", usage, call_site="reflection", session_key="cli:1", cost_usd=0.5)
+    ledger.record("m", usage)
+    assert batches == []
+    ledger.record("m", usage)
+    assert len(batches) == 1 and len(batches[0]) == 3
+    assert batches[0][0]["call_site"] == "reflection"
+    assert batches[0][0]["session_key"] == "cli:1"
+
+    ledger.record("m", usage)
+    ledger.close()
+    assert len(batches) == 2
+    assert ledger.stats["flushed"] == 4
+    assert ledger.stats["cost_usd"] == pytest.approx(0.5)
+
+
+def test_ledger_survives_writer_errors():
+    def broken(batch):
+        raise OSError("disk full")
+
+    ledger = UsageLedger(writer=broken, batch_size=1)
+    ledger.record("m", {"total_tokens": 1})
+    assert ledger.stats["write_errors"] == 1
+
+
+def test_batch_writes_records_and_daily_rollups(memory_db):
+    ledger = UsageLedger(batch_size=100)
+    ledger.record("gpt-4o", {"prompt_tokens": 100, "completion_tokens": 10, "total_tokens": 110},
+                  call_site="main", session_key="telegram:1", cost_usd=0.01)
+    ledger.record("gpt-4o", {"prompt_tokens": 50, "completion_tokens": 5, "total_tokens": 55, "cached_tokens": 40},
+                  call_site="navigator", session_key="telegram:1", cost_usd=0.002)
+    ledger.record("claude", {"prompt_tokens": 10, "completion_tokens": 1, "total_tokens": 11},
+                  call_site="reflection")
+    ledger.close()
+
+    today = get_token_usage_today()
+    assert today["total_tokens"] == 176
+    assert today["requests"] == 3
+
+    by_site = {r["group"]: r for r in get_llm_usage_rollup(days=1, group_by="call_site")}
+    assert by_site["navigator"]["cached_tokens"] == 40
+    assert by_site["main"]["cost_usd"] == pytest.approx(0.01)
+
+    by_session = {r["group"]: r for r in get_llm_usage_rollup(days=1, group_by="session_key")}
+    assert by_session["telegram:1"]["requests"] == 2
+
+    with pytest.raises(ValueError):
+        get_llm_usage_rollup(group_by="date; DROP TABLE llm_usage")
+
+
+def test_empty_batch_is_noop(memory_db):
+    add_llm_usage_batch([])
+    assert not memory_db.exists()
+
+
+async def test_provider_records_usage_with_call_context(monkeypatch):
+    async def fake_acompletion(**kwargs):
+        await asyncio.sleep(0)
+        return _fake_completion(cached=30)
+
+    monkeypatch.setattr(litellm_provider, "acompletion", fake_acompletion)
+    batches: list[list[dict]] = []
+    ledger = UsageLedger(writer=batches.append, batch_size=10)
+    provider = LiteLLMProvider(default_model="gpt-4o", usage_ledger=ledger, single_flight=False)
+
+    with llm_call_context(session_key="cli:direct", call_site="crystallize"):
+        response = await provider.chat(messages=[{"role": "user", "content": "hi"}])
+
+    assert response.usage["cached_tokens"] == 30
+    ledger.close()
+    records = [r for batch in batches for r in batch]
+    assert len(records) == 1
+    assert records[0]["call_site"] == "crystallize"
+    assert records[0]["session_key"] == "cli:direct"
+    assert records[0]["cached_tokens"] == 30
+    assert records[0]["model"] == "gpt-4o"
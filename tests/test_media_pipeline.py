@@ -0,0 +1,181 @@
+"""Tests for the shared inbound media pipeline."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from pathlib import Path
+
+from nanobot.bus import MessageBus
+from nanobot.channels.base import BaseChannel
+from nanobot.channels.media import MediaPipeline
+
+
+def _writer(data: bytes, calls: list[int] | None = None, delay: float = 0.0):
+    async def write(path: Path) -> None:
+        if calls is not None:
+            calls.append(1)
+        await asyncio.sleep(delay)
+        path.write_bytes(data)
+
+    return write
+
+
+async def test_identical_content_is_stored_once(tmp_path):
+    pipeline = MediaPipeline(media_dir=tmp_path)
+    a = await pipeline.fetch(_writer(b"photo"), ".jpg")
+    b = await pipeline.fetch(_writer(b"photo"), ".jpg")
+    c = await pipeline.fetch(_writer(b"other"), ".jpg")
+    assert a == b != c
+    assert a.read_bytes() == b"photo" and a.suffix == ".jpg"
+    assert sorted(p.name for p in tmp_path.iterdir() if p.is_file()) == sorted([a.name, c.name])
+    assert pipeline.stats["dedup_hits"] == 1
+    assert not any((tmp_path / ".partial").iterdir())
+
+
+async def test_same_source_downloads_once(tmp_path):
+    pipeline = MediaPipeline(media_dir=tmp_path)
+    calls: list[int] = []
+    paths = await asyncio.gather(*(
+        pipeline.fetch(_writer(b"voice", calls, delay=0.02), ".ogg", source_key="tg:abc") for _ in range(3)
+    ))
+    again = await pipeline.fetch(_writer(b"voice", calls), ".ogg", source_key="tg:abc")
+    assert len(set(paths)) == 1 and again == paths[0]
+    assert len(calls) == 1
+    assert pipeline.stats["source_hits"] == 3
+
+
+async def test_downloads_are_bounded(tmp_path):
+    pipeline = MediaPipeline(media_dir=tmp_path, max_concurrent=2)
+    running = peak = 0
+
+    def writer(i: int):
+        async def write(path: Path) -> None:
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            path.write_bytes(str(i).encode())
+            running -= 1
+        return write
+
+    await asyncio.gather(*(pipeline.fetch(writer(i)) for i in range(6)))
+    assert peak == 2
+
+
+async def test_failed_download_leaves_no_partial_file(tmp_path):
+    pipeline = MediaPipeline(media_dir=tmp_path)
+
+    async def broken(path: Path) -> None:
+        path.write_bytes(b"half")
+        raise ConnectionError("reset")
+
+    try:
+        await pipeline.fetch(broken, ".bin")
+    except ConnectionError:
+        pass
+    assert not any((tmp_path / ".partial").iterdir())
+    assert pipeline.stats["failed"] == 1
+
+
+async def test_quota_evicts_least_recently_used(tmp_path):
+    old = tmp_path / "old.bin"
+    old.write_bytes(b"x" * 600)
+    recent = tmp_path / "recent.bin"
+    recent.write_bytes(b"y" * 300)
+    an_hour_ago = time.time() - 3600
+    os.utime(old, (an_hour_ago, an_hour_ago))
+    os.utime(recent, (an_hour_ago + 60, an_hour_ago + 60))
+
+    pipeline = MediaPipeline(media_dir=tmp_path, quota_bytes=1000, protect_seconds=60)
+    new = await pipeline.fetch(_writer(b"z" * 400), ".bin")
+    assert not old.exists()
+    assert recent.exists() and new.exists()
+    assert pipeline.disk_usage == 700
+    assert pipeline.stats["evicted_bytes"] == 600
+
+
+class FakeTranscriber:
+    def __init__(self):
+        self.calls: list[Path] = []
+
+    async def transcribe(self, path: Path) -> str:
+        self.calls.append(path)
+        await asyncio.sleep(0.01)
+        return f"text of {path.name}"
+
+
+async def test_transcription_jobs_are_shared(tmp_path):
+    transcriber = FakeTranscriber()
+    pipeline = MediaPipeline(media_dir=tmp_path, transcriber=transcriber)
+    path = await pipeline.fetch(_writer(b"ogg"), ".ogg")
+    first, second = pipeline.transcribe(path), pipeline.transcribe(path)
+    assert first is second
+    assert await first == f"text of {path.name}"
+    assert transcriber.calls == [path]
+
+
+class _Channel(BaseChannel):
+    name = "fake"
+
+    async def start(self) -> None: ...
+
+    async def stop(self) -> None: ...
+
+    async def send(self, msg) -> None: ...
+
+
+async def test_channel_forwards_media_messages_in_order():
+    bus = MessageBus()
+    channel = _Channel(config=None, bus=bus)
+
+    async def slow_media() -> dict:
+        await asyncio.sleep(0.05)
+        return {"sender_id": "u", "chat_id": "c", "content": "[voice: transcribed]"}
+
+    await channel._forward_in_order("c", slow_media())  # returns before the download finishes
+    await channel._forward_in_order("c", {"sender_id": "u", "chat_id": "c", "content": "and text"})
+    assert bus.inbound_size == 0
+
+    first = await asyncio.wait_for(bus.consume_inbound(), 1.0)
+    second = await asyncio.wait_for(bus.consume_inbound(), 1.0)
+    assert [first.content, second.content] == ["[voice: transcribed]", "and text"]
+
+
+def test_standalone_channel_pipeline_uses_channel_groq_key():
+    channel = _Channel(config=None, bus=MessageBus())
+    channel.groq_api_key = "gsk-test"
+    pipeline = channel._media_pipeline()
+    assert channel._media_pipeline() is pipeline
+    assert pipeline.transcriber.api_key == "gsk-test"
+
+
+async def test_telegram_media_goes_through_the_bot_and_redacts_token(tmp_path):
+    from types import SimpleNamespace
+
+    from nanobot.channels.telegram import TelegramChannel
+    from nanobot.config.schema import TelegramConfig
+
+    token = "123:secret"
+    downloads: list[str] = []
+
+    class _File:
+        file_size = 3
+        file_path = f"https://api.telegram.org/file/bot{token}/photos/a.jpg"
+
+        async def download_to_drive(self, path):
+            downloads.append(path)
+            Path(path).write_bytes(b"jpg")
+
+    async def get_file(file_id):
+        return _File()
+
+    channel = TelegramChannel(TelegramConfig(token=token), MessageBus())
+    channel.media = MediaPipeline(media_dir=tmp_path)
+    channel._app = SimpleNamespace(bot=SimpleNamespace(get_file=get_file))
+    photo = SimpleNamespace(file_id="f1", file_unique_id="u1", mime_type="image/jpeg")
+
+    path = await channel._download_media(photo, "image")
+    assert path.read_bytes() == b"jpg" and len(downloads) == 1
+    assert token not in channel._redact(f"GET {_File.file_path} failed")
@@ -0,0 +1,107 @@
+"""Tests for the bounded, prioritised message bus."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from nanobot.bus import InboundMessage, MessageBus, Priority, classify_priority
+from nanobot.bus.queue import LaneQueue
+
+
+def _msg(content: str, channel: str = "telegram", **metadata) -> InboundMessage:
+    return InboundMessage(channel=channel, sender_id="u", chat_id="c", content=content, metadata=metadata)
+
+
+def test_classify_priority():
+    assert classify_priority(_msg("dm")) == Priority.INTERACTIVE
+    assert classify_priority(_msg("grp", is_group=True)) == Priority.GROUP
+    assert classify_priority(_msg("grp", channel="feishu", chat_type="group")) == Priority.GROUP
+    assert classify_priority(_msg("grp", channel="discord", guild_id="42")) == Priority.GROUP
+    assert classify_priority(_msg("dm", channel="slack", slack={"channel_type": "im"})) == Priority.INTERACTIVE
+    assert classify_priority(_msg("ch", channel="slack", slack={"channel_type": "channel"})) == Priority.GROUP
+    assert classify_priority(_msg("tick", channel="heartbeat")) == Priority.SCHEDULED
+    assert classify_priority(_msg("done", channel="system")) == Priority.SYSTEM
+    assert classify_priority(_msg("x", is_group=True, priority="interactive")) == Priority.INTERACTIVE
+
+
+async def test_lanes_are_served_by_priority():
+    bus = MessageBus()
+    for msg in (
+        _msg("announce", channel="system"),
+        _msg("group", is_group=True),
+        _msg("cron", channel="cron"),
+        _msg("dm-1"),
+        _msg("dm-2"),
+    ):
+        assert await bus.publish_inbound(msg)
+    order = [(await bus.consume_inbound()).content for _ in range(5)]
+    assert order == ["dm-1", "dm-2", "group", "cron", "announce"]
+
+
+async def test_starved_lane_is_served(monkeypatch):
+    queue = LaneQueue("inbound", maxsize=10, starvation_seconds=5.0)
+    now = [100.0]
+    monkeypatch.setattr("nanobot.bus.queue.time.monotonic", lambda: now[0])
+    queue.put_nowait(_msg("announce", channel="system"))
+    now[0] += 6
+    queue.put_nowait(_msg("dm"))
+    assert (await queue.get()).content == "announce"
+
+
+async def test_full_queue_blocks_publisher_until_consumed():
+    bus = MessageBus(inbound_maxsize=2)
+    await bus.publish_inbound(_msg("a"))
+    await bus.publish_inbound(_msg("b"))
+    blocked = asyncio.create_task(bus.publish_inbound(_msg("c")))
+    await asyncio.sleep(0.01)
+    assert not blocked.done()
+
+    assert (await bus.consume_inbound()).content == "a"
+    assert await asyncio.wait_for(blocked, 1.0) is True
+    assert bus.inbound_size == 2
+
+
+async def test_publish_timeout_and_try_publish_drop():
+    bus = MessageBus(inbound_maxsize=1, publish_timeout=0.02)
+    assert await bus.publish_inbound(_msg("a"))
+    assert await bus.publish_inbound(_msg("b", is_group=True)) is False
+    assert bus.try_publish_inbound(_msg("c")) is False
+
+    metrics = bus.metrics()["inbound"]
+    assert metrics["dropped"] == 2
+    assert metrics["lanes"]["group"]["dropped"] == 1
+    assert metrics["lanes"]["interactive"]["dropped"] == 1
+    assert metrics["depth"] == 1
+
+
+async def test_watermarks_and_capacity_wait():
+    bus = MessageBus(inbound_maxsize=10, high_watermark=0.8, low_watermark=0.3)
+    for i in range(7):
+        bus.try_publish_inbound(_msg(str(i)))
+    assert not bus.inbound_congested
+    bus.try_publish_inbound(_msg("7"))
+    assert bus.inbound_congested
+
+    waiter = asyncio.create_task(bus.wait_for_inbound_capacity())
+    for _ in range(4):
+        await bus.consume_inbound()
+    await asyncio.sleep(0)
+    assert bus.inbound_congested and not waiter.done()  # 4 left, above the low watermark (3)
+
+    await bus.consume_inbound()
+    await asyncio.wait_for(waiter, 1.0)
+    assert not bus.inbound_congested
+
+    metrics = bus.metrics()["inbound"]
+    assert metrics["published"] == 8
+    assert metrics["wait_ms_max"] >= metrics["wait_ms_avg"] >= 0.0
+
+
+async def test_cancelled_consumer_does_not_lose_messages():
+    bus = MessageBus()
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(bus.consume_inbound(), timeout=0.01)
+    await bus.publish_inbound(_msg("after"))
+    assert (await bus.consume_inbound()).content == "after"
@@ -0,0 +1,69 @@
+"""Tests for the memoized model resolver in the provider registry."""
+
+from __future__ import annotations
+
+from nanobot.providers.registry import PROVIDERS, ModelResolver, find_by_name
+
+
+def _linear_find(model: str):
+    """Reference implementation: first standard spec with a matching keyword."""
+    model_lower = model.lower()
+    for spec in PROVIDERS:
+        if spec.is_gateway or spec.is_local:
+            continue
+        if any(kw in model_lower for kw in spec.keywords):
+            return spec
+    return None
+
+
+def test_compiled_lookup_matches_linear_scan():
+    resolver = ModelResolver()
+    models = [
+        "anthropic/claude-opus-4-5",
+        "gpt-4o",
+        "deepseek-chat",
+        "qwen-max",
+        "kimi-k2.5",
+        "glm-4",
+        "llama-3-70b",
+        # Keywords from several providers: registry priority decides, not position.
+        "deepseek-distill-qwen",
+        "qwen-on-claude",
+    ]
+    for model in models:
+        assert resolver.find_by_model(model) is _linear_find(model), model
+
+
+def test_resolve_prefixes_and_caches():
+    resolver = ModelResolver()
+    first = resolver.resolve("qwen-max")
+    assert first.model == "dashscope/qwen-max"
+    assert first.spec is find_by_name("dashscope")
+    assert resolver.resolve("qwen-max") is first
+    assert resolver.cache_info()["hits"] == 1
+    assert resolver.cache_info()["misses"] == 1
+
+
+def test_resolve_gateway_mode_is_cached_per_gateway():
+    resolver = ModelResolver()
+    openrouter = find_by_name("openrouter")
+    via_gateway = resolver.resolve("anthropic/claude-opus-4-5", openrouter)
+    direct = resolver.resolve("anthropic/claude-opus-4-5")
+    assert via_gateway.model == "openrouter/anthropic/claude-opus-4-5"
+    assert via_gateway.spec is openrouter
+    assert direct.model == "anthropic/claude-opus-4-5"
+
+
+def test_overrides_are_resolved_once():
+    resolver = ModelResolver()
+    resolved = resolver.resolve("kimi-k2.5")
+    assert resolved.overrides == {"temperature": 1.0}
+    assert resolver.overrides_for(resolved.model) is resolved.overrides
+    assert resolver.resolve("deepseek-chat").overrides == {}
+
+
+def test_cache_is_bounded():
+    resolver = ModelResolver(max_entries=4)
+    for i in range(10):
+        resolver.resolve(f"gpt-{i}")
+    assert resolver.cache_info()["resolved"] <= 4
@@ -0,0 +1,132 @@
+"""Tests for the offline navigator evaluation runner."""
+
+from __future__ import annotations
+
+import json
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+from nanobot.agents.navigator import RuleEngine
+from nanobot.agents.navigator_eval import (
+    BatchRuleScorer,
+    EvalCase,
+    MockSLMProvider,
+    evaluate,
+    load_cases,
+    run_slm_branch,
+)
+from nanobot.agents.similarity import SequenceSimilarity, ShingleSimilarity
+
+EVAL_PATH = Path(__file__).parent / "eval_navigator_200.json"
+
+
+def _ts(seconds_ago: int) -> str:
+    return (datetime.now(timezone.utc) - timedelta(seconds=seconds_ago)).isoformat()
+
+
+def _varied_cases() -> list[EvalCase]:
+    messages = [
+        "Привет",
+        "Как настроить деплой? Что дальше?",
+        "срочно!!! ошибка в проде, не работает оплата, help",
+        "застрял с миграцией, не получается применить",
+        "подскажи " + "очень длинное описание задачи " * 20 + "?",
+    ]
+    histories = [
+        [],
+        [{"role": "user", "content": "Привет", "timestamp": _ts(30)}],
+        [
+            {"role": "user", "content": "Как настроить деплой? Что дальше?", "timestamp": _ts(900)},
+            {"role": "assistant", "content": "…", "timestamp": _ts(890)},
+            {"role": "user", "content": "Как настроить деплой? Что дальше?", "timestamp": _ts(60)},
+        ],
+        [{"role": "user", "content": "x", "timestamp": _ts(0)}],  # inside cooldown
+    ]
+    return [
+        EvalCase(id=f"c{i}-{j}", user_message=m, history=h)
+        for i, m in enumerate(messages)
+        for j, h in enumerate(histories)
+    ]
+
+
+@pytest.mark.parametrize("config", [{}, {"thresholds": {"complexity_low": 0.2, "complexity_high": 0.5}}])
+def test_batch_scorer_matches_preprocess(config):
+    engine = RuleEngine()
+    cases = _varied_cases()
+    scored = BatchRuleScorer(engine, config).score(cases)
+    for item in scored:
+        decision = engine.preprocess(item.case.user_message, item.case.history, config)
+        assert item.route == decision.route.value, item.case.id
+        assert item.tags == decision.tags
+        assert item.stage == decision.flags["stage"]
+        assert item.complexity == decision.complexity
+
+
+@pytest.mark.parametrize("name, engine_cls", [("sequence", SequenceSimilarity), ("shingle", ShingleSimilarity)])
+def test_scorer_uses_configured_similarity(name, engine_cls):
+    config = {"similarity": name}
+    scorer = BatchRuleScorer(config=config)
+    assert isinstance(scorer.engine.similarity, engine_cls)
+
+    engine = RuleEngine(similarity=engine_cls())
+    for item in scorer.score(_varied_cases()):
+        decision = engine.preprocess(item.case.user_message, item.case.history, config)
+        assert item.metrics["repeat_score"] == decision.metrics["repeat_score"]
+        assert item.route == decision.route.value
+
+
+def test_load_template_and_report():
+    cases = load_cases(EVAL_PATH)
+    assert len(cases) == 24
+    assert all(c.expected_route for c in cases)
+
+    scored, report = evaluate(cases)
+    assert report["cases"] == 24
+    assert report["labelled_routes"] == 24
+    confusion_total = sum(sum(row.values()) for row in report["confusion"].values())
+    assert confusion_total == 24
+    assert sum(report["route_distribution"].values()) == 24
+    assert 0.0 <= report["route_accuracy"] <= 1.0
+
+
+def test_load_case_and_session_jsonl(tmp_path):
+    cases_file = tmp_path / "cases.jsonl"
+    cases_file.write_text("\n".join(json.dumps(row, ensure_ascii=False) for row in [
+        {"id": "a", "user_message": "Привет", "expected_route": "TEMPLATE", "expected_tags": []},
+        {"id": "b", "user_message": "ошибка, help", "expected_route": "NO_ACTION|TEMPLATE|SLM|FALLBACK"},
+    ]), encoding="utf-8")
+    session_file = tmp_path / "telegram_1.jsonl"
+    session_file.write_text("\n".join(json.dumps(row, ensure_ascii=False) for row in [
+        {"_type": "metadata", "created_at": "2026-02-18T10:00:00"},
+        {"role": "user", "content": "первый", "timestamp": "2026-02-18T10:00:00"},
+        {"role": "assistant", "content": "ok", "timestamp": "2026-02-18T10:00:01"},
+        {"role": "user", "content": "первый", "timestamp": "2026-02-18T10:00:02"},
+    ]), encoding="utf-8")
+
+    cases = load_cases(tmp_path)
+    by_id = {c.id: c for c in cases}
+    assert by_id["a"].expected_route == "TEMPLATE"
+    assert by_id["b"].expected_route is None  # template placeholder is not a label
+    replay = by_id["telegram_1#2"]
+    assert len(replay.history) == 2
+
+    scored, report = evaluate(cases)
+    second_turn = next(s for s in scored if s.case.id == "telegram_1#2")
+    # Idle time is measured to the turn's own timestamp (1s), i.e. inside the cooldown.
+    assert second_turn.metrics["idle_sec"] == 1.0
+    assert second_turn.route == "NO_ACTION"
+    assert report["tag_accuracy"] is not None
+
+
+async def test_mock_slm_branch():
+    case = EvalCase(id="s", user_message="Как настроить деплой? Что дальше?")
+    scored, _ = evaluate([case] * 5)
+    assert all(s.route == "SLM" for s in scored)
+
+    ok = await run_slm_branch(scored, MockSLMProvider(latency_ms=1, jitter_ms=0))
+    assert ok["calls"] == 5 and ok["hints"] == 5
+
+    broken = await run_slm_branch(scored, MockSLMProvider(latency_ms=1, jitter_ms=0, failure_rate=1.0))
+    assert broken["fallbacks"] == 5
@@ -0,0 +1,109 @@
+"""Tests for the navigator hint cache."""
+
+from __future__ import annotations
+
+import json
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+
+from nanobot.agents.hint_cache import HintCache, hint_fingerprint
+from nanobot.agents.navigator import NavigatorAgent, RouteDecision, RuleEngine
+from nanobot.providers.base import LLMProvider, LLMResponse
+
+CONFIG = {"thresholds": {"complexity_low": 0.30, "complexity_high": 0.75}}
+
+
+class CountingProvider(LLMProvider):
+    def __init__(self) -> None:
+        super().__init__(api_key=None, api_base=None)
+        self.calls = 0
+
+    async def chat(self, messages, tools=None, model=None, max_tokens=4096, temperature=0.7) -> LLMResponse:
+        self.calls += 1
+        return LLMResponse(
+            content='{"hint":"Воспроизведи ошибку локально.","focus":"stacktrace"}',
+            usage={"prompt_tokens": 18, "completion_tokens": 9},
+        )
+
+    def get_default_model(self) -> str:
+        return "dummy/model"
+
+
+def _history(content: str) -> list[dict[str, Any]]:
+    ts = (datetime.now(timezone.utc) - timedelta(seconds=30)).isoformat()
+    return [{"role": "user", "content": content, "timestamp": ts}]
+
+
+def _payload(message: str, previous: str = "старое") -> dict[str, Any]:
+    decision = RuleEngine().preprocess(message, _history(previous), CONFIG)
+    assert decision.route == RouteDecision.SLM
+    return decision.llm_payload
+
+
+def test_fingerprint_ignores_free_text_but_not_rule_view():
+    a = _payload("У меня ошибка, не понимаю как починить?", previous="одно")
+    b = _payload("У меня ошибка, не понимаю как исправить?", previous="другое")
+    assert hint_fingerprint(a, "m") == hint_fingerprint(b, "m")
+    assert hint_fingerprint(a, "m") != hint_fingerprint(a, "other-model")
+    assert hint_fingerprint(a, "m", text_mode="keywords") != hint_fingerprint(b, "m", text_mode="keywords")
+
+    c = _payload("Как настроить деплой? Что дальше?")  # no "issue" tag
+    assert hint_fingerprint(a, "m") != hint_fingerprint(c, "m")
+
+
+def test_cache_ttl_and_lru(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("nanobot.agents.hint_cache.time.monotonic", lambda: now[0])
+    cache = HintCache(ttl_seconds=10, max_entries=2)
+    for key in ("a", "b"):
+        cache.put(key, hint=key, focus="", latency_ms=100.0, tokens_in=1, tokens_out=1)
+    assert cache.get("a").hint == "a"  # "b" is now least recently used
+    cache.put("c", hint="c", focus="", latency_ms=100.0, tokens_in=1, tokens_out=1)
+    assert cache.get("b") is None
+    assert cache.get("c") is not None
+
+    now[0] += 11
+    assert cache.get("a") is None
+    assert cache.stats() == {
+        "entries": 1,
+        "hits": 2,
+        "misses": 2,
+        "hit_rate": 0.5,
+        "latency_saved_ms": 200.0,
+    }
+
+
+async def test_navigator_reuses_hint_and_logs_savings(tmp_path: Path):
+    provider = CountingProvider()
+    log_path = tmp_path / "navigator_pilot.jsonl"
+    navigator = NavigatorAgent(provider=provider, log_path=str(log_path), hint_cache=HintCache())
+
+    first = await navigator.analyze(_history("одно"), "У меня ошибка, не понимаю как починить?", CONFIG, "u:1")
+    second = await navigator.analyze(_history("другое"), "У меня ошибка, не понимаю как починить?", CONFIG, "u:1")
+
+    assert provider.calls == 1
+    assert first.route == second.route == RouteDecision.SLM.value
+    assert second.hint == first.hint
+    assert second.metrics["tokens_in"] == 0
+
+    events = [json.loads(line) for line in log_path.read_text(encoding="utf-8").splitlines()]
+    assert [e["hint_cache"] for e in events] == ["miss", "hit"]
+    assert events[1]["hint_cache_hit_rate"] == 0.5
+    assert events[1]["latency_saved_ms"] == first.metrics["latency_ms"]
+
+
+async def test_sessions_do_not_share_hints(tmp_path: Path):
+    provider = CountingProvider()
+    navigator = NavigatorAgent(
+        provider=provider,
+        log_path=str(tmp_path / "navigator_pilot.jsonl"),
+        hint_cache=HintCache(text_mode="none"),
+    )
+    message = "У меня ошибка, не понимаю как починить?"
+
+    first = await navigator.analyze(_history("одно"), message, CONFIG, "telegram:alice")
+    second = await navigator.analyze(_history("одно"), message, CONFIG, "telegram:bob")
+
+    assert provider.calls == 2
+    assert first.metrics["hint_cache"] == second.metrics["hint_cache"] == "miss"
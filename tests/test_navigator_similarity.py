@@ -0,0 +1,101 @@
+"""Tests for the navigator's pluggable repeat-detection similarity engines."""
+
+from __future__ import annotations
+
+import json
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from difflib import SequenceMatcher
+from pathlib import Path
+
+import pytest
+
+from nanobot.agents.navigator import RuleEngine
+from nanobot.agents.similarity import (
+    HybridSimilarity,
+    SequenceSimilarity,
+    ShingleSimilarity,
+    get_similarity_engine,
+)
+
+EVAL_PATH = Path(__file__).parent / "eval_navigator_200.json"
+REPEAT_THRESHOLD = 0.90
+
+
+def _seed_messages() -> list[str]:
+    data = json.loads(EVAL_PATH.read_text(encoding="utf-8"))
+    return [m for bucket in data["bucket_templates"] for m in bucket["seed_examples"]]
+
+
+def _edited(text: str, rng: random.Random, edits: int) -> str:
+    chars = list(text)
+    for _ in range(edits):
+        chars[rng.randrange(len(chars))] = rng.choice("abcxyz ")
+    return "".join(chars)
+
+
+def _long_text(rng: random.Random, size: int) -> str:
+    words = ["error", "timeout", "request", "retry", "stack", "frame", "ошибка", "сервер", "лог", "файл"]
+    return " ".join(f"{rng.choice(words)}{rng.randrange(1000)}" for _ in range(size // 8))[:size]
+
+
+def _history(previous: str) -> list[dict]:
+    ts = (datetime.now(timezone.utc) - timedelta(seconds=30)).isoformat()
+    return [
+        {"role": "user", "content": "начало", "timestamp": ts},
+        {"role": "assistant", "content": "ok", "timestamp": ts},
+        {"role": "user", "content": previous, "timestamp": ts},
+    ]
+
+
+def test_eval_seed_routing_is_unchanged():
+    """Hybrid engine reproduces the SequenceMatcher decisions on the eval seeds."""
+    reference = RuleEngine(similarity=SequenceSimilarity())
+    hybrid = RuleEngine()
+    rng = random.Random(7)
+    seeds = _seed_messages()
+    assert seeds
+
+    pairs = [(a, b) for a in seeds for b in seeds]
+    pairs += [(s, _edited(s, rng, 1)) for s in seeds if len(s) > 10]
+    for current, previous in pairs:
+        ref = reference.preprocess(current, _history(previous), config={})
+        new = hybrid.preprocess(current, _history(previous), config={})
+        assert new.route == ref.route, (current, previous)
+        assert new.flags["stage"] == ref.flags["stage"]
+        assert new.metrics["repeat_score"] == ref.metrics["repeat_score"]
+
+
+@pytest.mark.parametrize("size", [2_000, 6_000])
+def test_long_messages_agree_on_repeat_threshold(size):
+    # Compared with the true ratio: above 200 chars SequenceMatcher's default
+    # autojunk heuristic scores near-duplicate pastes far too low.
+    rng = random.Random(size)
+    hybrid = HybridSimilarity()
+    base = _long_text(rng, size)
+    cases = [
+        (base, base),
+        (base, _edited(base, rng, size // 500)),
+        (base, _long_text(rng, size)),
+        (base, base[: size // 3]),
+    ]
+    for left, right in cases:
+        expected = SequenceMatcher(None, left, right, autojunk=False).ratio() > REPEAT_THRESHOLD
+        assert (hybrid.score(left, right) > REPEAT_THRESHOLD) == expected
+
+
+def test_shingle_cost_is_bounded():
+    rng = random.Random(1)
+    left, right = _long_text(rng, 200_000), _long_text(rng, 200_000)
+    engine = HybridSimilarity()
+    started = time.perf_counter()
+    engine.score(left, right)
+    assert time.perf_counter() - started < 0.5
+
+
+def test_engine_factory():
+    assert isinstance(get_similarity_engine("shingle"), ShingleSimilarity)
+    assert get_similarity_engine().score("", "x") == 0.0
+    with pytest.raises(ValueError):
+        get_similarity_engine("levenshtein")
@@ -0,0 +1,98 @@
+"""Tests for running the navigator concurrently with context building."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+from nanobot.agent.loop import AgentLoop
+from nanobot.agents.navigator import NavigatorResult
+from nanobot.config.schema import NavigatorConfig
+
+
+class _SlowNavigator:
+    def __init__(self, delay: float, fail: bool = False):
+        self.delay = delay
+        self.fail = fail
+
+    async def analyze(self, session_history, user_message, config=None, conversation_id="unknown"):
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("slm down")
+        return NavigatorResult(route="slm", hint="check the calendar first", metrics={}, complexity=0.5)
+
+
+class _GatedNavigator:
+    """Finishes only once the test sets ``release``."""
+
+    def __init__(self):
+        self.release = asyncio.Event()
+
+    async def analyze(self, session_history, user_message, config=None, conversation_id="unknown"):
+        await self.release.wait()
+        return NavigatorResult(route="slm", hint="check the calendar first", metrics={}, complexity=0.5)
+
+
+def _loop(navigator, deadline_ms: int = 0) -> AgentLoop:
+    # Only the navigator helpers are exercised; skip the heavy constructor.
+    loop = AgentLoop.__new__(AgentLoop)
+    loop.navigator = navigator
+    loop.navigator_config = NavigatorConfig(hint_deadline_ms=deadline_ms)
+    return loop
+
+
+def _messages() -> list[dict]:
+    return [{"role": "system", "content": "base prompt"}, {"role": "user", "content": "hi"}]
+
+
+async def test_without_deadline_waits_for_hint():
+    agent = _loop(_SlowNavigator(0.05))
+    started = time.monotonic()
+    task = asyncio.create_task(agent._run_navigator([], "hi", {}, "cli:1"))
+    assert await agent._wait_for_navigator(task, started)
+
+    messages = _messages()
+    agent._apply_navigator_task(messages, task)
+    assert "<navigator_hint>" in messages[0]["content"]
+    assert "check the calendar first" in messages[0]["content"]
+
+
+async def test_deadline_mode_proceeds_without_hint():
+    navigator = _GatedNavigator()
+    agent = _loop(navigator, deadline_ms=20)
+    task = asyncio.create_task(agent._run_navigator([], "hi", {}, "cli:1"))
+
+    # The navigator never finishes on its own; returning at all proves the deadline path.
+    assert not await asyncio.wait_for(agent._wait_for_navigator(task, time.monotonic()), 1.0)
+    assert not task.done()  # keeps running so a later iteration can use it
+
+    navigator.release.set()
+    await task
+    messages = _messages()
+    agent._apply_navigator_task(messages, task)
+    assert "<navigator_hint>" in messages[0]["content"]
+
+
+async def test_deadline_counts_time_spent_building_context():
+    navigator = _GatedNavigator()
+    agent = _loop(navigator, deadline_ms=100)
+    started = time.monotonic() - 0.2  # context building used up the whole budget
+    task = asyncio.create_task(agent._run_navigator([], "hi", {}, "cli:1"))
+    await asyncio.sleep(0)
+
+    assert not await asyncio.wait_for(agent._wait_for_navigator(task, started), 1.0)
+    assert not task.done()
+
+    # A hint finished while the context was built is still used past the deadline.
+    navigator.release.set()
+    await task
+    assert await agent._wait_for_navigator(task, started)
+
+
+async def test_navigator_failure_yields_no_hint():
+    agent = _loop(_SlowNavigator(0, fail=True))
+    task = asyncio.create_task(agent._run_navigator([], "hi", {}, "cli:1"))
+    assert await agent._wait_for_navigator(task, time.monotonic())
+    messages = _messages()
+    agent._apply_navigator_task(messages, task)
+    assert messages[0]["content"] == "base prompt"
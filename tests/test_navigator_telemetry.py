@@ -0,0 +1,90 @@
+"""Tests for the buffered navigator pilot log writer."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+
+from dashboard.utils.navigator import load_navigator_events
+from nanobot.agents.telemetry import NavigatorLogWriter, index_path, read_tail, segment_path
+
+
+def _event(i: int) -> dict:
+    return {"seq": i, "route": "SLM", "padding": "x" * 40}
+
+
+async def test_writes_are_batched_off_the_request_path(tmp_path):
+    path = tmp_path / "pilot.jsonl"
+    writer = NavigatorLogWriter(path, batch_size=100, flush_interval=0.05)
+    for i in range(10):
+        writer.write(_event(i))
+    assert not path.exists()  # nothing on disk until the timer fires
+
+    await asyncio.sleep(0.2)
+    assert [e["seq"] for e in read_tail(path, 0)] == list(range(10))
+    writer.close()
+
+
+def test_ring_buffer_drops_oldest(tmp_path):
+    path = tmp_path / "pilot.jsonl"
+    writer = NavigatorLogWriter(path, buffer_size=5, batch_size=100)
+    for i in range(8):
+        writer.write(_event(i))  # no running loop and below batch size: buffered only
+    writer.close()
+    assert [e["seq"] for e in read_tail(path, 0)] == [3, 4, 5, 6, 7]
+    assert writer.stats["dropped"] == 3
+
+
+def test_size_rotation_gzips_and_tail_spans_segments(tmp_path):
+    path = tmp_path / "pilot.jsonl"
+    writer = NavigatorLogWriter(path, flush_interval=0, max_bytes=2_000, keep_segments=2)
+    for i in range(200):
+        writer.write(_event(i))
+
+    assert writer.stats["rotations"] > 2
+    assert segment_path(path, 1).exists() and segment_path(path, 2).exists()
+    assert not segment_path(path, 3).exists()
+    assert path.stat().st_size < 2_000 + 100
+
+    active = len(path.read_text(encoding="utf-8").splitlines())
+    tail = read_tail(path, active + 10)
+    assert [e["seq"] for e in tail] == list(range(200 - active - 10, 200))
+
+
+def test_time_rotation(tmp_path, monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr("nanobot.agents.telemetry.time.time", lambda: now[0])
+    path = tmp_path / "pilot.jsonl"
+    writer = NavigatorLogWriter(path, flush_interval=0, max_bytes=0, rotate_seconds=3600)
+    writer.write(_event(0))
+    now[0] += 3601
+    writer.write(_event(1))
+    assert writer.stats["rotations"] == 1
+    assert [e["seq"] for e in read_tail(path, 10)] == [0, 1]
+
+
+def test_tail_uses_index_and_survives_legacy_files(tmp_path):
+    path = tmp_path / "pilot.jsonl"
+    # A log written before the index existed: the writer rebuilds it.
+    path.write_text("".join(json.dumps(_event(i)) + "\n" for i in range(1000)), encoding="utf-8")
+    writer = NavigatorLogWriter(path, flush_interval=0, max_bytes=0)
+    writer.write(_event(1000))
+
+    index = json.loads(index_path(path).read_text(encoding="utf-8"))
+    assert index["lines"] == 1001
+    assert index["size"] == path.stat().st_size
+    assert [e["seq"] for e in read_tail(path, 3)] == [998, 999, 1000]
+
+    # Stale index (file appended elsewhere) falls back to a full read.
+    with path.open("a", encoding="utf-8") as handle:
+        handle.write(json.dumps(_event(1001)) + "\n")
+    assert [e["seq"] for e in read_tail(path, 2)] == [1000, 1001]
+
+
+def test_dashboard_reads_tail(tmp_path):
+    path = tmp_path / "pilot.jsonl"
+    writer = NavigatorLogWriter(path, flush_interval=0)
+    for i in range(50):
+        writer.write(_event(i))
+    events = load_navigator_events(limit=20, config={"navigator": {"log_path": str(path)}})
+    assert [e["seq"] for e in events] == list(range(30, 50))
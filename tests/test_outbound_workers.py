@@ -0,0 +1,144 @@
+"""Tests for per-channel outbound delivery workers."""
+
+from __future__ import annotations
+
+import asyncio
+import smtplib
+
+import httpx
+from telegram.error import BadRequest, ChatMigrated, Forbidden, TimedOut
+
+from nanobot.bus.events import OutboundMessage
+from nanobot.channels.outbound import ChannelOutboundWorker, is_transient_send_error
+
+
+class FakeChannel:
+    def __init__(self, delay: float = 0.0, failures: list[BaseException] | None = None):
+        self.delay = delay
+        self.failures = list(failures or [])
+        self.sent: list[tuple[str, str]] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def send(self, msg: OutboundMessage) -> None:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            if self.failures:
+                raise self.failures.pop(0)
+            self.sent.append((msg.chat_id, msg.content))
+        finally:
+            self.in_flight -= 1
+
+
+class FloodWaitError(Exception):
+    def __init__(self, retry_after: float):
+        super().__init__("flood")
+        self.retry_after = retry_after
+
+
+FloodWaitError.__name__ = "RetryAfter"
+
+
+def _msg(chat: str, text: str) -> OutboundMessage:
+    return OutboundMessage(channel="fake", chat_id=chat, content=text)
+
+
+async def _drain(worker: ChannelOutboundWorker) -> None:
+    await asyncio.wait_for(asyncio.gather(*worker._tasks), 2.0)
+
+
+async def test_slow_channel_does_not_block_others():
+    slow = ChannelOutboundWorker("email", FakeChannel(delay=0.3))
+    fast_channel = FakeChannel()
+    fast = ChannelOutboundWorker("telegram", fast_channel)
+    slow.submit(_msg("a", "slow"))
+    fast.submit(_msg("b", "fast"))
+    await asyncio.wait_for(_drain(fast), 0.1)
+    assert fast_channel.sent == [("b", "fast")]
+    await _drain(slow)
+
+
+async def test_per_chat_order_and_concurrency_limit():
+    channel = FakeChannel(delay=0.01)
+    worker = ChannelOutboundWorker("fake", channel, concurrency=2)
+    for i in range(5):
+        for chat in ("x", "y", "z"):
+            worker.submit(_msg(chat, str(i)))
+    await _drain(worker)
+
+    for chat in ("x", "y", "z"):
+        assert [text for c, text in channel.sent if c == chat] == ["0", "1", "2", "3", "4"]
+    assert channel.max_in_flight == 2
+    metrics = worker.metrics()
+    assert metrics["sent"] == 15 and metrics["pending"] == 0
+    assert metrics["latency_ms_p95"] >= metrics["latency_ms_p50"] > 0
+
+
+async def test_transient_failures_are_retried():
+    channel = FakeChannel(failures=[ConnectionResetError("reset"), FloodWaitError(0.01)])
+    worker = ChannelOutboundWorker("fake", channel, base_delay=0.001)
+    worker.submit(_msg("a", "hello"))
+    await _drain(worker)
+    assert channel.sent == [("a", "hello")]
+    assert worker.stats["retries"] == 2 and worker.stats["failed"] == 0
+
+
+async def test_permanent_failure_is_not_retried():
+    channel = FakeChannel(failures=[ValueError("bad chat id")])
+    worker = ChannelOutboundWorker("fake", channel, base_delay=0.001)
+    worker.submit(_msg("a", "1"))
+    worker.submit(_msg("a", "2"))
+    await _drain(worker)
+    assert channel.sent == [("a", "2")]  # later messages still go out
+    assert worker.stats == {"sent": 1, "failed": 1, "retries": 0, "dropped": 0}
+
+
+async def test_backlog_limit_drops():
+    worker = ChannelOutboundWorker("fake", FakeChannel(delay=0.01), queue_size=2)
+    assert worker.submit(_msg("a", "1"))
+    assert worker.submit(_msg("a", "2"))
+    assert not worker.submit(_msg("b", "3"))
+    await _drain(worker)
+    assert worker.metrics()["dropped"] == 1
+
+
+def test_transient_classification():
+    assert is_transient_send_error(asyncio.TimeoutError())
+    assert is_transient_send_error(smtplib.SMTPServerDisconnected("gone"))
+    assert is_transient_send_error(smtplib.SMTPResponseException(421, b"try later"))
+    assert not is_transient_send_error(smtplib.SMTPAuthenticationError(535, b"bad credentials"))
+    assert not is_transient_send_error(FileNotFoundError("media.png"))
+    assert not is_transient_send_error(ValueError("nope"))
+
+
+def test_telegram_permanent_errors_are_not_transient():
+    assert not is_transient_send_error(BadRequest("Chat not found"))
+    assert not is_transient_send_error(Forbidden("bot was blocked by the user"))
+    assert not is_transient_send_error(ChatMigrated(-100123))
+    assert is_transient_send_error(TimedOut())
+
+
+def test_http_status_errors_are_classified_by_code():
+    def status_error(code: int) -> httpx.HTTPStatusError:
+        request = httpx.Request("POST", "https://api.example.com/send")
+        return httpx.HTTPStatusError("send failed", request=request, response=httpx.Response(code, request=request))
+
+    assert is_transient_send_error(status_error(429))
+    assert is_transient_send_error(status_error(503))
+    assert not is_transient_send_error(status_error(400))
+
+
+class FalseChannel:
+    async def send(self, msg: OutboundMessage) -> bool:
+        return False
+
+
+async def test_false_return_counts_as_failure():
+    worker = ChannelOutboundWorker("fake", FalseChannel())
+    worker.submit(_msg("a", "1"))
+    await _drain(worker)
+    metrics = worker.metrics()
+    assert metrics["sent"] == 0 and metrics["failed"] == 1
+    assert metrics["latency_ms_p50"] == 0.0
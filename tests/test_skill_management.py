@@ -1,10 +1,12 @@
 """Tests for the Skills Management System."""
 
+import sqlite3
 import tempfile
 from pathlib import Path
 
 import pytest
 
+from nanobot.agent.skill_graph import SkillDependencyGraph
 from nanobot.agent.skill_manager import SkillManager
 from nanobot.agent.skill_repository import SkillRepository
 
@@ -30,6 +32,31 @@ def skill_manager(temp_storage):
     return SkillManager(temp_storage, auto_sync=False)
 
 
+def _create_legacy_db(db_path: Path) -> None:
+    """Write a skills database from before the always_load column."""
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        """
+        CREATE TABLE skills (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT UNIQUE NOT NULL,
+            skill_type TEXT NOT NULL DEFAULT 'basic',
+            description TEXT,
+            content TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            usage_count INTEGER DEFAULT 0,
+            success_count INTEGER DEFAULT 0,
+            version INTEGER DEFAULT 1
+        )
+        """
+    )
+    conn.execute("INSERT INTO skills (name, content) VALUES ('legacy', 'Legacy')")
+    conn.execute("INSERT INTO skills (name, content) VALUES ('other', 'Other')")
+    conn.commit()
+    conn.close()
+
+
 class TestSkillRepository:
     """Test SkillRepository functionality."""
     
@@ -135,7 +162,7 @@ class TestSkillRepository:
         assert stats["success_rate"] == pytest.approx(2 / 3)
     
     def test_execution_history(self, repository):
-        """Test JSONL execution history."""
+        """Test execution history."""
         repository.add_skill("logged_skill", "Content")
         
         repository.record_execution(
@@ -151,6 +178,46 @@ class TestSkillRepository:
         assert history[0]["execution_time_ms"] == 50.0
         assert history[0]["context"]["user"] == "test"
     
+    def test_history_filters_and_limit(self, repository):
+        """History returns the most recent records with filters applied."""
+        repository.add_skill("busy", "Content")
+        for i in range(10):
+            repository.record_execution("busy", success=i % 2 == 0, context={"i": i})
+        
+        recent = repository.get_skill_history("busy", limit=3)
+        assert [r["context"]["i"] for r in recent] == [7, 8, 9]
+        
+        failures = repository.get_skill_history("busy", success=False)
+        assert [r["context"]["i"] for r in failures] == [1, 3, 5, 7, 9]
+        
+        assert repository.get_skill_history("busy", since="2000-01-01", until="2000-01-02") == []
+    
+    def test_history_retention(self, repository):
+        """prune_history keeps the newest records per skill."""
+        repository.add_skill("pruned", "Content")
+        for i in range(5):
+            repository.record_execution("pruned", success=True, context={"i": i})
+        
+        assert repository.prune_history(max_records=2) == 3
+        history = repository.get_skill_history("pruned")
+        assert [r["context"]["i"] for r in history] == [3, 4]
+    
+    def test_legacy_jsonl_history_migrated(self, temp_storage):
+        """Legacy JSONL history files are imported on startup."""
+        history_dir = temp_storage / "history"
+        history_dir.mkdir()
+        (history_dir / "old_skill.jsonl").write_text(
+            '{"timestamp": "2024-01-01T00:00:00", "success": true, '
+            '"execution_time_ms": 5.0, "context": {"k": "v"}}\n',
+            encoding="utf-8",
+        )
+        
+        repo = SkillRepository(temp_storage / "skills.db")
+        history = repo.get_skill_history("old_skill")
+        assert len(history) == 1
+        assert history[0]["context"] == {"k": "v"}
+        assert not (history_dir / "old_skill.jsonl").exists()
+    
     def test_delete_skill(self, repository):
         """Test deleting a skill."""
         repository.add_skill("deletable", "Content")
@@ -163,6 +230,174 @@ class TestSkillRepository:
         assert repository.get_skill("deletable") is None
 
 
+class TestSkillRepositoryCache:
+    """Test the in-memory read-through cache."""
+    
+    def test_reads_served_from_cache(self, repository, monkeypatch):
+        """Repeated reads do not open new connections."""
+        repository.add_skill("cached", "Content", tags=["a"])
+        assert repository.get_skill("cached")["content"] == "Content"
+        
+        def fail():
+            raise AssertionError("unexpected SQLite connection")
+        
+        monkeypatch.setattr(repository, "_get_connection", fail)
+        assert repository.get_skill("cached")["tags"] == ["a"]
+        assert [s["name"] for s in repository.list_skills(tags=["a"])] == ["cached"]
+    
+    def test_returned_skill_is_a_copy(self, repository):
+        """Mutating a returned skill does not corrupt the cache."""
+        repository.add_skill("immutable", "Content", tags=["x"])
+        skill = repository.get_skill("immutable")
+        skill["tags"].append("y")
+        skill["content"] = "changed"
+        
+        fresh = repository.get_skill("immutable")
+        assert fresh["tags"] == ["x"]
+        assert fresh["content"] == "Content"
+    
+    def test_generation_bumped_on_writes(self, repository):
+        """add/update/delete bump the generation counter."""
+        gen = repository.generation
+        repository.add_skill("gen", "v1")
+        assert repository.generation > gen
+        
+        gen = repository.generation
+        repository.update_skill("gen", "v2")
+        assert repository.generation > gen
+        assert repository.get_skill("gen")["content"] == "v2"
+        
+        gen = repository.generation
+        repository.delete_skill("gen")
+        assert repository.generation > gen
+        assert repository.get_skill("gen") is None
+    
+    def test_external_write_detected(self, temp_storage):
+        """A write from another connection invalidates the cache."""
+        db_path = temp_storage / "shared.db"
+        reader = SkillRepository(db_path)
+        writer = SkillRepository(db_path)
+        
+        writer.add_skill("shared", "v1")
+        assert reader.get_skill("shared")["content"] == "v1"
+        
+        gen = reader.generation
+        writer.update_skill("shared", "v2")
+        assert reader.get_skill("shared")["content"] == "v2"
+        assert reader.generation > gen
+
+
+class TestAlwaysLoadSkills:
+    """Test the always_load column and cached prompt bundle."""
+    
+    def test_always_load_flag(self, repository):
+        """always_load is stored in SQLite and listed from the cache."""
+        repository.add_skill("core", "Core content", always_load=True)
+        repository.add_skill("optional", "Optional content")
+        
+        assert repository.get_skill("core")["always_load"] is True
+        assert repository.get_skill("optional")["always_load"] is False
+        assert [s["name"] for s in repository.list_always_load_skills()] == ["core"]
+        
+        repository.set_always_load(["optional"])
+        names = [s["name"] for s in repository.list_always_load_skills()]
+        assert names == ["core", "optional"]
+    
+    def test_bundle_rebuilt_on_change(self, repository):
+        """The pre-rendered bundle follows skill updates."""
+        repository.add_skill("core", "v1", always_load=True)
+        names, bundle = repository.get_always_load_bundle()
+        assert names == ["core"]
+        assert bundle == "### Skill: core\n\nv1"
+        assert repository.get_always_load_bundle()[1] is bundle
+        
+        repository.update_skill("core", "v2")
+        assert repository.get_always_load_bundle()[1] == "### Skill: core\n\nv2"
+    
+    def test_migration_from_vector_metadata(self, temp_storage, monkeypatch):
+        """Legacy databases get the column and flags from the vector index."""
+        from nanobot.agent.skill_vector_search import SkillVectorSearch
+        
+        _create_legacy_db(temp_storage / "skills.db")
+        
+        monkeypatch.setattr(
+            SkillVectorSearch,
+            "get_by_filter",
+            lambda self, where: [{"skill_name": "legacy", "content": "", "metadata": {}}],
+        )
+        manager = SkillManager(temp_storage, auto_sync=False)
+        
+        assert [s["name"] for s in manager.list_always_load_skills()] == ["legacy"]
+        assert not SkillRepository(temp_storage / "skills.db").always_load_migration_pending
+    
+    def test_interrupted_migration_is_retried(self, temp_storage, monkeypatch):
+        """The pending migration survives a restart until it succeeds."""
+        from nanobot.agent.skill_vector_search import SkillVectorSearch
+        
+        _create_legacy_db(temp_storage / "skills.db")
+        
+        def unavailable(self, where):
+            raise RuntimeError("vector index unavailable")
+        
+        monkeypatch.setattr(SkillVectorSearch, "get_by_filter", unavailable)
+        with pytest.raises(RuntimeError):
+            SkillManager(temp_storage, auto_sync=False)
+        assert SkillRepository(temp_storage / "skills.db").always_load_migration_pending
+        
+        monkeypatch.setattr(
+            SkillVectorSearch,
+            "get_by_filter",
+            lambda self, where: [{"skill_name": "legacy", "content": "", "metadata": {}}],
+        )
+        manager = SkillManager(temp_storage, auto_sync=False)
+        assert [s["name"] for s in manager.list_always_load_skills()] == ["legacy"]
+        assert not manager.repository.always_load_migration_pending
+
+
+class TestSkillDependencyGraph:
+    """Test the materialized dependency graph."""
+    
+    def test_transitive_dependencies(self):
+        """Closures follow dependencies through intermediate skills."""
+        graph = SkillDependencyGraph({"a": ["b"], "b": ["c"], "c": []})
+        assert graph.transitive_dependencies("a") == {"b", "c"}
+        assert graph.transitive_dependencies("c") == frozenset()
+    
+    def test_topological_order_through_missing_member(self):
+        """Ordering respects dependencies via skills outside the subset."""
+        graph = SkillDependencyGraph({"a": ["b"], "b": ["c"], "c": [], "d": []})
+        assert graph.topological_order(["a", "d", "c"]) == ["d", "c", "a"]
+    
+    def test_cycles(self):
+        """Cycles are detected and make ordering impossible."""
+        graph = SkillDependencyGraph({"a": ["b"], "b": ["a"], "c": ["c"], "d": []})
+        assert sorted(graph.find_cycles()) == [["a", "b"], ["c"]]
+        assert graph.topological_order(["a", "b"]) is None
+        assert graph.topological_order(["d"]) == ["d"]
+    
+    def test_repository_graph_refreshed_on_write(self, repository):
+        """The repository rebuilds its graph only after writes."""
+        repository.add_skill("base", "Base")
+        graph = repository.get_dependency_graph()
+        assert repository.get_dependency_graph() is graph
+        
+        repository.add_skill("top", "Top", dependencies=["base"])
+        graph = repository.get_dependency_graph()
+        assert graph.dependencies("top") == ("base",)
+    
+    def test_composer_orders_by_dependencies(self, skill_manager):
+        """SkillComposer orders compositions using the graph."""
+        skill_manager.add_skill("base", "Base")
+        skill_manager.add_skill("top", "Top", dependencies=["base"])
+        composition = [
+            {"skill": skill_manager.get_skill("top")},
+            {"skill": skill_manager.get_skill("base")},
+        ]
+        ordered = skill_manager.composer._resolve_dependencies(composition)
+        assert [item["skill"]["name"] for item in ordered] == ["base", "top"]
+        assert skill_manager.composer.validate_composition(ordered)["valid"]
+
+
 class TestSkillManager:
     """Test SkillManager functionality."""
     
@@ -0,0 +1,174 @@
+"""Tests for the rate-limit-aware Telegram sender."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pytest
+from telegram.error import BadRequest, ChatMigrated, Forbidden
+
+from nanobot.channels.telegram_sender import PendingSend, RateBucket, TelegramSender
+
+
+class FloodWaitError(Exception):
+    def __init__(self, retry_after: float):
+        super().__init__("flood")
+        self.retry_after = retry_after
+
+
+FloodWaitError.__name__ = "RetryAfter"
+
+
+class FakeBot:
+    def __init__(
+        self,
+        failures: list[BaseException] | None = None,
+        edit_failures: list[BaseException] | None = None,
+    ):
+        self.failures = list(failures or [])
+        self.edit_failures = list(edit_failures or [])
+        self.calls: list[tuple] = []
+        self.times: list[float] = []
+        self._next_id = 100
+
+    async def send_text(self, chat_id: int, text: str, markup) -> int:
+        self.times.append(time.monotonic())
+        if self.failures:
+            raise self.failures.pop(0)
+        self._next_id += 1
+        self.calls.append(("send", chat_id, text, markup))
+        return self._next_id
+
+    async def edit_text(self, chat_id: int, message_id: int, text: str, markup) -> None:
+        self.times.append(time.monotonic())
+        if self.edit_failures:
+            raise self.edit_failures.pop(0)
+        self.calls.append(("edit", chat_id, message_id, text))
+
+
+def _sender(bot: FakeBot, **kwargs) -> TelegramSender:
+    defaults = dict(private_rate=1000.0, group_rate=1000.0, global_rate=1000.0)
+    defaults.update(kwargs)
+    return TelegramSender(bot.send_text, bot.edit_text, split=lambda t: [t[i:i + 50] for i in range(0, len(t), 50)], **defaults)
+
+
+async def _drain(sender: TelegramSender) -> None:
+    await asyncio.wait_for(asyncio.gather(*sender._workers.values()), 3.0)
+
+
+async def test_backlog_is_merged_and_markup_ends_a_merge():
+    bot = FakeBot()
+    sender = _sender(bot, max_chars=50)
+    for text in ("a", "b"):
+        sender.submit(1, PendingSend(text=text))
+    sender.submit(1, PendingSend(text="c", reply_markup="kbd"))
+    sender.submit(1, PendingSend(text="d"))
+    sender.submit(1, PendingSend(text="x" * 49))  # would overflow max_chars
+    await _drain(sender)
+
+    assert [c[2] for c in bot.calls] == ["a\n\nb\n\nc", "d", "x" * 49]
+    assert bot.calls[0][3] == "kbd"
+    assert sender.stats["merged"] == 2
+    assert sender.pending == 0
+
+
+async def test_edits_are_not_merged_and_resolve_last_message():
+    bot = FakeBot()
+    sender = _sender(bot)
+    sender.submit(1, PendingSend(text="working"))
+    sender.submit(1, PendingSend(text="step 1"))
+    sender.submit(1, PendingSend(text="step 2", edit_last=True))
+    sender.submit(1, PendingSend(text="done", edit_message_id=7))
+    await _drain(sender)
+    assert bot.calls == [
+        ("send", 1, "working\n\nstep 1", None),
+        ("edit", 1, 101, "step 2"),
+        ("edit", 1, 7, "done"),
+    ]
+
+
+async def test_flood_control_waits_and_retries_instead_of_dropping():
+    bot = FakeBot(failures=[FloodWaitError(0.1)])
+    sender = _sender(bot)
+    started = time.monotonic()
+    sender.submit(5, PendingSend(text="hello"))
+    await asyncio.sleep(0.02)
+    sender.submit(5, PendingSend(text="again"))  # queued behind the paused chat
+    await _drain(sender)
+    assert [c[2] for c in bot.calls] == ["hello", "again"]
+    assert bot.times[1] - started >= 0.1
+    assert sender.stats["flood_waits"] == 1 and sender.stats["failed"] == 0
+
+
+async def test_permanent_error_skips_only_that_message():
+    bot = FakeBot(failures=[ValueError("chat not found")])
+    sender = _sender(bot)
+    sender.submit(5, PendingSend(text="lost"))
+    await _drain(sender)
+    sender.submit(5, PendingSend(text="next"))
+    await _drain(sender)
+    assert [c[2] for c in bot.calls] == ["next"]
+    assert sender.stats["failed"] == 1
+
+
+async def test_chat_pacing_by_chat_type():
+    bot = FakeBot()
+    sender = _sender(bot, private_rate=20.0, group_rate=1000.0, burst=1)
+    for i in range(3):
+        sender.submit(1, PendingSend(text=f"p{i}", reply_markup="k"))  # markup: no merging
+        sender.submit(-1, PendingSend(text=f"g{i}", reply_markup="k"))
+    await _drain(sender)
+    private = [t for t, c in zip(bot.times, bot.calls) if c[1] == 1]
+    group = [t for t, c in zip(bot.times, bot.calls) if c[1] == -1]
+    assert private[-1] - private[0] >= 0.09  # 3 sends at 20/s
+    assert group[-1] - group[0] < 0.05
+
+
+def test_rate_bucket_allows_burst_then_paces():
+    bucket = RateBucket(rate=10.0, burst=2)
+    for _ in range(2):
+        assert bucket.wait_time() == 0
+        bucket.take()
+    assert 0.05 < bucket.wait_time() <= 0.1
+
+
+async def test_close_flushes_queued_messages():
+    bot = FakeBot()
+    sender = _sender(bot, private_rate=50.0, burst=1)
+    for i in range(3):
+        sender.submit(1, PendingSend(text=str(i), reply_markup="k"))
+    await sender.close(timeout=2.0)
+    assert [c[2] for c in bot.calls] == ["0", "1", "2"]
+
+
+@pytest.mark.parametrize("error", [
+    BadRequest("Chat not found"),
+    Forbidden("Forbidden: bot was blocked by the user"),
+    ChatMigrated(-100123),
+])
+async def test_permanent_errors_are_not_retried(error):
+    bot = FakeBot(failures=[error])
+    sender = _sender(bot)
+    sender.submit(5, PendingSend(text="lost"))
+    await _drain(sender)
+    assert sender.stats["api_calls"] == 1
+    assert sender.stats["failed"] == 1 and bot.calls == []
+
+
+async def test_failed_edit_is_not_retried_and_falls_back_to_send():
+    bot = FakeBot(edit_failures=[BadRequest("Message to edit not found")])
+    sender = _sender(bot)
+    sender.submit(1, PendingSend(text="fresh", edit_message_id=7))
+    await _drain(sender)
+    assert sender.stats["api_calls"] == 2  # one edit attempt, one send
+    assert bot.calls == [("send", 1, "fresh", None)]
+
+
+async def test_unmodified_edit_is_not_resent():
+    bot = FakeBot(edit_failures=[BadRequest("Message is not modified")])
+    sender = _sender(bot)
+    sender.submit(1, PendingSend(text="same", edit_message_id=7))
+    await _drain(sender)
+    assert sender.stats["api_calls"] == 1
+    assert bot.calls == [] and sender.stats["failed"] == 0
@@ -0,0 +1,112 @@
+"""Tests for prompt token accounting and the context budget."""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+import threading
+import types
+
+from nanobot.agent import token_accounting
+from nanobot.agent.token_accounting import (
+    MESSAGE_OVERHEAD_TOKENS,
+    ContextBudget,
+    TokenEstimator,
+    get_estimator,
+)
+
+
+def _budget(max_prompt_tokens: int, protect_recent: int = 2) -> ContextBudget:
+    budget = ContextBudget("test-model", max_prompt_tokens=max_prompt_tokens, protect_recent=protect_recent)
+    budget.estimator = TokenEstimator(encoding=None)  # byte heuristic, no tokenizer download
+    return budget
+
+
+def _conversation(tool_sizes: list[int]) -> list[dict]:
+    messages: list[dict] = [
+        {"role": "system", "content": "You are helpful."},
+        {"role": "user", "content": "Do the thing."},
+    ]
+    for i, size in enumerate(tool_sizes):
+        messages.append({
+            "role": "assistant",
+            "content": None,
+            "tool_calls": [{"id": f"c{i}", "type": "function", "function": {"name": "read_file", "arguments": "{}"}}],
+        })
+        messages.append({"role": "tool", "tool_call_id": f"c{i}", "name": "read_file", "content": f"{i}" * size})
+    return messages
+
+
+def test_heuristic_estimator_counts_messages():
+    est = TokenEstimator(encoding=None)
+    assert est.count_text("") == 0
+    assert est.count_text("abcdefgh") == 2
+    assert est.count_message({"role": "user", "content": "abcdefgh"}) == MESSAGE_OVERHEAD_TOKENS + 2
+    image = {"role": "user", "content": [{"type": "image_url", "image_url": {"url": "x"}}]}
+    assert est.count_message(image) > 500
+
+
+def test_estimator_scales_by_family():
+    assert get_estimator("anthropic/claude-opus-4-5").scale > 1.0
+    assert get_estimator("openai/gpt-4o").encoding == "o200k_base"
+    assert get_estimator("openai/gpt-4o") is get_estimator("openai/gpt-4o")
+
+
+def test_fit_is_noop_under_budget():
+    budget = _budget(100_000)
+    messages = _conversation([400, 400])
+    fitted, tokens = budget.fit(messages)
+    assert fitted is messages
+    assert tokens == budget.measure(messages)
+
+
+def test_fit_shrinks_oldest_tool_results_first():
+    budget = _budget(8_000)
+    messages = _conversation([20_000, 20_000, 4_000, 4_000])
+    fitted, tokens = budget.fit(messages)
+
+    assert tokens <= budget.max_prompt_tokens
+    assert tokens == budget.measure(fitted)
+    tool_contents = [m["content"] for m in fitted if m["role"] == "tool"]
+    assert "omitted to fit the context budget" in tool_contents[0]
+    # The two most recent results are protected while older ones can absorb the excess.
+    assert tool_contents[2] == "2" * 4_000
+    assert tool_contents[3] == "3" * 4_000
+    # Input is not mutated.
+    assert messages[3]["content"] == "0" * 20_000
+
+
+def test_fit_falls_back_to_recent_results():
+    budget = _budget(2_000, protect_recent=1)
+    messages = _conversation([20_000])
+    fitted, tokens = budget.fit(messages)
+    assert tokens <= budget.max_prompt_tokens
+    content = fitted[-1]["content"]
+    assert content.startswith("0" * 100) and content.endswith("0" * 100)
+    assert "omitted" in content
+
+
+async def test_encoding_loads_off_the_event_loop(monkeypatch):
+    loaded_on: list[threading.Thread] = []
+    release = threading.Event()
+
+    class _Encoding:
+        def encode(self, text, disallowed_special=()):
+            return text.split()
+
+    def get_encoding(name):
+        loaded_on.append(threading.current_thread())
+        release.wait(5)  # Stands in for fetching the BPE file
+        return _Encoding()
+
+    monkeypatch.setitem(sys.modules, "tiktoken", types.SimpleNamespace(get_encoding=get_encoding))
+    estimator = TokenEstimator(encoding="test_offloop_base")
+    text = "one two three " * 20
+
+    # Counted with the heuristic while the encoding is still loading
+    assert estimator.count_text(text) == (len(text) + 3) // 4
+    release.set()
+    while "test_offloop_base" not in token_accounting._ENCODINGS:
+        await asyncio.sleep(0.01)
+    assert loaded_on and loaded_on[0] is not threading.main_thread()
+    assert estimator.count_text(text) == 60
@@ -0,0 +1,93 @@
+"""Tests for spilling large tool results to disk and paging them back."""
+
+from __future__ import annotations
+
+import os
+from typing import Any
+
+from nanobot.agent.tools.base import Tool
+from nanobot.agent.tools.registry import ToolRegistry
+from nanobot.agent.tools.results import ReadResultTool, ResultStore
+
+
+class _BigOutputTool(Tool):
+    def __init__(self, output: str):
+        self._output = output
+
+    @property
+    def name(self) -> str:
+        return "big"
+
+    @property
+    def description(self) -> str:
+        return "Returns a large string."
+
+    @property
+    def parameters(self) -> dict[str, Any]:
+        return {"type": "object", "properties": {}, "required": []}
+
+    async def execute(self, **kwargs: Any) -> str:
+        return self._output
+
+
+def _store(tmp_path, **kwargs) -> ResultStore:
+    return ResultStore(tmp_path / "results", threshold_chars=1_000, preview_chars=200, **kwargs)
+
+
+def test_small_results_pass_through(tmp_path):
+    store = _store(tmp_path)
+    assert store.spill("exec", "short") == "short"
+    assert store.stats["spilled"] == 0
+
+
+def test_spill_returns_handle_and_preview(tmp_path):
+    store = _store(tmp_path)
+    result = "A" * 3_000 + "Z" * 2_000
+    notice = store.spill("web_fetch", result)
+
+    assert len(notice) < 600
+    assert "stored as result" in notice
+    assert notice.rstrip().endswith("Z" * 50)
+    handle = store.put(result)
+    assert f"'{handle}'" in notice
+    # Content-addressed: the same output is stored once.
+    assert len(list((tmp_path / "results").glob("*.txt"))) == 1
+
+
+def test_read_pages_through_stored_result(tmp_path):
+    store = _store(tmp_path)
+    result = "".join(chr(ord("a") + i % 26) for i in range(2_500))
+    handle = store.put(result)
+
+    first = store.read(handle, offset=0, length=1_000)
+    assert first.startswith(result[:1_000])
+    assert "offset=1000" in first
+    last = store.read(handle[:8], offset=2_000, length=1_000)
+    assert last.startswith(result[2_000:])
+    assert "next:" not in last
+    assert store.read("deadbeef").startswith("Error")
+    assert store.read("../etc").startswith("Error")
+
+
+async def test_registry_spills_and_read_result_pages(tmp_path):
+    store = _store(tmp_path)
+    registry = ToolRegistry(result_store=store)
+    registry.register(_BigOutputTool("x" * 5_000))
+    registry.register(ReadResultTool(store))
+
+    notice = await registry.execute("big", {})
+    assert "stored as result" in notice
+    handle = notice.split("stored as result '")[1].split("'")[0]
+
+    page = await registry.execute("read_result", {"handle": handle, "offset": 0, "length": 4_500})
+    # Pages are never re-spilled even above the threshold.
+    assert page.startswith("x" * 4_500)
+
+
+def test_prune_removes_old_results(tmp_path):
+    store = _store(tmp_path)
+    handle = store.put("y" * 2_000)
+    path = store.resolve(handle)
+    os.utime(path, (0, 0))
+    assert store.prune() == 1
+    assert store.resolve(handle) is None
@@ -0,0 +1,94 @@
+"""Tests for transcript caching and batch transcription."""
+
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+
+import httpx
+
+from nanobot.providers import transcription
+from nanobot.providers.transcription import GroqTranscriptionProvider, TranscriptionCache
+
+
+class CountingProvider(GroqTranscriptionProvider):
+    def __init__(self, **kwargs):
+        super().__init__(api_key="test", **kwargs)
+        self.uploads: list[str] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def _upload(self, path: Path) -> str:
+        self.uploads.append(path.name)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.02)
+        self.in_flight -= 1
+        return f"said: {path.read_bytes().decode()}"
+
+
+def _audio(tmp_path: Path, name: str, data: str) -> Path:
+    path = tmp_path / name
+    path.write_text(data)
+    return path
+
+
+async def test_same_audio_is_transcribed_once(tmp_path):
+    provider = CountingProvider()
+    original = _audio(tmp_path, "a.ogg", "hello")
+    forwarded = _audio(tmp_path, "b.ogg", "hello")
+    assert await provider.transcribe(original) == "said: hello"
+    assert await provider.transcribe(forwarded) == "said: hello"
+    assert provider.uploads == ["a.ogg"]
+    assert provider.cache.hits == 1
+
+
+async def test_transcripts_persist_on_disk(tmp_path):
+    audio = _audio(tmp_path, "a.ogg", "persisted")
+    first = CountingProvider(cache=TranscriptionCache(cache_dir=tmp_path / "cache"))
+    await first.transcribe(audio)
+    second = CountingProvider(cache=TranscriptionCache(cache_dir=tmp_path / "cache"))
+    assert await second.transcribe(audio) == "said: persisted"
+    assert second.uploads == []
+
+
+async def test_failed_transcription_is_not_cached(tmp_path):
+    provider = CountingProvider()
+    audio = _audio(tmp_path, "a.ogg", "x")
+    provider._upload = lambda path: asyncio.sleep(0, result="")
+    assert await provider.transcribe(audio) == ""
+    assert len(provider.cache._entries) == 0
+
+
+async def test_batch_is_concurrent_capped_and_deduplicated(tmp_path):
+    provider = CountingProvider(max_concurrency=2)
+    paths = [_audio(tmp_path, f"{i}.ogg", str(i)) for i in range(5)]
+    paths.append(_audio(tmp_path, "dup.ogg", "0"))
+    texts = await provider.transcribe_batch(paths)
+    assert texts == ["said: 0", "said: 1", "said: 2", "said: 3", "said: 4", "said: 0"]
+    assert provider.max_in_flight == 2
+    assert len(provider.uploads) == 5
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    def __init__(self):
+        self.chunks: list[bytes] = []
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.chunks = [chunk async for chunk in request.stream]
+        return httpx.Response(200, json={"text": "ok"})
+
+
+async def test_upload_streams_file_from_disk(tmp_path, monkeypatch):
+    transport = RecordingTransport()
+    client = httpx.AsyncClient(transport=transport)
+    monkeypatch.setattr(transcription, "get_http_client", lambda: client)
+    audio = tmp_path / "v.ogg"
+    audio.write_bytes(b"v" * 300_000)
+
+    provider = GroqTranscriptionProvider(api_key="test")
+    assert await provider.transcribe(audio) == "ok"
+    body = b"".join(transport.chunks)
+    assert b"v" * 300_000 in body and b"whisper-large-v3" in body
+    assert max(len(c) for c in transport.chunks) < 300_000  # sent in pieces, not one buffer
+    await client.aclose()